@@ -37,10 +37,25 @@
 from decimal import Decimal
 from uuid import UUID
 
+# Import capability contract decorator (optional - graceful degradation)
+try:
+    from app.core.capability_contract import capability
+    CAPABILITY_CONTRACT_AVAILABLE = True
+except ImportError:
+    logger = logging.getLogger(__name__)
+    logger.warning("Capability contract module not available - contracts disabled")
+    # Fallback: no-op decorator
+    def capability(*args, **kwargs):
+        def decorator(func):
+            return func
+        return decorator
+    CAPABILITY_CONTRACT_AVAILABLE = False
+
 from app.agents.base_agent import BaseAgent
 from app.core.types import RequestCtx
 from app.core.symbol_utils import normalize_symbol_for_fmp, normalize_symbol_for_news
 from app.services.fundamentals_transformer import transform_fmp_to_ratings_format
+from app.services.news_impact import NewsImpactScorer
 
 logger = logging.getLogger("DawsOS.DataHarvester")
 
@@ -84,6 +99,18 @@ class DataHarvester(BaseAgent):
         - Rights registry checks
     """
 
+    def __init__(self, name: str, services: Dict[str, Any]):
+        """
+        Initialize DataHarvester.
+
+        Args:
+            name: Agent identifier (e.g., "data_harvester")
+            services: Dependency injection dict (db, redis, optional news_scorer)
+        """
+        super().__init__(name, services)
+        # Shared across requests so scored articles are reused (cached by article id)
+        self.news_scorer = services.get("news_scorer") or NewsImpactScorer()
+
     def get_capabilities(self) -> List[str]:
         """Return list of capabilities."""
         return [
@@ -652,6 +679,17 @@ async def provider_fetch_ratios(
 
         return result
 
+    @capability(
+        name="fundamentals.load",
+        inputs={"security_id": str, "provider": str},
+        outputs={"symbol": str, "_provenance": dict},
+        implementation_status="real",
+        description="Load FMP fundamentals in ratings-service format",
+        dependencies=[],
+        latency_budget_ms=8000,
+        hedge=True,
+        idempotent=True,
+    )
     async def fundamentals_load(
         self,
         ctx: RequestCtx,
@@ -702,15 +740,24 @@ async def fundamentals_load(
         source = "fundamentals:stub"
 
         try:
-            # Step 1: Lookup symbol from security_id (system-level data - no RLS needed)
-            from app.db.connection import execute_query_one
-            
-            row = await execute_query_one(
-                "SELECT symbol FROM securities WHERE id = $1",
-                self._to_uuid(security_id, "security_id")
-            )
-            if row:
-                symbol = row["symbol"]
+            # Step 1: Lookup symbol from security_id (in-memory securities reference,
+            # database for securities added since it loaded)
+            from app.services.securities_reference import get_securities_reference
+
+            security_uuid = self._to_uuid(security_id, "security_id")
+            record = (await get_securities_reference()).get(security_uuid)
+            if record:
+                symbol = record["symbol"]
+            else:
+                from app.db.connection import execute_query_one
+
+                row = await execute_query_one(
+                    "SELECT symbol FROM securities WHERE id = $1",
+                    security_uuid
+                )
+                if row:
+                    symbol = row["symbol"]
+            if symbol:
                 logger.info(f"Looked up symbol: {security_id} → {symbol}")
 
             # Step 2: Attempt to fetch from provider if symbol found
@@ -1710,34 +1757,24 @@ def _calculate_news_relevance(
             Relevance score between 0.0 and 1.0
 
         Algorithm:
-            - Exact match in title: 1.0
-            - Match in title (case-insensitive): 0.85
-            - Match in description: 0.70
-            - Multiple matches: average of scores
+            - Exact match of the whole title: 1.0
+            - Query token in title (case-insensitive): 0.85
+            - Query token in description: 0.70
             - No match: 0.50 (default relevance)
         """
-        if not query or not title:
-            return Decimal("0.50")
-
-        query_lower = query.lower()
-        title_lower = title.lower()
-        description_lower = (description or "").lower()
-
-        # Check for exact match in title
-        if query == title:
-            return Decimal("1.00")
-
-        # Check for case-insensitive match in title
-        if query_lower in title_lower:
-            return Decimal("0.85")
-
-        # Check for match in description
-        if query_lower in description_lower:
-            return Decimal("0.70")
-
-        # No match found - default relevance
-        return Decimal("0.50")
-
+        return self.news_scorer.score_relevance(title, description, query)
+
+    @capability(
+        name="news.search",
+        inputs={"entities": list, "lookback_hours": int},
+        outputs={"news_items": list, "total_count": int, "entities_searched": list, "lookback_hours": int},
+        implementation_status="real",
+        description="Search recent news for symbols / positions (NewsAPI)",
+        dependencies=[],
+        latency_budget_ms=6000,
+        hedge=True,
+        idempotent=True,
+    )
     async def news_search(
         self,
         ctx: RequestCtx,
@@ -1908,158 +1945,10 @@ async def news_compute_portfolio_impact(
         )
 
         try:
-            # Create position lookup by symbol
-            position_lookup = {}
-            for pos in actual_positions:
-                if isinstance(pos, dict):
-                    symbol = pos.get("symbol")
-                    if symbol:
-                        position_lookup[symbol] = pos
-            
-            # Analyze each news item for portfolio impact
-            impact_analysis = []
-            total_impact_score = 0.0
-            entity_mention_counts = {}
-            
-            for news_item in actual_news_items:
-                if not isinstance(news_item, dict):
-                    continue
-                    
-                # Extract news fields - handle None values
-                title = (news_item.get("title") or news_item.get("headline") or "").lower()
-                summary = (news_item.get("summary") or "").lower()
-                content = (news_item.get("content") or summary or "").lower()
-                
-                # Enhanced sentiment analysis with more keywords  
-                positive_keywords = ["up", "rise", "gain", "profit", "beat", "exceed", "strong", "growth", 
-                                   "surge", "rally", "boost", "upgrade", "bullish", "record", "breakthrough"]
-                negative_keywords = ["down", "fall", "drop", "loss", "miss", "weak", "decline", "crash",
-                                   "plunge", "slump", "cut", "downgrade", "bearish", "warning", "concern"]
-                
-                # Calculate sentiment score based on keyword presence
-                sentiment_score = 0.0
-                for keyword in positive_keywords:
-                    if keyword in title:
-                        sentiment_score += 0.15  # Title mentions are weighted higher
-                    if keyword in content:
-                        sentiment_score += 0.05
-                        
-                for keyword in negative_keywords:
-                    if keyword in title:
-                        sentiment_score -= 0.15
-                    if keyword in content:
-                        sentiment_score -= 0.05
-                
-                # Clamp sentiment score to [-1, 1]
-                sentiment_score = max(-1.0, min(1.0, sentiment_score))
-                
-                # Check which portfolio holdings are mentioned
-                mentioned_symbols = []
-                for symbol, position in position_lookup.items():
-                    # Check both the symbol and possible variations
-                    symbol_lower = symbol.lower()
-                    symbol_normalized = symbol.replace(".", "").replace("-", "").lower()
-                    
-                    # Check if symbol or variations appear in title/content
-                    if (symbol_lower in title or symbol_lower in content or
-                        symbol_normalized in title or symbol_normalized in content):
-                        mentioned_symbols.append(symbol)
-                        # Track entity mentions for visualization
-                        entity_mention_counts[symbol] = entity_mention_counts.get(symbol, 0) + 1
-                
-                # Also check if news mentions matched_symbol from search
-                matched_symbol = news_item.get("matched_symbol", "")
-                if matched_symbol:
-                    # Convert back from normalized form (BRK-B -> BRK.B)
-                    original_symbol = matched_symbol.replace("-", ".")
-                    if original_symbol in position_lookup and original_symbol not in mentioned_symbols:
-                        mentioned_symbols.append(original_symbol)
-                        entity_mention_counts[original_symbol] = entity_mention_counts.get(original_symbol, 0) + 1
-                
-                # Calculate impact for each mentioned position
-                position_impacts = []
-                for symbol in mentioned_symbols:
-                    position = position_lookup.get(symbol, {})
-                    weight = float(position.get("weight", 0.0))  # Portfolio weight as percentage
-                    
-                    # Impact score combines relevance, sentiment, and portfolio weight
-                    relevance = float(news_item.get("relevance", 0.5))
-                    impact_score = abs(sentiment_score) * relevance * weight / 100.0
-                    
-                    if impact_score >= min_threshold:
-                        position_impacts.append({
-                            "symbol": symbol,
-                            "weight": weight,
-                            "impact_score": round(impact_score, 4),
-                            "sentiment": "positive" if sentiment_score > 0 else "negative" if sentiment_score < 0 else "neutral",
-                            "sentiment_score": round(sentiment_score, 3),
-                        })
-                        total_impact_score += impact_score
-                
-                # Include news item if it has portfolio impact
-                if position_impacts:
-                    impact_analysis.append({
-                        "headline": news_item.get("title", ""),
-                        "summary": news_item.get("summary", ""),
-                        "source": news_item.get("source", ""),
-                        "published_at": news_item.get("published_at", ""),
-                        "url": news_item.get("url", ""),
-                        "sentiment": "positive" if sentiment_score > 0 else "negative" if sentiment_score < 0 else "neutral",
-                        "sentiment_score": round(sentiment_score, 3),
-                        "impact_score": round(max(imp["impact_score"] for imp in position_impacts), 4),
-                        "entities": mentioned_symbols,
-                        "weight_affected": round(sum(imp["weight"] for imp in position_impacts), 2),
-                        "mentioned_symbols": mentioned_symbols,
-                        "position_impacts": position_impacts,
-                    })
-            
-            # Sort by impact score (highest impact first)
-            impact_analysis.sort(key=lambda x: x["impact_score"], reverse=True)
-            
-            # Prepare entity mentions for bar chart (top 10)
-            entity_mentions_list = sorted(
-                [{"entity": k, "mention_count": v} for k, v in entity_mention_counts.items()],
-                key=lambda x: x["mention_count"],
-                reverse=True
-            )[:10]
-            
-            # Calculate portfolio exposure percentage
-            exposed_positions = len(set(sum([item["entities"] for item in impact_analysis], [])))
-            exposed_portfolio_pct = (exposed_positions / len(actual_positions) * 100) if actual_positions else 0
-            
-            # Calculate overall sentiment
-            if impact_analysis:
-                avg_sentiment = sum(item["sentiment_score"] for item in impact_analysis) / len(impact_analysis)
-                overall_sentiment = "positive" if avg_sentiment > 0.1 else "negative" if avg_sentiment < -0.1 else "neutral"
-            else:
-                overall_sentiment = "neutral"
-            
-            # Calculate weighted impact score (0-1 scale)
-            total_weight = sum(float(pos.get("weight", 0)) for pos in actual_positions)
-            weighted_impact = (total_impact_score / total_weight * 100) if total_weight > 0 else 0
-            
-            return {
-                # Core analysis results
-                "news_with_impact": impact_analysis,  # For news_items panel
-                "impact_analysis": impact_analysis,   # Backwards compatibility
-                
-                # Summary metrics for impact_summary panel
-                "total_items": len(actual_news_items),
-                "high_impact_count": len([item for item in impact_analysis if item["impact_score"] >= min_threshold]),
-                "weighted_impact": round(weighted_impact, 4),
-                "exposed_portfolio_pct": round(exposed_portfolio_pct, 2),
-                "overall_sentiment": overall_sentiment,
-                
-                # Entity mentions for bar chart
-                "entity_mentions": entity_mentions_list,
-                
-                # Additional metadata
-                "total_impact_score": round(total_impact_score, 4),
-                "min_threshold": min_threshold,
-                "positions_analyzed": len(actual_positions),
-                "news_items_analyzed": len(actual_news_items),
-                "_source": "newsapi" if actual_news_items else "empty",
-            }
+            # Single pass per article + vectorized scoring (see NewsImpactScorer)
+            return self.news_scorer.compute_portfolio_impact(
+                actual_news_items, actual_positions, min_threshold=min_threshold
+            )
 
         except Exception as e:
             logger.error(f"news.compute_portfolio_impact failed: {e}", exc_info=True)
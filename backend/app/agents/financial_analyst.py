@@ -27,6 +27,11 @@
         - financial_analyst.resilience: Financial resilience scoring
         - financial_analyst.aggregate_ratings: Combined ratings aggregation
     
+    Tax Reporting:
+        - metrics.unrealized_pl: Unrealized P&L by holding-period term
+        - tax.realized_gains / tax.wash_sales / tax.lot_details / tax.summary: Tax report
+        - tax.identify_losses / tax.wash_sale_check / tax.calculate_benefit / tax.rank_opportunities: Loss harvesting
+
     Visualization:
         - charts.overview: Generate overview charts
         - financial_analyst.macro_overview_charts: Macro overview visualizations
@@ -40,6 +45,7 @@
     runtime.register_agent(agent)
 """
 
+import asyncio
 import logging
 from datetime import date, datetime
 from decimal import Decimal
@@ -69,7 +75,9 @@ def decorator(func):
 from app.db import (
     get_metrics_queries,
     get_pricing_pack_queries,
-    get_db_connection_with_rls,
+    get_rls_read_connection,
+    fetch_named,
+    register_query,
 )
 from app.services.pricing import PricingService
 from app.services.currency_attribution import CurrencyAttributor
@@ -79,6 +87,25 @@ def decorator(func):
 
 logger = logging.getLogger("DawsOS.FinancialAnalyst")
 
+# Open lots for ledger.positions (hot path on every portfolio pattern)
+OPEN_LOTS_QUERY = register_query(
+    "ledger.open_lots",
+    """
+    SELECT
+        l.security_id,
+        l.symbol,
+        l.quantity_open,
+        l.cost_basis,
+        l.currency,
+        p.base_currency
+    FROM lots l
+    JOIN portfolios p ON p.id = l.portfolio_id
+    WHERE l.portfolio_id = $1
+      AND l.is_open = true
+      AND l.quantity_open > 0
+    """,
+)
+
 
 class FinancialAnalyst(BaseAgent):
     """
@@ -166,9 +193,23 @@ def get_capabilities(self) -> List[str]:
             "charts.scenario",
         ]
         
+        # Tax reporting capabilities (tax-lot engine)
+        tax_capabilities = [
+            "metrics.unrealized_pl",
+            "tax.identify_losses",
+            "tax.wash_sale_check",
+            "tax.calculate_benefit",
+            "tax.rank_opportunities",
+            "tax.realized_gains",
+            "tax.wash_sales",
+            "tax.lot_details",
+            "tax.summary",
+        ]
+
         capabilities.extend(optimization_capabilities)
         capabilities.extend(ratings_capabilities)
         capabilities.extend(charting_capabilities)
+        capabilities.extend(tax_capabilities)
         
         return capabilities
 
@@ -246,24 +287,8 @@ async def ledger_positions(
             if not ctx.user_id:
                 raise ValueError("user_id missing from request context")
 
-            async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
-                rows = await conn.fetch(
-                    """
-                    SELECT
-                        l.security_id,
-                        l.symbol,
-                        l.quantity_open,
-                        l.cost_basis,
-                        l.currency,
-                        p.base_currency
-                    FROM lots l
-                    JOIN portfolios p ON p.id = l.portfolio_id
-                    WHERE l.portfolio_id = $1
-                      AND l.is_open = true
-                      AND l.quantity_open > 0
-                    """,
-                    portfolio_uuid,
-                )
+            async with get_rls_read_connection(str(ctx.user_id)) as conn:
+                rows = await fetch_named(conn, OPEN_LOTS_QUERY, portfolio_uuid)
 
             if rows:
                 portfolio_base_currency = rows[0]["base_currency"]
@@ -472,6 +497,10 @@ async def pricing_apply_pack(
 
         fx_cache: Dict[tuple, Optional[Decimal]] = {}
         valued_positions: List[Dict[str, Any]] = []
+
+        # Sector per holding for UI breakdowns (in-memory, only once the reference is loaded)
+        from app.services.securities_reference import current_reference
+        reference = current_reference()
         total_value_base = Decimal("0")
 
         for pos in positions:
@@ -534,6 +563,10 @@ async def pricing_apply_pack(
                 "fx_rate": fx_rate,
                 "base_currency": base_currency,
             }
+            if reference is not None and "sector" not in pos:
+                record = reference.get(security_id) or reference.get(pos.get("symbol"))
+                if record:
+                    valued_position["sector"] = record["sector"]
             valued_positions.append(valued_position)
             total_value_base += value_base
 
@@ -1372,27 +1405,33 @@ async def risk_get_factor_exposure_history(
         state: Dict[str, Any],
         portfolio_id: Optional[str] = None,
         lookback_days: int = 252,
+        lookback_weeks: Optional[int] = None,
     ) -> Dict[str, Any]:
         """
         Get historical factor exposures for portfolio.
 
         Capability: risk.get_factor_exposure_history
 
-        Returns time series of factor betas over specified period
+        Returns time series of factor betas over specified period. One point per
+        fresh pricing pack (or per week when lookback_weeks is given); each point
+        is a 1-year regression ending at the pack date. All windows are computed
+        from a single data load and persisted per pack (factor_exposure_history).
         """
         portfolio_id_uuid = self._resolve_portfolio_id(portfolio_id, ctx, "risk.get_factor_exposure_history")
+        if lookback_weeks:
+            lookback_days = int(lookback_weeks) * 7
 
         logger.info(f"risk.get_factor_exposure_history: portfolio_id={portfolio_id_uuid}, lookback={lookback_days}")
 
-        # PHASE 3 TASK 3.3: Implement historical lookback
         from app.services.factor_analysis import FactorAnalyzer
-        from app.db.connection import get_db_connection_with_rls, execute_query_value
+        from app.services.rolling_factors import FactorExposureHistoryStore, weekly_window_ends
+        from app.db.connection import get_rls_read_connection
         from datetime import date, timedelta
-        
+
         # FactorAnalyzer needs a connection - use RLS-aware for user-scoped data
-        async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
+        async with get_rls_read_connection(str(ctx.user_id)) as conn:
             factor_service = FactorAnalyzer(conn)
-            
+
             # Get current pack date (pricing_packs is system-level, but using RLS connection for consistency)
             if ctx.pricing_pack_id:
                 pack_date = await conn.fetchval(
@@ -1414,13 +1453,13 @@ async def risk_get_factor_exposure_history(
             else:
                 # Use current date if no pack specified
                 pack_date = ctx.asof_date or date.today()
-            
+
             # Calculate date range
             end_date = pack_date if isinstance(pack_date, date) else pack_date.date()
             start_date = end_date - timedelta(days=lookback_days)
-            
+
             # Query historical pricing packs
-            packs = await db.fetch(
+            pack_rows = await conn.fetch(
                 """
                 SELECT id, date
                 FROM pricing_packs
@@ -1433,78 +1472,47 @@ async def risk_get_factor_exposure_history(
                 start_date,
                 end_date
             )
-            
-            if not packs:
+            packs = [(row["id"], row["date"]) for row in pack_rows]
+            if not packs and ctx.pricing_pack_id:
                 logger.warning(f"No pricing packs found for date range {start_date} to {end_date}")
                 # Fall back to current pack only
-                current = await factor_service.compute_factor_exposure(
-                    portfolio_id=str(portfolio_id_uuid),
-                    pack_id=ctx.pricing_pack_id or str(packs[0]["id"]) if packs else None,
-                    lookback_days=252
-                )
+                packs = [(ctx.pricing_pack_id, end_date)]
+            if lookback_weeks:
+                packs = weekly_window_ends(packs)
+
+            # Loads returns/factors once for all windows; cached packs are not recomputed
+            history = await FactorExposureHistoryStore().get_history(
+                factor_service, portfolio_id_uuid, packs
+            )
+
+            if not history:
+                logger.error("No successful factor exposures computed")
                 result = {
-                    "history": [current] if "error" not in current else [],
+                    "history": [],
                     "lookback_days": lookback_days,
-                    "note": "Historical packs not available - using current only",
+                    "error": "Failed to compute factor exposures for any historical packs",
                     "_provenance": {
-                        "type": "partial",
+                        "type": "error",
                         "source": "factor_analysis_service",
-                        "warnings": ["Historical packs not available"],
+                        "error": "No successful computations",
                     }
                 }
             else:
-                # Compute factor exposures for each historical pack
-                history = []
-                for pack in packs:
-                    try:
-                        exposure = await factor_service.compute_factor_exposure(
-                            portfolio_id=str(portfolio_id_uuid),
-                            pack_id=pack["id"],
-                            lookback_days=252  # Use 1 year lookback for each historical point
-                        )
-                        if "error" not in exposure:
-                            # Add date to exposure result
-                            exposure["asof_date"] = str(pack["date"])
-                            history.append(exposure)
-                        else:
-                            logger.warning(f"Factor exposure computation failed for pack {pack['id']}: {exposure.get('error')}")
-                    except (ValueError, TypeError, KeyError, AttributeError) as e:
-                        # Programming errors - re-raise to surface bugs immediately
-                        logger.error(f"Programming error computing factor exposure for pack {pack['id']}: {e}", exc_info=True)
-                        raise
-                    except Exception as e:
-                        # Service/database errors - log and continue with other packs
-                        logger.error(f"Error computing factor exposure for pack {pack['id']}: {e}", exc_info=True)
-                        # Continue with other packs
-                        continue
-                
-                if not history:
-                    logger.error("No successful factor exposures computed")
-                    result = {
-                        "history": [],
-                        "lookback_days": lookback_days,
-                        "error": "Failed to compute factor exposures for any historical packs",
-                        "_provenance": {
-                            "type": "error",
-                            "source": "factor_analysis_service",
-                            "error": "No successful computations",
-                        }
-                    }
-                else:
-                    # Sort by date (most recent first)
-                    history.sort(key=lambda x: x.get("asof_date", ""), reverse=True)
-                    result = {
-                        "history": history,
-                        "lookback_days": lookback_days,
-                        "pack_count": len(packs),
-                        "exposure_count": len(history),
-                        "_provenance": {
-                            "type": "real",
-                            "source": "factor_analysis_service",
-                            "confidence": 0.9,
-                            "implementation_status": "complete",
-                        }
+                result = {
+                    "history": history,
+                    "lookback_days": lookback_days,
+                    "pack_count": len(packs),
+                    "exposure_count": len(history),
+                    "_provenance": {
+                        "type": "real" if pack_rows else "partial",
+                        "source": "factor_analysis_service",
+                        "confidence": 0.9,
+                        "implementation_status": "complete",
                     }
+                }
+                if not pack_rows:
+                    result["note"] = "Historical packs not available - using current only"
+                    result["_provenance"]["warnings"] = ["Historical packs not available"]
 
         metadata = self._create_metadata(
             source=f"factor_analysis_service:history",
@@ -1671,117 +1679,126 @@ async def risk_overlay_cycle_phases(
             }
         }
 
+        # Phase history from the cached timeline (how long the current phases have lasted)
+        try:
+            from app.services.cycle_timeline import load_phase_timeline
+            timelines = await load_phase_timeline(cycle_types=("STDC", "LTDC"))
+            result["cycle_history"] = {
+                "short_term": timelines["STDC"].summary(),
+                "long_term": timelines["LTDC"].summary(),
+            }
+        except Exception as e:
+            logger.warning(f"Cycle phase timeline unavailable: {e}")
+
         # Return result directly without metadata wrapping to avoid orchestrator resolution issues
         return result
 
-    async def get_position_details(
+    # ============================================================================
+    # Holding Deep Dive (shared PositionContext)
+    # ============================================================================
+
+    @staticmethod
+    def _background(coro) -> "asyncio.Future":
+        """Start coro now; failures surface only to whoever awaits the task."""
+        task = asyncio.ensure_future(coro)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    async def _load_position_context(self, ctx, state, portfolio_uuid: UUID, security_uuid: UUID, pack: str, lookback_days: int):
+        from app.services.position_context import load_position_context
+
+        # Portfolio TWR (for contribution) does not need the context; run it alongside the load
+        twr_task = self._background(self.metrics_compute_twr(ctx, state, str(portfolio_uuid), pack_id=pack))
+        try:
+            async with get_rls_read_connection(str(ctx.user_id)) as conn:
+                pctx = await load_position_context(conn, portfolio_uuid, security_uuid, pack, lookback_days)
+        except BaseException:
+            twr_task.cancel()
+            raise
+        pctx.pending["portfolio_twr"] = twr_task
+        if pctx.asset_class in ("equity", "stock"):
+            pctx.pending["fundamentals"] = self._background(
+                self._fetch_fundamentals(ctx, str(security_uuid), pctx.symbol, pctx.name, pctx.asset_class)
+            )
+        return pctx
+
+    async def _position_context(
         self,
         ctx: RequestCtx,
-        state: Dict[str, Any],
+        state: Optional[Dict[str, Any]],
         portfolio_id: str,
         security_id: str,
         pack_id: Optional[str] = None,
-    ) -> Dict[str, Any]:
+        lookback_days: int = 252,
+    ):
         """
-        Get detailed position information.
-
-        Capability: get_position_details
+        PositionContext for (portfolio, security, pack), loaded once per pattern run.
 
-        Returns position details including qty, cost basis, market value, unrealized P&L
+        The first deep-dive step starts the load (plus portfolio TWR and, for
+        equities, fundamentals) and stores the future in pattern state; later
+        steps await the same future and compute from memory.
         """
+        from app.services.position_context import STATE_KEY
+
         portfolio_uuid = self._to_uuid(portfolio_id, "portfolio_id")
         security_uuid = self._to_uuid(security_id, "security_id")
         pack = self._resolve_pricing_pack_id(pack_id, ctx)
-
-        logger.info(f"get_position_details: portfolio={portfolio_id}, security={security_id}, pack={pack}")
-
-        # Query lots table for position details (user-scoped data - requires RLS)
-        from app.db.connection import get_db_connection_with_rls
-
-        async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
-            # Get position from lots
-            lots = await conn.fetch(
-                """
-                SELECT l.*, s.symbol, l.currency as security_currency
-                FROM lots l
-                JOIN securities s ON l.security_id = s.id
-                WHERE l.portfolio_id = $1
-                  AND l.security_id = $2
-                  AND l.quantity_open > 0
-                ORDER BY l.acquisition_date
-                """,
-                portfolio_uuid,
-                security_uuid,
-            )
-
-            if not lots:
-                raise ValueError(f"No open position found for security {security_id}")
-
-            # Calculate aggregated position
-            total_qty = sum(Decimal(str(lot["quantity_open"])) for lot in lots)
-            weighted_cost = sum(
-                Decimal(str(lot["quantity_open"])) * Decimal(str(lot["cost_basis_per_share"]))
-                for lot in lots
+        lookback_days = int(lookback_days or 252)
+
+        contexts = state.setdefault(STATE_KEY, {}) if state is not None else {}
+        key = (str(portfolio_uuid), str(security_uuid), pack)
+        future = contexts.get(key)
+        if future is None:
+            future = contexts[key] = asyncio.ensure_future(
+                self._load_position_context(ctx, state, portfolio_uuid, security_uuid, pack, lookback_days)
             )
-            avg_cost = weighted_cost / total_qty if total_qty > 0 else Decimal("0")
+        try:
+            pctx = await asyncio.shield(future)
+        except Exception:
+            # Let a later step retry instead of replaying the same failure
+            if contexts.get(key) is future:
+                contexts.pop(key)
+            raise
+        await pctx.ensure_history(lambda: get_rls_read_connection(str(ctx.user_id)), lookback_days)
+        return pctx
 
-            symbol = lots[0]["symbol"]
-            security_currency = lots[0]["security_currency"]
+    def _find_position_context(self, state: Optional[Dict[str, Any]], security_id: str, portfolio_id: Optional[str] = None):
+        """Already-loaded PositionContext for a security in this pattern run, if any."""
+        from app.services.position_context import STATE_KEY
 
-            # Get current price from pricing pack
-            price_row = await conn.fetchrow(
-                """
-                SELECT close as price
-                FROM prices
-                WHERE security_id = $1 AND pricing_pack_id = $2
-                """,
-                security_uuid,
-                pack,
-            )
+        for (portfolio, security, _), future in (state or {}).get(STATE_KEY, {}).items():
+            if security != str(security_id) or (portfolio_id and portfolio != str(portfolio_id)):
+                continue
+            if future.done() and not future.cancelled() and future.exception() is None:
+                return future.result()
+        return None
 
-            current_price = Decimal(str(price_row["price"])) if price_row else Decimal("0")
-            market_value = total_qty * current_price
-            unrealized_pnl = market_value - weighted_cost
-            unrealized_pnl_pct = (unrealized_pnl / weighted_cost) if weighted_cost > 0 else Decimal("0")
+    async def get_position_details(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        portfolio_id: str,
+        security_id: str,
+        pack_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Get detailed position information.
 
-            # Get portfolio total value for weight calculation
-            portfolio_value_row = await conn.fetchrow(
-                """
-                SELECT SUM(l.quantity_open * p.close) as total_value
-                FROM lots l
-                JOIN prices p ON l.security_id = p.security_id
-                WHERE l.portfolio_id = $1
-                  AND p.pricing_pack_id = $2
-                  AND l.quantity_open > 0
-                """,
-                portfolio_uuid,
-                pack,
-            )
+        Capability: get_position_details
 
-            portfolio_value = Decimal(str(portfolio_value_row["total_value"])) if portfolio_value_row and portfolio_value_row["total_value"] else Decimal("1")
-            weight = market_value / portfolio_value if portfolio_value > 0 else Decimal("0")
+        Returns position details including qty, cost basis, market value, unrealized P&L
+        """
+        from app.services.position_context import position_details
 
-        result = {
-            "symbol": symbol,
-            "security_id": str(security_uuid),
-            "security_currency": security_currency,
-            "quantity": float(total_qty),  # Changed from quantity_open to quantity for consistency
-            "avg_cost": float(avg_cost),
-            "current_price": float(current_price),
-            "market_value": float(market_value),
-            "weight": float(weight),
-            "unrealized_pnl": float(unrealized_pnl),
-            "unrealized_pnl_pct": float(unrealized_pnl_pct),
-            "lot_count": len(lots),
-        }
+        logger.info(f"get_position_details: portfolio={portfolio_id}, security={security_id}, pack={pack_id}")
+        pctx = await self._position_context(ctx, state, portfolio_id, security_id, pack_id)
 
         metadata = self._create_metadata(
-            source=f"lots_table:{pack}",
+            source=f"lots_table:{pctx.pack_id}",
             asof=ctx.asof_date,
             ttl=self.CACHE_TTL_5MIN
         )
-
-        return self._attach_metadata(result, metadata)
+        return self._attach_metadata(position_details(pctx), metadata)
 
     async def compute_position_return(
         self,
@@ -1799,110 +1816,19 @@ async def compute_position_return(
 
         Returns total return, volatility, Sharpe ratio, max drawdown
         """
-        security_uuid = self._to_uuid(security_id, "security_id")
-        pack = self._resolve_pricing_pack_id(pack_id, ctx)
-
-        logger.info(f"compute_position_return: security={security_id}, lookback={lookback_days}, pack={pack}")
-
-        # Get historical prices from pricing packs (last N days)
-        # Note: prices table is system-level, but we use RLS-aware connection for consistency
-        from app.db.connection import get_db_connection_with_rls
-
-        async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
-            # Query historical prices for this security
-            prices = await conn.fetch(
-                """
-                SELECT p.asof_date, p.close as price
-                FROM prices p
-                JOIN pricing_packs pp ON p.pricing_pack_id = pp.id
-                WHERE p.security_id = $1
-                  AND p.asof_date <= (SELECT date FROM pricing_packs WHERE id = $2)
-                  AND p.asof_date >= (SELECT date FROM pricing_packs WHERE id = $2) - INTERVAL '1 day' * $3
-                ORDER BY p.asof_date ASC
-                """,
-                security_uuid,
-                pack,
-                lookback_days,
-            )
-
-            if len(prices) < 2:
-                logger.warning(f"Insufficient price data for security {security_id}: {len(prices)} data points")
-                return self._attach_metadata(
-                    {
-                        "error": "Insufficient historical data",
-                        "data_points": len(prices),
-                        "required_minimum": 2,
-                    },
-                    self._create_metadata(source=f"position_returns:{security_id}", asof=ctx.asof_date, ttl=self.CACHE_TTL_HOUR)
-                )
-
-            # Calculate daily returns
-            daily_returns = []
-            for i in range(1, len(prices)):
-                prev_price = Decimal(str(prices[i - 1]["price"]))
-                curr_price = Decimal(str(prices[i]["price"]))
-                if prev_price > 0:
-                    daily_return = (curr_price - prev_price) / prev_price
-                    daily_returns.append({
-                        "date": str(prices[i]["asof_date"]),
-                        "return": float(daily_return),
-                    })
-
-            if not daily_returns:
-                return self._attach_metadata(
-                    {"error": "No valid returns calculated", "data_points": len(prices)},
-                    self._create_metadata(source=f"position_returns:{security_id}", asof=ctx.asof_date, ttl=self.CACHE_TTL_HOUR)
-                )
-
-            # Compute metrics
-            returns_array = [r["return"] for r in daily_returns]
+        from app.services.position_context import position_return
 
-            # Total return (geometric linking)
-            total_return = float(np.prod([1 + r for r in returns_array]) - 1)
-
-            # Annualized volatility
-            volatility = float(np.std(returns_array) * np.sqrt(252)) if len(returns_array) > 1 else 0.0
-
-            # Sharpe ratio (assume 4% risk-free rate)
-            rf_rate = 0.04
-            days_actual = len(daily_returns)
-            ann_return = (1 + total_return) ** (252 / days_actual) - 1 if days_actual > 0 else 0.0
-            sharpe = (ann_return - rf_rate) / volatility if volatility > 0 else 0.0
-
-            # Max drawdown
-            prices_array = [float(p["price"]) for p in prices]
-            running_max = np.maximum.accumulate(prices_array)
-            drawdowns = (np.array(prices_array) - running_max) / running_max
-            max_drawdown = float(np.min(drawdowns))
-            max_dd_idx = int(np.argmin(drawdowns))
-
-            # Recovery days (days from max drawdown to recovery)
-            peak_value = running_max[max_dd_idx]
-            recovery_days = -1
-            for i in range(max_dd_idx, len(prices_array)):
-                if prices_array[i] >= peak_value:
-                    recovery_days = i - max_dd_idx
-                    break
-
-        result = {
-            "security_id": security_id,
-            "total_return": round(total_return, 6),
-            "annualized_return": round(ann_return, 6),
-            "volatility": round(volatility, 6),
-            "sharpe": round(sharpe, 4),
-            "max_drawdown": round(max_drawdown, 6),
-            "recovery_days": recovery_days,
-            "data_points": len(prices),
-            "lookback_days": lookback_days,
-            "daily_returns": daily_returns,  # For charting
-        }
+        logger.info(f"compute_position_return: security={security_id}, lookback={lookback_days}, pack={pack_id}")
+        pctx = await self._position_context(ctx, state, portfolio_id, security_id, pack_id, lookback_days)
+        result = position_return(pctx, lookback_days)
+        if "error" in result:
+            logger.warning(f"Insufficient price data for security {security_id}: {result.get('data_points')} data points")
 
         metadata = self._create_metadata(
-            source=f"position_returns:{pack}",
+            source=f"position_returns:{pctx.pack_id}",
             asof=ctx.asof_date,
             ttl=self.CACHE_TTL_HOUR
         )
-
         return self._attach_metadata(result, metadata)
 
     async def compute_portfolio_contribution(
@@ -1921,52 +1847,29 @@ async def compute_portfolio_contribution(
 
         Returns contribution = weight × return
         """
-        logger.info(f"compute_portfolio_contribution: security={security_id}")
+        from app.services.position_context import portfolio_contribution, position_details, position_return
 
-        # Get position weight
-        position = await self.get_position_details(ctx, state, portfolio_id, security_id, pack_id)
+        logger.info(f"compute_portfolio_contribution: security={security_id}")
+        pctx = await self._position_context(ctx, state, portfolio_id, security_id, pack_id, lookback_days)
 
-        # Calculate contribution
-        weight = Decimal(str(position["weight"]))
-        
-        # Get actual position return from compute_position_return
-        try:
-            position_return_data = await self.compute_position_return(
-                ctx, state, portfolio_id, security_id, pack_id, lookback_days
-            )
-            position_return = Decimal(str(position_return_data.get("total_return", 0.0)))
-        except Exception as e:
-            logger.warning(f"Could not compute position return: {e}. Using default 0.0")
-            position_return = Decimal("0.0")
-        
-        # Get portfolio return from metrics (if available)
+        # Portfolio return from metrics (started when the context was loaded)
+        portfolio_return = Decimal("0.10")
         try:
-            portfolio_metrics = await self.metrics_compute_twr(
-                ctx, state, portfolio_id, pack_id
-            )
-            portfolio_return = Decimal(str(portfolio_metrics.get("twr_1y", 0.10)))  # Default to 10% if not available
+            portfolio_metrics = await pctx.pending["portfolio_twr"]
+            if portfolio_metrics.get("twr_1y") is not None:
+                portfolio_return = Decimal(str(portfolio_metrics["twr_1y"]))
         except Exception as e:
             logger.warning(f"Could not get portfolio return: {e}. Using default 0.10")
-            portfolio_return = Decimal("0.10")
-
-        total_contribution = weight * position_return
-        pct_of_portfolio_return = (total_contribution / portfolio_return * 100) if portfolio_return > 0 else Decimal("0")
 
-        result = {
-            "total_contribution": float(total_contribution),
-            "pct_of_portfolio_return": float(pct_of_portfolio_return),
-            "weight": float(weight),
-            "position_return": float(position_return),
-            "portfolio_return": float(portfolio_return),
-            "note": "Contribution calculated from actual position and portfolio returns"
-        }
+        result = portfolio_contribution(
+            position_details(pctx), position_return(pctx, lookback_days), portfolio_return
+        )
 
         metadata = self._create_metadata(
             source=f"contribution:{security_id}",
             asof=ctx.asof_date,
             ttl=self.CACHE_TTL_HOUR
         )
-
         return self._attach_metadata(result, metadata)
 
     async def compute_position_currency_attribution(
@@ -1988,117 +1891,19 @@ async def compute_position_currency_attribution(
         Formula:
             r_base = r_local + r_fx + (r_local × r_fx)
         """
-        security_uuid = self._to_uuid(security_id, "security_id")
-        pack = self._resolve_pricing_pack_id(pack_id, ctx)
-
-        logger.info(f"compute_position_currency_attribution: security={security_id}, pack={pack}")
-
-        # Get position details to determine currency
-        position = await self.get_position_details(ctx, state, portfolio_id, security_id, pack)
-        security_currency = position.get("security_currency", "USD")
-        base_currency = ctx.base_currency or "CAD"
-
-        # If security is in base currency, no FX attribution
-        if security_currency == base_currency:
-            result = {
-                "security_id": security_id,
-                "security_currency": security_currency,
-                "base_currency": base_currency,
-                "local_contribution": float(position.get("unrealized_pnl_pct", 0)),
-                "fx_contribution": 0.0,
-                "interaction_contribution": 0.0,
-                "total_contribution": float(position.get("unrealized_pnl_pct", 0)),
-                "note": "Position in base currency - no FX attribution"
-            }
-            metadata = self._create_metadata(
-                source=f"currency_attr:{security_id}",
-                asof=ctx.asof_date,
-                ttl=self.CACHE_TTL_HOUR
-            )
-            return self._attach_metadata(result, metadata)
-
-        # Get historical prices and FX rates
-        # Note: prices/fx_rates are system-level, but we use RLS-aware connection for consistency
-        from app.db.connection import get_db_connection_with_rls
-
-        async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
-            # Query historical prices in local currency and FX rates
-            data = await conn.fetch(
-                """
-                SELECT
-                    p.asof_date,
-                    p.close as local_price,
-                    COALESCE(fx.rate, 1.0) as fx_rate
-                FROM prices p
-                JOIN pricing_packs pp ON p.pricing_pack_id = pp.id
-                LEFT JOIN fx_rates fx ON fx.pricing_pack_id = pp.id
-                    AND fx.base_ccy = $4
-                    AND fx.quote_ccy = $5
-                WHERE p.security_id = $1
-                  AND p.asof_date <= (SELECT date FROM pricing_packs WHERE id = $2)
-                  AND p.asof_date >= (SELECT date FROM pricing_packs WHERE id = $2) - INTERVAL '1 day' * $3
-                ORDER BY p.asof_date ASC
-                """,
-                security_uuid,
-                pack,
-                lookback_days,
-                security_currency,
-                base_currency,
-            )
-
-            if len(data) < 2:
-                logger.warning(f"Insufficient data for currency attribution: {len(data)} data points")
-                result = {
-                    "error": "Insufficient historical data",
-                    "data_points": len(data),
-                    "required_minimum": 2,
-                }
-                metadata = self._create_metadata(
-                    source=f"currency_attr:{security_id}",
-                    asof=ctx.asof_date,
-                    ttl=self.CACHE_TTL_HOUR
-                )
-                return self._attach_metadata(result, metadata)
-
-            # Calculate returns
-            start = data[0]
-            end = data[-1]
-
-            start_local_price = Decimal(str(start["local_price"]))
-            end_local_price = Decimal(str(end["local_price"]))
-            start_fx_rate = Decimal(str(start["fx_rate"]))
-            end_fx_rate = Decimal(str(end["fx_rate"]))
-
-            # Local return (in security's currency)
-            r_local = (end_local_price - start_local_price) / start_local_price if start_local_price > 0 else Decimal("0")
+        from app.services.position_context import position_currency_attribution
 
-            # FX return (currency move)
-            r_fx = (end_fx_rate - start_fx_rate) / start_fx_rate if start_fx_rate > 0 else Decimal("0")
-
-            # Interaction term
-            r_interaction = r_local * r_fx
-
-            # Total return in base currency
-            r_total = r_local + r_fx + r_interaction
-
-        result = {
-            "security_id": security_id,
-            "security_currency": security_currency,
-            "base_currency": base_currency,
-            "local_contribution": float(r_local),
-            "fx_contribution": float(r_fx),
-            "interaction_contribution": float(r_interaction),
-            "total_contribution": float(r_total),
-            "lookback_days": lookback_days,
-            "data_points": len(data),
-        }
+        logger.info(f"compute_position_currency_attribution: security={security_id}, pack={pack_id}")
+        pctx = await self._position_context(ctx, state, portfolio_id, security_id, pack_id, lookback_days)
+        result = position_currency_attribution(pctx, lookback_days, ctx.base_currency)
+        if "error" in result:
+            logger.warning(f"Insufficient data for currency attribution: {result.get('data_points')} data points")
 
         metadata = self._create_metadata(
-            source=f"currency_attr:{pack}",
+            source=f"currency_attr:{pctx.pack_id}",
             asof=ctx.asof_date,
             ttl=self.CACHE_TTL_HOUR
         )
-
         return self._attach_metadata(result, metadata)
 
     async def compute_position_risk(
@@ -2115,148 +1920,22 @@ async def compute_position_risk(
 
         Capability: compute_position_risk
 
-        Returns VaR, marginal VaR, beta, correlation, diversification benefit
+        Returns VaR, marginal VaR, beta, correlation, diversification benefit.
+        Position and portfolio (twr_1d) returns are aligned by date.
         """
-        security_uuid = self._to_uuid(security_id, "security_id")
-        portfolio_uuid = self._to_uuid(portfolio_id, "portfolio_id")
-        pack = self._resolve_pricing_pack_id(pack_id, ctx)
-
-        logger.info(f"compute_position_risk: security={security_id}, portfolio={portfolio_id}, pack={pack}")
-
-        # Get position details
-        position = await self.get_position_details(ctx, state, portfolio_id, security_id, pack)
-        market_value = position.get("market_value", 0)
+        from app.services.position_context import position_risk
 
-        # Get historical returns for position and portfolio (user-scoped data - requires RLS)
-        from app.db.connection import get_db_connection_with_rls
-
-        async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
-            # Get position returns
-            position_data = await conn.fetch(
-                """
-                SELECT p.asof_date, p.close as price
-                FROM prices p
-                JOIN pricing_packs pp ON p.pricing_pack_id = pp.id
-                WHERE p.security_id = $1
-                  AND p.asof_date <= (SELECT date FROM pricing_packs WHERE id = $2)
-                  AND p.asof_date >= (SELECT date FROM pricing_packs WHERE id = $2) - INTERVAL '1 day' * $3
-                ORDER BY p.asof_date ASC
-                """,
-                security_uuid,
-                pack,
-                lookback_days,
-            )
-
-            # Get portfolio returns (from metrics table - user-scoped)
-            portfolio_metrics = await conn.fetch(
-                """
-                SELECT asof_date, twr_1d as daily_return
-                FROM portfolio_metrics
-                WHERE portfolio_id = $1
-                  AND asof_date <= (SELECT asof_date FROM pricing_packs WHERE id = $2)
-                  AND asof_date >= (SELECT asof_date FROM pricing_packs WHERE id = $2) - INTERVAL '1 day' * $3
-                  AND twr_1d IS NOT NULL
-                ORDER BY asof_date ASC
-                """,
-                portfolio_uuid,
-                pack,
-                lookback_days,
-            )
-
-            if len(position_data) < 2 or len(portfolio_metrics) < 2:
-                logger.warning(f"Insufficient data for risk calculation: position={len(position_data)}, portfolio={len(portfolio_metrics)}")
-                result = {
-                    "error": "Insufficient historical data",
-                    "position_data_points": len(position_data),
-                    "portfolio_data_points": len(portfolio_metrics),
-                }
-                metadata = self._create_metadata(
-                    source=f"position_risk:{security_id}",
-                    asof=ctx.asof_date,
-                    ttl=self.CACHE_TTL_HOUR
-                )
-                return self._attach_metadata(result, metadata)
-
-            # Calculate position returns
-            position_returns = []
-            for i in range(1, len(position_data)):
-                prev_price = Decimal(str(position_data[i - 1]["price"]))
-                curr_price = Decimal(str(position_data[i]["price"]))
-                if prev_price > 0:
-                    ret = float((curr_price - prev_price) / prev_price)
-                    position_returns.append(ret)
-
-            # Extract portfolio returns
-            portfolio_returns = [float(m["daily_return"]) for m in portfolio_metrics if m["daily_return"] is not None]
-
-            # Align arrays (use minimum length)
-            min_len = min(len(position_returns), len(portfolio_returns))
-            position_returns = position_returns[-min_len:]
-            portfolio_returns = portfolio_returns[-min_len:]
-
-            if min_len < 30:
-                logger.warning(f"Insufficient aligned data points: {min_len}")
-                result = {
-                    "error": "Insufficient aligned data",
-                    "aligned_data_points": min_len,
-                    "required_minimum": 30,
-                }
-                metadata = self._create_metadata(
-                    source=f"position_risk:{security_id}",
-                    asof=ctx.asof_date,
-                    ttl=self.CACHE_TTL_HOUR
-                )
-                return self._attach_metadata(result, metadata)
-
-            # Compute risk metrics
-            position_vol = float(np.std(position_returns) * np.sqrt(252))
-            portfolio_vol = float(np.std(portfolio_returns) * np.sqrt(252))
-
-            # Correlation
-            correlation = float(np.corrcoef(position_returns, portfolio_returns)[0, 1]) if min_len > 1 else 0.0
-
-            # Beta (slope of regression: position returns vs portfolio returns)
-            covariance = float(np.cov(position_returns, portfolio_returns)[0, 1])
-            portfolio_variance = float(np.var(portfolio_returns))
-            beta = covariance / portfolio_variance if portfolio_variance > 0 else 1.0
-
-            # VaR at 95% confidence (parametric)
-            var_1d_pct = -1.645 * position_vol / np.sqrt(252)  # 1-day VaR
-            var_1d = var_1d_pct * market_value
-
-            # Marginal VaR (contribution to portfolio VaR)
-            # Approximation: beta × position_weight × portfolio_VaR
-            position_weight = position.get("weight", 0)
-            portfolio_var_pct = -1.645 * portfolio_vol / np.sqrt(252)
-            marginal_var_pct = beta * position_weight * portfolio_var_pct
-            marginal_var = marginal_var_pct * market_value
-
-            # Diversification benefit (how much correlation < 1 reduces risk)
-            standalone_risk = position_weight * position_vol
-            portfolio_contribution = position_weight * beta * portfolio_vol
-            diversification_benefit = (standalone_risk - portfolio_contribution) / standalone_risk if standalone_risk > 0 else 0.0
-
-        result = {
-            "security_id": security_id,
-            "market_value": float(market_value),
-            "position_weight": float(position_weight),
-            "var_1d": round(var_1d, 2),
-            "var_1d_pct": round(var_1d_pct, 6),
-            "marginal_var": round(marginal_var, 2),
-            "position_volatility": round(position_vol, 6),
-            "portfolio_volatility": round(portfolio_vol, 6),
-            "beta_to_portfolio": round(beta, 4),
-            "correlation": round(correlation, 4),
-            "diversification_benefit": round(diversification_benefit, 4),
-            "data_points": min_len,
-        }
+        logger.info(f"compute_position_risk: security={security_id}, portfolio={portfolio_id}, pack={pack_id}")
+        pctx = await self._position_context(ctx, state, portfolio_id, security_id, pack_id, lookback_days)
+        result = position_risk(pctx, lookback_days)
+        if "error" in result:
+            logger.warning(f"Insufficient data for risk calculation: {result}")
 
         metadata = self._create_metadata(
-            source=f"position_risk:{pack}",
+            source=f"position_risk:{pctx.pack_id}",
             asof=ctx.asof_date,
             ttl=self.CACHE_TTL_HOUR
         )
-
         return self._attach_metadata(result, metadata)
 
     async def get_transaction_history(
@@ -2274,51 +1953,26 @@ async def get_transaction_history(
 
         Returns list of buy/sell transactions
         """
-        portfolio_uuid = self._to_uuid(portfolio_id, "portfolio_id")
-        security_uuid = self._to_uuid(security_id, "security_id")
+        from app.services.position_context import GET_TRANSACTIONS, transaction_history
 
         logger.info(f"get_transaction_history: portfolio={portfolio_id}, security={security_id}")
 
-        # Query transactions (user-scoped data - requires RLS)
-        from app.db.connection import get_db_connection_with_rls
-
-        async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
-            transactions = await conn.fetch(
-                """
-                SELECT
-                    transaction_date,
-                    transaction_type,
-                    quantity,
-                    price,
-                    (quantity * price) as total_value,
-                    commission,
-                    realized_pl
-                FROM transactions
-                WHERE portfolio_id = $1
-                  AND security_id = $2
-                ORDER BY transaction_date DESC
-                LIMIT $3
-                """,
-                portfolio_uuid,
-                security_uuid,
-                limit,
-            )
+        pctx = self._find_position_context(state, security_id, portfolio_id)
+        if pctx is None and ctx.pricing_pack_id:
+            try:
+                pctx = await self._position_context(ctx, state, portfolio_id, security_id, ctx.pricing_pack_id)
+            except ValueError:
+                # Closed position: no context, but transactions may still exist
+                pctx = None
 
-            result = {
-                "transactions": [
-                    {
-                        "transaction_date": str(t["transaction_date"]),
-                        "transaction_type": t["transaction_type"],
-                        "quantity": float(t["quantity"]) if t["quantity"] is not None else 0.0,
-                        "price": float(t["price"]) if t["price"] is not None else 0.0,
-                        "total_value": float(t["total_value"]) if t["total_value"] is not None else 0.0,
-                        "commission": float(t["commission"]) if t["commission"] else 0.0,
-                        "realized_pl": float(t["realized_pl"]) if t["realized_pl"] else None,
-                    }
-                    for t in transactions
-                ],
-                "count": len(transactions),
-            }
+        if pctx is not None:
+            rows = pctx.transactions
+        else:
+            portfolio_uuid = self._to_uuid(portfolio_id, "portfolio_id")
+            security_uuid = self._to_uuid(security_id, "security_id")
+            async with get_rls_read_connection(str(ctx.user_id)) as conn:
+                rows = await fetch_named(conn, GET_TRANSACTIONS, portfolio_uuid, security_uuid)
+        result = transaction_history(rows, limit)
 
         metadata = self._create_metadata(
             source=f"transactions_table",
@@ -2341,29 +1995,52 @@ async def get_security_fundamentals(
 
         Returns market cap, P/E, dividend yield, sector (for equities)
         """
-        security_uuid = self._to_uuid(security_id, "security_id")
-
         logger.info(f"get_security_fundamentals: security={security_id}")
 
-        # Query securities table (system-level data - no RLS needed)
-        from app.db.connection import execute_query_one
+        # Deep dive: the position context already has the security row and
+        # started the FMP fetch concurrently with the other steps
+        pctx = self._find_position_context(state, str(self._to_uuid(security_id, "security_id")))
+        if pctx is not None:
+            prefetched = pctx.pending.get("fundamentals")
+            if prefetched is not None:
+                return await prefetched
+            return await self._fetch_fundamentals(ctx, security_id, pctx.symbol, pctx.name, pctx.asset_class)
 
-        security = await execute_query_one(
-            """
-            SELECT symbol, name, asset_class
-            FROM securities
-            WHERE id = $1
-            """,
-            security_uuid,
-        )
+        security_uuid = self._to_uuid(security_id, "security_id")
+
+        # Security row from the in-memory reference; query only for securities added since it loaded
+        reference = await self._securities_reference()
+        security = reference.get(security_uuid)
+        if security is not None:
+            security = {**security, "asset_class": security["security_type"]}
+        else:
+            from app.db.connection import execute_query_one
+
+            security = await execute_query_one(
+                """
+                SELECT symbol, name, security_type AS asset_class
+                FROM securities
+                WHERE id = $1
+                """,
+                security_uuid,
+            )
 
         if not security:
             raise ValueError(f"Security not found: {security_id}")
 
-        symbol = security["symbol"]
-        name = security["name"]
-        asset_class = security["asset_class"]
+        return await self._fetch_fundamentals(
+            ctx, security_id, security["symbol"], security["name"], security["asset_class"]
+        )
 
+    async def _fetch_fundamentals(
+        self,
+        ctx: RequestCtx,
+        security_id: str,
+        symbol: str,
+        name: Optional[str],
+        asset_class: Optional[str],
+    ) -> Dict[str, Any]:
+        """FMP profile + ratios for an equity; basic info for other asset classes."""
         # For non-equity securities, return basic info only
         if asset_class not in ["equity", "stock"]:
             result = {
@@ -2487,46 +2164,28 @@ async def get_comparable_positions(
         """
         logger.info(f"get_comparable_positions: security={security_id}, sector={sector}")
 
-        # Get current security to determine sector if not provided
+        # Sector and peers come from the in-memory securities reference
+        from app.services.securities_reference import UNCLASSIFIED
+
         security_uuid = self._to_uuid(security_id, "security_id")
         comparables = []
-        
-        # Query securities table (system-level data - no RLS needed)
-        from app.db.connection import execute_query_one, execute_query
 
         try:
-            # Get current security's sector if not provided
+            reference = await self._securities_reference()
             if not sector:
-                security_row = await execute_query_one(
-                    "SELECT sector FROM securities WHERE id = $1",
-                    security_uuid
-                )
-                if security_row and security_row.get("sector"):
-                    sector = security_row["sector"]
-            
-            # Query securities by sector (excluding current security)
+                record = reference.get(security_uuid)
+                if record and record["sector"] != UNCLASSIFIED:
+                    sector = record["sector"]
+
             if sector:
-                rows = await execute_query(
-                    """
-                    SELECT id, symbol, name, security_type
-                    FROM securities
-                    WHERE sector = $1 AND id != $2 AND active = TRUE
-                    ORDER BY symbol
-                    LIMIT $3
-                    """,
-                    sector,
-                    security_uuid,
-                    limit
-                )
-                
                 comparables = [
                     {
-                        "security_id": str(row["id"]),
-                        "symbol": row["symbol"],
-                        "name": row.get("name"),
-                        "security_type": row.get("security_type"),
+                        "security_id": peer["security_id"],
+                        "symbol": peer["symbol"],
+                        "name": peer["name"],
+                        "security_type": peer["security_type"],
                     }
-                    for row in rows
+                    for peer in reference.peers(security_uuid, by="sector", label=sector, limit=limit)
                 ]
             else:
                 logger.warning(f"No sector data available for security {security_id}")
@@ -2548,6 +2207,16 @@ async def get_comparable_positions(
 
         return self._attach_metadata(result, metadata)
     
+    async def _securities_reference(self, positions: Optional[List[Dict[str, Any]]] = None):
+        """Process-wide securities reference; positions-only table when the database is unavailable."""
+        from app.services.securities_reference import SecuritiesReference, get_securities_reference
+
+        try:
+            return await get_securities_reference()
+        except Exception as e:
+            logger.warning(f"Securities reference unavailable ({e}); classifying from positions")
+            return SecuritiesReference.from_positions(positions or [])
+
     async def portfolio_sector_allocation(
         self,
         ctx: RequestCtx,
@@ -2573,83 +2242,20 @@ async def portfolio_sector_allocation(
             valued_positions = valued_positions_data.get("positions", [])
         
         logger.info(f"portfolio.sector_allocation: Processing {len(valued_positions)} positions")
-        
-        # Calculate sector allocation
-        from collections import defaultdict
-        sector_values = defaultdict(Decimal)
-        total_value = Decimal("0")
-        
+
+        # Classification comes from the in-memory securities reference (no per-position I/O)
+        reference = await self._securities_reference(valued_positions)
+        keys, values = [], []
         for position in valued_positions:
             # Get position value - check both 'value' and 'market_value' fields
-            value = position.get("market_value") or position.get("value") or Decimal("0")
-            if isinstance(value, str):
-                value = Decimal(value)
-            if value <= 0:
-                continue
-                
-            total_value += value
-            
-            # Get sector from security fundamentals if available
-            symbol = position.get("symbol", "")
-            
-            # Default sector mapping based on common symbols
-            sector = "Other"
-            
-            # Try to get actual sector from fundamentals service
-            if symbol:
-                # Common sector mappings for well-known symbols
-                sector_map = {
-                    "AAPL": "Technology",
-                    "MSFT": "Technology", 
-                    "GOOGL": "Technology",
-                    "AMZN": "Consumer Cyclical",
-                    "TSLA": "Consumer Cyclical",
-                    "JPM": "Financial Services",
-                    "BAC": "Financial Services",
-                    "JNJ": "Healthcare",
-                    "PFE": "Healthcare",
-                    "XOM": "Energy",
-                    "CVX": "Energy",
-                    "WMT": "Consumer Defensive",
-                    "PG": "Consumer Defensive",
-                    "NVDA": "Technology",
-                    "META": "Technology",
-                    "BRK.B": "Financial Services",
-                    "UNH": "Healthcare",
-                    "V": "Financial Services",
-                    "MA": "Financial Services",
-                    "HD": "Consumer Cyclical",
-                    "DIS": "Communication Services",
-                    "NFLX": "Communication Services",
-                    "ADBE": "Technology",
-                    "CRM": "Technology",
-                    "NKE": "Consumer Cyclical",
-                    "MCD": "Consumer Defensive",
-                    "COST": "Consumer Defensive",
-                    "PEP": "Consumer Defensive",
-                    "KO": "Consumer Defensive",
-                    "INTC": "Technology",
-                    "AMD": "Technology",
-                    "TMO": "Healthcare",
-                    "ABT": "Healthcare",
-                    "LLY": "Healthcare",
-                    "ORCL": "Technology",
-                    "VZ": "Communication Services",
-                    "T": "Communication Services",
-                    "CMCSA": "Communication Services",
-                }
-                
-                sector = sector_map.get(symbol.upper(), "Other")
-            
-            sector_values[sector] += value
-        
-        # Convert to percentages
-        sector_allocation = {}
-        if total_value > 0:
-            for sector, value in sector_values.items():
-                percentage = float((value / total_value) * 100)
-                sector_allocation[sector] = round(percentage, 2)
-        
+            value = position.get("market_value") or position.get("value") or 0
+            security_id = position.get("security_id")
+            keys.append(security_id if security_id in reference else position.get("symbol"))
+            values.append(float(Decimal(str(value))))
+
+        sector_allocation = reference.allocation(keys, values, by="sector")
+        total_value = sum(v for v in values if v > 0)
+
         # Phase 1: Fix data nesting - Return flattened structure for chart compatibility
         # Chart expects: Flat object {Tech: 30, Finance: 20, ...}
         # Return flat structure directly (chart component handles nested gracefully)
@@ -2704,7 +2310,7 @@ async def portfolio_historical_nav(
                 raise ValueError("user_id missing from request context")
             
             # Query portfolio_daily_values table for historical NAV
-            async with get_db_connection_with_rls(str(ctx.user_id)) as conn:
+            async with get_rls_read_connection(str(ctx.user_id)) as conn:
                 # Get historical daily values
                 rows = await conn.fetch(
                     """
@@ -2774,6 +2380,461 @@ async def portfolio_historical_nav(
         logger.info(f"✅ portfolio.historical_nav: {len(historical_data)} data points")
         return self._attach_metadata(result, metadata)
 
+    # ============================================================================
+    # Tax Reporting Capabilities
+    # ============================================================================
+
+    async def _tax_lot_book(self, ctx: RequestCtx, portfolio_id: Optional[str], capability_name: str):
+        """Lot book for the portfolio, shared by all tax steps of this request."""
+        from app.services.tax_lots import get_lot_book
+
+        portfolio_uuid = self._resolve_portfolio_id(portfolio_id, ctx, capability_name)
+        if not ctx.user_id:
+            raise ValueError("user_id missing from request context")
+        book = await get_lot_book(ctx.user_id, portfolio_uuid, ctx.request_id)
+        return portfolio_uuid, book
+
+    async def _tax_open_lot_valuation(self, ctx: RequestCtx, book, pack_id: Optional[str] = None):
+        """Open lots of a book valued against the pricing pack (memoized on the book)."""
+        from app.services.tax_lots import value_open_lots
+
+        pack_id = self._resolve_pricing_pack_id(pack_id, ctx)
+        asof = ctx.asof_date or date.today()
+        key = ("valuation", pack_id, asof)
+        if key not in book._cache:
+            held = {book.securities[c] for c in book.lot_security[book.quantity_open > 0]}
+            security_ids = []
+            for sec_id in held:
+                try:
+                    security_ids.append(self._to_uuid(sec_id, "security_id"))
+                except ValueError:
+                    logger.warning("Invalid security_id on lot: %s", sec_id)
+            prices = await self.pricing_service.get_prices_as_decimals(security_ids, pack_id) if security_ids else {}
+
+            fx_rates: Dict[str, Optional[Decimal]] = {}
+            for currency in set(book.currency.tolist()):
+                if currency != book.base_currency:
+                    fx_record = await self.pricing_service.get_fx_rate(currency, book.base_currency, pack_id)
+                    fx_rates[currency] = fx_record.rate if fx_record else None
+                    if not fx_record:
+                        logger.warning(
+                            "No FX rate for %s/%s in pack %s; assuming 1.0", currency, book.base_currency, pack_id
+                        )
+            book._cache[key] = value_open_lots(book, prices, fx_rates, asof)
+        return pack_id, book._cache[key]
+
+    @capability(
+        name="metrics.unrealized_pl",
+        inputs={"positions": dict, "portfolio_id": str, "pack_id": str},
+        outputs={"total_unrealized": float, "short_term": float, "long_term": float, "by_position": list},
+        implementation_status="real",
+        description="Unrealized P&L by holding-period term from open tax lots",
+        dependencies=["ledger.positions"],
+    )
+    async def metrics_unrealized_pl(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        positions: Optional[Dict[str, Any]] = None,
+        portfolio_id: Optional[str] = None,
+        pack_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Unrealized P&L of open lots, split short-term / long-term.
+
+        Capability: metrics.unrealized_pl
+
+        Args:
+            ctx: Request context
+            state: Execution state
+            positions: ledger.positions result (used for its portfolio_id)
+            portfolio_id: Portfolio ID (optional, falls back to positions / ctx)
+            pack_id: Pricing pack (optional, uses ctx.pricing_pack_id)
+
+        Returns:
+            Dict with totals by term, per-position breakdown and pricing_pack_id
+        """
+        from app.services.tax_lots import unrealized_summary
+
+        if not portfolio_id and isinstance(positions, dict) and positions.get("portfolio_id"):
+            portfolio_id = str(positions["portfolio_id"])
+        portfolio_uuid, book = await self._tax_lot_book(ctx, portfolio_id, "metrics.unrealized_pl")
+        pack_id, valuation = await self._tax_open_lot_valuation(ctx, book, pack_id)
+
+        logger.info(f"metrics.unrealized_pl: portfolio_id={portfolio_uuid}, open_lots={len(valuation.lots)}")
+
+        result = {
+            "portfolio_id": str(portfolio_uuid),
+            "pricing_pack_id": pack_id,
+            "asof_date": str(ctx.asof_date) if ctx.asof_date else None,
+            "base_currency": book.base_currency,
+            **unrealized_summary(book, valuation),
+        }
+        metadata = self._create_metadata(
+            source=f"lots+pricing_pack:{pack_id}",
+            asof=ctx.asof_date,
+            ttl=self.CACHE_TTL_HOUR,
+        )
+        return self._attach_metadata(result, metadata)
+
+    @capability(
+        name="tax.identify_losses",
+        inputs={"positions": dict, "unrealized_pl": dict, "min_loss": float},
+        outputs={"positions": list, "total_loss": float, "count": int},
+        implementation_status="real",
+        description="Securities whose losing tax lots exceed a loss threshold",
+        dependencies=["ledger.positions", "metrics.unrealized_pl"],
+    )
+    async def tax_identify_losses(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        positions: Optional[Dict[str, Any]] = None,
+        unrealized_pl: Optional[Dict[str, Any]] = None,
+        min_loss: float = 1000,
+        portfolio_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Loss-harvest candidates: per security, the open lots trading below cost.
+
+        Capability: tax.identify_losses
+
+        Only losing lots are included (specific-lot harvesting), so a position
+        with an overall gain can still contribute a candidate.
+        """
+        from app.services.tax_lots import harvest_candidates
+
+        if not portfolio_id and isinstance(positions, dict) and positions.get("portfolio_id"):
+            portfolio_id = str(positions["portfolio_id"])
+        pack_id = (unrealized_pl or {}).get("pricing_pack_id")
+        portfolio_uuid, book = await self._tax_lot_book(ctx, portfolio_id, "tax.identify_losses")
+        pack_id, valuation = await self._tax_open_lot_valuation(ctx, book, pack_id)
+
+        candidates = harvest_candidates(book, valuation, float(min_loss or 0))
+        logger.info(f"tax.identify_losses: portfolio_id={portfolio_uuid}, candidates={len(candidates)}")
+
+        result = {
+            "portfolio_id": str(portfolio_uuid),
+            "pricing_pack_id": pack_id,
+            "positions": candidates,
+            "count": len(candidates),
+            "total_loss": round(sum(c["unrealized_loss"] for c in candidates), 2),
+            "min_loss": float(min_loss or 0),
+        }
+        metadata = self._create_metadata(source=f"lots+pricing_pack:{pack_id}", asof=ctx.asof_date, ttl=self.CACHE_TTL_HOUR)
+        return self._attach_metadata(result, metadata)
+
+    @capability(
+        name="tax.wash_sale_check",
+        inputs={"portfolio_id": str, "positions": dict},
+        outputs={"risks": dict, "at_risk_count": int},
+        implementation_status="real",
+        description="Wash-sale exposure of selling candidate lots today",
+        dependencies=["tax.identify_losses"],
+    )
+    async def tax_wash_sale_check(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        portfolio_id: Optional[str] = None,
+        positions: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Purchases of the same securities in the 30 days before today.
+
+        Capability: tax.wash_sale_check
+
+        Args:
+            positions: tax.identify_losses result (or its "positions" list)
+        """
+        from app.services.tax_lots import WASH_SALE_WINDOW_DAYS, wash_sale_risks
+
+        candidates = positions.get("positions", []) if isinstance(positions, dict) else (positions or [])
+        portfolio_uuid, book = await self._tax_lot_book(ctx, portfolio_id, "tax.wash_sale_check")
+        risks = wash_sale_risks(book, candidates, ctx.asof_date or date.today())
+        at_risk = sum(1 for risk in risks.values() if risk["at_risk"])
+
+        logger.info(f"tax.wash_sale_check: portfolio_id={portfolio_uuid}, checked={len(risks)}, at_risk={at_risk}")
+        result = {
+            "portfolio_id": str(portfolio_uuid),
+            "risks": risks,
+            "at_risk_count": at_risk,
+            "window_days": WASH_SALE_WINDOW_DAYS,
+        }
+        metadata = self._create_metadata(source="lots", asof=ctx.asof_date, ttl=self.CACHE_TTL_HOUR)
+        return self._attach_metadata(result, metadata)
+
+    @capability(
+        name="tax.calculate_benefit",
+        inputs={"loss_positions": dict, "tax_rate": float, "wash_sale_risks": dict},
+        outputs={"benefits": dict, "total_benefit": float},
+        implementation_status="real",
+        description="Tax saved by harvesting each candidate, net of wash-sale disallowance",
+        dependencies=["tax.identify_losses", "tax.wash_sale_check"],
+    )
+    async def tax_calculate_benefit(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        loss_positions: Optional[Dict[str, Any]] = None,
+        tax_rate: float = 0.32,
+        wash_sale_risks: Optional[Dict[str, Any]] = None,
+        long_term_rate: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        benefit = (short-term loss × tax_rate + long-term loss × long_term_rate) × (1 − disallowed fraction)
+
+        Capability: tax.calculate_benefit
+        """
+        from app.services.tax_lots import DEFAULT_LONG_TERM_RATE
+
+        candidates = loss_positions.get("positions", []) if isinstance(loss_positions, dict) else (loss_positions or [])
+        risks = (wash_sale_risks or {}).get("risks", {})
+        tax_rate = float(tax_rate if tax_rate is not None else 0.32)
+        long_term_rate = float(long_term_rate if long_term_rate is not None else DEFAULT_LONG_TERM_RATE)
+
+        st = np.array([c.get("short_term_loss", 0.0) for c in candidates], dtype=np.float64)
+        lt = np.array([c.get("long_term_loss", 0.0) for c in candidates], dtype=np.float64)
+        disallowed = np.array(
+            [risks.get(str(c.get("security_id")), {}).get("disallowed_fraction", 0.0) for c in candidates],
+            dtype=np.float64,
+        )
+        gross = st * tax_rate + lt * long_term_rate
+        net = gross * (1 - disallowed)
+
+        benefits = {
+            str(c.get("security_id")): {
+                "symbol": c.get("symbol"),
+                "gross_benefit": round(float(g), 2),
+                "disallowed_fraction": round(float(d), 4),
+                "benefit": round(float(n), 2),
+            }
+            for c, g, d, n in zip(candidates, gross, disallowed, net)
+        }
+        return {
+            "benefits": benefits,
+            "total_benefit": round(float(net.sum()), 2),
+            "tax_rate": tax_rate,
+            "long_term_rate": long_term_rate,
+        }
+
+    @capability(
+        name="tax.rank_opportunities",
+        inputs={"positions": dict, "benefits": dict},
+        outputs={"opportunities": list, "total_benefit": float, "count": int},
+        implementation_status="real",
+        description="Harvest candidates ordered by after-wash-sale tax benefit",
+        dependencies=["tax.identify_losses", "tax.calculate_benefit"],
+    )
+    async def tax_rank_opportunities(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        positions: Optional[Dict[str, Any]] = None,
+        benefits: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Rank candidates by benefit (largest first); zero-benefit candidates are dropped.
+
+        Capability: tax.rank_opportunities
+        """
+        candidates = positions.get("positions", []) if isinstance(positions, dict) else (positions or [])
+        by_security = (benefits or {}).get("benefits", {})
+        values = np.array(
+            [by_security.get(str(c.get("security_id")), {}).get("benefit", 0.0) for c in candidates],
+            dtype=np.float64,
+        )
+        order = [i for i in np.argsort(-values, kind="stable") if values[i] > 0]
+
+        opportunities = [
+            {
+                **candidates[i],
+                **by_security.get(str(candidates[i].get("security_id")), {}),
+                "rank": rank,
+            }
+            for rank, i in enumerate(order, start=1)
+        ]
+        return {
+            "opportunities": opportunities,
+            "count": len(opportunities),
+            "total_benefit": round(float(values[order].sum()) if order else 0.0, 2),
+        }
+
+    @capability(
+        name="tax.realized_gains",
+        inputs={"portfolio_id": str, "tax_year": int, "lot_method": str},
+        outputs={"short_term_net": float, "long_term_net": float, "net_realized": float, "dispositions": list},
+        implementation_status="real",
+        description="Realized gains by term for a tax year (sells replayed against lots)",
+        dependencies=[],
+    )
+    async def tax_realized_gains(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        portfolio_id: Optional[str] = None,
+        tax_year: Optional[int] = None,
+        lot_method: str = "fifo",
+    ) -> Dict[str, Any]:
+        """
+        Realized gains for one tax year.
+
+        Capability: tax.realized_gains
+
+        Every SELL in the ledger is replayed against the portfolio's lots with
+        lot_method (fifo/lifo/hifo; "specific" replays as fifo because per-lot
+        dispositions are not stored). recorded_realized_pl is the sum booked on
+        the sell transactions, for reconciliation.
+        """
+        from app.services.tax_lots import realized_summary
+
+        tax_year = int(tax_year or (ctx.asof_date or date.today()).year)
+        lot_method = (lot_method or "fifo").lower()
+        portfolio_uuid, book = await self._tax_lot_book(ctx, portfolio_id, "tax.realized_gains")
+        report = realized_summary(book, book.relieve(lot_method), tax_year)
+
+        logger.info(
+            f"tax.realized_gains: portfolio_id={portfolio_uuid}, year={tax_year}, method={lot_method}, "
+            f"dispositions={report['disposition_count']}"
+        )
+        result = {
+            "portfolio_id": str(portfolio_uuid),
+            "tax_year": tax_year,
+            "lot_method": lot_method,
+            "base_currency": book.base_currency,
+            **report,
+        }
+        if lot_method == "specific":
+            result["note"] = "Specific-lot elections are not stored; gains replayed with FIFO"
+        metadata = self._create_metadata(source="lots+transactions", asof=ctx.asof_date, ttl=self.CACHE_TTL_HOUR)
+        return self._attach_metadata(result, metadata)
+
+    @capability(
+        name="tax.wash_sales",
+        inputs={"portfolio_id": str, "tax_year": int, "lot_method": str},
+        outputs={"wash_sales": list, "count": int, "total_disallowed": float},
+        implementation_status="real",
+        description="Loss sales with replacement purchases within 30 days",
+        dependencies=[],
+    )
+    async def tax_wash_sales(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        portfolio_id: Optional[str] = None,
+        tax_year: Optional[int] = None,
+        lot_method: str = "fifo",
+    ) -> Dict[str, Any]:
+        """
+        Wash sales among the tax year's loss dispositions.
+
+        Capability: tax.wash_sales
+        """
+        from app.services.tax_lots import detect_wash_sales
+
+        tax_year = int(tax_year or (ctx.asof_date or date.today()).year)
+        portfolio_uuid, book = await self._tax_lot_book(ctx, portfolio_id, "tax.wash_sales")
+        report = detect_wash_sales(book, book.relieve((lot_method or "fifo").lower()), tax_year)
+
+        logger.info(f"tax.wash_sales: portfolio_id={portfolio_uuid}, year={tax_year}, count={report['count']}")
+        result = {"portfolio_id": str(portfolio_uuid), "tax_year": tax_year, **report}
+        metadata = self._create_metadata(source="lots+transactions", asof=ctx.asof_date, ttl=self.CACHE_TTL_HOUR)
+        return self._attach_metadata(result, metadata)
+
+    @capability(
+        name="tax.lot_details",
+        inputs={"portfolio_id": str, "pack_id": str},
+        outputs={"lots": list, "count": int},
+        implementation_status="real",
+        description="Open tax lots with cost basis, unrealized P&L and holding-period term",
+        dependencies=[],
+    )
+    async def tax_lot_details(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        portfolio_id: Optional[str] = None,
+        pack_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Open lots valued against the pricing pack.
+
+        Capability: tax.lot_details
+        """
+        from app.services.tax_lots import open_lot_details, unrealized_summary
+
+        portfolio_uuid, book = await self._tax_lot_book(ctx, portfolio_id, "tax.lot_details")
+        pack_id, valuation = await self._tax_open_lot_valuation(ctx, book, pack_id)
+        summary = unrealized_summary(book, valuation)
+        summary.pop("by_position")
+
+        result = {
+            "portfolio_id": str(portfolio_uuid),
+            "pricing_pack_id": pack_id,
+            "base_currency": book.base_currency,
+            "lots": open_lot_details(book, valuation),
+            "count": int(len(valuation.lots)),
+            **summary,
+        }
+        metadata = self._create_metadata(source=f"lots+pricing_pack:{pack_id}", asof=ctx.asof_date, ttl=self.CACHE_TTL_HOUR)
+        return self._attach_metadata(result, metadata)
+
+    @capability(
+        name="tax.summary",
+        inputs={"realized_gains": dict, "wash_sales": dict, "tax_year": int},
+        outputs={"short_term_net": float, "long_term_net": float, "net_capital_gain": float},
+        implementation_status="real",
+        description="Tax-year summary: net gains by term after wash-sale adjustments",
+        dependencies=["tax.realized_gains", "tax.wash_sales"],
+    )
+    async def tax_summary(
+        self,
+        ctx: RequestCtx,
+        state: Dict[str, Any],
+        realized_gains: Optional[Dict[str, Any]] = None,
+        wash_sales: Optional[Dict[str, Any]] = None,
+        tax_year: Optional[int] = None,
+        tax_rate: float = 0.32,
+        long_term_rate: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Combine realized gains and wash-sale disallowances into reportable totals.
+
+        Capability: tax.summary
+
+        Disallowed losses are added back to the term they were realized in. A net
+        capital loss is deductible up to 3,000 per year; the rest carries forward.
+        """
+        from app.services.tax_lots import DEFAULT_LONG_TERM_RATE
+
+        realized_gains = realized_gains or {}
+        wash_sales = wash_sales or {}
+        long_term_rate = float(long_term_rate if long_term_rate is not None else DEFAULT_LONG_TERM_RATE)
+
+        short_term = float(realized_gains.get("short_term_net", 0.0)) + float(wash_sales.get("short_term_disallowed", 0.0))
+        long_term = float(realized_gains.get("long_term_net", 0.0)) + float(wash_sales.get("long_term_disallowed", 0.0))
+        net = short_term + long_term
+
+        # Losses offset gains of the other term first; a positive net is taxed by its composition
+        taxable_short = max(short_term, 0.0) if long_term >= 0 else max(short_term + long_term, 0.0)
+        taxable_long = max(long_term, 0.0) if short_term >= 0 else max(long_term + short_term, 0.0)
+        deductible_loss = min(-net, 3000.0) if net < 0 else 0.0
+
+        return {
+            "tax_year": int(tax_year or realized_gains.get("tax_year") or (ctx.asof_date or date.today()).year),
+            "short_term_net": round(short_term, 2),
+            "long_term_net": round(long_term, 2),
+            "net_capital_gain": round(net, 2),
+            "wash_sale_disallowed": round(float(wash_sales.get("total_disallowed", 0.0)), 2),
+            "wash_sale_count": int(wash_sales.get("count", 0)),
+            "deductible_loss": round(deductible_loss, 2),
+            "loss_carryforward": round(max(0.0, -net - deductible_loss), 2),
+            "estimated_tax": round(taxable_short * float(tax_rate) + taxable_long * long_term_rate - deductible_loss * float(tax_rate), 2),
+            "total_proceeds": realized_gains.get("total_proceeds"),
+            "total_cost_basis": realized_gains.get("total_cost_basis"),
+            "lot_method": realized_gains.get("lot_method"),
+        }
+
     # ============================================================================
     # Portfolio Optimization Capabilities
     # ============================================================================
@@ -3182,10 +3243,13 @@ async def _resolve_rating_symbol(
         if state.get("fundamentals") and "symbol" in state["fundamentals"]:
             return state["fundamentals"]["symbol"]
             
-        # Try database lookup from security_id (fixes STUB bug)
+        # Try the in-memory securities reference, then the database
         if security_id:
+            record = (await self._securities_reference()).get(security_id)
+            if record:
+                return record["symbol"]
             try:
-                async with get_db_connection_with_rls(ctx.user_id) as conn:
+                async with get_rls_read_connection(ctx.user_id) as conn:
                     symbol = await conn.fetchval(
                         """
                         SELECT symbol 
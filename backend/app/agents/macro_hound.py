@@ -297,10 +297,9 @@ async def macro_compute_cycles(
         logger.info(f"macro.compute_cycles: asof_date={asof}")
 
         try:
-            # Detect all cycle phases using injected cycles_service
-            stdc_phase = await self.cycles_service.detect_stdc_phase(as_of_date=asof)
-            ltdc_phase = await self.cycles_service.detect_ltdc_phase(as_of_date=asof)
-            empire_phase = await self.cycles_service.detect_empire_phase(as_of_date=asof)
+            # Detect all cycle phases from one indicator snapshot
+            phases = await self.cycles_service.detect_all_phases(as_of_date=asof)
+            stdc_phase, ltdc_phase, empire_phase = phases["stdc"], phases["ltdc"], phases["empire"]
 
             result = {
                 "stdc": {
@@ -1115,6 +1114,42 @@ async def cycles_compute_empire(
 
         return self._attach_metadata(result, metadata)
 
+    def _civil_cycle_result(self, phase) -> Dict[str, Any]:
+        """Civil cycle payload (description and risk factors) for a detected phase."""
+        # Generate description based on phase
+        descriptions = {
+            "Harmony": "Strong social cohesion, low inequality, high trust",
+            "Rising Tensions": "Rising inequality, declining trust in institutions",
+            "Polarization": "Deep political divisions, social unrest emerging",
+            "Crisis": "Institutional breakdown, high conflict risk",
+            "Conflict/Revolution": "Active internal conflict, potential for revolution or civil war",
+            "Reconstruction": "Rebuilding institutions and social trust after conflict"
+        }
+
+        description = descriptions.get(phase.phase, "Unknown phase state")
+
+        # Determine risk factors based on indicators
+        gini = phase.indicators.get("gini_coefficient", 0.418)
+        polarization = phase.indicators.get("polarization_index", 0.78)
+        trust = phase.indicators.get("institutional_trust", 0.38)
+
+        # Build result
+        return {
+            "cycle_type": "civil",
+            "phase_label": phase.phase,
+            "phase_number": phase.phase_number,
+            "composite_score": float(phase.composite_score),
+            "confidence": float(phase.composite_score),  # Use composite score as confidence
+            "description": description,
+            "date": phase.date.isoformat() if phase.date else None,
+            "indicators": phase.indicators,
+            "risk_factors": {
+                "wealth_inequality": "HIGH" if gini > 0.40 else "MEDIUM" if gini > 0.35 else "LOW",
+                "political_polarization": "HIGH" if polarization > 0.70 else "MEDIUM" if polarization > 0.50 else "LOW",
+                "trust_deficit": "HIGH" if trust < 0.40 else "MEDIUM" if trust < 0.60 else "LOW",
+            },
+        }
+
     async def cycles_compute_civil(
         self,
         ctx: RequestCtx,
@@ -1140,40 +1175,7 @@ async def cycles_compute_civil(
         try:
             # Use the injected cycles_service to detect civil phase
             phase = await self.cycles_service.detect_civil_phase(as_of_date=asof)
-
-            # Generate description based on phase
-            descriptions = {
-                "Harmony": "Strong social cohesion, low inequality, high trust",
-                "Rising Tensions": "Rising inequality, declining trust in institutions",
-                "Polarization": "Deep political divisions, social unrest emerging",
-                "Crisis": "Institutional breakdown, high conflict risk",
-                "Conflict/Revolution": "Active internal conflict, potential for revolution or civil war",
-                "Reconstruction": "Rebuilding institutions and social trust after conflict"
-            }
-
-            description = descriptions.get(phase.phase, "Unknown phase state")
-
-            # Determine risk factors based on indicators
-            gini = phase.indicators.get("gini_coefficient", 0.418)
-            polarization = phase.indicators.get("polarization_index", 0.78)
-            trust = phase.indicators.get("institutional_trust", 0.38)
-
-            # Build result
-            result = {
-                "cycle_type": "civil",
-                "phase_label": phase.phase,
-                "phase_number": phase.phase_number,
-                "composite_score": float(phase.composite_score),
-                "confidence": float(phase.composite_score),  # Use composite score as confidence
-                "description": description,
-                "date": phase.date.isoformat() if phase.date else None,
-                "indicators": phase.indicators,
-                "risk_factors": {
-                    "wealth_inequality": "HIGH" if gini > 0.40 else "MEDIUM" if gini > 0.35 else "LOW",
-                    "political_polarization": "HIGH" if polarization > 0.70 else "MEDIUM" if polarization > 0.50 else "LOW",
-                    "trust_deficit": "HIGH" if trust < 0.40 else "MEDIUM" if trust < 0.60 else "LOW",
-                },
-            }
+            result = self._civil_cycle_result(phase)
 
         except (ValueError, TypeError, KeyError, AttributeError) as e:
             # Programming errors - should not happen, log and return fallback
@@ -1248,13 +1250,10 @@ async def cycles_aggregate_overview(
         asof = asof_date or ctx.asof_date
         logger.info(f"cycles.aggregate_overview: asof={asof}")
 
-        # Compute all three cycles from injected service
-        stdc_phase = await self.cycles_service.detect_stdc_phase(as_of_date=asof)
-        ltdc_phase = await self.cycles_service.detect_ltdc_phase(as_of_date=asof)
-        empire_phase = await self.cycles_service.detect_empire_phase(as_of_date=asof)
-
-        # Compute civil cycle using our implementation
-        civil_data = await self.cycles_compute_civil(ctx, state, asof_date=asof)
+        # All four cycles from one indicator snapshot (one query, no writes)
+        phases = await self.cycles_service.detect_all_phases(as_of_date=asof)
+        stdc_phase, ltdc_phase, empire_phase = phases["stdc"], phases["ltdc"], phases["empire"]
+        civil_data = self._civil_cycle_result(phases["civil"])
 
         result = {
             "short_term": {
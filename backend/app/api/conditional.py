@@ -0,0 +1,213 @@
+"""
+Conditional GET Helpers
+
+Purpose: Strong ETags keyed by pricing pack / ledger commit, 304 answers and compressed JSON bodies
+Created: 2025-11-10
+Priority: P1 (Polling dashboards: /api/portfolio, /api/holdings, /api/macro/cycles, /api/ratings/overview)
+
+Endpoint responses are deterministic given (route, user, pricing_pack_id,
+ledger_commit_hash, inputs) - the same assumption the pattern result cache
+makes - so the ETag is a hash of exactly those values. It is known before the
+endpoint runs any pattern or query, and a matching If-None-Match is answered
+with 304 straight away.
+
+The (pack, ledger) version itself is held by DataVersionProvider for a few
+seconds, so a 304 costs no database round trip between refreshes.
+
+Usage:
+    conditional = await ConditionalGet.open(request, versions, "/api/holdings", user["id"], {"page": page})
+    if conditional.not_modified is not None:
+        return conditional.not_modified
+    ...
+    return conditional.respond(SuccessResponse(data=payload))
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from app.core.pattern_cache import normalize_inputs
+from app.core.serialization import dumps
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Compress bodies at least this large (smaller ones gain little over the header cost)
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Clients must revalidate every time; the ETag makes revalidation cheap
+CONDITIONAL_HEADERS = {
+    "Cache-Control": "private, no-cache",
+    "Vary": "Authorization, Accept-Encoding",
+}
+
+
+@dataclass(frozen=True)
+class DataVersion:
+    """What endpoint data is derived from (same pair RequestCtx carries)."""
+
+    pricing_pack_id: str
+    ledger_commit_hash: str
+
+
+class DataVersionProvider:
+    """Current DataVersion, reloaded at most every ttl_seconds; concurrent callers share one load."""
+
+    def __init__(self, loader: Callable[[], Awaitable[DataVersion]], ttl_seconds: float = 15.0):
+        self._loader = loader
+        self.ttl_seconds = ttl_seconds
+        self._version: Optional[DataVersion] = None
+        self._loaded_at = 0.0
+        self._inflight: Optional[asyncio.Future] = None
+
+    async def current(self) -> DataVersion:
+        if self._version is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return self._version
+        if self._inflight is None:
+            self._inflight = asyncio.ensure_future(self._reload())
+        inflight = self._inflight
+        try:
+            return await asyncio.shield(inflight)
+        finally:
+            if self._inflight is inflight and inflight.done():
+                self._inflight = None
+
+    async def _reload(self) -> DataVersion:
+        version = await self._loader()
+        if version != self._version:
+            logger.info(f"Data version: {version.pricing_pack_id} / {version.ledger_commit_hash}")
+        self._version, self._loaded_at = version, time.monotonic()
+        return version
+
+    def invalidate(self) -> None:
+        """Force the next current() to reload (e.g. right after a pack is marked fresh)."""
+        self._loaded_at = 0.0
+
+
+def make_etag(route: str, user_id: Any, version: DataVersion, inputs: Optional[Dict[str, Any]] = None) -> str:
+    """Strong ETag for (route, user, pack, ledger, inputs)."""
+    material = json.dumps(
+        [route, str(user_id), version.pricing_pack_id, version.ledger_commit_hash, normalize_inputs(inputs or {})],
+        separators=(",", ":"),
+    )
+    return '"' + hashlib.sha256(material.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110: W/ prefixes are ignored)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(tag == "*" or tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Preferred content coding we can produce ("br", "gzip" or None).
+
+    Follows the client's q-values (RFC 9110): q=0 refuses a coding, "*"
+    covers codings not listed explicitly, and br wins a tie with gzip.
+    """
+    if not accept_encoding:
+        return None
+    offered: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, *params = (piece.strip() for piece in part.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        offered[name] = q
+    wildcard = offered.get("*", 0.0)
+    supported = ("br", "gzip") if BROTLI_AVAILABLE else ("gzip",)
+    best, best_q = None, 0.0
+    for coding in supported:
+        q = offered.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+def json_response(
+    content: Any,
+    accept_encoding: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    status_code: int = 200,
+) -> Response:
+    """JSON body (app.core.serialization rendering), compressed when large and the client accepts it."""
+    body = dumps(content)
+    headers = dict(headers or {})
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_BYTES else None
+    if encoding:
+        body = compress(body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+class ConditionalGet:
+    """ETag for one request; answers 304 or wraps the fresh response."""
+
+    def __init__(self, request: Request, etag: Optional[str]):
+        self.request = request
+        self.etag = etag
+        self.not_modified: Optional[Response] = None
+        if etag is not None and etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified = Response(status_code=304, headers={"ETag": etag, **CONDITIONAL_HEADERS})
+
+    @classmethod
+    async def open(
+        cls,
+        request: Request,
+        versions: DataVersionProvider,
+        route: str,
+        user_id: Any,
+        inputs: Optional[Dict[str, Any]] = None,
+    ) -> "ConditionalGet":
+        """Resolve the data version and ETag; without a version the request is served unconditionally."""
+        try:
+            version = await versions.current()
+        except Exception as e:
+            logger.warning(f"Data version unavailable for {route}; serving without ETag: {e}")
+            return cls(request, None)
+        return cls(request, make_etag(route, user_id, version, inputs))
+
+    def respond(self, content: Any, cacheable: bool = True) -> Response:
+        """
+        Fresh response with ETag (cacheable results only) and negotiated compression.
+
+        Fallback / degraded payloads should pass cacheable=False so clients
+        do not keep them until the next pack.
+        """
+        headers = {"Vary": CONDITIONAL_HEADERS["Vary"]}
+        if cacheable and self.etag is not None:
+            headers.update(CONDITIONAL_HEADERS)
+            headers["ETag"] = self.etag
+        return json_response(content, self.request.headers.get("accept-encoding"), headers)
@@ -7,6 +7,8 @@
 
 Endpoints:
     POST /v1/execute - Execute pattern with freshness gate
+    POST /v1/execute/stream - Same, streaming per-step results (SSE or NDJSON)
+    POST /v1/execute/batch - One pattern over many input sets, streaming per-item results
 
 Critical Requirements:
     - BLOCKS execution when pack.is_fresh = false (returns 503)
@@ -27,11 +29,12 @@
 import uuid
 import asyncio
 from contextlib import nullcontext, asynccontextmanager
+from dataclasses import replace
 from datetime import datetime, date
-from typing import Optional
+from typing import Optional, Tuple
 
 from fastapi import FastAPI, HTTPException, Depends, status, Header
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -48,7 +51,10 @@
 )
 from app.core.exceptions import DatabaseError
 from app.db.pricing_pack_queries import get_pricing_pack_queries
-from app.core.pattern_orchestrator import PatternOrchestrator
+from app.core.pattern_orchestrator import DEFAULT_BATCH_CONCURRENCY, PatternOrchestrator, with_request_deadline
+from app.core.profiling import PROFILE_HEADER, header_requests_profile
+from app.api.streaming import STREAM_HEADERS, encode_stream, negotiate_stream_format
+from app.core.serialization import ORJSONResponse, summarize
 from app.core.agent_runtime import AgentRuntime
 from app.middleware.auth_middleware import verify_token
 from app.core.di_container import get_container
@@ -304,6 +310,32 @@ class ExecuteRequest(BaseModel):
     security_id: Optional[str] = Field(default=None, description="Security filter")
 
 
+class ExecuteBatchRequest(BaseModel):
+    """Request model for /v1/execute/batch endpoint."""
+
+    pattern_id: str = Field(..., description="Pattern ID to execute")
+    input_sets: list[dict] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Inputs for each item (typically one per portfolio_id)",
+    )
+    require_fresh: bool = Field(
+        default=True,
+        description="Block execution if pack not fresh (default: true)",
+    )
+    asof_date: Optional[str] = Field(
+        default=None,
+        description="As-of date override (ISO format: YYYY-MM-DD)",
+    )
+    max_concurrency: int = Field(
+        default=DEFAULT_BATCH_CONCURRENCY,
+        ge=1,
+        le=32,
+        description="Maximum items executed concurrently",
+    )
+
+
 class ExecuteResponse(BaseModel):
     """Response model for /v1/execute endpoint."""
 
@@ -333,20 +365,26 @@ async def metrics_endpoint():
     """
     Health metrics endpoint.
 
-    Returns basic health status (observability metrics not available).
+    Returns basic health status plus per-query and per-pool database
+    histograms (observability metrics not available).
     """
     from fastapi import Response
     import json
 
+    from app.db.connection import get_pool_manager
+    from app.db.query_registry import get_query_stats
+
     # Basic health status when observability not available
     health_status = {
         "status": "healthy",
         "service": "dawsos_executor",
-        "observability": "not_available"
+        "observability": "not_available",
+        "db_queries": get_query_stats().snapshot(),
+        "db_pools": get_pool_manager().snapshot(),
     }
 
     return Response(
-        content=json.dumps(health_status, indent=2),
+        content=json.dumps(health_status, indent=2, default=str),
         media_type="application/json"
     )
 
@@ -368,7 +406,8 @@ async def metrics_endpoint():
 async def execute(
     req: ExecuteRequest,
     claims: dict = Depends(verify_token),  # JWT authentication (production)
-) -> ExecuteResponse:
+    x_profile: Optional[str] = Header(default=None, alias=PROFILE_HEADER),
+) -> ORJSONResponse:
     """
     Execute pattern with freshness gate and JWT authentication.
 
@@ -394,9 +433,12 @@ async def execute(
     Args:
         req: Execute request (pattern_id, inputs, require_fresh, asof_date)
         claims: JWT claims (user_id, email, role) from verify_token dependency
+        x_profile: "X-Profile: 1" profiles the run; metadata.profile then holds
+            the call tree and cpu/db/await breakdown
 
     Returns:
-        ExecuteResponse with result and metadata
+        ExecuteResponse with result and metadata (rendered by ORJSONResponse,
+        bypassing FastAPI's response_model re-encoding)
 
     Raises:
         HTTPException 401: Missing or invalid JWT token
@@ -424,7 +466,11 @@ async def execute(
                 # Add pattern attributes to span
                 add_pattern_attributes(span, req.pattern_id, req.inputs)
 
-                return await _execute_pattern_internal(req, claims, request_id, started_at, span, metrics_registry)
+                response = await _execute_pattern_internal(
+                    req, claims, request_id, started_at, span, metrics_registry,
+                    profile=header_requests_profile(x_profile),
+                )
+                return ORJSONResponse(response)
 
         except HTTPException:
             # Re-raise HTTP exceptions (already formatted)
@@ -484,240 +530,295 @@ async def execute(
             )
 
 
-async def _execute_pattern_internal(
+@executor_app.post(
+    "/v1/execute/stream",
+    responses={
+        503: {"model": ErrorResponse, "description": "Pricing pack warming"},
+        404: {"model": ErrorResponse, "description": "Pattern not found"},
+    },
+)
+async def execute_stream(
     req: ExecuteRequest,
-    claims: dict,
-    request_id: str,
-    started_at: datetime,
-    span,
-    metrics_registry,
-) -> ExecuteResponse:
-    """Internal implementation of pattern execution (separated for instrumentation)."""
-    try:
-
-        # ========================================
-        # STEP 1: Get Latest Pricing Pack
-        # ========================================
+    accept: Optional[str] = Header(default=None),
+    claims: dict = Depends(verify_token),
+) -> StreamingResponse:
+    """
+    Execute pattern, streaming each step's result as soon as it completes.
+
+    Freshness gate, portfolio access and RequestCtx construction are identical
+    to /v1/execute and run before the stream opens, so those failures still
+    return regular HTTP errors. Once streaming starts, failures arrive as a
+    terminal "error" event.
+
+    Events (Accept: text/event-stream → SSE, application/x-ndjson → NDJSON):
+        start    - {"metadata": {pricing_pack_id, ledger_commit_hash, ...}}
+        step     - {"step_index", "step_count", "capability", "as", "output", "trace"}
+        complete - {"result", "metadata", "warnings", "trace_id"} (same shape as /v1/execute)
+        error    - {"error", "request_id"}
+    """
+    request_id = str(uuid.uuid4())
+    started_at = datetime.now()
+    metrics_registry = get_metrics()
 
-        # Get pricing service from DI container
-        container = get_container()
-        if not container._initialized:
-            db_pool = get_db_pool()
-            initialize_services(container, db_pool=db_pool)
-        pricing_service = container.resolve("pricing")
+    with trace_context(
+        "execute_pattern_stream",
+        pattern_id=req.pattern_id,
+        request_id=request_id,
+    ) as span:
         try:
-            pack_obj = await pricing_service.get_latest_pack(
-                require_fresh=False,  # Check freshness separately in Step 2
-                raise_if_not_found=True
-            )
-            
-            # Convert PricingPack object to dict format for compatibility
-            pack = {
-                "id": pack_obj.id,
-                "date": pack_obj.date,
-                "status": pack_obj.status,
-                "is_fresh": pack_obj.is_fresh,
-                "prewarm_done": pack_obj.prewarm_done,
-                "reconciliation_passed": pack_obj.reconciliation_passed,
-                "reconciliation_failed": not pack_obj.reconciliation_passed,
-                "updated_at": pack_obj.updated_at,
-            }
-        except PricingPackNotFoundError as e:
-            logger.error(f"No pricing pack found: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,  # Changed from 500 to 503
-                detail=ExecError(
-                    code=ErrorCode.PACK_NOT_FOUND,
-                    message="No pricing pack found. Nightly job may not have run yet.",
-                    request_id=request_id,
-                ).to_dict(),
-            )
-        except PricingPackStaleError as e:
-            # This should be handled in freshness gate check, but catch it here too
-            logger.warning(f"Pricing pack is stale: {e}")
-            from datetime import timedelta
-            # Use default estimate since pack_obj wasn't successfully retrieved
-            estimated_ready = datetime.now() + timedelta(minutes=15)
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=ExecError(
-                    code=ErrorCode.PACK_WARMING,
-                    message="Pricing pack is not ready. Try again in a few minutes.",
-                    details={
-                        "pack_id": e.pricing_pack_id,
-                        "status": e.status,
-                        "is_fresh": e.is_fresh,
-                        "estimated_ready": estimated_ready.isoformat(),
-                    },
-                    request_id=request_id,
-                ).to_dict(),
+            add_pattern_attributes(span, req.pattern_id, req.inputs)
+            ctx, pack, ledger_commit_hash, asof_date = await _prepare_execution(
+                req, claims, request_id, started_at, span, metrics_registry
             )
+            ctx = with_request_deadline(ctx)
+        except (PricingPackValidationError, PricingPackNotFoundError, PricingPackStaleError) as e:
+            raise _pack_error_to_http(e, request_id)
 
-        # ========================================
-        # STEP 2: Freshness Gate (CRITICAL)
-        # ========================================
+    orchestrator = get_pattern_orchestrator()
+    if req.pattern_id not in orchestrator.patterns:
+        logger.error(f"Pattern not found: {req.pattern_id}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ExecError(
+                code=ErrorCode.PATTERN_NOT_FOUND,
+                message=f"Pattern not found: {req.pattern_id}",
+                request_id=request_id,
+            ).to_dict(),
+        )
 
-        if req.require_fresh and not pack["is_fresh"]:
-            logger.warning(
-                f"Freshness gate BLOCKED: pack={pack['id']}, is_fresh={pack['is_fresh']}, "
-                f"prewarm_done={pack['prewarm_done']}"
-            )
+    metadata = {
+        "pricing_pack_id": pack["id"],
+        "ledger_commit_hash": ledger_commit_hash,
+        "pattern_id": req.pattern_id,
+        "asof_date": str(asof_date),
+    }
 
-            # Calculate estimated ready time
-            # Assume 15 minutes for full pre-warm
-            from datetime import timedelta
+    async def events():
+        yield {"event": "start", "metadata": metadata, "trace_id": request_id}
+        async for event in orchestrator.stream_pattern(req.pattern_id, ctx, req.inputs):
+            if event["event"] == "complete":
+                await _audit_execution(req, ctx, pack, ledger_commit_hash, asof_date, started_at)
+                completed_at = datetime.now()
+                duration_ms = (completed_at - started_at).total_seconds() * 1000
+                logger.info(
+                    f"Execute stream completed: pattern={req.pattern_id}, "
+                    f"duration={duration_ms:.2f}ms, request_id={request_id}"
+                )
+                event = {
+                    "event": "complete",
+                    "result": event.get("data", {}),
+                    "metadata": {
+                        **metadata,
+                        "duration_ms": round(duration_ms, 2),
+                        "timestamp": completed_at.isoformat(),
+                    },
+                    "warnings": [],
+                    "trace_id": request_id,
+                }
+            elif event["event"] == "error":
+                logger.error(f"Execute stream failed: pattern={req.pattern_id}: {event['error']}")
+                event = {**event, "request_id": request_id}
+            yield event
+
+    media_type = negotiate_stream_format(accept)
+    return StreamingResponse(
+        encode_stream(events(), media_type),
+        media_type=media_type,
+        headers=STREAM_HEADERS,
+    )
 
-            estimated_ready = pack["updated_at"] + timedelta(minutes=15)
 
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail=ExecError(
-                    code=ErrorCode.PACK_WARMING,
-                    message="Pricing pack warming in progress. Try again in a few minutes.",
-                    details={
-                        "pack_id": pack["id"],
-                        "status": pack["status"],
-                        "prewarm_done": pack["prewarm_done"],
-                        "estimated_ready": estimated_ready.isoformat(),
-                    },
-                    request_id=request_id,
-                ).to_dict(),
-            )
+@executor_app.post(
+    "/v1/execute/batch",
+    responses={
+        503: {"model": ErrorResponse, "description": "Pricing pack warming"},
+        404: {"model": ErrorResponse, "description": "Pattern not found"},
+    },
+)
+async def execute_batch(
+    req: ExecuteBatchRequest,
+    accept: Optional[str] = Header(default=None),
+    claims: dict = Depends(verify_token),
+) -> StreamingResponse:
+    """
+    Execute one pattern for many input sets (e.g. one per portfolio).
+
+    The pricing pack, freshness gate and ledger hash are resolved once for the
+    whole batch. Portfolio-independent steps (macro regime, cycles, ...) run
+    once and are shared; portfolio-specific steps fan out with at most
+    max_concurrency items in flight. Items the caller may not access are
+    reported as item_error without running.
+
+    Events (SSE or NDJSON, see /v1/execute/stream):
+        start      - {"metadata", "total"}
+        shared     - {"steps": [{"step_index", "capability", "as"}], "duration_ms"}
+        item       - {"index", "inputs", "data", "charts", "trace"}
+        item_error - {"index", "inputs", "error"}
+        complete   - {"total", "succeeded", "failed", "duration_ms"}
+    """
+    request_id = str(uuid.uuid4())
+    started_at = datetime.now()
+    metrics_registry = get_metrics()
 
-        # Check for reconciliation failure
-        if pack["reconciliation_failed"]:
-            logger.error(f"Reconciliation failed for pack: {pack['id']}")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=ExecError(
-                    code=ErrorCode.PACK_ERROR,
-                    message="Pricing pack reconciliation failed. Manual intervention required.",
-                    details={
-                        "pack_id": pack["id"],
-                        "error": "Ledger reconciliation failed (±1bp threshold exceeded)",
-                    },
-                    request_id=request_id,
-                ).to_dict(),
+    with trace_context(
+        "execute_pattern_batch",
+        pattern_id=req.pattern_id,
+        request_id=request_id,
+    ) as span:
+        try:
+            base_req = ExecuteRequest(
+                pattern_id=req.pattern_id,
+                require_fresh=req.require_fresh,
+                asof_date=req.asof_date,
             )
+            ctx, pack, ledger_commit_hash, asof_date = await _prepare_execution(
+                base_req, claims, request_id, started_at, span, metrics_registry
+            )
+        except (PricingPackValidationError, PricingPackNotFoundError, PricingPackStaleError) as e:
+            raise _pack_error_to_http(e, request_id)
 
-        logger.info(f"Freshness gate PASSED: pack={pack['id']}, is_fresh={pack['is_fresh']}")
-
-        # ========================================
-        # STEP 3: Construct RequestCtx
-        # ========================================
+    orchestrator = get_pattern_orchestrator()
+    if req.pattern_id not in orchestrator.patterns:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=ExecError(
+                code=ErrorCode.PATTERN_NOT_FOUND,
+                message=f"Pattern not found: {req.pattern_id}",
+                request_id=request_id,
+            ).to_dict(),
+        )
 
-        # Get ledger commit hash
-        ledger_commit_hash = await pack_queries.get_ledger_commit_hash()
+    # Resolve portfolio access for all items in one query
+    allowed, denied = await _partition_batch_access(req.input_sets, ctx, claims)
 
-        # Parse asof_date (if provided)
-        asof_date = pack["date"]
-        if req.asof_date:
-            try:
-                asof_date = date.fromisoformat(req.asof_date)
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=ExecError(
-                        code=ErrorCode.PATTERN_INVALID,
-                        message=f"Invalid asof_date format: {req.asof_date}. Use ISO format (YYYY-MM-DD).",
-                        request_id=request_id,
-                    ).to_dict(),
-                )
+    metadata = {
+        "pricing_pack_id": pack["id"],
+        "ledger_commit_hash": ledger_commit_hash,
+        "pattern_id": req.pattern_id,
+        "asof_date": str(asof_date),
+    }
 
-        # Extract user info from JWT claims
-        user_id = claims["user_id"]
-        user_role = claims.get("role", "USER")
-
-        # Build context (immutable)
-        from uuid import UUID
-        ctx = RequestCtx(
-            user_id=UUID(user_id) if isinstance(user_id, str) else user_id,
-            pricing_pack_id=pack["id"],
-            ledger_commit_hash=ledger_commit_hash,
-            trace_id=request_id,  # Use request_id as trace_id
-            request_id=request_id,
-            timestamp=started_at,
-            asof_date=asof_date,
-            require_fresh=req.require_fresh,
-            portfolio_id=UUID(req.portfolio_id) if req.portfolio_id else None,
+    async def events():
+        yield {
+            "event": "start",
+            "metadata": metadata,
+            "total": len(req.input_sets),
+            "trace_id": request_id,
+        }
+        for index in denied:
+            yield {
+                "event": "item_error",
+                "index": index,
+                "inputs": req.input_sets[index],
+                "error": f"Access denied to portfolio {req.input_sets[index].get('portfolio_id')}",
+            }
+        if allowed:
+            async for event in orchestrator.run_pattern_batch(
+                req.pattern_id,
+                ctx,
+                [req.input_sets[i] for i in allowed],
+                max_concurrency=req.max_concurrency,
+            ):
+                if "index" in event:
+                    event = {**event, "index": allowed[event["index"]]}
+                elif event["event"] == "complete":
+                    event = {
+                        **event,
+                        "total": len(req.input_sets),
+                        "failed": event["failed"] + len(denied),
+                    }
+                yield event
+        else:
+            yield {
+                "event": "complete",
+                "pattern_id": req.pattern_id,
+                "total": len(req.input_sets),
+                "succeeded": 0,
+                "failed": len(denied),
+            }
+        await _audit_execution(
+            ExecuteRequest(pattern_id=req.pattern_id, require_fresh=req.require_fresh,
+                           inputs={"batch_size": len(req.input_sets)}),
+            ctx, pack, ledger_commit_hash, asof_date, started_at,
         )
 
-        logger.info(f"RequestCtx constructed: user_id={user_id}, role={user_role}, {ctx.to_dict()}")
+    media_type = negotiate_stream_format(accept)
+    return StreamingResponse(
+        encode_stream(events(), media_type),
+        media_type=media_type,
+        headers=STREAM_HEADERS,
+    )
 
-        # Add context attributes to span
-        add_context_attributes(span, ctx)
 
-        # ========================================
-        # STEP 3.5: Portfolio Access Check (Authorization)
-        # ========================================
+async def _partition_batch_access(
+    input_sets: list[dict], ctx: RequestCtx, claims: dict
+) -> Tuple[list[int], list[int]]:
+    """
+    Split batch items into (allowed, denied) indexes by portfolio ownership.
+
+    Items without portfolio_id and all items for ADMIN callers are allowed.
+    Malformed portfolio IDs and lookup failures deny (fail closed).
+    """
+    if claims.get("role", "USER") == "ADMIN":
+        return list(range(len(input_sets))), []
 
-        # Check if user has access to the requested portfolio (if portfolio_id provided)
-        if ctx.portfolio_id and user_role != "ADMIN":
+    from uuid import UUID
+
+    requested = {}
+    for index, inputs in enumerate(input_sets):
+        portfolio_id = inputs.get("portfolio_id")
+        if portfolio_id:
             try:
-                pool = get_db_pool()
-                access_query = """
-                    SELECT COUNT(*) as count
-                    FROM portfolios
-                    WHERE id = $1 AND user_id = $2
+                requested[index] = UUID(str(portfolio_id))
+            except ValueError:
+                requested[index] = None
+
+    owned: set = set()
+    ids = [pid for pid in requested.values() if pid is not None]
+    if ids:
+        try:
+            pool = get_db_pool()
+            rows = await pool.fetch(
                 """
-                access_result = await pool.fetchrow(access_query, ctx.portfolio_id, ctx.user_id)
-
-                if not access_result or access_result["count"] == 0:
-                    logger.warning(
-                        f"Portfolio access denied: user_id={ctx.user_id}, portfolio_id={ctx.portfolio_id}"
-                    )
-                    raise HTTPException(
-                        status_code=status.HTTP_403_FORBIDDEN,
-                        detail=ExecError(
-                            code=ErrorCode.PATTERN_INVALID,
-                            message=f"Access denied to portfolio {ctx.portfolio_id}",
-                            request_id=request_id,
-                        ).to_dict(),
-                    )
-
-                logger.debug(f"Portfolio access granted: user_id={ctx.user_id}, portfolio_id={ctx.portfolio_id}")
-
-            except HTTPException:
-                raise
-            except Exception as e:
-                # Database/service errors - fail closed (deny access on error)
-                logger.error(f"Portfolio access check failed: {e}")
-                # Don't raise DatabaseError here - convert to HTTPException is intentional
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=ExecError(
-                        code=ErrorCode.PATTERN_INVALID,
-                        message="Portfolio access check failed",
-                        request_id=request_id,
-                    ).to_dict(),
-                )
+                SELECT id FROM portfolios
+                WHERE id = ANY($1::uuid[]) AND user_id = $2
+                """,
+                list(set(ids)),
+                ctx.user_id,
+            )
+            owned = {row["id"] for row in rows}
+        except Exception as e:
+            logger.error(f"Batch portfolio access check failed: {e}")
 
-        # ========================================
-        # STEP 3.6: RLS Context Enforcement (Security)
-        # ========================================
+    allowed, denied = [], []
+    for index in range(len(input_sets)):
+        if index in requested and requested[index] not in owned:
+            denied.append(index)
+        else:
+            allowed.append(index)
+    if denied:
+        logger.warning(f"Batch access denied for {len(denied)} items: user_id={ctx.user_id}")
+    return allowed, denied
 
-        # RLS (Row-Level Security) REQUIREMENT:
-        # All database queries MUST use get_db_connection_with_rls(ctx.user_id) to enforce
-        # multi-tenant data isolation. This sets app.user_id for RLS policies.
-        #
-        # ✅ RLS Infrastructure Status:
-        #    - get_db_connection_with_rls() implemented: backend/app/db/connection.py:165
-        #    - RLS policies defined: backend/db/migrations/005_create_rls_policies.sql
-        #    - RequestCtx includes user_id: backend/app/core/types.py:98
-        #
-        # Security Enforcement:
-        #   - RequestCtx now carries the caller UUID (from JWT claims)
-        #   - Agents must call get_db_connection_with_rls(ctx.user_id)
-        #   - RLS context is transaction-scoped (auto-resets after transaction)
-
-        if not ctx.user_id:
-            logger.warning(
-                "RLS WARNING: Missing user_id on RequestCtx; falling back to stub behaviour"
-            )
 
-        # Record pack freshness metric
-        if metrics_registry:
-            metrics_registry.record_pack_freshness(pack["id"], pack["status"])
+async def _execute_pattern_internal(
+    req: ExecuteRequest,
+    claims: dict,
+    request_id: str,
+    started_at: datetime,
+    span,
+    metrics_registry,
+    profile: bool = False,
+) -> ExecuteResponse:
+    """Internal implementation of pattern execution (separated for instrumentation)."""
+    try:
+        ctx, pack, ledger_commit_hash, asof_date = await _prepare_execution(
+            req, claims, request_id, started_at, span, metrics_registry
+        )
+        # Capabilities run within what is left of the request deadline
+        ctx = with_request_deadline(ctx)
+        if profile:
+            ctx = replace(ctx, profile=True)
 
         # ========================================
         # STEP 4: Execute Pattern via Orchestrator
@@ -739,39 +840,17 @@ async def _execute_pattern_internal(
             result = orchestration_result.get("data", {})
             trace = orchestration_result.get("trace", {})
 
-            logger.info(f"Pattern executed successfully: {req.pattern_id}, trace={trace}")
+            logger.info(
+                f"Pattern executed successfully: {req.pattern_id}, "
+                f"steps={len(trace.get('steps', []))}, result={summarize(result)}"
+            )
 
             # ========================================
             # STEP 4.5: Audit Log Execution
             # ========================================
 
             # Log pattern execution for compliance and debugging
-            try:
-                # Get audit service from DI container
-                container = get_container()
-                if not container._initialized:
-                    db_pool = get_db_pool()
-                    initialize_services(container, db_pool=db_pool)
-                audit_service = container.resolve("audit")
-                await audit_service.log(
-                    user_id=str(ctx.user_id),
-                    action="execute_pattern",
-                    resource_type="pattern",
-                    resource_id=req.pattern_id,
-                    details={
-                        "portfolio_id": str(ctx.portfolio_id) if ctx.portfolio_id else None,
-                        "pricing_pack_id": pack["id"],
-                        "ledger_commit_hash": ledger_commit_hash,
-                        "asof_date": str(asof_date),
-                        "require_fresh": req.require_fresh,
-                        "inputs": req.inputs,
-                        "execution_time_ms": (datetime.now() - started_at).total_seconds() * 1000,
-                    }
-                )
-                logger.debug("Audit log recorded for pattern execution")
-            except Exception as audit_error:
-                # Never fail request due to audit logging failure
-                logger.error(f"Failed to write audit log: {audit_error}")
+            await _audit_execution(req, ctx, pack, ledger_commit_hash, asof_date, started_at)
 
         except FileNotFoundError:
             logger.error(f"Pattern not found: {req.pattern_id}")
@@ -810,6 +889,8 @@ async def _execute_pattern_internal(
             "duration_ms": round(duration_ms, 2),
             "timestamp": completed_at.isoformat(),
         }
+        if "profile" in trace:
+            metadata["profile"] = trace["profile"]
 
         logger.info(
             f"Execute completed: pattern={req.pattern_id}, duration={duration_ms:.2f}ms, "
@@ -823,24 +904,92 @@ async def _execute_pattern_internal(
             trace_id=request_id,
         )
 
-    except PricingPackValidationError as e:
-        logger.error(f"Invalid pricing pack ID: {e}")
+    except (PricingPackValidationError, PricingPackNotFoundError, PricingPackStaleError) as e:
+        raise _pack_error_to_http(e, request_id)
+    except HTTPException:
+        # Re-raise HTTP exceptions (already formatted)
+        raise
+
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        # Programming errors - should not happen, log and re-raise as HTTPException
+        logger.exception(f"Programming error in pattern execution: {e}")
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=ExecError(
-                code=ErrorCode.PATTERN_INVALID,
-                message=f"Invalid pricing pack ID: {e.reason}",
-                details={
-                    "pricing_pack_id": e.pricing_pack_id,
-                    "reason": e.reason,
-                },
+                code=ErrorCode.INTERNAL_ERROR,
+                message="Internal server error during pattern execution (programming error).",
+                details={"error": str(e)},
                 request_id=request_id,
             ).to_dict(),
         )
+
+    except Exception as e:
+        # Catch-all for unexpected errors (service/database errors)
+        logger.exception(f"Execute failed with unexpected error: {e}")
+        # Don't raise DatabaseError here - convert to HTTPException is intentional
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=ExecError(
+                code=ErrorCode.INTERNAL_ERROR,
+                message="Internal server error during pattern execution.",
+                details={"error": str(e)},
+                request_id=request_id,
+            ).to_dict(),
+        )
+
+
+async def _prepare_execution(
+    req: ExecuteRequest,
+    claims: dict,
+    request_id: str,
+    started_at: datetime,
+    span,
+    metrics_registry,
+) -> Tuple[RequestCtx, dict, str, date]:
+    """
+    Resolve pricing pack, enforce the freshness gate and portfolio access, build RequestCtx.
+
+    Shared by /v1/execute and /v1/execute/stream so both enforce the same gates
+    before any pattern step runs.
+
+    Returns:
+        Tuple of (ctx, pack, ledger_commit_hash, asof_date)
+
+    Raises:
+        HTTPException: Gate/validation failures (already formatted)
+        PricingPack*Error: Pack lookup failures (see _pack_error_to_http)
+    """
+    # ========================================
+    # STEP 1: Get Latest Pricing Pack
+    # ========================================
+
+    # Get pricing service from DI container
+    container = get_container()
+    if not container._initialized:
+        db_pool = get_db_pool()
+        initialize_services(container, db_pool=db_pool)
+    pricing_service = container.resolve("pricing")
+    try:
+        pack_obj = await pricing_service.get_latest_pack(
+            require_fresh=False,  # Check freshness separately in Step 2
+            raise_if_not_found=True
+        )
+        
+        # Convert PricingPack object to dict format for compatibility
+        pack = {
+            "id": pack_obj.id,
+            "date": pack_obj.date,
+            "status": pack_obj.status,
+            "is_fresh": pack_obj.is_fresh,
+            "prewarm_done": pack_obj.prewarm_done,
+            "reconciliation_passed": pack_obj.reconciliation_passed,
+            "reconciliation_failed": not pack_obj.reconciliation_passed,
+            "updated_at": pack_obj.updated_at,
+        }
     except PricingPackNotFoundError as e:
-        logger.error(f"Pricing pack not found: {e}")
+        logger.error(f"No pricing pack found: {e}")
         raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,  # Changed from 500 to 503
             detail=ExecError(
                 code=ErrorCode.PACK_NOT_FOUND,
                 message="No pricing pack found. Nightly job may not have run yet.",
@@ -848,9 +997,11 @@ async def _execute_pattern_internal(
             ).to_dict(),
         )
     except PricingPackStaleError as e:
+        # This should be handled in freshness gate check, but catch it here too
         logger.warning(f"Pricing pack is stale: {e}")
         from datetime import timedelta
-        estimated_ready = datetime.now() + timedelta(minutes=15)  # Default estimate
+        # Use default estimate since pack_obj wasn't successfully retrieved
+        estimated_ready = datetime.now() + timedelta(minutes=15)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=ExecError(
@@ -865,37 +1016,257 @@ async def _execute_pattern_internal(
                 request_id=request_id,
             ).to_dict(),
         )
-    except HTTPException:
-        # Re-raise HTTP exceptions (already formatted)
-        raise
 
-    except (ValueError, TypeError, KeyError, AttributeError) as e:
-        # Programming errors - should not happen, log and re-raise as HTTPException
-        logger.exception(f"Programming error in pattern execution: {e}")
+    # ========================================
+    # STEP 2: Freshness Gate (CRITICAL)
+    # ========================================
+
+    if req.require_fresh and not pack["is_fresh"]:
+        logger.warning(
+            f"Freshness gate BLOCKED: pack={pack['id']}, is_fresh={pack['is_fresh']}, "
+            f"prewarm_done={pack['prewarm_done']}"
+        )
+
+        # Calculate estimated ready time
+        # Assume 15 minutes for full pre-warm
+        from datetime import timedelta
+
+        estimated_ready = pack["updated_at"] + timedelta(minutes=15)
+
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=ExecError(
-                code=ErrorCode.INTERNAL_ERROR,
-                message="Internal server error during pattern execution (programming error).",
-                details={"error": str(e)},
+                code=ErrorCode.PACK_WARMING,
+                message="Pricing pack warming in progress. Try again in a few minutes.",
+                details={
+                    "pack_id": pack["id"],
+                    "status": pack["status"],
+                    "prewarm_done": pack["prewarm_done"],
+                    "estimated_ready": estimated_ready.isoformat(),
+                },
                 request_id=request_id,
             ).to_dict(),
         )
 
-    except Exception as e:
-        # Catch-all for unexpected errors (service/database errors)
-        logger.exception(f"Execute failed with unexpected error: {e}")
-        # Don't raise DatabaseError here - convert to HTTPException is intentional
+    # Check for reconciliation failure
+    if pack["reconciliation_failed"]:
+        logger.error(f"Reconciliation failed for pack: {pack['id']}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=ExecError(
-                code=ErrorCode.INTERNAL_ERROR,
-                message="Internal server error during pattern execution.",
-                details={"error": str(e)},
+                code=ErrorCode.PACK_ERROR,
+                message="Pricing pack reconciliation failed. Manual intervention required.",
+                details={
+                    "pack_id": pack["id"],
+                    "error": "Ledger reconciliation failed (±1bp threshold exceeded)",
+                },
                 request_id=request_id,
             ).to_dict(),
         )
 
+    logger.info(f"Freshness gate PASSED: pack={pack['id']}, is_fresh={pack['is_fresh']}")
+
+    # ========================================
+    # STEP 3: Construct RequestCtx
+    # ========================================
+
+    # Get ledger commit hash
+    ledger_commit_hash = await get_pricing_pack_queries().get_ledger_commit_hash()
+
+    # Parse asof_date (if provided)
+    asof_date = pack["date"]
+    if req.asof_date:
+        try:
+            asof_date = date.fromisoformat(req.asof_date)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=ExecError(
+                    code=ErrorCode.PATTERN_INVALID,
+                    message=f"Invalid asof_date format: {req.asof_date}. Use ISO format (YYYY-MM-DD).",
+                    request_id=request_id,
+                ).to_dict(),
+            )
+
+    # Extract user info from JWT claims
+    user_id = claims["user_id"]
+    user_role = claims.get("role", "USER")
+
+    # Build context (immutable)
+    from uuid import UUID
+    ctx = RequestCtx(
+        user_id=UUID(user_id) if isinstance(user_id, str) else user_id,
+        pricing_pack_id=pack["id"],
+        ledger_commit_hash=ledger_commit_hash,
+        trace_id=request_id,  # Use request_id as trace_id
+        request_id=request_id,
+        timestamp=started_at,
+        asof_date=asof_date,
+        require_fresh=req.require_fresh,
+        portfolio_id=UUID(req.portfolio_id) if req.portfolio_id else None,
+    )
+    logger.info(f"RequestCtx constructed: user_id={user_id}, role={user_role}, {ctx.to_dict()}")
+
+    # Add context attributes to span
+    add_context_attributes(span, ctx)
+
+    # ========================================
+    # STEP 3.5: Portfolio Access Check (Authorization)
+    # ========================================
+
+    # Check if user has access to the requested portfolio (if portfolio_id provided)
+    if ctx.portfolio_id and user_role != "ADMIN":
+        try:
+            pool = get_db_pool()
+            access_query = """
+                SELECT COUNT(*) as count
+                FROM portfolios
+                WHERE id = $1 AND user_id = $2
+            """
+            access_result = await pool.fetchrow(access_query, ctx.portfolio_id, ctx.user_id)
+
+            if not access_result or access_result["count"] == 0:
+                logger.warning(
+                    f"Portfolio access denied: user_id={ctx.user_id}, portfolio_id={ctx.portfolio_id}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_403_FORBIDDEN,
+                    detail=ExecError(
+                        code=ErrorCode.PATTERN_INVALID,
+                        message=f"Access denied to portfolio {ctx.portfolio_id}",
+                        request_id=request_id,
+                    ).to_dict(),
+                )
+
+            logger.debug(f"Portfolio access granted: user_id={ctx.user_id}, portfolio_id={ctx.portfolio_id}")
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            # Database/service errors - fail closed (deny access on error)
+            logger.error(f"Portfolio access check failed: {e}")
+            # Don't raise DatabaseError here - convert to HTTPException is intentional
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=ExecError(
+                    code=ErrorCode.PATTERN_INVALID,
+                    message="Portfolio access check failed",
+                    request_id=request_id,
+                ).to_dict(),
+            )
+
+    # ========================================
+    # STEP 3.6: RLS Context Enforcement (Security)
+    # ========================================
+
+    # RLS (Row-Level Security) REQUIREMENT:
+    # All database queries MUST use get_db_connection_with_rls(ctx.user_id) to enforce
+    # multi-tenant data isolation. This sets app.user_id for RLS policies.
+    #
+    # ✅ RLS Infrastructure Status:
+    #    - get_db_connection_with_rls() implemented: backend/app/db/connection.py:165
+    #    - RLS policies defined: backend/db/migrations/005_create_rls_policies.sql
+    #    - RequestCtx includes user_id: backend/app/core/types.py:98
+    #
+    # Security Enforcement:
+    #   - RequestCtx now carries the caller UUID (from JWT claims)
+    #   - Agents must call get_db_connection_with_rls(ctx.user_id), or
+    #     get_rls_read_connection(ctx.user_id) for plain reads
+    #   - RLS context is transaction-scoped (auto-resets after transaction)
+
+    if not ctx.user_id:
+        logger.warning(
+            "RLS WARNING: Missing user_id on RequestCtx; falling back to stub behaviour"
+        )
+
+    # Record pack freshness metric
+    if metrics_registry:
+        metrics_registry.record_pack_freshness(pack["id"], pack["status"])
+
+    return ctx, pack, ledger_commit_hash, asof_date
+
+
+async def _audit_execution(
+    req: ExecuteRequest,
+    ctx: RequestCtx,
+    pack: dict,
+    ledger_commit_hash: str,
+    asof_date: date,
+    started_at: datetime,
+) -> None:
+    """Write the execute_pattern audit record (never fails the request)."""
+    try:
+        # Get audit service from DI container
+        container = get_container()
+        if not container._initialized:
+            db_pool = get_db_pool()
+            initialize_services(container, db_pool=db_pool)
+        audit_service = container.resolve("audit")
+        await audit_service.log(
+            user_id=str(ctx.user_id),
+            action="execute_pattern",
+            resource_type="pattern",
+            resource_id=req.pattern_id,
+            details={
+                "portfolio_id": str(ctx.portfolio_id) if ctx.portfolio_id else None,
+                "pricing_pack_id": pack["id"],
+                "ledger_commit_hash": ledger_commit_hash,
+                "asof_date": str(asof_date),
+                "require_fresh": req.require_fresh,
+                "inputs": req.inputs,
+                "execution_time_ms": (datetime.now() - started_at).total_seconds() * 1000,
+            }
+        )
+        logger.debug("Audit log recorded for pattern execution")
+    except Exception as audit_error:
+        # Never fail request due to audit logging failure
+        logger.error(f"Failed to write audit log: {audit_error}")
+
+
+def _pack_error_to_http(e: Exception, request_id: str) -> HTTPException:
+    """Map pricing pack lookup errors to HTTP errors."""
+    if isinstance(e, PricingPackValidationError):
+        logger.error(f"Invalid pricing pack ID: {e}")
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ExecError(
+                code=ErrorCode.PATTERN_INVALID,
+                message=f"Invalid pricing pack ID: {e.reason}",
+                details={
+                    "pricing_pack_id": e.pricing_pack_id,
+                    "reason": e.reason,
+                },
+                request_id=request_id,
+            ).to_dict(),
+        )
+    if isinstance(e, PricingPackNotFoundError):
+        logger.error(f"Pricing pack not found: {e}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=ExecError(
+                code=ErrorCode.PACK_NOT_FOUND,
+                message="No pricing pack found. Nightly job may not have run yet.",
+                request_id=request_id,
+            ).to_dict(),
+        )
+    logger.warning(f"Pricing pack is stale: {e}")
+    from datetime import timedelta
+    estimated_ready = datetime.now() + timedelta(minutes=15)  # Default estimate
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=ExecError(
+            code=ErrorCode.PACK_WARMING,
+            message="Pricing pack is not ready. Try again in a few minutes.",
+            details={
+                "pack_id": e.pricing_pack_id,
+                "status": e.status,
+                "is_fresh": e.is_fresh,
+                "estimated_ready": estimated_ready.isoformat(),
+            },
+            request_id=request_id,
+        ).to_dict(),
+    )
+
 
 # ============================================================================
 # Error Handlers
@@ -5,6 +5,7 @@
 
 Endpoints:
 - POST /v1/trades - Execute buy/sell trade
+- POST /v1/trades/batch - Execute a list of buy/sell trades in one transaction
 - GET /v1/trades - List trades for a portfolio
 - GET /v1/lots - View open lots for a portfolio
 - GET /v1/positions - View current positions
@@ -23,6 +24,7 @@
 from app.db.connection import get_db_connection_with_rls
 from app.services.trade_execution import (
     TradeExecutionService,
+    TradeOrder,
     TradeType,
     LotSelectionMethod,
     TradeExecutionError,
@@ -140,6 +142,43 @@ class Config:
         }
 
 
+class BatchTradeItem(BaseModel):
+    """Single trade within a batch request."""
+
+    symbol: str = Field(..., min_length=1, max_length=20, description="Security symbol (e.g., AAPL)")
+    trade_type: Literal["buy", "sell"] = Field(..., description="Trade type (buy or sell)")
+    qty: Decimal = Field(..., gt=0, description="Quantity (positive)")
+    price: Decimal = Field(..., ge=0, description="Price per share")
+    currency: str = Field(..., pattern="^[A-Z]{3}$", description="Trade currency (ISO 4217)")
+    trade_date: date = Field(..., description="Trade execution date")
+    settlement_date: Optional[date] = Field(None, description="Settlement date (defaults to trade_date)")
+    lot_selection: Optional[Literal["fifo", "lifo", "hifo", "specific"]] = Field(
+        None,
+        description="Lot selection method for sells (defaults to portfolio cost basis method)"
+    )
+    specific_lot_id: Optional[UUID] = Field(None, description="Specific lot ID (if lot_selection=specific)")
+    fx_rate: Optional[Decimal] = Field(None, gt=0, description="FX rate (trade_currency -> base_currency)")
+    fees: Decimal = Field(Decimal("0"), ge=0, description="Trade fees/commissions")
+    notes: Optional[str] = Field(None, max_length=1000, description="Optional trade notes")
+
+
+class BatchTradeRequest(BaseModel):
+    """Request model for executing a batch of trades (e.g. a rebalance)."""
+
+    portfolio_id: UUID = Field(..., description="Portfolio UUID")
+    base_currency: Optional[str] = Field(None, pattern="^[A-Z]{3}$", description="Portfolio base currency")
+    trades: List[BatchTradeItem] = Field(..., min_length=1, max_length=1000, description="Trades, applied in order")
+
+
+class BatchTradeResponse(BaseModel):
+    """Response model for batch trade execution."""
+
+    portfolio_id: UUID
+    trade_count: int
+    realized_pnl: Decimal
+    trades: List[TradeResponse]
+
+
 class TransactionListItem(BaseModel):
     """Transaction list item."""
 
@@ -390,6 +429,134 @@ async def execute_trade(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+@router.post("/batch", response_model=BatchTradeResponse, status_code=201)
+async def execute_trade_batch(
+    batch: BatchTradeRequest,
+    claims: dict = Depends(verify_token)
+) -> BatchTradeResponse:
+    """
+    Execute a list of buy/sell trades atomically.
+
+    Intended for rebalances (e.g. optimizer trade proposals): lots are locked
+    once, FIFO/LIFO/HIFO relief is computed in memory and all writes happen in
+    a single transaction. If any trade fails validation or lacks shares, no
+    trade in the batch is applied.
+
+    **RLS**: Automatically filtered to user's portfolios
+    """
+    user_id = get_user_id_from_claims(claims)
+    user_role = claims.get("role", "USER")
+
+    # RBAC: Check permission to write trades
+    container = ensure_initialized()
+    auth_service = container.resolve("auth")
+    if not auth_service.check_permission(user_role, "write_trades"):
+        raise HTTPException(
+            status_code=403,
+            detail="Insufficient permissions to execute trades"
+        )
+
+    logger.info(
+        f"Batch trade request: user_id={user_id}, portfolio_id={batch.portfolio_id}, "
+        f"trades={len(batch.trades)}, role={user_role}"
+    )
+
+    try:
+        async with get_db_connection_with_rls(str(user_id)) as conn:
+            # Verify portfolio exists and belongs to user (RLS enforced)
+            portfolio = await conn.fetchrow(
+                "SELECT id, base_currency FROM portfolios WHERE id = $1 AND is_active = true",
+                batch.portfolio_id
+            )
+
+            if not portfolio:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"Portfolio {batch.portfolio_id} not found or inactive"
+                )
+
+            orders = [
+                TradeOrder(
+                    symbol=item.symbol,
+                    trade_type=TradeType(item.trade_type.upper()),
+                    qty=item.qty,
+                    price=item.price,
+                    currency=item.currency,
+                    trade_date=item.trade_date,
+                    settlement_date=item.settlement_date,
+                    lot_selection=LotSelectionMethod(item.lot_selection) if item.lot_selection else None,
+                    specific_lot_id=item.specific_lot_id,
+                    fx_rate=item.fx_rate,
+                    fees=item.fees,
+                    notes=item.notes,
+                )
+                for item in batch.trades
+            ]
+
+            service = TradeExecutionService(conn)
+            result = await service.execute_batch(
+                portfolio_id=batch.portfolio_id,
+                orders=orders,
+                base_currency=batch.base_currency or portfolio["base_currency"],
+            )
+
+        trades = []
+        for trade in result["trades"]:
+            lots_closed = None
+            if trade["trade_type"] == "sell":
+                lots_closed = [LotInfo(**lot) for lot in trade["lots_closed"]]
+            trades.append(TradeResponse(
+                trade_id=trade["trade_id"],
+                symbol=trade["symbol"],
+                trade_type=trade["trade_type"],
+                qty=trade["qty"],
+                price=trade["price"],
+                currency=trade["currency"],
+                total_cost=trade.get("total_cost"),
+                net_proceeds=trade.get("net_proceeds"),
+                cost_basis_base=trade.get("cost_basis_base"),
+                proceeds_base=trade.get("proceeds_base"),
+                fx_rate=trade["fx_rate"],
+                trade_date=trade["trade_date"],
+                settlement_date=trade["settlement_date"],
+                lot_id=trade.get("lot_id"),
+                lots_closed=lots_closed,
+                realized_pnl=trade.get("realized_pnl"),
+                fees=trade["fees"],
+                notes=trade["notes"]
+            ))
+
+        return BatchTradeResponse(
+            portfolio_id=batch.portfolio_id,
+            trade_count=result["trade_count"],
+            realized_pnl=result["realized_pnl"],
+            trades=trades,
+        )
+
+    except InsufficientSharesError as e:
+        logger.warning(f"Insufficient shares in batch: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except InvalidTradeError as e:
+        logger.warning(f"Invalid trade in batch: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+
+    except TradeExecutionError as e:
+        logger.error(f"Batch trade execution error: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Batch trade execution failed: {e}")
+
+    except HTTPException:
+        raise
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        # Programming errors - should not happen, log and re-raise as HTTPException
+        logger.error(f"Programming error executing trade batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Internal server error (programming error): {str(e)}")
+    except Exception as e:
+        # Service/database errors - log and re-raise as HTTPException
+        logger.error(f"Unexpected error executing trade batch: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
 @router.get("", response_model=List[TransactionListItem])
 async def list_trades(
     portfolio_id: UUID,
@@ -0,0 +1,75 @@
+"""
+Streaming Response Helpers
+
+Purpose: Encode pattern execution events as Server-Sent Events or NDJSON
+Created: 2025-11-10
+Priority: P1 (Time-to-first-panel on dashboard patterns)
+
+Formats:
+    - text/event-stream (default): "event: <type>\\ndata: <json>\\n\\n"
+    - application/x-ndjson: one JSON object per line
+
+Events are dicts with an "event" key (start, step, complete, error); the
+payload is rendered with app.core.serialization so Decimal/UUID/date values
+match the regular JSON endpoints.
+
+Usage:
+    media_type = negotiate_stream_format(request.headers.get("accept"))
+    return StreamingResponse(
+        encode_stream(events, media_type),
+        media_type=media_type,
+        headers=STREAM_HEADERS,
+    )
+"""
+
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+from app.core.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+SSE_MEDIA_TYPE = "text/event-stream"
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Disable proxy buffering so each event is flushed as soon as it is written
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
+
+
+def negotiate_stream_format(accept: Optional[str]) -> str:
+    """Pick NDJSON when the client asks for it, otherwise SSE."""
+    if accept and (NDJSON_MEDIA_TYPE in accept or "application/jsonl" in accept):
+        return NDJSON_MEDIA_TYPE
+    return SSE_MEDIA_TYPE
+
+
+def encode_event(event: Dict[str, Any], media_type: str) -> str:
+    """Encode one event for the given stream format."""
+    body = dumps(event).decode()
+    if media_type == NDJSON_MEDIA_TYPE:
+        return body + "\n"
+    return f"event: {event.get('event', 'message')}\ndata: {body}\n\n"
+
+
+async def encode_stream(
+    events: AsyncIterator[Dict[str, Any]], media_type: str
+) -> AsyncIterator[str]:
+    """
+    Encode an event iterator, converting unexpected failures into an error event.
+
+    Headers are already sent once streaming starts, so errors can no longer
+    become HTTP status codes; clients must treat the "error" event as terminal.
+    """
+    try:
+        async for event in events:
+            yield encode_event(event, media_type)
+    except Exception as e:
+        logger.exception(f"Streaming execution failed: {e}")
+        yield encode_event({"event": "error", "error": str(e)}, media_type)
+    finally:
+        aclose = getattr(events, "aclose", None)
+        if aclose is not None:
+            await aclose()
@@ -1,7 +1,7 @@
 """
 DawsOS Agent Runtime
 
-Purpose: Agent registration, capability routing, retry management, and rights enforcement
+Purpose: Agent registration, capability routing, retry management, latency budgets, and rights enforcement
 Updated: 2025-01-14
 Priority: P0 (Critical for execution architecture)
 
@@ -10,6 +10,9 @@
     - Capability routing to correct agent
     - Dependency injection (services, DB, Redis)
     - Simple retry mechanism with exponential backoff (3 retries, 1s/2s/4s delays)
+    - Per-capability latency budgets and RequestCtx deadline propagation
+    - Hedged duplicate calls for idempotent provider reads (after p95 latency)
+    - Per-capability circuit breakers (last good result or fail fast while open)
     - Request-level capability result caching
     - Result metadata preservation
     - Capability discovery
@@ -22,8 +25,14 @@
 
 Retry Logic:
     - Max 3 retries with exponential backoff (1s, 2s, 4s)
-    - No circuit breaker (removed for simplicity)
+    - A retry is skipped when its backoff would pass the request deadline
+    - Budget timeouts are not retried (the attempt already used its budget)
     - Failures are logged and metrics recorded
+
+Latency Bounds (see app.core.resilience):
+    - Each attempt runs within min(capability budget, time left on ctx.deadline)
+    - Budgets come from the capability contract (latency_budget_ms) or prefix defaults
+    - Circuit breaker opens at 50% errors over the last 20 calls, for 30s
 """
 
 import asyncio
@@ -32,6 +41,18 @@
 from typing import Any, Dict, List, Optional
 
 from app.agents.base_agent import BaseAgent
+from app.core.capability_contract import get_capability_contract
+from app.core.exceptions import CapabilityTimeoutError, CircuitOpenError
+from app.core.resilience import (
+    CapabilityPolicy,
+    CircuitBreaker,
+    LastGoodResults,
+    LatencyTracker,
+    call_with_budget,
+    degraded,
+    is_error_result,
+    policy_for,
+)
 from app.core.types import RequestCtx
 
 # Compliance modules not used in current deployment
@@ -108,6 +129,13 @@ def __init__(self, services: Dict[str, Any], enable_rights_enforcement: bool = T
         self.max_retries = 3
         self.retry_delays = [1, 2, 4]  # Exponential backoff: 1s, 2s, 4s
 
+        # Latency budgets, hedging and circuit breakers (per capability)
+        self._policies: Dict[str, CapabilityPolicy] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency = LatencyTracker()
+        self._last_good = LastGoodResults()
+        self._resilience_stats: Dict[str, Dict[str, int]] = {}
+
         # Rights enforcement
         self.enable_rights_enforcement = enable_rights_enforcement
         if enable_rights_enforcement and get_attribution_manager is not None:
@@ -394,6 +422,15 @@ async def execute_capability(
             )
             return cached_result
 
+        policy = self._policy_for(agent, capability)
+        breaker = self._breakers.setdefault(capability, CircuitBreaker())
+        last_good_key = (capability, str(ctx.user_id), cache_key)
+
+        # Circuit open: previous result for the same user/arguments, or fail fast
+        if not breaker.allow():
+            self._count(capability, "short_circuited")
+            return self._short_circuit(capability, policy, last_good_key, breaker)
+
         # Execute capability with retry logic
         metrics = get_metrics()
 
@@ -401,6 +438,7 @@ async def execute_capability(
         for attempt in range(self.max_retries + 1):
             agent_start_time = time.time()
             agent_status = "success"
+            timeout = self._attempt_timeout(capability, ctx, policy)
 
             try:
                 if attempt > 0:
@@ -414,7 +452,29 @@ async def execute_capability(
                         f"(ctx.pricing_pack_id={ctx.pricing_pack_id})"
                     )
 
-                result = await agent.execute(capability, ctx, state, **kwargs)
+                hedge_delay = self._latency.hedge_delay(capability) if policy.hedge else None
+                try:
+                    result, hedged = await call_with_budget(
+                        lambda: agent.execute(capability, ctx, state, **kwargs),
+                        timeout,
+                        hedge_delay,
+                    )
+                except asyncio.TimeoutError:
+                    raise CapabilityTimeoutError(
+                        f"Capability {capability} exceeded its {timeout:.2f}s budget",
+                        capability=capability,
+                        timeout=timeout,
+                    )
+                if hedged:
+                    self._count(capability, "hedged")
+
+                # In-band provider errors count against the breaker and are never replayed
+                succeeded = not is_error_result(result)
+                breaker.record(succeeded)
+                if succeeded:
+                    self._latency.observe(capability, time.time() - agent_start_time)
+                    if policy.idempotent:
+                        self._last_good.set(last_good_key, result)
 
                 # Add attributions if rights enforcement enabled
                 if self.enable_rights_enforcement and self._attribution_manager:
@@ -441,6 +501,7 @@ async def execute_capability(
 
             except (ValueError, TypeError, KeyError, AttributeError) as e:
                 # Programming errors - should not happen, log and re-raise immediately (no retry)
+                # Not counted against the breaker: bugs say nothing about the provider's health
                 agent_status = "error"
                 last_exception = e
                 logger.error(
@@ -453,19 +514,10 @@ async def execute_capability(
                 # Service/database errors - retry logic applies
                 agent_status = "error"
                 last_exception = e
-
-                # Log the error with appropriate severity based on attempt
-                if attempt < self.max_retries:
-                    logger.warning(
-                        f"Capability {capability} failed in {agent_name} "
-                        f"(attempt {attempt + 1}/{self.max_retries + 1}): {e}"
-                    )
-                else:
-                    logger.error(
-                        f"Capability {capability} failed in {agent_name} "
-                        f"after {self.max_retries + 1} attempts: {e}",
-                        exc_info=True,
-                    )
+                timed_out = isinstance(e, CapabilityTimeoutError)
+                breaker.record(False)
+                if timed_out:
+                    self._count(capability, "timeouts")
 
                 # Record failure metrics
                 if metrics:
@@ -481,14 +533,31 @@ async def execute_capability(
                         capability=capability,
                     ).observe(agent_duration)
 
-                # If this is not the last attempt, wait before retrying
-                if attempt < self.max_retries:
+                # Retry unless the budget is spent, the breaker opened or the backoff passes the deadline
+                if attempt < self.max_retries and not timed_out and breaker.state == "closed":
                     delay = self.retry_delays[attempt]
-                    logger.info(
-                        f"Waiting {delay}s before retry for {capability} in {agent_name}"
-                    )
-                    await asyncio.sleep(delay)
-                    continue
+                    remaining = ctx.remaining_seconds()
+                    if remaining is None or delay < remaining:
+                        logger.warning(
+                            f"Capability {capability} failed in {agent_name} "
+                            f"(attempt {attempt + 1}/{self.max_retries + 1}): {e}"
+                        )
+                        logger.info(
+                            f"Waiting {delay}s before retry for {capability} in {agent_name}"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+
+                logger.error(
+                    f"Capability {capability} failed in {agent_name} "
+                    f"after {attempt + 1} attempts: {e}",
+                    exc_info=not timed_out,
+                )
+
+                # Previous good result beats failing the whole pattern
+                fallback = self._last_good_result(capability, policy, last_good_key)
+                if fallback is not None:
+                    return fallback
 
                 # If all retries failed, raise the last exception
                 raise
@@ -499,6 +568,80 @@ async def execute_capability(
         else:
             raise RuntimeError(f"Unexpected error in retry logic for {capability}")
 
+    def _policy_for(self, agent: BaseAgent, capability: str) -> CapabilityPolicy:
+        """Resilience policy for a capability (contract declarations over prefix defaults)."""
+        policy = self._policies.get(capability)
+        if policy is None:
+            method = getattr(agent, capability.replace(".", "_"), None)
+            contract = get_capability_contract(method) if method is not None else None
+            policy = self._policies[capability] = policy_for(capability, contract)
+        return policy
+
+    def _attempt_timeout(self, capability: str, ctx: RequestCtx, policy: CapabilityPolicy) -> Optional[float]:
+        """Capability budget, capped by the time left on the request deadline (None = unbounded)."""
+        remaining = ctx.remaining_seconds()
+        if remaining is None:
+            return policy.budget_seconds
+        if remaining <= 0:
+            raise CapabilityTimeoutError(
+                f"Request deadline passed before {capability} could run",
+                capability=capability,
+            )
+        if policy.budget_seconds is None:
+            return remaining
+        return min(policy.budget_seconds, remaining)
+
+    def _last_good_result(self, capability: str, policy: CapabilityPolicy, key: tuple) -> Optional[Any]:
+        """Previous result for the same user/arguments marked as cached, or None."""
+        if not policy.idempotent:
+            return None
+        entry = self._last_good.get(key)
+        if entry is None:
+            return None
+        result, age = entry
+        self._count(capability, "served_last_good")
+        logger.warning(f"Serving last good {capability} result ({int(age)}s old)")
+        return degraded(result, capability, age)
+
+    def _short_circuit(
+        self, capability: str, policy: CapabilityPolicy, key: tuple, breaker: CircuitBreaker
+    ) -> Any:
+        fallback = self._last_good_result(capability, policy, key)
+        if fallback is not None:
+            return fallback
+        raise CircuitOpenError(
+            f"Capability {capability} temporarily unavailable (circuit open)",
+            capability=capability,
+            retry_after=breaker.retry_after(),
+        )
+
+    def _count(self, capability: str, event: str) -> None:
+        stats = self._resilience_stats.setdefault(capability, {})
+        stats[event] = stats.get(event, 0) + 1
+
+    def get_resilience_stats(self) -> Dict[str, Any]:
+        """
+        Per-capability latency/breaker snapshot for monitoring.
+
+        Returns:
+            {capability: {p50_ms, p95_ms, budget_ms, hedge, breaker, hedged, timeouts, ...}}
+        """
+        snapshot = {}
+        for capability in sorted(set(self._breakers) | set(self._resilience_stats)):
+            policy = self._policies.get(capability)
+            breaker = self._breakers.get(capability)
+            p50 = self._latency.quantile(capability, 0.5)
+            p95 = self._latency.quantile(capability, 0.95)
+            snapshot[capability] = {
+                "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "budget_ms": int(policy.budget_seconds * 1000) if policy and policy.budget_seconds else None,
+                "hedge": policy.hedge if policy else False,
+                "breaker": breaker.state if breaker else "closed",
+                **self._resilience_stats.get(capability, {}),
+            }
+        return snapshot
+
     def _add_attributions(self, result: Any) -> Any:
         """
         Add attributions to capability result.
@@ -10,6 +10,7 @@
     - Self-documenting code
     - Clear expectations (inputs, outputs, behavior)
     - Stub identification (mark stub vs real implementations)
+    - Latency budget / hedging declarations read by AgentRuntime (app.core.resilience)
 
 Usage:
     from app.core.capability_contract import capability
@@ -22,6 +23,7 @@
         implementation_status="stub",
         description="Compute portfolio factor exposures (currently stub implementation)",
         dependencies=["ledger.positions", "pricing.apply_pack"],
+        latency_budget_ms=5000,
     )
     async def risk_compute_factor_exposures(...):
         ...
@@ -43,6 +45,9 @@ def capability(
     implementation_status: str = "real",  # "real" | "stub" | "partial"
     description: Optional[str] = None,
     dependencies: Optional[list] = None,
+    latency_budget_ms: Optional[int] = None,
+    hedge: Optional[bool] = None,
+    idempotent: Optional[bool] = None,
 ):
     """
     Decorator to document capability contracts.
@@ -55,6 +60,9 @@ def capability(
         implementation_status: "real" | "stub" | "partial"
         description: Human-readable description
         dependencies: List of capability dependencies
+        latency_budget_ms: Per-attempt time limit (None = runtime default for the capability)
+        hedge: Start a duplicate call after the capability's p95 latency (read-only capabilities)
+        idempotent: Safe to repeat / serve a previous result for (None = runtime default)
     
     Returns:
         Decorated function with contract metadata attached
@@ -80,6 +88,9 @@ def decorator(func: Callable) -> Callable:
             "implementation_status": implementation_status,
             "description": description or "",
             "dependencies": dependencies or [],
+            "latency_budget_ms": latency_budget_ms,
+            "hedge": hedge,
+            "idempotent": idempotent,
         }
         
         # Attach to function
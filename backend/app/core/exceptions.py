@@ -209,6 +209,26 @@ def __init__(self, message: str = "Authentication failed", **kwargs):
         super().__init__(message, retryable=False, **kwargs)
 
 
+class CapabilityTimeoutError(TimeoutError):
+    """Capability exceeded its latency budget or the request deadline."""
+
+    def __init__(self, message: str, capability: str, timeout: Optional[float] = None):
+        details = {"capability": capability}
+        if timeout:
+            details["timeout"] = round(timeout, 3)
+        APIError.__init__(self, message, details=details, retryable=False)
+
+
+class CircuitOpenError(APIError):
+    """Capability short-circuited by its circuit breaker (no fallback result available)."""
+
+    def __init__(self, message: str, capability: str, retry_after: Optional[float] = None):
+        details = {"capability": capability}
+        if retry_after:
+            details["retry_after"] = round(retry_after, 1)
+        super().__init__(message, details=details, retryable=True)
+
+
 # ============================================================================
 # Business Logic Exceptions
 # ============================================================================
@@ -0,0 +1,246 @@
+"""
+Pattern Result Cache
+
+Purpose: Memoize whole-pattern results keyed by pricing pack, ledger and inputs
+Created: 2025-11-10
+Priority: P1 (Repeat dashboard loads)
+
+Features:
+    - Opt-in per pattern via "cache": {"enabled": true, "ttl_seconds": 300} in pattern JSON
+    - In-memory LRU tier (per process) + optional Redis tier (shared)
+    - Keys include pattern, pricing pack, ledger commit, portfolio data version
+      (app.db.portfolio_version), user, request context and normalized inputs, so
+      a new pack, ledger commit or recorded trade never reads old entries
+    - LRU entries for superseded packs/ledger commits are purged when a newer one is seen
+
+Pattern results are deterministic given RequestCtx.pricing_pack_id,
+ledger_commit_hash, the portfolio's stored transactions/values and inputs,
+so a cached result is equivalent to a fresh one.
+
+Usage:
+    cache = PatternResultCache(redis=redis)
+    key = cache.make_key("portfolio_overview", ctx, inputs, data_version)
+    result = await cache.get(key)
+    if result is None:
+        result = await run()
+        await cache.set(key, result, ttl_seconds=300, ctx=ctx)
+"""
+
+import copy
+import hashlib
+import inspect
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Optional, Tuple
+from uuid import UUID
+
+from app.core.serialization import dumps, loads
+from app.core.types import RequestCtx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+REDIS_KEY_PREFIX = "dawsos:pattern_result"
+
+
+def _json_default(value: Any) -> Any:
+    """Encode non-JSON types the same way the API layer renders them."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def normalize_inputs(inputs: Dict[str, Any]) -> str:
+    """Canonical JSON for inputs (sorted keys, API-equivalent scalars)."""
+    return json.dumps(inputs, sort_keys=True, default=_json_default, separators=(",", ":"))
+
+
+@dataclass
+class _CacheEntry:
+    value: Dict[str, Any]
+    expires_at: float
+    cached_at: float
+    generation: Tuple[str, str]
+
+
+class PatternResultCache:
+    """Two-tier (LRU + optional Redis) cache of run_pattern results."""
+
+    def __init__(self, redis=None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize cache.
+
+        Args:
+            redis: Redis client (sync or asyncio API; optional)
+            max_entries: In-memory LRU capacity
+        """
+        self.redis = redis
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._generation: Optional[Tuple[str, str]] = None
+        self.stats = {"hits": 0, "redis_hits": 0, "misses": 0, "sets": 0, "invalidated": 0}
+
+    def make_key(
+        self,
+        pattern_id: str,
+        ctx: RequestCtx,
+        inputs: Dict[str, Any],
+        data_version: Optional[str] = None,
+    ) -> str:
+        """
+        Build cache key.
+
+        Format: {pattern}:{pack}:{ledger}:{data version}:{user}:{md5(context + inputs)}
+        """
+        scope = normalize_inputs({
+            "portfolio_id": ctx.portfolio_id,
+            "base_currency": ctx.base_currency,
+            "rights_profile": ctx.rights_profile,
+            "asof_date": ctx.asof_date,
+            "inputs": inputs,
+        })
+        digest = hashlib.md5(scope.encode()).hexdigest()
+        return (
+            f"{pattern_id}:{ctx.pricing_pack_id}:{ctx.ledger_commit_hash}:"
+            f"{data_version or '-'}:{ctx.user_id}:{digest}"
+        )
+
+    def observe_generation(self, ctx: RequestCtx) -> None:
+        """
+        Purge in-memory entries from an older pack/ledger when a new one appears.
+
+        Redis entries need no purge: their keys embed pack and ledger, so they
+        are unreachable after a change and expire by TTL.
+        """
+        generation = (ctx.pricing_pack_id, ctx.ledger_commit_hash)
+        if generation == self._generation:
+            return
+        if self._generation is not None:
+            self.invalidate(keep_generation=generation)
+        self._generation = generation
+
+    def invalidate(self, keep_generation: Optional[Tuple[str, str]] = None) -> int:
+        """
+        Drop in-memory entries (all, or all not matching keep_generation).
+
+        Returns:
+            Number of entries dropped
+        """
+        stale = [
+            key for key, entry in self._entries.items()
+            if keep_generation is None or entry.generation != keep_generation
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.stats["invalidated"] += len(stale)
+        if stale:
+            logger.info(f"Pattern cache: invalidated {len(stale)} entries")
+        return len(stale)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result (LRU first, then Redis).
+
+        Returns:
+            Deep copy of the cached result with a "_cache" info dict, or None
+        """
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return self._materialize(entry.value, entry.cached_at, "memory")
+            del self._entries[key]
+
+        if self.redis is not None:
+            payload = await self._redis_call("get", self._redis_key(key))
+            if payload:
+                try:
+                    record = loads(payload)
+                    self._store_local(
+                        key,
+                        record["value"],
+                        record["expires_at"],
+                        record["cached_at"],
+                        tuple(record["generation"]),
+                    )
+                    self.stats["redis_hits"] += 1
+                    return self._materialize(record["value"], record["cached_at"], "redis")
+                except (ValueError, KeyError, TypeError) as e:
+                    logger.warning(f"Pattern cache: discarding unreadable Redis entry {key}: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(
+        self, key: str, value: Dict[str, Any], ttl_seconds: int, ctx: RequestCtx
+    ) -> None:
+        """Store a result in both tiers."""
+        now = time.time()
+        generation = (ctx.pricing_pack_id, ctx.ledger_commit_hash)
+        self._store_local(key, copy.deepcopy(value), now + ttl_seconds, now, generation)
+        self.stats["sets"] += 1
+
+        if self.redis is not None:
+            record = {
+                "value": value,
+                "expires_at": now + ttl_seconds,
+                "cached_at": now,
+                "generation": list(generation),
+            }
+            await self._redis_call(
+                "set",
+                self._redis_key(key),
+                dumps(record),
+                ex=int(ttl_seconds),
+            )
+
+    def _store_local(
+        self,
+        key: str,
+        value: Dict[str, Any],
+        expires_at: float,
+        cached_at: float,
+        generation: Tuple[str, str],
+    ) -> None:
+        self._entries[key] = _CacheEntry(value, expires_at, cached_at, generation)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _materialize(value: Dict[str, Any], cached_at: float, tier: str) -> Dict[str, Any]:
+        result = copy.deepcopy(value)
+        result["_cache"] = {
+            "tier": tier,
+            "cached_at": datetime.utcfromtimestamp(cached_at).isoformat(),
+            "age_seconds": round(time.time() - cached_at, 3),
+        }
+        return result
+
+    @staticmethod
+    def _redis_key(key: str) -> str:
+        return f"{REDIS_KEY_PREFIX}:{key}"
+
+    async def _redis_call(self, method: str, *args, **kwargs) -> Any:
+        """Call a Redis method (sync or async client); errors degrade to a miss."""
+        try:
+            result = getattr(self.redis, method)(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        except Exception as e:
+            logger.warning(f"Pattern cache: Redis {method} failed (continuing without): {e}")
+            return None
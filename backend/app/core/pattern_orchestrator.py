@@ -14,20 +14,48 @@
     - Conditional step execution
     - Redis caching for intermediate results
     - Pattern contract validation (Phase 3)
+    - Compiled execution plans (templates/conditions parsed once at load)
+    - Opt-in whole-pattern result cache (LRU + optional Redis)
+    - Streaming execution (per-step events via on_step / stream_pattern)
+    - Batch execution (portfolio-independent steps shared across input sets)
+    - Sampled response-schema / deprecated-field checks, run off the request path
+    - Per-request deadline (RequestCtx.deadline, set by HTTP entrypoints via
+      with_request_deadline) bounding every capability call; scheduled and
+      batch runs without one are not cut short
+    - Opt-in sampled profiling (RequestCtx.profile / PROFILE_SAMPLE_RATE): call tree
+      and per-step cpu/db/await breakdown in the trace, rolling flame graphs
 
 Usage:
     orchestrator = PatternOrchestrator(agent_runtime, db, redis)
     result = await orchestrator.run_pattern("portfolio_overview", ctx, inputs)
 """
 
+import asyncio
 import inspect
 import json
 import logging
+import os
+import random
 import re
+import sys
+import time
+import uuid
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.core.pattern_cache import PatternResultCache
+from app.core.pattern_plan import (
+    CompiledStep,
+    PatternPlan,
+    compile_pattern,
+    shared_step_indexes,
+    varying_inputs,
+)
+from app.core.profiling import PROFILE_SAMPLE_RATE, get_profiler
+from app.core.serialization import summarize
 from app.core.types import RequestCtx
+from app.db.portfolio_version import portfolio_data_version
 
 # Optional import for observability (graceful degradation)
 try:
@@ -55,6 +83,18 @@ def check_deprecated_fields(cls, data: Any, path: str = "root") -> List[str]:
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_CONCURRENCY = 8
+
+# Fraction of fresh results checked against response schemas / deprecated field names
+# (both walk the whole result; 0 disables, 1 checks every result)
+VALIDATION_SAMPLE_RATE = float(os.getenv("PATTERN_VALIDATION_SAMPLE_RATE", "0.01"))
+
+# Whole-request deadline propagated to capabilities via RequestCtx (0 disables)
+PATTERN_DEADLINE_SECONDS = float(os.getenv("PATTERN_DEADLINE_SECONDS", "60"))
+
+# Agent methods that read other steps' results straight from pattern state
+_STATE_READ_RE = re.compile(r"\bstate(?:\.get\(|\[)")
+
 
 # ============================================================================
 # Execution Trace
@@ -231,6 +271,11 @@ def serialize(self) -> Dict[str, Any]:
         return trace_dict
 
 
+def with_request_deadline(ctx: RequestCtx) -> RequestCtx:
+    """Bound an interactive request's pattern run by PATTERN_DEADLINE_SECONDS."""
+    return ctx.with_deadline(PATTERN_DEADLINE_SECONDS) if PATTERN_DEADLINE_SECONDS else ctx
+
+
 # ============================================================================
 # Pattern Orchestrator
 # ============================================================================
@@ -277,7 +322,19 @@ def __init__(self, agent_runtime, db, redis=None):
         self.agent_runtime = agent_runtime
         self.db = db
         self.redis = redis
+        self.result_cache = PatternResultCache(redis=redis)
         self.patterns: Dict[str, Dict[str, Any]] = {}
+        self.plans: Dict[str, PatternPlan] = {}
+        # (pattern_id, capability count) -> static capability validation
+        self._capability_validation_cache: Dict[tuple, Dict[str, Any]] = {}
+        self._validation_logged: set = set()
+        # capability -> True if it implicitly depends on portfolio/pattern state
+        self._portfolio_bound_cache: Dict[str, bool] = {}
+        self.validation_sample_rate = VALIDATION_SAMPLE_RATE
+        self.profile_sample_rate = PROFILE_SAMPLE_RATE
+        # (db, portfolio_id) -> version stamp that moves when trades are recorded
+        self.portfolio_data_version = portfolio_data_version
+        self._validation_tasks: set = set()
         
         self._load_patterns()
 
@@ -331,6 +388,9 @@ def _load_patterns(self):
                 elif validation_result["warnings"]:
                     for warning in validation_result["warnings"]:
                         logger.warning(f"Pattern {pattern_id}: {warning}")
+
+                # Compile once into an immutable execution plan
+                self.plans[pattern_id] = compile_pattern(spec, validation_result)
                 
                 pattern_count += 1
                 logger.debug(f"Loaded pattern: {pattern_id} from {pattern_file}")
@@ -470,7 +530,6 @@ def validate_pattern(
         """
         errors = []
         warnings = []
-        capability_details = {}
         
         # Check if pattern exists
         spec = self.patterns.get(pattern_id)
@@ -494,6 +553,53 @@ def validate_pattern(
                 if input_name not in inputs and "default" not in input_config:
                     errors.append(f"Required input '{input_name}' is missing")
         
+        # Capability checks only depend on the pattern and the registered agents
+        static = self._validate_capabilities(pattern_id, spec)
+        errors.extend(static["errors"])
+        warnings.extend(static["warnings"])
+        capability_details = {
+            capability: {**detail} for capability, detail in static["capabilities"].items()
+        }
+        
+        # Determine overall validity
+        valid = len(errors) == 0
+        
+        return {
+            "valid": valid,
+            "errors": errors,
+            "warnings": warnings,
+            "capabilities": capability_details,
+            "pattern": {
+                "id": pattern_id,
+                "name": spec.get("name", "Unknown"),
+                "description": spec.get("description", ""),
+                "steps": len(spec.get("steps", []))
+            }
+        }
+
+    def _validate_capabilities(self, pattern_id: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Validate step capabilities against registered agents (cached).
+
+        Results only change when agents are registered, so they are cached per
+        pattern and capability-map size.
+
+        Args:
+            pattern_id: Pattern ID
+            spec: Pattern specification
+
+        Returns:
+            Dict with errors, warnings and per-capability details
+        """
+        cache_key = (pattern_id, len(self.agent_runtime.capability_map))
+        cached = self._capability_validation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        errors = []
+        warnings = []
+        capability_details = {}
+
         # Validate each step's capability
         for step_idx, step in enumerate(spec.get("steps", [])):
             capability = step.get("capability")
@@ -545,13 +651,6 @@ def validate_pattern(
                             # Check if step provides required parameters
                             step_args = step.get("args", {})
                             
-                            # Create a mock state to test argument resolution
-                            mock_state = {
-                                "ctx": {"portfolio_id": "test", "pricing_pack_id": "test"},
-                                "inputs": inputs,
-                                "state": {}
-                            }
-                            
                             # Check each required parameter
                             for param_name in required_params:
                                 # Check if parameter is in step args
@@ -640,27 +739,21 @@ def validate_pattern(
             
             capability_details[capability] = capability_detail
         
-        # Determine overall validity
-        valid = len(errors) == 0
-        
-        return {
-            "valid": valid,
+        result = {
             "errors": errors,
             "warnings": warnings,
             "capabilities": capability_details,
-            "pattern": {
-                "id": pattern_id,
-                "name": spec.get("name", "Unknown"),
-                "description": spec.get("description", ""),
-                "steps": len(spec.get("steps", []))
-            }
         }
+        self._capability_validation_cache[cache_key] = result
+        return result
 
     async def run_pattern(
         self,
         pattern_id: str,
         ctx: RequestCtx,
         inputs: Dict[str, Any],
+        on_step: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        shared_results: Optional[Dict[int, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Execute a pattern with given context and inputs.
@@ -669,6 +762,10 @@ async def run_pattern(
             pattern_id: Pattern ID to execute
             ctx: Immutable request context (reproducibility guarantee)
             inputs: User-provided inputs for pattern
+            on_step: Optional async callback invoked with a step event as soon as
+                each step completes or is skipped (used for streaming)
+            shared_results: Precomputed results by step index (batch execution);
+                these steps are not re-executed
 
         Returns:
             Dict with data, charts, and trace:
@@ -683,46 +780,55 @@ async def run_pattern(
             Exception: If capability execution fails
         """
         spec = self.patterns.get(pattern_id)
-        if not spec:
+        plan = self.plans.get(pattern_id)
+        if not spec or not plan:
             raise ValueError(f"Pattern not found: {pattern_id}")
 
         logger.info(f"Executing pattern: {pattern_id}")
-        logger.info(f"Initial inputs: {inputs}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Initial inputs: {summarize(inputs)}")
 
         # Perform pre-flight validation (non-blocking, informative only)
-        validation_result = self.validate_pattern(pattern_id, inputs)
-        if not validation_result["valid"]:
-            logger.warning(f"Pattern '{pattern_id}' validation failed (continuing anyway):")
-            for error in validation_result["errors"]:
-                logger.error(f"  ERROR: {error}")
-            for warning in validation_result["warnings"]:
-                logger.warning(f"  WARNING: {warning}")
-        else:
-            logger.info(f"Pattern '{pattern_id}' passed validation")
-            if validation_result["warnings"]:
-                for warning in validation_result["warnings"]:
-                    logger.warning(f"  WARNING: {warning}")
+        self._log_preflight_validation(pattern_id, plan, inputs)
 
         # Apply defaults from pattern spec
-        inputs = self._apply_pattern_defaults(spec, inputs)
-        logger.info(f"Inputs after applying defaults: {inputs}")
+        inputs = plan.apply_defaults(inputs)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Inputs after applying defaults: {summarize(inputs)}")
 
-        # PHASE 2: Validate pattern dependencies before execution
-        validation_result = self.validate_pattern_dependencies(pattern_id)
-        if not validation_result["valid"]:
-            error_msg = "Pattern dependency validation failed:\n" + "\n".join(validation_result["errors"])
+        # PHASE 2: Dependency validation is computed once at load time
+        if not plan.dependency_validation["valid"]:
+            error_msg = "Pattern dependency validation failed:\n" + "\n".join(
+                plan.dependency_validation["errors"]
+            )
             logger.error(error_msg)
             raise ValueError(error_msg)
-        
-        if validation_result["warnings"]:
-            for warning in validation_result["warnings"]:
-                logger.warning(f"Pattern {pattern_id} validation warning: {warning}")
+
+        # Pattern-level result cache (opt-in via "cache" in pattern JSON)
+        cache_key = None
+        if plan.cache_ttl_seconds:
+            try:
+                data_version = await self._cache_data_version(ctx, inputs)
+            except Exception as e:
+                # A result cached before a trade must not be served: run uncached
+                logger.warning(f"Pattern cache bypassed for {pattern_id}: no data version ({e})")
+            else:
+                self.result_cache.observe_generation(ctx)
+                cache_key = self.result_cache.make_key(pattern_id, ctx, inputs, data_version)
+                cached = await self.result_cache.get(cache_key)
+                if cached is not None:
+                    return self._serve_cached_result(pattern_id, ctx, cached)
+
+        # Sampled profile of this run (requested, or PROFILE_SAMPLE_RATE of runs)
+        profile_session = None
+        profile_data = None
+        if ctx.profile or (self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate):
+            profile_session = get_profiler().start(pattern_id, sys._getframe())
 
         # Get metrics registry for pattern-level tracking
         metrics = get_metrics()
 
         # Start pattern timing
-        import time
         pattern_start_time = time.time()
         pattern_status = "success"
 
@@ -735,20 +841,23 @@ async def run_pattern(
 
         # Execute steps with metrics tracking
         try:
-            for step_idx, step in enumerate(spec["steps"]):
-                capability = step["capability"]
+            for step in plan.steps:
+                step_idx = step.index
+                capability = step.capability
                 logger.debug(f"Step {step_idx}: {capability}")
 
                 # Evaluate condition if present
-                if "condition" in step:
-                    if not self._eval_condition(step["condition"], state):
+                if step.condition is not None:
+                    if not step.condition.evaluate(state):
                         trace.skip_step(capability, "condition_not_met")
                         logger.debug(f"Skipped {capability}: condition not met")
+                        if on_step:
+                            await on_step(self._step_event(plan, step, trace, None))
                         continue
 
                 # Resolve template arguments
                 try:
-                    args = self._resolve_args(step.get("args", {}), state)
+                    args = step.resolve_args(state)
                 except (ValueError, TypeError, KeyError, AttributeError) as e:
                     # Programming errors - should not happen, log and re-raise
                     error_msg = f"Programming error resolving args for {capability}: {e}"
@@ -763,16 +872,21 @@ async def run_pattern(
                     raise ValueError(error_msg)
 
                 # Execute capability
+                if profile_session:
+                    profile_session.begin_step(step_idx, capability)
                 try:
-                    import time
                     start_time = time.time()
 
-                    result = await self.agent_runtime.execute_capability(
-                        capability,
-                        ctx=ctx,
-                        state=state,
-                        **args,
-                    )
+                    shared = shared_results is not None and step_idx in shared_results
+                    if shared:
+                        result = shared_results[step_idx]
+                    else:
+                        result = await self.agent_runtime.execute_capability(
+                            capability,
+                            ctx=ctx,
+                            state=state,
+                            **args,
+                        )
 
                     duration = time.time() - start_time
 
@@ -785,9 +899,8 @@ async def run_pattern(
                         ).observe(duration)
 
                     # Store result in state
-                    result_key = step.get("as", "last")
-                    logger.info(f"📦 Storing result from {capability} in state['{result_key}']")
-                    logger.info(f"Result type: {type(result)}, is None: {result is None}")
+                    result_key = step.result_key
+                    logger.debug(f"📦 Storing result from {capability} in state['{result_key}']")
                     
                     # Phase 1: Remove metadata from results (metadata moved to trace only)
                     # Strip _metadata key from dict results before storing
@@ -801,13 +914,19 @@ async def run_pattern(
                     # This prevents double-nesting issues (result.result.data)
                     state[result_key] = cleaned_result
                     
-                    logger.info(f"State after storing: keys={list(state.keys())}, '{result_key}' is None: {state.get(result_key) is None}")
 
                     trace.add_step(capability, result, args, duration)
+                    if shared:
+                        trace.steps[-1]["shared"] = True
+                    if profile_session:
+                        trace.steps[-1]["time_breakdown"] = profile_session.end_step(duration)
                     logger.debug(
                         f"Completed {capability} in {duration:.3f}s → {result_key}"
                     )
 
+                    if on_step:
+                        await on_step(self._step_event(plan, step, trace, cleaned_result))
+
                 except (ValueError, TypeError, KeyError, AttributeError) as e:
                     # Programming errors - should not happen, log and re-raise
                     error_msg = f"Programming error in capability {capability}: {e}"
@@ -836,6 +955,9 @@ async def run_pattern(
             trace.add_error("pattern_execution", error_msg)
             raise
         finally:
+            if profile_session:
+                profile_data = profile_session.finish()
+
             # Record pattern-level metrics
             pattern_duration = time.time() - pattern_start_time
             if metrics:
@@ -852,7 +974,7 @@ async def run_pattern(
         
         if isinstance(outputs_spec, list):
             # Format 1: List of keys
-            output_keys = outputs_spec
+            output_keys = plan.output_keys
         else:
             # Fallback: empty list (should not happen after migration)
             output_keys = []
@@ -878,7 +1000,10 @@ async def run_pattern(
         # Special handling for charts (common output key)
         charts = state.get("charts", [])
 
-        logger.info(f"Pattern {pattern_id} completed successfully")
+        logger.info(
+            f"Pattern {pattern_id} completed successfully: "
+            f"{len(trace.steps)} steps, outputs {summarize(outputs)}"
+        )
 
         # Get trace with cache stats before cleanup
         trace_data = trace.serialize()
@@ -886,6 +1011,9 @@ async def run_pattern(
         # Cleanup request cache after pattern execution
         self.agent_runtime.clear_request_cache(ctx.request_id)
 
+        if cache_key is not None:
+            trace_data["cache"] = {"served": False}
+
         # Build result
         result = {
             "data": outputs,
@@ -894,20 +1022,65 @@ async def run_pattern(
         }
 
         # Validate response (Phase 2: Pattern System Refactoring)
-        # Non-blocking validation - logs warnings but doesn't fail execution
+        # Sampled and run in a worker thread - never delays the response
+        if self.validation_sample_rate > 0 and random.random() < self.validation_sample_rate:
+            self._schedule_response_validation(pattern_id, outputs, trace_data)
+
+        # Don't pin stub/fallback data for the whole TTL
+        if cache_key is not None and trace_data["data_provenance"]["overall"] not in ("stub", "mixed"):
+            await self.result_cache.set(cache_key, result, plan.cache_ttl_seconds, ctx)
+
+        # Added after caching so a cached result never carries another run's profile
+        if profile_data:
+            result = {**result, "trace": {**trace_data, "profile": profile_data}}
+
+        return result
+
+    async def _cache_data_version(self, ctx: RequestCtx, inputs: Dict[str, Any]) -> Optional[str]:
+        """
+        Portfolio data version for result cache keys (None for portfolio-independent runs).
+
+        ledger_commit_hash does not move when trades are written to Postgres;
+        this does, so cached results are keyed past every recorded trade.
+        """
+        portfolio_id = ctx.portfolio_id or inputs.get("portfolio_id")
+        if not portfolio_id:
+            return None
+        return await self.portfolio_data_version(self.db, portfolio_id)
+
+    def _schedule_response_validation(
+        self, pattern_id: str, outputs: Dict[str, Any], trace_data: Dict[str, Any]
+    ) -> None:
+        """Check a result against its response schema and deprecated field names in the background."""
+        task = asyncio.create_task(
+            asyncio.to_thread(self._validate_response, pattern_id, outputs, trace_data)
+        )
+        self._validation_tasks.add(task)
+        task.add_done_callback(self._validation_tasks.discard)
+
+    @staticmethod
+    def _validate_response(
+        pattern_id: str, outputs: Dict[str, Any], trace_data: Dict[str, Any]
+    ) -> None:
+        """
+        Non-blocking response validation (logs warnings, never fails the pattern).
+
+        Read-only over outputs/trace_data, so it is safe to run while the
+        same result is being serialized for the response.
+        """
         try:
             # Flatten outputs for validation (validator expects flat structure)
             validation_data = {**outputs, "_metadata": {"pattern_id": pattern_id}, "_trace": trace_data}
-            validated = PatternResponseValidator.validate(pattern_id, validation_data)
+            PatternResponseValidator.validate(pattern_id, validation_data)
 
             # Check for deprecated field names
             deprecated_warnings = PatternResponseValidator.check_deprecated_fields(outputs)
             if deprecated_warnings:
                 logger.warning(
-                    f"Pattern {pattern_id} contains deprecated fields:",
-                    extra={"warnings": deprecated_warnings}
+                    f"Pattern {pattern_id} contains {len(deprecated_warnings)} deprecated fields",
+                    extra={"warnings": deprecated_warnings[:20]}
                 )
-                for warning in deprecated_warnings:
+                for warning in deprecated_warnings[:20]:
                     logger.warning(f"  - {warning}")
 
         except (ValueError, TypeError, KeyError, AttributeError) as e:
@@ -917,257 +1090,321 @@ async def run_pattern(
             # Validation errors - log and continue (non-blocking)
             logger.error(f"Pattern validation error (non-blocking): {e}", exc_info=True)
 
-        return result
+    async def stream_pattern(
+        self,
+        pattern_id: str,
+        ctx: RequestCtx,
+        inputs: Dict[str, Any],
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a pattern, yielding events as steps complete.
 
-    def _resolve_args(self, args: Dict[str, Any], state: Dict[str, Any]) -> Dict[str, Any]:
+        Events:
+            {"event": "step", ...}      - one per executed/skipped step (see _step_event)
+            {"event": "complete", "data", "charts", "trace"} - final result
+            {"event": "error", "pattern_id", "error"} - execution failed
+
+        Cache-served results produce only the "complete" event. Closing the
+        iterator early cancels the running pattern.
         """
-        Resolve template arguments.
+        queue: asyncio.Queue = asyncio.Queue()
 
-        Templates:
-            {{foo}} - Access state variable (from previous step's "as" key)
-            {{ctx.pricing_pack_id}} - Access context field
-            {{inputs.symbol}} - Access user input
+        async def on_step(event: Dict[str, Any]) -> None:
+            await queue.put(event)
+
+        async def run() -> None:
+            try:
+                result = await self.run_pattern(pattern_id, ctx, inputs, on_step=on_step)
+                await queue.put({"event": "complete", **result})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                await queue.put({
+                    "event": "error",
+                    "pattern_id": pattern_id,
+                    "error": str(e),
+                })
+            finally:
+                await queue.put(None)
+
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            if not task.done():
+                task.cancel()
+
+    async def run_pattern_batch(
+        self,
+        pattern_id: str,
+        ctx: RequestCtx,
+        input_sets: List[Dict[str, Any]],
+        max_concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute one pattern for many input sets, yielding per-item results.
+
+        Steps whose result cannot differ between items (no varying input,
+        no ctx.portfolio_id, no portfolio-bound capability; see
+        shared_step_indexes) run once up front and are reused by every item.
+        Remaining work fans out with at most max_concurrency items in flight.
 
         Args:
-            args: Raw arguments with templates
-            state: Current execution state
+            pattern_id: Pattern ID to execute
+            ctx: Base request context (pack, ledger, user); each item gets a copy
+                with its own request_id/trace_id and portfolio_id from its inputs.
+                Any request deadline is dropped: a batch is not one interactive run
+            input_sets: Inputs for each item
+            max_concurrency: Maximum concurrently running items
+
+        Events:
+            {"event": "shared", "steps": [...], "duration_ms"}
+            {"event": "item", "index", "inputs", "data", "charts", "trace"}
+            {"event": "item_error", "index", "inputs", "error"}
+            {"event": "complete", "total", "succeeded", "failed", "duration_ms"}
 
-        Returns:
-            Resolved arguments dict
-            
         Raises:
-            ValueError: If required template variable (e.g., ctx.pricing_pack_id) resolves to None
-
-        Example:
-            args = {"positions": "{{positions.positions}}", "pack_id": "{{ctx.pricing_pack_id}}"}
-            state = {"positions": {...}, "ctx": {"pricing_pack_id": "20241020_v1"}}
-            → {"positions": {...}, "pack_id": "20241020_v1"}
+            ValueError: If pattern not found
         """
-        resolved = {}
-        for key, value in args.items():
-            resolved_value = self._resolve_value(value, state)
-            
-            # Validate required template variables (especially ctx.pricing_pack_id)
-            if resolved_value is None and isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
-                template_path = value[2:-2].strip()
-                
-                # Check if this is a required context variable
-                if template_path.startswith("ctx."):
-                    # Required context variables that cannot be None
-                    required_ctx_vars = ["ctx.pricing_pack_id", "ctx.ledger_commit_hash"]
-                    if template_path in required_ctx_vars:
-                        raise ValueError(
-                            f"Required template variable '{template_path}' resolved to None. "
-                            f"Context: pricing_pack_id={state.get('ctx', {}).get('pricing_pack_id')}, "
-                            f"ledger_commit_hash={state.get('ctx', {}).get('ledger_commit_hash')}. "
-                            f"Must be set in request context before pattern execution."
-                        )
-            
-            resolved[key] = resolved_value
-        return resolved
+        plan = self.plans.get(pattern_id)
+        if not plan:
+            raise ValueError(f"Pattern not found: {pattern_id}")
+
+        batch_start = time.time()
+        ctx = replace(ctx, deadline=None)
+        resolved_sets = [plan.apply_defaults(inputs) for inputs in input_sets]
+        shared_results = await self._run_shared_steps(plan, ctx, resolved_sets)
+        yield {
+            "event": "shared",
+            "pattern_id": pattern_id,
+            "steps": [
+                {"step_index": step.index, "capability": step.capability, "as": step.result_key}
+                for step in plan.steps if step.index in shared_results
+            ],
+            "duration_ms": round((time.time() - batch_start) * 1000, 2),
+        }
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_item(index: int, inputs: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                item_ctx = replace(
+                    ctx,
+                    portfolio_id=inputs.get("portfolio_id", ctx.portfolio_id),
+                    request_id=str(uuid.uuid4()),
+                    trace_id=str(uuid.uuid4()),
+                )
+                try:
+                    result = await self.run_pattern(
+                        pattern_id, item_ctx, inputs, shared_results=shared_results
+                    )
+                    return {"event": "item", "index": index, "inputs": inputs, **result}
+                except Exception as e:
+                    logger.warning(f"Batch item {index} of {pattern_id} failed: {e}")
+                    return {"event": "item_error", "index": index, "inputs": inputs, "error": str(e)}
 
-    def _resolve_value(self, value: Any, state: Dict[str, Any]) -> Any:
+        tasks = [
+            asyncio.create_task(run_item(index, inputs))
+            for index, inputs in enumerate(input_sets)
+        ]
+        failed = 0
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                event = await next_done
+                failed += event["event"] == "item_error"
+                yield event
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        duration_ms = round((time.time() - batch_start) * 1000, 2)
+        logger.info(
+            f"Batch {pattern_id}: {len(tasks)} items, {failed} failed, "
+            f"{len(shared_results)} shared steps, {duration_ms}ms"
+        )
+        yield {
+            "event": "complete",
+            "pattern_id": pattern_id,
+            "total": len(tasks),
+            "succeeded": len(tasks) - failed,
+            "failed": failed,
+            "duration_ms": duration_ms,
+        }
+
+    async def _run_shared_steps(
+        self,
+        plan: PatternPlan,
+        ctx: RequestCtx,
+        input_sets: List[Dict[str, Any]],
+    ) -> Dict[int, Any]:
         """
-        Recursively resolve a single value (supports nested dicts/lists).
+        Execute batch-invariant steps once.
 
-        Args:
-            value: Value to resolve (supports template variables {{...}})
-            state: Current execution state
+        Steps that fail or whose condition is false are left out so each item
+        executes (or skips) them itself with normal error handling; so are
+        shared steps that read a failed step's result (directly or through
+        another dropped step), since they would run against missing state.
 
         Returns:
-            Resolved value
+            Raw capability results keyed by step index
         """
-        # Handle string templates
-        if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
-            # Extract path: {{positions}} → ["positions"] or {{positions.positions}} → ["positions", "positions"]
-            path = value[2:-2].strip().split(".")
-            result = state
-            for part in path:
-                if isinstance(result, dict):
-                    result = result.get(part)
-                elif hasattr(result, part):
-                    result = getattr(result, part)
-                else:
-                    raise ValueError(
-                        f"Cannot resolve template path {value}: {part} not found"
-                    )
-                # Allow None for optional parameters
-                # Don't raise ValueError if result is None - just return None
-                # This allows optional fields like custom_shocks to be None
-            return result
+        if len(input_sets) < 2:
+            return {}
 
-        # Handle nested dicts
-        elif isinstance(value, dict):
-            return {k: self._resolve_value(v, state) for k, v in value.items()}
+        varying = varying_inputs(input_sets)
+        shared_indexes = shared_step_indexes(plan, varying, self._is_portfolio_bound)
+        if not shared_indexes:
+            return {}
 
-        # Handle lists
-        elif isinstance(value, list):
-            return [self._resolve_value(item, state) for item in value]
+        shared_ctx = replace(ctx, portfolio_id=None, request_id=str(uuid.uuid4()))
+        state = {
+            "ctx": shared_ctx.to_dict(),
+            "inputs": {k: v for k, v in input_sets[0].items() if k not in varying},
+        }
+        results: Dict[int, Any] = {}
+        # Result keys of failed / dropped shared steps (items compute them)
+        unavailable: set = set()
+        try:
+            for step in plan.steps:
+                if step.index not in shared_indexes:
+                    continue
+                if step.depends_on & unavailable:
+                    unavailable.add(step.result_key)
+                    continue
+                if step.condition is not None and not step.condition.evaluate(state):
+                    continue
+                try:
+                    result = await self.agent_runtime.execute_capability(
+                        step.capability,
+                        ctx=shared_ctx,
+                        state=state,
+                        **step.resolve_args(state),
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Shared step {step.capability} failed; items will run it individually: {e}"
+                    )
+                    unavailable.add(step.result_key)
+                    continue
+                unavailable.discard(step.result_key)
+                results[step.index] = result
+                state[step.result_key] = (
+                    {k: v for k, v in result.items() if k != "_metadata"}
+                    if isinstance(result, dict) else result
+                )
+        finally:
+            clear_cache = getattr(self.agent_runtime, "clear_request_cache", None)
+            if clear_cache:
+                clear_cache(shared_ctx.request_id)
+        return results
 
-        # Return primitive values as-is
-        else:
-            return value
+    def _is_portfolio_bound(self, step: CompiledStep) -> bool:
+        """
+        Whether a capability may depend on the portfolio implicitly.
 
-    def _eval_condition(self, condition: str, state: Dict[str, Any]) -> bool:
+        True when the agent method takes portfolio_id (falling back to
+        ctx.portfolio_id) and the step does not pass it, when the method reads
+        other results straight from pattern state, or when the method cannot
+        be resolved (unknown → not shareable).
         """
-        Safely evaluate simple boolean conditions without using eval().
+        passes_portfolio = any(arg.name == "portfolio_id" for arg in step.args)
+        cache_key = f"{step.capability}:{passes_portfolio}"
+        cached = self._portfolio_bound_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        bound = True
+        agent_name = getattr(self.agent_runtime, "capability_map", {}).get(step.capability)
+        agent = getattr(self.agent_runtime, "agents", {}).get(agent_name)
+        method = getattr(agent, (step.capability or "").replace(".", "_"), None)
+        if method is not None:
+            try:
+                takes_portfolio = "portfolio_id" in inspect.signature(method).parameters
+                reads_state = bool(_STATE_READ_RE.search(inspect.getsource(method)))
+                bound = (takes_portfolio and not passes_portfolio) or reads_state
+            except (OSError, TypeError, ValueError):
+                bound = True
+
+        self._portfolio_bound_cache[cache_key] = bound
+        return bound
+
+    @staticmethod
+    def _step_event(plan: PatternPlan, step, trace: Trace, output: Any) -> Dict[str, Any]:
+        """Build a streaming event for a completed (or skipped) step."""
+        return {
+            "event": "step",
+            "pattern_id": plan.pattern_id,
+            "step_index": step.index,
+            "step_count": len(plan.steps),
+            "capability": step.capability,
+            "as": step.result_key,
+            "is_output": step.result_key in plan.output_keys,
+            "output": output,
+            "trace": trace.steps[-1],
+        }
 
-        Supported conditions:
-            - "positions.length > 0" (where positions is a step result key)
-            - "inputs.include_charts == true"
-            - "ctx.portfolio_id != null"
-            - "value >= 100"
-            - "status == 'active' and count > 0"
+    def _serve_cached_result(
+        self, pattern_id: str, ctx: RequestCtx, cached: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Return a cached pattern result re-stamped for the current request.
 
         Args:
-            condition: Condition string
-            state: Current execution state
+            pattern_id: Pattern ID
+            ctx: Current request context
+            cached: Result from PatternResultCache.get (includes "_cache" info)
 
         Returns:
-            True if condition met, False otherwise
+            Result dict with trace marked as cache-served
         """
-        try:
-            # First handle template variables {{...}}
-            safe_condition = self._resolve_template_vars(condition, state)
-            
-            # Now evaluate the resolved condition safely
-            return self._safe_evaluate(safe_condition, state)
-            
-        except (ValueError, TypeError, KeyError, AttributeError) as e:
-            # Programming errors - should not happen, log and return False
-            logger.warning(f"Programming error evaluating condition '{condition}': {e}")
-            return False
-        except Exception as e:
-            # Condition evaluation errors - log and return False
-            logger.warning(f"Failed to evaluate condition '{condition}': {e}")
-            return False
-    
-    def _safe_evaluate(self, condition: str, state: Dict[str, Any]) -> bool:
+        cache_info = cached.pop("_cache", {})
+        trace_data = cached.get("trace", {})
+        trace_data["trace_id"] = ctx.trace_id
+        trace_data["request_id"] = ctx.request_id
+        trace_data["cache"] = {"served": True, **cache_info}
+
+        metrics = get_metrics()
+        if metrics:
+            metrics.record_pattern_execution(pattern_id, "cached")
+
+        logger.info(
+            f"Pattern {pattern_id} served from {cache_info.get('tier', 'cache')} "
+            f"(age {cache_info.get('age_seconds', 0)}s)"
+        )
+        return cached
+
+    def _log_preflight_validation(
+        self, pattern_id: str, plan: PatternPlan, inputs: Dict[str, Any]
+    ) -> None:
         """
-        Safely evaluate boolean conditions without using eval().
-        
-        Supports operators: ==, !=, <, >, <=, >=, and, or, not, is, in
-        Supports literals: true, false, null, numeric values, quoted strings
-        Supports path access: positions.length, inputs.portfolio_id, ctx.asof_date
-        
-        Args:
-            condition: Condition string to evaluate
-            state: Current execution state containing step results and context
-            
-        Returns:
-            True if condition evaluates to true, False otherwise
-            
-        Example:
-            >>> state = {"positions": [1, 2, 3], "inputs": {"include_charts": True}}
-            >>> _safe_evaluate("positions.length > 0", state)
-            True
-            >>> _safe_evaluate("inputs.include_charts == true", state)
-            True
+        Log pre-flight validation without re-validating on every request.
+
+        Capability errors/warnings are logged once per pattern; missing
+        required inputs are request-specific and logged every time.
         """
-        import operator
-        from ast import literal_eval
-        
-        # Handle simple boolean keywords
-        condition = condition.strip()
-        if condition.lower() == 'true':
-            return True
-        if condition.lower() == 'false':
-            return False
-        
-        # Handle 'and' and 'or' operators
-        if ' and ' in condition:
-            parts = condition.split(' and ')
-            return all(self._safe_evaluate(part.strip(), state) for part in parts)
-        
-        if ' or ' in condition:
-            parts = condition.split(' or ')
-            return any(self._safe_evaluate(part.strip(), state) for part in parts)
-        
-        # Handle 'not' operator
-        if condition.startswith('not '):
-            return not self._safe_evaluate(condition[4:].strip(), state)
-        
-        # Handle comparison operators
-        ops = {
-            '==': operator.eq,
-            '!=': operator.ne,
-            '<=': operator.le,
-            '>=': operator.ge,
-            '<': operator.lt,
-            '>': operator.gt,
-            ' is ': operator.is_,
-            ' in ': lambda x, y: x in y
-        }
-        
-        for op_str, op_func in ops.items():
-            if op_str in condition:
-                parts = condition.split(op_str, 1)
-                if len(parts) == 2:
-                    left = parts[0].strip()
-                    right = parts[1].strip()
-                    
-                    # Get values
-                    left_val = self._get_value(left, state)
-                    right_val = self._get_value(right, state)
-                    
-                    # Special handling for null/None comparisons
-                    if right_val == 'null' or right_val == 'None':
-                        right_val = None
-                    
-                    try:
-                        return op_func(left_val, right_val)
-                    except:
-                        return False
-        
-        # If no operator found, try to evaluate as a simple path
-        val = self._get_value(condition, state)
-        return bool(val)
-    
-    def _get_value(self, expr: str, state: Dict[str, Any]) -> Any:
-        """Get value from expression, handling paths and literals."""
-        expr = expr.strip()
-        
-        # Handle string literals
-        if (expr.startswith('"') and expr.endswith('"')) or \
-           (expr.startswith("'") and expr.endswith("'")):
-            return expr[1:-1]
-        
-        # Handle numeric literals
-        try:
-            if '.' in expr:
-                return float(expr)
-            return int(expr)
-        except ValueError:
-            pass
-        
-        # Handle boolean literals
-        if expr.lower() == 'true':
-            return True
-        if expr.lower() == 'false':
-            return False
-        if expr.lower() in ('null', 'none'):
-            return None
-        
-        # Handle paths like "positions.length" or "inputs.portfolio_id"
-        if '.' in expr:
-            parts = expr.split('.')
-            obj = state
-            for part in parts:
-                # Handle list length
-                if part == 'length' and isinstance(obj, list):
-                    return len(obj)
-                # Handle dictionary access
-                elif isinstance(obj, dict):
-                    obj = obj.get(part)
-                    if obj is None:
-                        return None
-                else:
-                    return None
-            return obj
-        
-        # Simple key lookup
-        return state.get(expr)
-    
+        missing = plan.missing_inputs(inputs)
+        for input_name in missing:
+            logger.error(f"Pattern '{pattern_id}': required input '{input_name}' is missing")
+
+        if pattern_id in self._validation_logged:
+            return
+        self._validation_logged.add(pattern_id)
+
+        static = self._validate_capabilities(pattern_id, self.patterns[pattern_id])
+        if static["errors"]:
+            logger.warning(f"Pattern '{pattern_id}' validation failed (continuing anyway):")
+            for error in static["errors"]:
+                logger.error(f"  ERROR: {error}")
+        else:
+            logger.info(f"Pattern '{pattern_id}' passed validation")
+        for warning in static["warnings"]:
+            logger.warning(f"  WARNING: {warning}")
+
     def _extract_template_references(self, text: str) -> List[str]:
         """
         Extract template references from text.
@@ -1282,50 +1519,6 @@ def validate_pattern_dependencies(self, pattern_id: str) -> Dict[str, Any]:
             "errors": errors,
             "warnings": warnings
         }
-    
-    def _resolve_template_vars(self, text: str, state: Dict[str, Any]) -> str:
-        """
-        Replace template variables {{var}} with actual values from execution state.
-        
-        Supports template syntax: {{path.to.value}}
-        - Paths can reference step results: {{positions.positions}}
-        - Paths can reference context: {{ctx.portfolio_id}}
-        - Paths can reference inputs: {{inputs.asof_date}}
-        - Paths can reference nested structures: {{valued_positions.positions[0].symbol}}
-        
-        Args:
-            text: Text containing template variables in {{...}} format
-            state: Current execution state containing step results, context, and inputs
-            
-        Returns:
-            Text with template variables replaced by their actual values
-            
-        Example:
-            >>> state = {
-            ...     "positions": {"positions": [{"symbol": "AAPL"}]},
-            ...     "ctx": {"portfolio_id": "abc-123"},
-            ...     "inputs": {"asof_date": "2025-01-01"}
-            ... }
-            >>> _resolve_template_vars("Portfolio {{ctx.portfolio_id}} on {{inputs.asof_date}}", state)
-            'Portfolio abc-123 on 2025-01-01'
-        """
-        import re
-        
-        def replace_template(match):
-            var_path = match.group(1)
-            val = self._get_value(var_path, state)
-            # Return the value as a string representation
-            if val is None:
-                return 'null'
-            elif isinstance(val, bool):
-                return 'true' if val else 'false'
-            elif isinstance(val, str):
-                return f'"{val}"'
-            else:
-                return str(val)
-        
-        # Replace {{path.to.value}} with resolved values
-        return re.sub(r'\{\{([\w.]+)\}\}', replace_template, text)
 
 
 # ============================================================================
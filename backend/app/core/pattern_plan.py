@@ -0,0 +1,501 @@
+"""
+Compiled Pattern Execution Plans
+
+Purpose: Compile JSON pattern specs once into immutable execution plans
+Created: 2025-11-10
+Priority: P1 (Per-request orchestration overhead)
+
+Features:
+    - Template arguments ({{positions.positions}}) pre-split into accessor tuples
+    - Step conditions parsed once into a small expression tree
+    - Per-step dependency edges (state keys each step reads)
+    - Frozen dataclasses so plans can be shared across concurrent requests
+    - Result-cache policy ("cache": {"enabled": true, "ttl_seconds": N})
+    - Batch sharing analysis (steps whose results are identical across input sets)
+
+Semantics follow the original interpretive pattern templates. Conditions
+are split on the authored text rather than after template substitution, so
+substituted values containing operator keywords do not change the expression
+shape.
+
+Usage:
+    plan = compile_pattern(spec)
+    for step in plan.steps:
+        if step.condition and not step.condition.evaluate(state):
+            continue
+        args = step.resolve_args(state)
+"""
+
+import logging
+import operator
+import re
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Context variables that must never resolve to None when used as step args
+REQUIRED_CTX_VARS = frozenset({"ctx.pricing_pack_id", "ctx.ledger_commit_hash"})
+
+# A condition operand that is a single {{path}} template
+_CONDITION_TEMPLATE_RE = re.compile(r"^\{\{([\w.]+)\}\}$")
+
+# Context fields that differ between items of a batch run
+PER_ITEM_CTX_FIELDS = frozenset({"portfolio_id", "trace_id", "request_id"})
+
+# Bare words in conditions that are operators/literals, not state paths
+_CONDITION_KEYWORDS = frozenset({"and", "or", "not", "is", "in", "true", "false", "null", "none"})
+
+# Comparison operators in the order they are tried when splitting
+_COMPARISON_OPS: Tuple[Tuple[str, Callable[[Any, Any], bool]], ...] = (
+    ("==", operator.eq),
+    ("!=", operator.ne),
+    ("<=", operator.le),
+    (">=", operator.ge),
+    ("<", operator.lt),
+    (">", operator.gt),
+    (" is ", operator.is_),
+    (" in ", lambda x, y: x in y),
+)
+
+
+# ============================================================================
+# Template Values
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class TemplateAccessor:
+    """Pre-split {{a.b.c}} reference."""
+    template: str
+    path: Tuple[str, ...]
+
+    def resolve(self, state: Dict[str, Any]) -> Any:
+        result = state
+        for part in self.path:
+            if isinstance(result, dict):
+                result = result.get(part)
+            elif hasattr(result, part):
+                result = getattr(result, part)
+            else:
+                raise ValueError(
+                    f"Cannot resolve template path {self.template}: {part} not found"
+                )
+        return result
+
+
+@dataclass(frozen=True)
+class ConstantValue:
+    """Primitive literal (returned as-is)."""
+    value: Any
+
+    def resolve(self, state: Dict[str, Any]) -> Any:
+        return self.value
+
+
+@dataclass(frozen=True)
+class DictValue:
+    """Dict literal whose values may contain templates (rebuilt per call)."""
+    items: Tuple[Tuple[Any, Any], ...]
+
+    def resolve(self, state: Dict[str, Any]) -> Dict[Any, Any]:
+        return {k: v.resolve(state) for k, v in self.items}
+
+
+@dataclass(frozen=True)
+class ListValue:
+    """List literal whose items may contain templates (rebuilt per call)."""
+    items: Tuple[Any, ...]
+
+    def resolve(self, state: Dict[str, Any]) -> list:
+        return [item.resolve(state) for item in self.items]
+
+
+def compile_value(value: Any):
+    """Compile a raw step arg value into a resolver."""
+    if isinstance(value, str) and value.startswith("{{") and value.endswith("}}"):
+        return TemplateAccessor(value, tuple(value[2:-2].strip().split(".")))
+    if isinstance(value, dict):
+        return DictValue(tuple((k, compile_value(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return ListValue(tuple(compile_value(item) for item in value))
+    return ConstantValue(value)
+
+
+def _value_references(resolver) -> FrozenSet[str]:
+    """Full dotted state paths a compiled value reads."""
+    if isinstance(resolver, TemplateAccessor):
+        return frozenset({".".join(resolver.path)})
+    if isinstance(resolver, DictValue):
+        return frozenset().union(*(_value_references(v) for _, v in resolver.items))
+    if isinstance(resolver, ListValue):
+        return frozenset().union(*(_value_references(v) for v in resolver.items))
+    return frozenset()
+
+
+def _value_roots(resolver) -> FrozenSet[str]:
+    """State keys a compiled value reads."""
+    if isinstance(resolver, TemplateAccessor):
+        return frozenset(resolver.path[:1])
+    if isinstance(resolver, DictValue):
+        return frozenset().union(*(_value_roots(v) for _, v in resolver.items))
+    if isinstance(resolver, ListValue):
+        return frozenset().union(*(_value_roots(v) for v in resolver.items))
+    return frozenset()
+
+
+# ============================================================================
+# Conditions
+# ============================================================================
+
+
+def lookup_path(expr: str, state: Dict[str, Any]) -> Any:
+    """Dotted path lookup into state with `.length` support for lists."""
+    if "." in expr:
+        obj = state
+        for part in expr.split("."):
+            if part == "length" and isinstance(obj, list):
+                return len(obj)
+            elif isinstance(obj, dict):
+                obj = obj.get(part)
+                if obj is None:
+                    return None
+            else:
+                return None
+        return obj
+    return state.get(expr)
+
+
+def compile_operand(expr: str) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Compile a condition operand: literal, {{template}} or state path.
+
+    Template operands keep the render-then-parse behavior of the original
+    interpreter: None/bool/str/int come back unchanged, anything else is
+    rendered with str() and parsed as an operand.
+    """
+    expr = expr.strip()
+
+    template = _CONDITION_TEMPLATE_RE.match(expr)
+    if template:
+        path = template.group(1)
+
+        def template_operand(state: Dict[str, Any]) -> Any:
+            val = lookup_path(path, state)
+            if val is None or isinstance(val, (bool, str, int)):
+                return val
+            return compile_operand(str(val))(state)
+
+        return template_operand
+
+    # String literals
+    if (expr.startswith('"') and expr.endswith('"')) or \
+       (expr.startswith("'") and expr.endswith("'")):
+        literal = expr[1:-1]
+        return lambda state: literal
+
+    # Numeric literals
+    try:
+        number = float(expr) if "." in expr else int(expr)
+        return lambda state: number
+    except ValueError:
+        pass
+
+    # Boolean / null literals
+    lowered = expr.lower()
+    if lowered == "true":
+        return lambda state: True
+    if lowered == "false":
+        return lambda state: False
+    if lowered in ("null", "none"):
+        return lambda state: None
+
+    return lambda state: lookup_path(expr, state)
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """Parsed step condition."""
+    source: str
+    evaluate_fn: Callable[[Dict[str, Any]], bool]
+
+    def evaluate(self, state: Dict[str, Any]) -> bool:
+        """Evaluate against state; errors evaluate to False (never raises)."""
+        try:
+            return bool(self.evaluate_fn(state))
+        except Exception as e:
+            logger.warning(f"Failed to evaluate condition '{self.source}': {e}")
+            return False
+
+
+def _compile_expression(condition: str) -> Callable[[Dict[str, Any]], bool]:
+    condition = condition.strip()
+
+    # Handle simple boolean keywords
+    if condition.lower() == "true":
+        return lambda state: True
+    if condition.lower() == "false":
+        return lambda state: False
+
+    if " and " in condition:
+        parts = tuple(_compile_expression(p) for p in condition.split(" and "))
+        return lambda state: all(p(state) for p in parts)
+
+    if " or " in condition:
+        parts = tuple(_compile_expression(p) for p in condition.split(" or "))
+        return lambda state: any(p(state) for p in parts)
+
+    if condition.startswith("not "):
+        inner = _compile_expression(condition[4:])
+        return lambda state: not inner(state)
+
+    for op_str, op_func in _COMPARISON_OPS:
+        if op_str in condition:
+            left_src, right_src = condition.split(op_str, 1)
+            left = compile_operand(left_src)
+            right = compile_operand(right_src)
+
+            def compare(state, left=left, right=right, op_func=op_func):
+                left_val = left(state)
+                right_val = right(state)
+                # Special handling for null/None comparisons
+                if right_val == "null" or right_val == "None":
+                    right_val = None
+                try:
+                    return op_func(left_val, right_val)
+                except Exception:
+                    return False
+
+            return compare
+
+    operand = compile_operand(condition)
+    return lambda state: bool(operand(state))
+
+
+def compile_condition(condition: str) -> CompiledCondition:
+    """Parse a condition string once into an evaluable expression tree."""
+    return CompiledCondition(condition, _compile_expression(condition))
+
+
+def _condition_references(condition: str) -> FrozenSet[str]:
+    """Dotted state paths a condition reads (templates and bare paths)."""
+    refs = {ref.strip() for ref in re.findall(r"\{\{([^}]+)\}\}", condition)}
+    bare = re.sub(r"\{\{[^}]+\}\}|'[^']*'|\"[^\"]*\"", " ", condition)
+    for token in re.findall(r"[A-Za-z_][\w.]*", bare):
+        if token.lower() not in _CONDITION_KEYWORDS:
+            refs.add(token[:-len(".length")] if token.endswith(".length") else token)
+    return frozenset(refs)
+
+
+def _condition_roots(condition: str) -> FrozenSet[str]:
+    return frozenset(
+        ref.strip().split(".")[0] for ref in re.findall(r"\{\{([^}]+)\}\}", condition)
+    )
+
+
+# ============================================================================
+# Plans
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class CompiledArg:
+    """Step argument with its resolver and required-ctx guard."""
+    name: str
+    resolver: Any
+    required_ctx_path: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """Single pattern step with precompiled args and condition."""
+    index: int
+    capability: str
+    result_key: str
+    args: Tuple[CompiledArg, ...]
+    condition: Optional[CompiledCondition]
+    depends_on: FrozenSet[str]
+    references: FrozenSet[str] = frozenset()  # Full dotted paths (args + condition)
+
+    def resolve_args(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Resolve step args against state (templates replaced by their values).
+
+        Raises:
+            ValueError: If a required ctx variable resolves to None
+        """
+        resolved = {}
+        for arg in self.args:
+            value = arg.resolver.resolve(state)
+            if value is None and arg.required_ctx_path:
+                ctx = state.get("ctx", {})
+                raise ValueError(
+                    f"Required template variable '{arg.required_ctx_path}' resolved to None. "
+                    f"Context: pricing_pack_id={ctx.get('pricing_pack_id')}, "
+                    f"ledger_commit_hash={ctx.get('ledger_commit_hash')}. "
+                    f"Must be set in request context before pattern execution."
+                )
+            resolved[arg.name] = value
+        return resolved
+
+
+@dataclass(frozen=True)
+class PatternPlan:
+    """Immutable execution plan for one pattern."""
+    pattern_id: str
+    steps: Tuple[CompiledStep, ...]
+    output_keys: Tuple[str, ...]
+    input_defaults: Mapping[str, Any]
+    required_inputs: FrozenSet[str]
+    dependency_validation: Mapping[str, Any]
+    cache_ttl_seconds: Optional[int] = None  # None = results not cacheable
+
+    def apply_defaults(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge pattern defaults into user inputs (user values win)."""
+        merged = dict(inputs)
+        for name, default in self.input_defaults.items():
+            merged.setdefault(name, default)
+        return merged
+
+    def missing_inputs(self, inputs: Dict[str, Any]) -> Tuple[str, ...]:
+        """Required inputs (without defaults) absent from inputs."""
+        return tuple(name for name in sorted(self.required_inputs) if name not in inputs)
+
+
+def _compile_step(index: int, step: Dict[str, Any]) -> CompiledStep:
+    args = []
+    depends_on = set()
+    references = set()
+    for name, raw in step.get("args", {}).items():
+        resolver = compile_value(raw)
+        required_ctx_path = None
+        if isinstance(resolver, TemplateAccessor):
+            template_path = raw[2:-2].strip()
+            if template_path in REQUIRED_CTX_VARS:
+                required_ctx_path = template_path
+        args.append(CompiledArg(name, resolver, required_ctx_path))
+        depends_on |= _value_roots(resolver)
+        references |= _value_references(resolver)
+
+    condition = None
+    if "condition" in step:
+        condition = compile_condition(step["condition"])
+        depends_on |= _condition_roots(step["condition"])
+        references |= _condition_references(step["condition"])
+
+    return CompiledStep(
+        index=index,
+        capability=step.get("capability"),
+        result_key=step.get("as", "last"),
+        args=tuple(args),
+        condition=condition,
+        depends_on=frozenset(depends_on),
+        references=frozenset(references),
+    )
+
+
+def compile_pattern(
+    spec: Dict[str, Any],
+    dependency_validation: Optional[Dict[str, Any]] = None,
+) -> PatternPlan:
+    """
+    Compile a pattern spec into a PatternPlan.
+
+    Args:
+        spec: Pattern JSON spec
+        dependency_validation: Result of validate_pattern_dependencies (cached on the plan)
+
+    Returns:
+        PatternPlan
+    """
+    inputs_spec = spec.get("inputs", {})
+    outputs_spec = spec.get("outputs", [])
+    cache_spec = spec.get("cache") or {}
+
+    return PatternPlan(
+        pattern_id=spec["id"],
+        steps=tuple(_compile_step(i, step) for i, step in enumerate(spec["steps"])),
+        output_keys=tuple(outputs_spec) if isinstance(outputs_spec, list) else (),
+        input_defaults=MappingProxyType({
+            name: config["default"]
+            for name, config in inputs_spec.items()
+            if "default" in config
+        }),
+        required_inputs=frozenset(
+            name for name, config in inputs_spec.items()
+            if config.get("required", False) and "default" not in config
+        ),
+        dependency_validation=MappingProxyType(
+            dependency_validation or {"valid": True, "errors": [], "warnings": []}
+        ),
+        cache_ttl_seconds=(
+            int(cache_spec.get("ttl_seconds", 300)) if cache_spec.get("enabled") else None
+        ),
+    )
+
+
+# ============================================================================
+# Batch Sharing
+# ============================================================================
+
+
+def varying_inputs(input_sets: Iterable[Dict[str, Any]]) -> FrozenSet[str]:
+    """Input names whose value differs (or is missing) somewhere in the batch."""
+    input_sets = list(input_sets)
+    names = set().union(*(inputs.keys() for inputs in input_sets)) if input_sets else set()
+    return frozenset(
+        name for name in names
+        if any(name not in inputs or inputs[name] != input_sets[0].get(name) for inputs in input_sets)
+    )
+
+
+def shared_step_indexes(
+    plan: PatternPlan,
+    varying: FrozenSet[str],
+    is_portfolio_bound: Callable[[CompiledStep], bool],
+) -> FrozenSet[int]:
+    """
+    Steps whose result is identical for every item of a batch.
+
+    A step is shared when none of its args/condition reference a varying
+    input, a per-item ctx field, or the result of a non-shared step, and
+    is_portfolio_bound(step) is False (capabilities that fall back to
+    ctx.portfolio_id when no portfolio_id arg is passed).
+
+    Args:
+        plan: Compiled pattern plan
+        varying: Input names that differ across the batch (see varying_inputs)
+        is_portfolio_bound: Predicate for capabilities with implicit portfolio scope
+
+    Returns:
+        Step indexes that can be executed once for the whole batch
+    """
+    shared_keys = set()
+    shared = set()
+    for step in plan.steps:
+        if _references_are_shared(step.references, varying, shared_keys) and \
+                not is_portfolio_bound(step):
+            shared.add(step.index)
+            shared_keys.add(step.result_key)
+        else:
+            # A later step reusing this key must not read a stale shared value
+            shared_keys.discard(step.result_key)
+    return frozenset(shared)
+
+
+def _references_are_shared(
+    references: FrozenSet[str], varying: FrozenSet[str], shared_keys: set
+) -> bool:
+    for ref in references:
+        parts = ref.split(".")
+        root = parts[0]
+        if root == "inputs":
+            if len(parts) < 2 or parts[1] in varying:
+                return False
+        elif root == "ctx":
+            if len(parts) < 2 or parts[1] in PER_ITEM_CTX_FIELDS:
+                return False
+        elif root not in shared_keys:
+            return False
+    return True
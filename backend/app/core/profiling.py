@@ -0,0 +1,461 @@
+"""
+Pattern Profiling
+
+Purpose: Opt-in sampled profiling of pattern runs, per-step time breakdown and rolling flame graphs
+Created: 2025-11-10
+Priority: P2 (Finding hot paths in production without a profiler deploy)
+
+How it works:
+    - A background thread reads the event-loop thread's stack every
+      PROFILE_INTERVAL_MS (sys._current_frames; no tracing hooks, so code
+      runs at full speed). A sample belongs to a pattern run when that run's
+      run_pattern frame is on the stack, or when the loop's current task was
+      created inside the run (capability attempts in call_with_budget,
+      asyncio.gather children; recorded by a loop task factory from the
+      creating context), and to the step the orchestrator has marked as current.
+    - Queries through app.db.query_registry.run_query report their time to
+      the run profiled in the current context (record_db_time).
+    - Per step: cpu_seconds = sampled time on the loop, db_seconds = query
+      time (including pool wait), await_seconds = the rest of the step's wall
+      time (providers, sleeps, other requests holding the loop).
+    - Finished runs add their folded stacks to FlameGraphStore, which keeps
+      per-pattern and per-capability flame graphs over a rolling window.
+
+    Work moved to other threads (to_thread, executors) is not sampled and
+    shows up as await time.
+
+Configuration (environment):
+    PROFILE_SAMPLE_RATE=0          Fraction of pattern runs profiled without being asked
+    PROFILE_INTERVAL_MS=5          Sampling interval
+    PROFILE_WINDOW_MINUTES=30      Flame graph aggregation window
+
+Usage:
+    # Per request: X-Profile: 1 header -> RequestCtx(profile=True)
+    session = get_profiler().start(pattern_id, sys._getframe())
+    session.begin_step(0, "ledger.positions")
+    step["time_breakdown"] = session.end_step(duration)
+    trace["profile"] = session.finish()
+
+    get_flame_graph_store().folded(kind="pattern", name="portfolio_overview")
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_WINDOW_SECONDS = float(os.getenv("PROFILE_WINDOW_MINUTES", "30")) * 60
+PROFILE_BUCKET_SECONDS = 60.0
+
+# Request header that asks for a profile of one pattern run
+PROFILE_HEADER = "X-Profile"
+
+# Frames kept per sample (from the run_pattern frame down)
+MAX_STACK_DEPTH = 64
+# Call tree condensing: drop subtrees under this share of the total, cap depth
+TREE_MIN_FRACTION = 0.02
+TREE_MAX_DEPTH = 24
+# Distinct stacks kept per flame graph per bucket; the rest fold into "(other)"
+MAX_STACKS_PER_GRAPH = 2000
+
+ORCHESTRATOR_STEP = "(orchestrator)"
+OTHER_STACK = ("(other)",)
+
+Stack = Tuple[str, ...]
+
+# Outermost frame of a task step on the loop thread: stacks of adopted tasks end here
+_HANDLE_RUN = asyncio.events.Handle._run.__code__
+
+_current_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+
+
+def header_requests_profile(value: Optional[str]) -> bool:
+    """True for X-Profile: 1 / true / yes."""
+    return bool(value) and value.strip().lower() in ("1", "true", "yes")
+
+
+def record_db_time(seconds: float) -> None:
+    """Add query time to the profiled pattern run in the current context (if any)."""
+    session = _current_session.get()
+    if session is not None:
+        session.add_db_time(seconds)
+
+
+_labels: Dict[Any, str] = {}
+
+
+def _frame_label(code) -> str:
+    label = _labels.get(code)
+    if label is None:
+        path = code.co_filename.replace("\\", "/")
+        short = path.split("/app/", 1)[-1] if "/app/" in path else "/".join(path.rsplit("/", 2)[-2:])
+        label = f"{getattr(code, 'co_qualname', code.co_name)} ({short}:{code.co_firstlineno})"
+        _labels[code] = label
+    return label
+
+
+class ProfileSession:
+    """Samples, DB time and per-step breakdown for one pattern run."""
+
+    def __init__(
+        self,
+        profiler: "SamplingProfiler",
+        pattern_id: str,
+        root_frame,
+        thread_id: int,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.profiler = profiler
+        self.pattern_id = pattern_id
+        self.root_frame = root_frame
+        self.thread_id = thread_id
+        self.loop = loop
+        self.started = time.perf_counter()
+        self.finished = False
+        # (step label, stack) -> sampled seconds
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self.step_key: Optional[int] = None
+        self.step_label = ORCHESTRATOR_STEP
+        self.cpu_by_step: Counter = Counter()
+        self.db_by_step: Counter = Counter()
+        self._token = None
+
+    def activate(self) -> None:
+        """Make this the session record_db_time() reports to in the current context."""
+        self._token = _current_session.set(self)
+
+    def begin_step(self, index: int, capability: str) -> None:
+        self.step_key = index
+        self.step_label = capability
+
+    def end_step(self, duration_seconds: float) -> Dict[str, float]:
+        """Time breakdown of the current step; later samples go to the orchestrator."""
+        db = self.db_by_step.get(self.step_key, 0.0)
+        cpu = min(self.cpu_by_step.get(self.step_key, 0.0), duration_seconds)
+        self.step_key = None
+        self.step_label = ORCHESTRATOR_STEP
+        return {
+            "cpu_seconds": round(cpu, 4),
+            "db_seconds": round(db, 4),
+            "await_seconds": round(max(0.0, duration_seconds - cpu - db), 4),
+        }
+
+    def add_sample(self, stack: Stack, seconds: float) -> None:
+        # Called by the sampler thread while holding the profiler lock
+        self.samples[(self.step_label, stack)] += seconds
+        self.cpu_by_step[self.step_key] += seconds
+        self.sample_count += 1
+
+    def add_db_time(self, seconds: float) -> None:
+        if not self.finished:
+            self.db_by_step[self.step_key] += seconds
+
+    def finish(self, store: Optional["FlameGraphStore"] = None) -> Dict[str, Any]:
+        """Stop sampling, record flame graphs and return the profile for the trace."""
+        if self.finished:
+            return {}
+        self.profiler.stop(self)
+        self.finished = True
+        self.root_frame = None
+        if self._token is not None:
+            try:
+                _current_session.reset(self._token)
+            except ValueError:
+                # Finished from a different context than it was activated in
+                _current_session.set(None)
+            self._token = None
+
+        wall = time.perf_counter() - self.started
+        stacks: Counter = Counter()
+        for (step, stack), seconds in self.samples.items():
+            stacks[(step,) + stack] += seconds
+
+        store = store if store is not None else get_flame_graph_store()
+        store.add("pattern", self.pattern_id, stacks)
+        for step, step_stacks in _split_by_step(self.samples).items():
+            store.add("capability", step, step_stacks)
+
+        cpu = sum(self.cpu_by_step.values())
+        db = sum(self.db_by_step.values())
+        return {
+            "interval_ms": round(self.profiler.interval * 1000, 2),
+            "samples": self.sample_count,
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(cpu, 4),
+            "db_seconds": round(db, 4),
+            "await_seconds": round(max(0.0, wall - cpu - db), 4),
+            "call_tree": build_call_tree(stacks, self.pattern_id),
+        }
+
+
+def _split_by_step(samples: Counter) -> Dict[str, Counter]:
+    by_step: Dict[str, Counter] = {}
+    for (step, stack), seconds in samples.items():
+        if step != ORCHESTRATOR_STEP:
+            by_step.setdefault(step, Counter())[stack] += seconds
+    return by_step
+
+
+class SamplingProfiler:
+    """Statistical stack sampler for the threads running profiled pattern runs."""
+
+    def __init__(self, interval_seconds: float = PROFILE_INTERVAL_SECONDS):
+        self.interval = max(interval_seconds, 0.001)
+        self._lock = threading.Lock()
+        self._sessions: Dict[int, ProfileSession] = {}
+        # id(task) -> session of the run that created it
+        self._tasks: Dict[int, ProfileSession] = {}
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, pattern_id: str, root_frame) -> ProfileSession:
+        """Start sampling the run whose outermost frame is root_frame (call from that frame)."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        session = ProfileSession(self, pattern_id, root_frame, threading.get_ident(), loop)
+        session.activate()
+        if loop is not None:
+            self._install_task_factory(loop)
+        with self._lock:
+            self._sessions[id(root_frame)] = session
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pattern-profiler", daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return session
+
+    def stop(self, session: ProfileSession) -> None:
+        """No samples are added to session after this returns."""
+        with self._lock:
+            if session.root_frame is not None:
+                self._sessions.pop(id(session.root_frame), None)
+            for task_id in [t for t, owner in self._tasks.items() if owner is session]:
+                del self._tasks[task_id]
+
+    def active_sessions(self) -> int:
+        return len(self._sessions)
+
+    def adopt(self, task: asyncio.Task, session: ProfileSession) -> None:
+        """Attribute samples taken while task runs to session (until the task or session ends)."""
+        with self._lock:
+            if session.finished:
+                return
+            self._tasks[id(task)] = session
+        task.add_done_callback(self._forget_task)
+
+    def _forget_task(self, task: asyncio.Task) -> None:
+        with self._lock:
+            self._tasks.pop(id(task), None)
+
+    def _install_task_factory(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Wrap the loop's task factory so tasks created inside a profiled run are adopted by it."""
+        previous = loop.get_task_factory()
+        if getattr(previous, "_profiler", None) is self:
+            return
+
+        def factory(loop, coro, **kwargs):
+            task = previous(loop, coro, **kwargs) if previous else asyncio.Task(coro, loop=loop, **kwargs)
+            session = _current_session.get()
+            if session is not None and not session.finished:
+                self.adopt(task, session)
+            return task
+
+        factory._profiler = self
+        loop.set_task_factory(factory)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while True:
+            if not self._sessions:
+                self._wake.wait()
+                self._wake.clear()
+                last = time.perf_counter()
+                continue
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            try:
+                with self._lock:
+                    self._sample(now - last)
+            except Exception as e:
+                logger.warning(f"Profiler sample failed: {e}")
+            last = now
+
+    def _sample(self, seconds: float) -> None:
+        frames = sys._current_frames()
+        by_thread: Dict[int, Dict[int, ProfileSession]] = {}
+        loops: Dict[int, asyncio.AbstractEventLoop] = {}
+        for root_id, session in self._sessions.items():
+            by_thread.setdefault(session.thread_id, {})[root_id] = session
+            if session.loop is not None:
+                loops[session.thread_id] = session.loop
+
+        for thread_id, sessions in by_thread.items():
+            frame = frames.get(thread_id)
+            task = asyncio.tasks._current_tasks.get(loops.get(thread_id))
+            owner = self._tasks.get(id(task)) if task is not None else None
+            leaf_first: List[str] = []
+            while frame is not None:
+                session = sessions.get(id(frame))
+                if session is not None and frame is session.root_frame:
+                    session.add_sample(tuple(reversed(leaf_first))[:MAX_STACK_DEPTH], seconds)
+                    break
+                if frame.f_code is _HANDLE_RUN:
+                    # Bottom of a task step: the task's own run, if it was created in one
+                    if owner is not None:
+                        owner.add_sample(tuple(reversed(leaf_first))[:MAX_STACK_DEPTH], seconds)
+                    break
+                leaf_first.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+
+
+class FlameGraphStore:
+    """
+    Folded stacks per pattern and per capability over a rolling window.
+
+    Time is bucketed (bucket_seconds); buckets older than window_seconds
+    are dropped, so memory is bounded by buckets x graphs x max_stacks.
+    """
+
+    def __init__(
+        self,
+        window_seconds: float = PROFILE_WINDOW_SECONDS,
+        bucket_seconds: float = PROFILE_BUCKET_SECONDS,
+        max_stacks: int = MAX_STACKS_PER_GRAPH,
+        clock=time.time,
+    ):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = bucket_seconds
+        self.max_stacks = max_stacks
+        self._clock = clock
+        # (bucket start, {(kind, name): {"profiles": n, "stacks": Counter}})
+        self._buckets: Deque[Tuple[float, Dict[Tuple[str, str], Dict[str, Any]]]] = deque()
+
+    def add(self, kind: str, name: str, stacks: Dict[Stack, float]) -> None:
+        graph = self._current_bucket().setdefault((kind, name), {"profiles": 0, "stacks": Counter()})
+        graph["profiles"] += 1
+        folded = graph["stacks"]
+        for stack, seconds in stacks.items():
+            if stack not in folded and len(folded) >= self.max_stacks:
+                stack = OTHER_STACK
+            folded[stack] += seconds
+
+    def graphs(self, kind: Optional[str] = None, name: Optional[str] = None) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """Merged graphs in the window: {(kind, name): {"profiles", "stacks"}}."""
+        self._expire()
+        merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for _, bucket in self._buckets:
+            for key, graph in bucket.items():
+                if (kind and key[0] != kind) or (name and key[1] != name):
+                    continue
+                target = merged.setdefault(key, {"profiles": 0, "stacks": Counter()})
+                target["profiles"] += graph["profiles"]
+                target["stacks"].update(graph["stacks"])
+        return merged
+
+    def folded(self, kind: Optional[str] = None, name: Optional[str] = None) -> str:
+        """Brendan Gregg folded format ("a;b;c <ms>"), one root per graph (flamegraph.pl, speedscope)."""
+        lines = []
+        for (graph_kind, graph_name), graph in sorted(self.graphs(kind, name).items()):
+            for stack, seconds in graph["stacks"].most_common():
+                ms = round(seconds * 1000)
+                if ms > 0:
+                    lines.append(f"{graph_kind}:{graph_name};{';'.join(stack)} {ms}")
+        return "\n".join(lines)
+
+    def summary(self, kind: Optional[str] = None, name: Optional[str] = None, trees: bool = True) -> List[Dict[str, Any]]:
+        """Per graph: profiles, sampled seconds and (optionally) a condensed call tree."""
+        rows = []
+        for (graph_kind, graph_name), graph in self.graphs(kind, name).items():
+            row = {
+                "kind": graph_kind,
+                "name": graph_name,
+                "profiles": graph["profiles"],
+                "sampled_seconds": round(sum(graph["stacks"].values()), 4),
+            }
+            if trees:
+                row["call_tree"] = build_call_tree(graph["stacks"], graph_name)
+            rows.append(row)
+        return sorted(rows, key=lambda row: row["sampled_seconds"], reverse=True)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+    def _current_bucket(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        start = self._clock() // self.bucket_seconds * self.bucket_seconds
+        if not self._buckets or self._buckets[-1][0] != start:
+            self._buckets.append((start, {}))
+            self._expire()
+        return self._buckets[-1][1]
+
+    def _expire(self) -> None:
+        oldest = self._clock() - self.window_seconds
+        while self._buckets and self._buckets[0][0] + self.bucket_seconds <= oldest:
+            self._buckets.popleft()
+
+
+def build_call_tree(
+    stacks: Dict[Stack, float],
+    root_name: str,
+    min_fraction: float = TREE_MIN_FRACTION,
+    max_depth: int = TREE_MAX_DEPTH,
+) -> Dict[str, Any]:
+    """
+    Condensed call tree from folded stacks.
+
+    Nodes are {"name", "seconds", "children"} (children sorted by time);
+    subtrees below min_fraction of the total and frames deeper than
+    max_depth are dropped.
+    """
+    total = sum(stacks.values())
+    root: Dict[str, Any] = {"name": root_name, "seconds": total, "children": {}}
+    threshold = total * min_fraction
+    for stack, seconds in stacks.items():
+        node = root
+        for name in stack[:max_depth]:
+            child = node["children"].get(name)
+            if child is None:
+                child = node["children"][name] = {"name": name, "seconds": 0.0, "children": {}}
+            child["seconds"] += seconds
+            node = child
+
+    def condense(node: Dict[str, Any]) -> Dict[str, Any]:
+        children = [
+            condense(child)
+            for child in sorted(node["children"].values(), key=lambda c: c["seconds"], reverse=True)
+            if child["seconds"] >= threshold
+        ]
+        condensed = {"name": node["name"], "seconds": round(node["seconds"], 4)}
+        if children:
+            condensed["children"] = children
+        return condensed
+
+    return condense(root)
+
+
+_profiler: Optional[SamplingProfiler] = None
+_store = FlameGraphStore()
+
+
+def get_profiler() -> SamplingProfiler:
+    """Process-wide sampler (its thread starts with the first profiled run)."""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler()
+    return _profiler
+
+
+def get_flame_graph_store() -> FlameGraphStore:
+    """Process-wide rolling flame graphs."""
+    return _store
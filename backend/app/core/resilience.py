@@ -0,0 +1,279 @@
+"""
+Capability Resilience
+
+Purpose: Latency budgets, request deadlines, hedged reads and circuit breakers for AgentRuntime
+Created: 2025-11-10
+Priority: P1 (Bounded tail latency for patterns with provider-backed steps)
+
+Policies (per capability):
+    - Budget: each attempt is cancelled after latency_budget_ms (capability
+      contract, else PREFIX_POLICIES), or earlier when RequestCtx.deadline
+      comes first. Capabilities with neither (DEFAULT_POLICY) are unbounded
+      apart from the request deadline.
+    - Hedging: for hedge=True read capabilities a duplicate call starts once
+      the first has run longer than the capability's observed p95; the first
+      success wins and the other is cancelled.
+    - Circuit breaker: when a capability's recent error rate crosses the
+      threshold, calls short-circuit for a cooldown - to the last good result
+      for the same user and arguments (idempotent capabilities, marked as
+      cached provenance) or to CircuitOpenError.
+
+Usage:
+    policy = policy_for("news.search", get_capability_contract(method))
+    result, hedged = await call_with_budget(lambda: agent.execute(...), timeout, hedge_delay)
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, replace
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Hedging needs a stable p95: no hedge until this many successful samples
+MIN_HEDGE_SAMPLES = 20
+LATENCY_WINDOW = 200
+# Never hedge sooner than this (avoids doubling load on fast calls)
+MIN_HEDGE_DELAY_SECONDS = 0.05
+
+# Circuit breaker: open when >= ERROR_RATE of the last WINDOW calls failed
+BREAKER_WINDOW = 20
+BREAKER_MIN_CALLS = 10
+BREAKER_ERROR_RATE = 0.5
+BREAKER_COOLDOWN_SECONDS = 30.0
+
+# Last good results served while a circuit is open
+LAST_GOOD_MAX_ENTRIES = 512
+LAST_GOOD_MAX_AGE_SECONDS = 3600
+
+
+@dataclass(frozen=True)
+class CapabilityPolicy:
+    """How AgentRuntime bounds one capability."""
+
+    budget_seconds: Optional[float] = None  # None = no per-attempt budget
+    hedge: bool = False
+    idempotent: bool = False
+
+
+DEFAULT_POLICY = CapabilityPolicy()
+
+# Provider-backed reads: short budgets, hedged, safe to serve a previous result.
+# Everything else gets DEFAULT_POLICY (no budget) unless its contract declares one.
+PREFIX_POLICIES: Dict[str, CapabilityPolicy] = {
+    "provider.": CapabilityPolicy(budget_seconds=8.0, hedge=True, idempotent=True),
+    "fundamentals.": CapabilityPolicy(budget_seconds=8.0, hedge=True, idempotent=True),
+    "news.": CapabilityPolicy(budget_seconds=8.0, hedge=True, idempotent=True),
+    "corporate_actions.": CapabilityPolicy(budget_seconds=10.0, hedge=True, idempotent=True),
+    "macro.": CapabilityPolicy(budget_seconds=20.0, idempotent=True),
+    # Long-running by nature (LLM calls, optimization)
+    "claude.": CapabilityPolicy(budget_seconds=90.0),
+    "ai.": CapabilityPolicy(budget_seconds=90.0),
+    "optimizer.": CapabilityPolicy(budget_seconds=60.0),
+}
+
+
+def policy_for(capability: str, contract: Optional[Dict[str, Any]] = None) -> CapabilityPolicy:
+    """Policy for a capability: contract declarations over prefix defaults."""
+    policy = next(
+        (p for prefix, p in PREFIX_POLICIES.items() if capability.startswith(prefix)),
+        DEFAULT_POLICY,
+    )
+    if not contract:
+        return policy
+    if contract.get("latency_budget_ms"):
+        policy = replace(policy, budget_seconds=contract["latency_budget_ms"] / 1000)
+    if contract.get("idempotent") is not None:
+        policy = replace(policy, idempotent=bool(contract["idempotent"]))
+    if contract.get("hedge") is not None:
+        policy = replace(policy, hedge=bool(contract["hedge"]) and policy.idempotent)
+    return policy
+
+
+class LatencyTracker:
+    """Rolling successful-call latencies per capability (for hedge delays)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW, min_samples: int = MIN_HEDGE_SAMPLES):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def observe(self, capability: str, seconds: float) -> None:
+        samples = self._samples.get(capability)
+        if samples is None:
+            samples = self._samples[capability] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def quantile(self, capability: str, q: float) -> Optional[float]:
+        samples = self._samples.get(capability)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def hedge_delay(self, capability: str) -> Optional[float]:
+        """p95 of recent successes, or None until enough samples exist."""
+        p95 = self.quantile(capability, 0.95)
+        return None if p95 is None else max(p95, MIN_HEDGE_DELAY_SECONDS)
+
+
+class CircuitBreaker:
+    """
+    Error-rate circuit breaker (closed -> open -> half_open -> closed).
+
+    Open for cooldown_seconds once error_rate of the last window calls failed;
+    then one trial call is let through and its outcome closes or re-opens it.
+    """
+
+    def __init__(
+        self,
+        window: int = BREAKER_WINDOW,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate: float = BREAKER_ERROR_RATE,
+        cooldown_seconds: float = BREAKER_COOLDOWN_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._trial_started_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        """True if a call may run now."""
+        if self.state == "closed":
+            return True
+        now = self._clock()
+        if self.state == "open" and now - self._opened_at >= self.cooldown_seconds:
+            self.state = "half_open"
+        # One trial at a time; a trial that never reported (cancelled) expires after a cooldown
+        if self.state == "half_open" and (
+            self._trial_started_at is None or now - self._trial_started_at >= self.cooldown_seconds
+        ):
+            self._trial_started_at = now
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.cooldown_seconds - (self._clock() - self._opened_at))
+
+    def record(self, success: bool) -> None:
+        if self.state == "open":
+            # Calls that started before the circuit opened
+            return
+        if self.state == "half_open":
+            self._trial_started_at = None
+            if success:
+                self.state = "closed"
+                self._outcomes.clear()
+            else:
+                self._open()
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.error_rate:
+            self._open()
+
+    def _open(self) -> None:
+        self.state = "open"
+        self._opened_at = self._clock()
+        self._outcomes.clear()
+
+
+class LastGoodResults:
+    """Bounded LRU of recent successful results, served while a circuit is open."""
+
+    def __init__(self, max_entries: int = LAST_GOOD_MAX_ENTRIES, max_age_seconds: float = LAST_GOOD_MAX_AGE_SECONDS):
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[Any, float]]" = OrderedDict()
+
+    def set(self, key: Tuple, result: Any) -> None:
+        self._entries[key] = (result, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Tuple) -> Optional[Tuple[Any, float]]:
+        """(result, age_seconds) or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, stored_at = entry
+        age = time.time() - stored_at
+        if age > self.max_age_seconds:
+            del self._entries[key]
+            return None
+        return result, age
+
+
+def is_error_result(result: Any) -> bool:
+    """Capabilities that catch provider failures return them in-band ({"error": ...})."""
+    if not isinstance(result, dict):
+        return False
+    provenance = result.get("_provenance")
+    return bool(result.get("error")) or (isinstance(provenance, dict) and provenance.get("type") == "error")
+
+
+def degraded(result: Any, capability: str, age_seconds: float) -> Any:
+    """Copy of a previous result marked as cached provenance (visible in the pattern trace)."""
+    if not isinstance(result, dict):
+        return result
+    result = copy.copy(result)
+    result["_provenance"] = {
+        "type": "cached",
+        "source": "circuit_breaker:last_good",
+        "warnings": [f"{capability} unavailable; showing result from {int(age_seconds)}s ago"],
+        "confidence": 0.5,
+    }
+    return result
+
+
+async def call_with_budget(
+    factory: Callable[[], Awaitable[Any]],
+    timeout: Optional[float],
+    hedge_delay: Optional[float] = None,
+) -> Tuple[Any, bool]:
+    """
+    Await factory() within timeout (None = unbounded), hedging with a second call after hedge_delay.
+
+    Returns (result, hedged). The first successful call wins; if every call
+    fails the last error is raised, and asyncio.TimeoutError when time runs
+    out. Calls still running on return are cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    pending = {asyncio.ensure_future(factory())}
+    hedged = False
+    error: Optional[BaseException] = None
+    try:
+        if hedge_delay is not None and (timeout is None or hedge_delay < timeout):
+            done, pending = await asyncio.wait(pending, timeout=hedge_delay)
+            if not done:
+                pending.add(asyncio.ensure_future(factory()))
+                hedged = True
+            else:
+                pending = done
+        while pending:
+            remaining = None if deadline is None else deadline - loop.time()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), hedged
+                error = task.exception()
+        if error is not None and not pending:
+            raise error
+        raise asyncio.TimeoutError()
+    finally:
+        for task in pending:
+            task.cancel()
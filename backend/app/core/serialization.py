@@ -0,0 +1,150 @@
+"""
+Fast JSON Serialization
+
+Purpose: One orjson-backed encoder for API responses, streamed events and cached pattern results
+Created: 2025-11-10
+Priority: P1 (Serialization CPU on large portfolio / holding payloads)
+
+Pattern results carry Decimal, date, UUID and dataclass values (ScenarioResult,
+DaRResult, ...). Rendering them through jsonable_encoder walks the whole tree
+in Python before json.dumps walks it again; orjson serializes dicts, lists,
+dates, UUIDs, enums and dataclasses natively and only calls json_default for
+the rest (Decimal, sets, pydantic models, records).
+
+Values render exactly as jsonable_encoder renders them (Decimal("12") -> 12,
+Decimal("1.5") -> 1.5, dates ISO 8601, pydantic models via their JSON mode),
+except NaN/Infinity, which become null instead of invalid JSON. Without
+orjson installed the stdlib json module is used with the same default hook
+and non-finite floats are replaced with None before encoding.
+
+Usage:
+    return ORJSONResponse(SuccessResponse(data=payload))
+    body = dumps(event)                       # bytes
+    logger.info(f"Result: {summarize(result)}")
+"""
+
+import json
+import logging
+import math
+from itertools import islice
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from enum import Enum
+from pathlib import PurePath
+from typing import Any
+
+from starlette.responses import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Characters of a value shown by summarize() before truncating
+SUMMARY_MAX_CHARS = 200
+
+
+def json_default(value: Any) -> Any:
+    """Encode types orjson / json do not handle natively (jsonable_encoder semantics)."""
+    if isinstance(value, Decimal):
+        # int for integral exponents (as FastAPI does); as_tuple() only when it can matter
+        number = float(value)
+        if number.is_integer() and value.as_tuple().exponent >= 0:
+            return int(value)
+        return number
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    if hasattr(value, "model_dump"):
+        # Same as response_model / jsonable_encoder: the model's own JSON mode
+        return value.model_dump(mode="json")
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    if isinstance(value, Enum):
+        return value.value
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, bytes):
+        return value.decode()
+    if isinstance(value, PurePath):
+        return str(value)
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    if hasattr(value, "keys"):
+        # asyncpg.Record and other mapping-like rows
+        return dict(value)
+    return str(value)
+
+
+def _finite(value: Any) -> Any:
+    """Replace non-finite floats with None (what orjson writes for them)."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _json_default_finite(value: Any) -> Any:
+    return _finite(json_default(value))
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    """Stdlib fallback; only walks the payload again when it holds NaN/Infinity."""
+    try:
+        text = json.dumps(content, default=_json_default_finite, allow_nan=False, separators=(",", ":"))
+    except ValueError:
+        text = json.dumps(_finite(content), default=_json_default_finite, allow_nan=False, separators=(",", ":"))
+    return text.encode()
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, default=json_default, option=_ORJSON_OPTIONS)
+    return _stdlib_dumps(content)
+
+
+def loads(payload: Any) -> Any:
+    """Parse JSON from bytes or str."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+class ORJSONResponse(Response):
+    """JSONResponse rendered with dumps() (no jsonable_encoder pre-pass)."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def summarize(value: Any, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    Size-bounded description of a payload for logs.
+
+    Containers are described by shape (type, length, first keys) rather than
+    rendered, so logging a large result costs O(keys) instead of a full walk.
+    """
+    if isinstance(value, dict):
+        keys = ", ".join(str(k) for k in islice(value, 10))
+        more = ", ..." if len(value) > 10 else ""
+        text = f"dict[{len(value)}]({keys}{more})"
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        text = f"{type(value).__name__}[{len(value)}]"
+    elif isinstance(value, (str, bytes)) and len(value) > max_chars:
+        text = f"{type(value).__name__}[{len(value)}]"
+    else:
+        text = repr(value)
+    return text if len(text) <= max_chars else text[: max_chars - 3] + "..."
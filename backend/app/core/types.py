@@ -20,7 +20,8 @@ def execute(self, ctx: RequestCtx, request: ValuationRequest) -> ValuationRespon
             ...
 """
 
-from dataclasses import dataclass, field
+import time
+from dataclasses import dataclass, field, replace
 from datetime import date, datetime
 from decimal import Decimal
 from enum import Enum
@@ -94,6 +95,12 @@ class RequestCtx:
     require_fresh: bool = True
     """If true, block execution when pack not fresh (default: true)"""
 
+    deadline: Optional[float] = field(default=None, compare=False)
+    """time.monotonic() by which the whole request must finish (None = no deadline)"""
+
+    profile: bool = field(default=False, compare=False)
+    """Profile this request's pattern run (call tree + step time breakdown in the trace)"""
+
     def __post_init__(self):
         """Validate required fields."""
         if not self.pricing_pack_id:
@@ -117,8 +124,23 @@ def with_portfolio(self, portfolio_id: UUID) -> "RequestCtx":
             rights_profile=self.rights_profile,
             asof_date=self.asof_date,
             require_fresh=self.require_fresh,
+            deadline=self.deadline,
+            profile=self.profile,
         )
 
+    def with_deadline(self, seconds: float) -> "RequestCtx":
+        """Create new context that must finish within seconds (an earlier deadline is kept)."""
+        deadline = time.monotonic() + seconds
+        if self.deadline is not None and self.deadline <= deadline:
+            return self
+        return replace(self, deadline=deadline)
+
+    def remaining_seconds(self) -> Optional[float]:
+        """Seconds left before the deadline (None = no deadline)."""
+        if self.deadline is None:
+            return None
+        return self.deadline - time.monotonic()
+
     def to_dict(self) -> Dict[str, Any]:
         """Serialize to dict (for JSON responses)."""
         return {
@@ -6,9 +6,11 @@
 Priority: P0 (Critical for Phase 2 & Phase 3)
 
 Components:
-    - connection.py: AsyncPG connection pooling
+    - connection.py: AsyncPG connection pooling, read/batch/write role pools
     - pricing_pack_queries.py: Pricing pack database queries
     - metrics_queries.py: Portfolio metrics, currency attribution, factor exposures
+    - query_registry.py: Named queries, prepared-statement reuse, per-query histograms
+    - columnar_store.py: Nightly mmap-able NumPy snapshots of long time series
 
 Usage:
     from app.db import init_db_pool, get_pricing_pack_queries, get_metrics_queries
@@ -31,13 +33,42 @@
     close_db_pool,
     get_db_connection,
     get_db_connection_with_rls,
+    get_rls_read_connection,
+    RLSConnection,
     check_db_health,
+    POOL_READ,
+    POOL_BATCH,
+    POOL_WRITE,
+    ManagedPool,
+    PoolManager,
+    get_pool_manager,
+    get_pool,
+    use_pool,
+    init_role_pools,
     execute_query,
     execute_query_one,
     execute_query_value,
     execute_statement,
 )
 
+from .query_registry import (
+    NamedQuery,
+    register_query,
+    get_query_registry,
+    get_query_stats,
+    fetch_named,
+    fetchrow_named,
+    fetchval_named,
+    execute_named,
+)
+
+from .columnar_store import (
+    ColumnarStore,
+    ColumnarSeries,
+    get_columnar_store,
+    export_columnar_store,
+)
+
 from .pricing_pack_queries import (
     PricingPackQueries,
     get_pricing_pack_queries,
@@ -64,11 +95,36 @@
     "close_db_pool",
     "get_db_connection",
     "get_db_connection_with_rls",
+    "get_rls_read_connection",
+    "RLSConnection",
     "check_db_health",
+    "POOL_READ",
+    "POOL_BATCH",
+    "POOL_WRITE",
+    "ManagedPool",
+    "PoolManager",
+    "get_pool_manager",
+    "get_pool",
+    "use_pool",
+    "init_role_pools",
     "execute_query",
     "execute_query_one",
     "execute_query_value",
     "execute_statement",
+    # Query Registry
+    "NamedQuery",
+    "register_query",
+    "get_query_registry",
+    "get_query_stats",
+    "fetch_named",
+    "fetchrow_named",
+    "fetchval_named",
+    "execute_named",
+    # Columnar Store
+    "ColumnarStore",
+    "ColumnarSeries",
+    "get_columnar_store",
+    "export_columnar_store",
     # Pricing Pack Queries
     "PricingPackQueries",
     "get_pricing_pack_queries",
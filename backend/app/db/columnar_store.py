@@ -0,0 +1,477 @@
+"""
+Columnar Time-Series Store
+
+Purpose: Nightly NumPy (.npy) snapshots of long histories, read zero-copy via mmap
+Created: 2025-11-10
+Priority: P1 (Historical analytics without per-row Record decoding)
+
+Datasets (one series per key, sorted by date):
+    - portfolio_daily_values: portfolio_id -> total_value, cash_flows
+    - prices:                 security_id  -> close (latest pack per date)
+    - macro_indicators:       indicator_id -> value
+
+Layout:
+    <root>/<dataset>/CURRENT            name of the live version directory
+    <root>/<dataset>/<version>/dates.npy     datetime64[D], all keys concatenated
+    <root>/<dataset>/<version>/<column>.npy  float64, aligned with dates.npy
+    <root>/<dataset>/<version>/index.json    key -> [start, stop), max_date, exported_at
+
+Readers memory-map the arrays (np.load(mmap_mode="r")) so worker processes
+share pages, and slice date ranges with searchsorted. A key only answers
+queries whose end date its own series covers, and only while none of its
+snapshotted rows were rewritten after exported_at (checked against Postgres
+at most every CHANGE_CHECK_SECONDS); otherwise callers fall back to Postgres,
+so intraday writes, per-key gaps and restated rows are never hidden by a
+stale snapshot.
+
+Usage:
+    from app.db.columnar_store import get_columnar_store
+
+    series = await get_columnar_store().series("portfolio_daily_values", portfolio_id, start, end)
+    if series is not None:
+        values = series.columns["total_value"]  # np.ndarray view, no copy
+
+    # Nightly export (jobs/export_columnar.py)
+    await export_columnar_store()
+"""
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.db.connection import POOL_BATCH, POOL_READ, get_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROOT = Path(__file__).resolve().parents[3] / "data" / "columnar"
+EXPORT_CHUNK_ROWS = 50_000
+KEEP_VERSIONS = 2
+CHANGE_CHECK_SECONDS = 10.0
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """
+    Source queries for a dataset.
+
+    query: rows of (key, date, *columns) ordered by key, date
+    changed_query: keys with rows at or before $2 (snapshot max_date) written after $1
+    """
+
+    name: str
+    columns: Tuple[str, ...]
+    query: str
+    changed_query: str
+
+
+DATASETS: Dict[str, DatasetSpec] = {
+    spec.name: spec
+    for spec in (
+        DatasetSpec(
+            "portfolio_daily_values",
+            ("total_value", "cash_flows"),
+            """
+            SELECT portfolio_id::text, valuation_date, total_value::float8,
+                   COALESCE(cash_flows, 0)::float8
+            FROM portfolio_daily_values
+            ORDER BY portfolio_id, valuation_date
+            """,
+            """
+            SELECT DISTINCT portfolio_id::text
+            FROM portfolio_daily_values
+            WHERE computed_at > $1 AND valuation_date <= $2
+            """,
+        ),
+        DatasetSpec(
+            "prices",
+            ("close",),
+            """
+            SELECT DISTINCT ON (security_id, asof_date)
+                   security_id::text, asof_date, close::float8
+            FROM prices
+            ORDER BY security_id, asof_date, pricing_pack_id DESC
+            """,
+            """
+            SELECT DISTINCT security_id::text
+            FROM prices
+            WHERE created_at > $1 AND asof_date <= $2
+            """,
+        ),
+        DatasetSpec(
+            "macro_indicators",
+            ("value",),
+            """
+            SELECT indicator_id, date, value::float8
+            FROM macro_indicators
+            ORDER BY indicator_id, date
+            """,
+            """
+            SELECT DISTINCT indicator_id
+            FROM macro_indicators
+            WHERE GREATEST(created_at, last_updated) > $1 AND date <= $2
+            """,
+        ),
+    )
+}
+
+
+class ColumnarSeries(NamedTuple):
+    """Date-sliced view of one key; arrays are read-only mmap views."""
+
+    dates: np.ndarray
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+def _root(root=None) -> Path:
+    return Path(root or os.getenv("COLUMNAR_STORE_DIR") or DEFAULT_ROOT)
+
+
+# ============================================================================
+# Writer
+# ============================================================================
+
+def write_dataset(
+    root,
+    name: str,
+    columns: Sequence[str],
+    keys: Sequence[str],
+    dates: np.ndarray,
+    values: Dict[str, np.ndarray],
+    exported_at: Optional[datetime] = None,
+) -> Path:
+    """
+    Write one dataset version and atomically point CURRENT at it.
+
+    Args:
+        root: Store root directory
+        name: Dataset name
+        columns: Value column names
+        keys: Key per row (rows grouped by key, dates ascending within a key)
+        dates: datetime64[D] per row
+        values: column -> float64 array per row
+        exported_at: Source snapshot time; rows written later mark their key
+            stale (None: restatements cannot be checked, readers fall back)
+
+    Returns:
+        Path of the new version directory
+    """
+    dataset_dir = _root(root) / name
+    version = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    tmp_dir = dataset_dir / f".tmp-{version}"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    index: Dict[str, List[int]] = {}
+    start = 0
+    keys = list(keys)
+    for i in range(1, len(keys) + 1):
+        if i == len(keys) or keys[i] != keys[start]:
+            index[keys[start]] = [start, i]
+            start = i
+
+    np.save(tmp_dir / "dates.npy", np.asarray(dates, dtype="datetime64[D]"))
+    for column in columns:
+        np.save(tmp_dir / f"{column}.npy", np.asarray(values[column], dtype=np.float64))
+    max_date = str(np.max(dates)) if len(dates) else None
+    with open(tmp_dir / "index.json", "w") as f:
+        json.dump(
+            {
+                "columns": list(columns),
+                "rows": len(dates),
+                "max_date": max_date,
+                "exported_at": exported_at.isoformat() if exported_at else None,
+                "keys": index,
+            },
+            f,
+        )
+
+    version_dir = dataset_dir / version
+    os.replace(tmp_dir, version_dir)
+    current_tmp = dataset_dir / ".CURRENT.tmp"
+    current_tmp.write_text(version)
+    os.replace(current_tmp, dataset_dir / "CURRENT")
+
+    # Old versions stay until superseded twice so open mmaps remain valid
+    versions = sorted(p for p in dataset_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in versions[:-KEEP_VERSIONS]:
+        shutil.rmtree(old, ignore_errors=True)
+
+    logger.info(f"Columnar export {name}: {len(dates)} rows, {len(index)} keys -> {version_dir}")
+    return version_dir
+
+
+async def export_dataset(name: str, root=None) -> Dict[str, int]:
+    """Export one dataset from Postgres (batch pool) in chunks."""
+    spec = DATASETS[name]
+    keys: List[str] = []
+    date_chunks: List[np.ndarray] = []
+    value_chunks: Dict[str, List[np.ndarray]] = {c: [] for c in spec.columns}
+
+    async with get_pool(POOL_BATCH).acquire() as conn:
+        async with conn.transaction(readonly=True):
+            # Transaction start: anything written after it may be missing or restated
+            exported_at = await conn.fetchval("SELECT now()")
+            cursor = await conn.cursor(spec.query)
+            while True:
+                rows = await cursor.fetch(EXPORT_CHUNK_ROWS)
+                if not rows:
+                    break
+                keys.extend(row[0] for row in rows)
+                date_chunks.append(np.array([row[1] for row in rows], dtype="datetime64[D]"))
+                for offset, column in enumerate(spec.columns, start=2):
+                    value_chunks[column].append(
+                        np.fromiter((row[offset] for row in rows), dtype=np.float64, count=len(rows))
+                    )
+
+    dates = np.concatenate(date_chunks) if date_chunks else np.array([], dtype="datetime64[D]")
+    values = {
+        c: np.concatenate(chunks) if chunks else np.array([], dtype=np.float64)
+        for c, chunks in value_chunks.items()
+    }
+    write_dataset(root, name, spec.columns, keys, dates, values, exported_at)
+    get_columnar_store(root).invalidate(name)
+    return {"rows": len(dates), "keys": len(set(keys))}
+
+
+async def export_columnar_store(root=None, datasets: Optional[Sequence[str]] = None) -> Dict[str, Dict[str, int]]:
+    """Export all (or selected) datasets; returns per-dataset row/key counts."""
+    results = {}
+    for name in datasets or DATASETS:
+        started = time.perf_counter()
+        results[name] = await export_dataset(name, root)
+        results[name]["seconds"] = round(time.perf_counter() - started, 2)
+    return results
+
+
+# ============================================================================
+# Reader
+# ============================================================================
+
+@dataclass
+class _LoadedDataset:
+    version: str
+    max_date: Optional[np.datetime64]
+    exported_at: Optional[datetime]
+    index: Dict[str, Tuple[int, int]]
+    dates: np.ndarray
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+
+async def _query_changed_keys(name: str, exported_at: datetime, max_date: date) -> Set[str]:
+    async with get_pool(POOL_READ).acquire() as conn:
+        rows = await conn.fetch(DATASETS[name].changed_query, exported_at, max_date)
+    return {row[0] for row in rows}
+
+
+class ColumnarStore:
+    """
+    Memory-mapped reader; reloads a dataset when its CURRENT version changes.
+
+    changed_keys(name, exported_at, max_date) returns the keys whose snapshotted
+    rows were rewritten since the export (default: the dataset's changed_query).
+    """
+
+    def __init__(
+        self,
+        root=None,
+        changed_keys: Optional[Callable[[str, datetime, date], Awaitable[Set[str]]]] = None,
+    ):
+        self.root = _root(root)
+        self.changed_keys = changed_keys or _query_changed_keys
+        self._datasets: Dict[str, Optional[_LoadedDataset]] = {}
+        self._changed: Dict[str, Tuple[str, float, Set[str]]] = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, name: Optional[str] = None) -> None:
+        with self._lock:
+            if name is None:
+                self._datasets.clear()
+                self._changed.clear()
+            else:
+                self._datasets.pop(name, None)
+                self._changed.pop(name, None)
+
+    def _current_version(self, name: str) -> Optional[str]:
+        try:
+            return (self.root / name / "CURRENT").read_text().strip()
+        except OSError:
+            return None
+
+    def _load(self, name: str) -> Optional[_LoadedDataset]:
+        version = self._current_version(name)
+        loaded = self._datasets.get(name)
+        if loaded is not None and loaded.version == version:
+            return loaded
+        if version is None:
+            return None
+
+        with self._lock:
+            version_dir = self.root / name / version
+            try:
+                with open(version_dir / "index.json") as f:
+                    meta = json.load(f)
+                dataset = _LoadedDataset(
+                    version=version,
+                    max_date=np.datetime64(meta["max_date"], "D") if meta["max_date"] else None,
+                    exported_at=(
+                        datetime.fromisoformat(meta["exported_at"]) if meta.get("exported_at") else None
+                    ),
+                    index={k: (v[0], v[1]) for k, v in meta["keys"].items()},
+                    dates=np.load(version_dir / "dates.npy", mmap_mode="r"),
+                    columns={
+                        c: np.load(version_dir / f"{c}.npy", mmap_mode="r") for c in meta["columns"]
+                    },
+                )
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Columnar dataset {name} unreadable ({version}): {e}")
+                return None
+            self._datasets[name] = dataset
+            return dataset
+
+    def max_date(self, name: str) -> Optional[date]:
+        dataset = self._load(name)
+        return dataset.max_date.astype(date) if dataset and dataset.max_date is not None else None
+
+    async def _restated_keys(self, name: str, dataset: _LoadedDataset) -> Optional[Set[str]]:
+        """Keys rewritten since the export (cached briefly); None if that cannot be checked."""
+        if dataset.exported_at is None:
+            return None
+        cached = self._changed.get(name)
+        now = time.monotonic()
+        if cached is not None and cached[0] == dataset.version and now - cached[1] < CHANGE_CHECK_SECONDS:
+            return cached[2]
+        try:
+            keys = await self.changed_keys(name, dataset.exported_at, dataset.max_date.astype(date))
+        except Exception as e:
+            logger.warning(f"Columnar dataset {name}: change check failed, using Postgres: {e}")
+            return None
+        self._changed[name] = (dataset.version, now, keys)
+        return keys
+
+    async def _covering(
+        self, name: str, keys: Sequence[str], end: Optional[date]
+    ) -> Optional[_LoadedDataset]:
+        """The dataset if every key is in the snapshot, runs through `end` and is unchanged since."""
+        dataset = self._load(name)
+        if dataset is None or dataset.max_date is None:
+            return None
+        end_day = np.datetime64(end, "D") if end is not None else dataset.max_date
+        for key in keys:
+            bounds = dataset.index.get(key)
+            if bounds is None or dataset.dates[bounds[1] - 1] < end_day:
+                return None
+        restated = await self._restated_keys(name, dataset)
+        if restated is None or not restated.isdisjoint(keys):
+            return None
+        return dataset
+
+    async def covers(self, name: str, keys: Sequence, end: Optional[date]) -> bool:
+        """True if the snapshot holds every key through `end` with no later rewrites."""
+        return await self._covering(name, [str(k) for k in keys], end) is not None
+
+    @staticmethod
+    def _slice(
+        dataset: _LoadedDataset, key: str, start: Optional[date], end: Optional[date]
+    ) -> ColumnarSeries:
+        lo, hi = dataset.index[key]
+        key_dates = dataset.dates[lo:hi]
+        i = lo + (np.searchsorted(key_dates, np.datetime64(start, "D"), "left") if start else 0)
+        j = lo + (np.searchsorted(key_dates, np.datetime64(end, "D"), "right") if end else hi - lo)
+        return ColumnarSeries(
+            dataset.dates[i:j], {c: arr[i:j] for c, arr in dataset.columns.items()}
+        )
+
+    async def series(
+        self,
+        name: str,
+        key,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> Optional[ColumnarSeries]:
+        """
+        Slice one key's series to [start, end] (inclusive) without copying.
+
+        Returns:
+            ColumnarSeries (possibly empty), or None if the key is not in the
+            snapshot, its series stops before `end`, or its rows were restated
+            since the export (caller should query Postgres)
+        """
+        key = str(key)
+        dataset = await self._covering(name, [key], end)
+        if dataset is None:
+            return None
+        return self._slice(dataset, key, start, end)
+
+    async def frame(
+        self,
+        name: str,
+        keys: Sequence,
+        column: str,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ):
+        """
+        Wide DataFrame (date index, one column per key) for several keys.
+
+        Returns None unless every key is covered through `end` (see series).
+        """
+        import pandas as pd
+
+        keys = [str(k) for k in keys]
+        dataset = await self._covering(name, keys, end)
+        if dataset is None:
+            return None
+        data = {}
+        for key in keys:
+            s = self._slice(dataset, key, start, end)
+            if len(s):
+                data[key] = pd.Series(s.columns[column], index=pd.DatetimeIndex(s.dates))
+        return pd.DataFrame(data).sort_index()
+
+
+async def portfolio_value_returns(
+    portfolio_id, start: date, end: date, store: Optional[ColumnarStore] = None
+) -> Optional[List[Tuple[date, float]]]:
+    """
+    Simple daily returns from portfolio_daily_values.total_value.
+
+    Matches the Postgres path in the risk/factor services: (date, return) for
+    each consecutive pair whose previous value is positive.
+
+    Returns:
+        List of (asof_date, return), or None if the snapshot does not cover `end`
+    """
+    series = await (store or get_columnar_store()).series("portfolio_daily_values", portfolio_id, start, end)
+    if series is None:
+        return None
+    values = series.columns["total_value"]
+    if len(values) < 2:
+        return []
+    prev, curr = values[:-1], values[1:]
+    valid = prev > 0
+    returns = (curr[valid] - prev[valid]) / prev[valid]
+    days = series.dates[1:][valid].astype(date)
+    return list(zip(days.tolist(), returns.tolist()))
+
+
+_stores: Dict[str, ColumnarStore] = {}
+
+
+def get_columnar_store(root=None) -> ColumnarStore:
+    """Get the process-wide reader for a store root (default: COLUMNAR_STORE_DIR)."""
+    path = str(_root(root))
+    store = _stores.get(path)
+    if store is None:
+        store = _stores[path] = ColumnarStore(path)
+    return store
@@ -10,6 +10,19 @@
     - Connection lifecycle management
     - Health checks
     - Graceful shutdown
+    - Query helpers instrumented via the named-query registry (query_registry.py)
+    - Named role pools (read / batch / write) with per-pool limits and wait metrics
+    - RLS-scoped connections (parameterised set_config; lazy read-only sessions)
+
+Pool Roles:
+    - write: primary pool (what get_db_pool() returns); INSERT/UPDATE/DELETE
+    - read: interactive reads; uses DATABASE_REPLICA_URL when configured
+    - batch: nightly jobs; primary DSN, sized separately so jobs cannot starve
+      interactive requests. Enter with `with use_pool(POOL_BATCH):`
+
+    Role pools are sized from DB_<ROLE>_POOL_MIN / DB_<ROLE>_POOL_MAX, capped by
+    DB_<ROLE>_POOL_LIMIT and DB_<ROLE>_ACQUIRE_TIMEOUT. A role whose pool is not
+    configured (max 0) or failed to start falls back to the primary pool.
 
 Usage:
     from app.db.connection import get_db_pool, init_db_pool
@@ -22,12 +35,24 @@
         result = await conn.fetchrow("SELECT * FROM pricing_packs LIMIT 1")
 """
 
+import asyncio
 import asyncpg
 import logging
 import os
 import sys
-from typing import Optional
-from contextlib import asynccontextmanager
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional, Union
+from uuid import UUID
+
+from app.db.query_registry import (
+    WAIT_BUCKETS_MS,
+    Histogram,
+    NamedQuery,
+    get_query_stats,
+    run_query,
+)
 
 logger = logging.getLogger("DawsOS.Database")
 
@@ -51,6 +76,7 @@ def _get_pool_storage():
         import types
         storage = types.ModuleType(POOL_STORAGE_KEY)
         storage.pool = None
+        storage.manager = None
         sys.modules[POOL_STORAGE_KEY] = storage
         logger.info(f"Created cross-module pool storage: {POOL_STORAGE_KEY}")
     return sys.modules[POOL_STORAGE_KEY]
@@ -67,8 +93,268 @@ def register_external_pool(pool: asyncpg.Pool) -> None:
     """
     storage = _get_pool_storage()
     storage.pool = pool
+    get_pool_manager().register(POOL_WRITE, pool)
     logger.info(f"✅ Database pool registered in cross-module storage: {pool}")
 
+# ============================================================================
+# Role Pools
+# ============================================================================
+
+POOL_READ = "read"
+POOL_BATCH = "batch"
+POOL_WRITE = "write"
+
+# (min_size, max_size) defaults per role pool; the write pool is sized by init_db_pool()
+ROLE_POOL_DEFAULTS = {
+    POOL_READ: (2, 10),
+    POOL_BATCH: (1, 4),
+}
+
+# Role override for the current task (and tasks it spawns)
+_pool_role: ContextVar[Optional[str]] = ContextVar("dawsos_db_pool_role", default=None)
+
+
+def _env_number(name: str, default, cast=int):
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"Ignoring invalid {name}={value!r}")
+        return default
+
+
+class ManagedPool:
+    """
+    asyncpg pool wrapper with a concurrency limit and acquire-wait metrics.
+
+    Only acquire() goes through the limit; every other attribute (fetch,
+    get_size, close, ...) is delegated to the underlying pool.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        pool: asyncpg.Pool,
+        limit: Optional[int] = None,
+        acquire_timeout: Optional[float] = None,
+        replica: bool = False,
+    ):
+        self.name = name
+        self.pool = pool
+        self.limit = limit or pool.get_max_size()
+        self.acquire_timeout = acquire_timeout
+        self.replica = replica
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.acquired = 0
+        self.timeouts = 0
+        self.waiting = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self._semaphore = asyncio.Semaphore(self.limit)
+
+    def __getattr__(self, attr):
+        return getattr(self.pool, attr)
+
+    @asynccontextmanager
+    async def acquire(self, timeout: Optional[float] = None):
+        """Acquire a connection, waiting at most timeout (default: pool acquire_timeout)."""
+        timeout = timeout if timeout is not None else self.acquire_timeout
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            if timeout is None:
+                await self._semaphore.acquire()
+            else:
+                await asyncio.wait_for(self._semaphore.acquire(), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.waiting -= 1
+
+        try:
+            remaining = None if timeout is None else max(timeout - (time.perf_counter() - started), 0.001)
+            try:
+                ctx = self.pool.acquire(timeout=remaining)
+                conn = await ctx.__aenter__()
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise
+            self._observe_wait((time.perf_counter() - started) * 1000)
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            try:
+                yield conn
+            finally:
+                self.in_use -= 1
+                await ctx.__aexit__(None, None, None)
+        finally:
+            self._semaphore.release()
+
+    def _observe_wait(self, wait_ms: float) -> None:
+        self.acquired += 1
+        self.wait_ms.observe(wait_ms)
+        try:
+            from observability.metrics import get_metrics
+        except ImportError:
+            return
+        metrics = get_metrics()
+        wait_hist = getattr(metrics, "db_pool_acquire_wait", None) if metrics else None
+        if wait_hist is not None:
+            wait_hist.labels(pool=self.name).observe(wait_ms / 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "replica": self.replica,
+            "limit": self.limit,
+            "size": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "in_use": self.in_use,
+            "peak_in_use": self.peak_in_use,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "wait_ms": self.wait_ms.snapshot(),
+        }
+
+
+class PoolManager:
+    """Named role pools; roles without a pool fall back to the write (primary) pool."""
+
+    def __init__(self):
+        self.pools: Dict[str, ManagedPool] = {}
+
+    def register(
+        self,
+        role: str,
+        pool: asyncpg.Pool,
+        limit: Optional[int] = None,
+        acquire_timeout: Optional[float] = None,
+        replica: bool = False,
+    ) -> ManagedPool:
+        current = self.pools.get(role)
+        if current is not None and current.pool is pool:
+            return current
+        managed = ManagedPool(role, pool, limit=limit, acquire_timeout=acquire_timeout, replica=replica)
+        self.pools[role] = managed
+        return managed
+
+    def get(self, role: str) -> Optional[ManagedPool]:
+        return self.pools.get(role) or self.pools.get(POOL_WRITE)
+
+    async def close(self, keep: Optional[asyncpg.Pool] = None) -> None:
+        """Close all role pools except keep (closed by its owner)."""
+        closed = set()
+        for role, managed in list(self.pools.items()):
+            if managed.pool is not keep and id(managed.pool) not in closed:
+                closed.add(id(managed.pool))
+                try:
+                    await managed.pool.close()
+                except Exception as e:
+                    logger.error(f"Error closing {role} pool: {e}", exc_info=True)
+        self.pools.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {role: managed.snapshot() for role, managed in self.pools.items()}
+
+
+def get_pool_manager() -> PoolManager:
+    """Get the cross-module pool manager."""
+    storage = _get_pool_storage()
+    if getattr(storage, "manager", None) is None:
+        storage.manager = PoolManager()
+    return storage.manager
+
+
+@contextmanager
+def use_pool(role: str):
+    """
+    Route helper queries in this context (and tasks spawned from it) to a role pool.
+
+    POOL_BATCH sends reads and writes to the batch pool; POOL_WRITE forces reads
+    onto the primary (read-your-writes when a replica is configured).
+    """
+    token = _pool_role.set(role)
+    try:
+        yield
+    finally:
+        _pool_role.reset(token)
+
+
+def get_pool(role: str = POOL_READ):
+    """
+    Get the pool for a role, honouring any use_pool() override.
+
+    Args:
+        role: POOL_READ, POOL_BATCH or POOL_WRITE
+
+    Returns:
+        ManagedPool (or the primary pool when no managed pools exist)
+    """
+    override = _pool_role.get()
+    if override is not None and not (override == POOL_READ and role == POOL_WRITE):
+        role = override
+    managed = get_pool_manager().get(role)
+    if managed is not None:
+        return managed
+    return get_db_pool()
+
+
+async def init_role_pools(
+    database_url: Optional[str] = None,
+    replica_url: Optional[str] = None,
+    command_timeout: float = 60.0,
+) -> Dict[str, ManagedPool]:
+    """
+    Create the read and batch role pools next to the primary pool.
+
+    Sizes come from DB_<ROLE>_POOL_MIN / DB_<ROLE>_POOL_MAX (max 0 disables the
+    pool). The read pool connects to replica_url / DATABASE_REPLICA_URL when set.
+    Failures are logged and the role falls back to the primary pool.
+
+    Returns:
+        Dict of role -> ManagedPool for pools created
+    """
+    database_url = database_url or os.getenv("DATABASE_URL")
+    replica_url = replica_url or os.getenv("DATABASE_REPLICA_URL")
+    manager = get_pool_manager()
+    created = {}
+
+    for role, (default_min, default_max) in ROLE_POOL_DEFAULTS.items():
+        if role in manager.pools:
+            continue
+        prefix = f"DB_{role.upper()}"
+        max_size = _env_number(f"{prefix}_POOL_MAX", default_max)
+        if max_size <= 0:
+            continue
+        min_size = min(_env_number(f"{prefix}_POOL_MIN", default_min), max_size)
+        dsn = replica_url if role == POOL_READ and replica_url else database_url
+        try:
+            pool = await asyncpg.create_pool(
+                dsn,
+                min_size=min_size,
+                max_size=max_size,
+                command_timeout=command_timeout,
+            )
+        except Exception as e:
+            logger.warning(f"Could not create {role} pool, falling back to primary: {e}")
+            continue
+        created[role] = manager.register(
+            role,
+            pool,
+            limit=_env_number(f"{prefix}_POOL_LIMIT", None),
+            acquire_timeout=_env_number(f"{prefix}_ACQUIRE_TIMEOUT", None, float),
+            replica=dsn == replica_url,
+        )
+        logger.info(
+            f"Created {role} pool (min={min_size}, max={max_size}"
+            f"{', replica' if dsn == replica_url else ''})"
+        )
+
+    return created
+
 # ============================================================================
 # Pool Initialization
 # ============================================================================
@@ -79,12 +365,14 @@ async def init_db_pool(
     max_size: int = 20,
     command_timeout: float = 60.0,
     max_inactive_connection_lifetime: float = 300.0,
+    split_pools: bool = True,
 ) -> asyncpg.Pool:
     """
     Initialize database connection pool.
 
     Creates a pool and stores it in cross-module storage for access
-    by all parts of the application.
+    by all parts of the application. This is the primary (write) pool;
+    with split_pools the read and batch role pools are created as well.
 
     Args:
         database_url: PostgreSQL connection URL (default: from DATABASE_URL env)
@@ -92,6 +380,7 @@ async def init_db_pool(
         max_size: Maximum pool size
         command_timeout: Command timeout in seconds
         max_inactive_connection_lifetime: Max inactive connection lifetime
+        split_pools: Also create read/batch role pools (see init_role_pools)
 
     Returns:
         AsyncPG connection pool
@@ -137,8 +426,12 @@ async def init_db_pool(
 
         # Store in cross-module storage
         storage.pool = pool
+        get_pool_manager().register(POOL_WRITE, pool)
         logger.info("✅ Database pool stored in cross-module storage")
-        
+
+        if split_pools:
+            await init_role_pools(database_url, command_timeout=command_timeout)
+
         return pool
 
     except (ValueError, TypeError, KeyError, AttributeError) as e:
@@ -162,12 +455,20 @@ def get_db_pool() -> asyncpg.Pool:
     1. Cross-module storage (primary - works across module boundaries)
     2. Direct import from combined_server (fallback for legacy compatibility)
 
+    Inside use_pool(POOL_BATCH) the batch pool is returned instead, so jobs
+    that take the pool directly stay off the interactive connections.
+
     Returns:
         AsyncPG connection pool
 
     Raises:
         RuntimeError: If pool not initialized
     """
+    if _pool_role.get() == POOL_BATCH:
+        batch = get_pool_manager().pools.get(POOL_BATCH)
+        if batch is not None:
+            return batch
+
     # SOURCE 1: Check cross-module storage (primary method)
     storage = _get_pool_storage()
     if storage.pool is not None:
@@ -211,6 +512,7 @@ async def close_db_pool():
         return
 
     logger.info("Closing database connection pool")
+    await get_pool_manager().close(keep=storage.pool)
     try:
         await storage.pool.close()
         storage.pool = None
@@ -242,15 +544,35 @@ async def get_db_connection():
     async with pool.acquire() as conn:
         yield conn
 
+# Parameterised, transaction-scoped (is_local = true) RLS context
+SET_RLS_USER_SQL = "SELECT set_config('app.user_id', $1, true)"
+
+
+def _rls_user_id(user_id) -> str:
+    """
+    Canonical UUID text for app.user_id.
+
+    Raises:
+        ValueError: If user_id is not a UUID (RLS policies cast it to ::uuid)
+    """
+    try:
+        return str(user_id if isinstance(user_id, UUID) else UUID(str(user_id)))
+    except ValueError:
+        raise ValueError(f"Invalid user_id for RLS context: {user_id!r}") from None
+
+
 @asynccontextmanager
-async def get_db_connection_with_rls(user_id: str):
+async def get_db_connection_with_rls(user_id: str, readonly: bool = False):
     """
     Get database connection with RLS context set (context manager).
 
-    Sets app.user_id session variable for Row-Level Security policies.
+    Sets app.user_id for Row-Level Security policies with a parameterised
+    set_config() inside a transaction. Nested conn.transaction() blocks
+    become savepoints, so services that manage their own transactions work.
 
     Args:
         user_id: User UUID (for RLS filtering)
+        readonly: Open a READ ONLY transaction on the read pool
 
     Usage:
         async with get_db_connection_with_rls(ctx.user_id) as conn:
@@ -261,21 +583,100 @@ async def get_db_connection_with_rls(user_id: str):
         AsyncPG connection with RLS context set
 
     Note:
-        RLS context is transaction-scoped using SET LOCAL, so it automatically
-        resets when the transaction ends. This ensures no RLS bleed between requests.
+        RLS context is transaction-scoped (set_config is_local = true), so it
+        automatically resets when the transaction ends. This ensures no RLS
+        bleed between requests. For plain reads prefer get_rls_read_connection().
     """
-    pool = get_db_pool()
+    rls_user_id = _rls_user_id(user_id)
+    pool = get_pool(POOL_READ if readonly else POOL_WRITE)
     async with pool.acquire() as conn:
-        # Start transaction
-        async with conn.transaction():
-            # Set RLS context (transaction-scoped)
-            await conn.execute(f"SET LOCAL app.user_id = '{user_id}'")
-            logger.debug(f"RLS context set: user_id={user_id}")
+        async with conn.transaction(readonly=readonly):
+            await conn.execute(SET_RLS_USER_SQL, rls_user_id)
+            logger.debug(f"RLS context set: user_id={rls_user_id}")
 
             yield conn
 
         # Transaction ends here, RLS context automatically reset
 
+
+class RLSConnection:
+    """
+    Read-only RLS connection that opens its transaction with the first query.
+
+    BEGIN READ ONLY and set_config go out as one simple-protocol message, so a
+    session costs one extra round trip (plus COMMIT) instead of BEGIN + SET LOCAL
+    + COMMIT, and none at all if it never queries. The only literal sent is
+    the canonical UUID from _rls_user_id() (hex digits and hyphens).
+    """
+
+    _QUERY_METHODS = frozenset(
+        {"fetch", "fetchrow", "fetchval", "execute", "executemany", "prepare", "copy_from_query"}
+    )
+
+    def __init__(self, conn, user_id: str):
+        self._conn = conn
+        self._user_id = _rls_user_id(user_id)
+        self.started = False
+
+    async def ensure_session(self) -> None:
+        """Open the read-only transaction and set app.user_id (once)."""
+        if not self.started:
+            await self._conn.execute(
+                "BEGIN READ ONLY; "
+                f"SELECT set_config('app.user_id', '{self._user_id}', true)"
+            )
+            self.started = True
+
+    async def finish(self, commit: bool = True) -> None:
+        """End the transaction if one was opened."""
+        if self.started:
+            self.started = False
+            await self._conn.execute("COMMIT" if commit else "ROLLBACK")
+
+    def transaction(self, *args, **kwargs):
+        raise RuntimeError(
+            "RLS read connections do not support transactions; use get_db_connection_with_rls()"
+        )
+
+    def __getattr__(self, attr):
+        value = getattr(self._conn, attr)
+        if attr not in self._QUERY_METHODS:
+            return value
+
+        async def call(*args, **kwargs):
+            await self.ensure_session()
+            return await value(*args, **kwargs)
+
+        return call
+
+
+@asynccontextmanager
+async def get_rls_read_connection(user_id: str):
+    """
+    Get a read-only RLS connection from the read pool (context manager).
+
+    Usage:
+        async with get_rls_read_connection(ctx.user_id) as conn:
+            rows = await conn.fetch("SELECT * FROM lots WHERE portfolio_id = $1", portfolio_id)
+
+    Yields:
+        RLSConnection (asyncpg connection API; writes fail as READ ONLY)
+    """
+    rls_user_id = _rls_user_id(user_id)
+    pool = get_pool(POOL_READ)
+    async with pool.acquire() as conn:
+        rls_conn = RLSConnection(conn, rls_user_id)
+        try:
+            yield rls_conn
+        except BaseException:
+            try:
+                await rls_conn.finish(commit=False)
+            except Exception as e:
+                # Connection is reset (ROLLBACK) when released back to the pool
+                logger.debug(f"RLS read rollback failed: {e}")
+            raise
+        await rls_conn.finish()
+
 # ============================================================================
 # Health Check
 # ============================================================================
@@ -306,6 +707,8 @@ async def check_db_health() -> dict:
             "pool_size": pool_size,
             "pool_free": pool_free,
             "pool_in_use": pool_size - pool_free,
+            "slow_queries": sum(e.slow for e in get_query_stats().entries.values()),
+            "pools": get_pool_manager().snapshot(),
         }
 
     except (ValueError, TypeError, KeyError, AttributeError) as e:
@@ -327,78 +730,66 @@ async def check_db_health() -> dict:
 # Database Utilities
 # ============================================================================
 
-async def execute_query(query: str, *args, timeout: Optional[float] = None) -> list:
+async def execute_query(
+    query: Union[str, NamedQuery], *args, timeout: Optional[float] = None
+) -> list:
     """
     Execute query and return all rows.
 
     Args:
-        query: SQL query
+        query: SQL query or NamedQuery (prepared and tracked by name)
         *args: Query parameters
         timeout: Query timeout (default: use pool default)
 
     Returns:
         List of Record objects
     """
-    async with get_db_connection() as conn:
-        if timeout:
-            return await conn.fetch(query, *args, timeout=timeout)
-        else:
-            return await conn.fetch(query, *args)
+    return await run_query(get_pool(POOL_READ), "fetch", query, *args, timeout=timeout)
 
 async def execute_query_one(
-    query: str, *args, timeout: Optional[float] = None
+    query: Union[str, NamedQuery], *args, timeout: Optional[float] = None
 ) -> Optional[asyncpg.Record]:
     """
     Execute query and return first row.
 
     Args:
-        query: SQL query
+        query: SQL query or NamedQuery (prepared and tracked by name)
         *args: Query parameters
         timeout: Query timeout (default: use pool default)
 
     Returns:
         Record object or None if no results
     """
-    async with get_db_connection() as conn:
-        if timeout:
-            return await conn.fetchrow(query, *args, timeout=timeout)
-        else:
-            return await conn.fetchrow(query, *args)
+    return await run_query(get_pool(POOL_READ), "fetchrow", query, *args, timeout=timeout)
 
 async def execute_query_value(
-    query: str, *args, timeout: Optional[float] = None
+    query: Union[str, NamedQuery], *args, timeout: Optional[float] = None
 ) -> Optional[any]:
     """
     Execute query and return single value.
 
     Args:
-        query: SQL query
+        query: SQL query or NamedQuery (prepared and tracked by name)
         *args: Query parameters
         timeout: Query timeout (default: use pool default)
 
     Returns:
         Single value or None if no results
     """
-    async with get_db_connection() as conn:
-        if timeout:
-            return await conn.fetchval(query, *args, timeout=timeout)
-        else:
-            return await conn.fetchval(query, *args)
+    return await run_query(get_pool(POOL_READ), "fetchval", query, *args, timeout=timeout)
 
-async def execute_statement(query: str, *args, timeout: Optional[float] = None) -> str:
+async def execute_statement(
+    query: Union[str, NamedQuery], *args, timeout: Optional[float] = None
+) -> str:
     """
     Execute statement (INSERT/UPDATE/DELETE).
 
     Args:
-        query: SQL statement
+        query: SQL statement or NamedQuery (tracked by name)
         *args: Query parameters
         timeout: Query timeout (default: use pool default)
 
     Returns:
         Status string (e.g., "UPDATE 1")
     """
-    async with get_db_connection() as conn:
-        if timeout:
-            return await conn.execute(query, *args, timeout=timeout)
-        else:
-            return await conn.execute(query, *args)
\ No newline at end of file
+    return await run_query(get_pool(POOL_WRITE), "execute", query, *args, timeout=timeout)
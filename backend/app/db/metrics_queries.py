@@ -19,7 +19,7 @@
     # Get historical metrics
     history = await queries.get_metrics_history(portfolio_id, start_date, end_date)
 
-    # Get rolling metrics from continuous aggregates
+    # Get rolling metrics (incrementally maintained portfolio_rolling_stats)
     rolling = await queries.get_rolling_metrics_30d(portfolio_id, asof_date)
 
 Testing:
@@ -636,14 +636,14 @@ async def get_factor_exposures(
         return dict(row)
 
     # ========================================================================
-    # Continuous Aggregate Queries (Rolling Metrics)
+    # Rolling Metrics (portfolio_rolling_stats, see services/rolling_stats.py)
     # ========================================================================
 
     async def get_rolling_metrics_30d(
         self, portfolio_id: UUID, asof_date: date
     ) -> Optional[Dict[str, Any]]:
         """
-        Get 30-day rolling metrics from continuous aggregate.
+        Get 30-day rolling metrics (single-row read of portfolio_rolling_stats).
 
         Args:
             portfolio_id: Portfolio UUID
@@ -663,9 +663,12 @@ async def get_rolling_metrics_30d(
             }
 
         query = """
-            SELECT *
-            FROM portfolio_metrics_30d_rolling
-            WHERE portfolio_id = $1 AND day = $2
+            SELECT portfolio_id, asof_date AS day,
+                   mean_return AS avg_return_30d,
+                   volatility AS volatility_30d_realized,
+                   drawdown AS drawdown_30d
+            FROM portfolio_rolling_stats
+            WHERE portfolio_id = $1 AND window_days = 30 AND asof_date = $2
         """
         row = await execute_query_one(query, portfolio_id, asof_date)
 
@@ -677,7 +680,7 @@ async def get_rolling_metrics_30d(
     async def get_rolling_metrics_60d(
         self, portfolio_id: UUID, asof_date: date
     ) -> Optional[Dict[str, Any]]:
-        """Get 60-day rolling metrics from continuous aggregate."""
+        """Get 60-day rolling metrics (single-row read of portfolio_rolling_stats)."""
         if not self.use_db:
             logger.warning("get_rolling_metrics_60d: Using stub")
             return {
@@ -688,9 +691,11 @@ async def get_rolling_metrics_60d(
             }
 
         query = """
-            SELECT *
-            FROM portfolio_metrics_60d_rolling
-            WHERE portfolio_id = $1 AND day = $2
+            SELECT portfolio_id, asof_date AS day,
+                   mean_return AS avg_return_60d,
+                   volatility AS volatility_60d_realized
+            FROM portfolio_rolling_stats
+            WHERE portfolio_id = $1 AND window_days = 60 AND asof_date = $2
         """
         row = await execute_query_one(query, portfolio_id, asof_date)
 
@@ -702,7 +707,7 @@ async def get_rolling_metrics_60d(
     async def get_sharpe_90d(
         self, portfolio_id: UUID, asof_date: date
     ) -> Optional[Dict[str, Any]]:
-        """Get 90-day Sharpe ratio from continuous aggregate."""
+        """Get 90-day Sharpe ratio (single-row read of portfolio_rolling_stats)."""
         if not self.use_db:
             logger.warning("get_sharpe_90d: Using stub")
             return {
@@ -713,9 +718,11 @@ async def get_sharpe_90d(
             }
 
         query = """
-            SELECT *
-            FROM portfolio_metrics_90d_sharpe
-            WHERE portfolio_id = $1 AND day = $2
+            SELECT portfolio_id, asof_date AS day,
+                   mean_return AS avg_return_90d,
+                   sharpe AS sharpe_90d_realized
+            FROM portfolio_rolling_stats
+            WHERE portfolio_id = $1 AND window_days = 90 AND asof_date = $2
         """
         row = await execute_query_one(query, portfolio_id, asof_date)
 
@@ -727,7 +734,7 @@ async def get_sharpe_90d(
     async def get_beta_1y(
         self, portfolio_id: UUID, asof_date: date
     ) -> Optional[Dict[str, Any]]:
-        """Get 1-year beta/alpha from continuous aggregate."""
+        """Get 1-year beta/alpha (single-row read of portfolio_rolling_stats)."""
         if not self.use_db:
             logger.warning("get_beta_1y: Using stub")
             return {
@@ -738,9 +745,11 @@ async def get_beta_1y(
             }
 
         query = """
-            SELECT *
-            FROM portfolio_metrics_1y_beta
-            WHERE portfolio_id = $1 AND day = $2
+            SELECT portfolio_id, asof_date AS day,
+                   beta AS avg_beta_1y,
+                   alpha AS avg_alpha_1y
+            FROM portfolio_rolling_stats
+            WHERE portfolio_id = $1 AND window_days = 252 AND asof_date = $2
         """
         row = await execute_query_one(query, portfolio_id, asof_date)
 
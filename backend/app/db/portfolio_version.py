@@ -0,0 +1,67 @@
+"""
+Portfolio Data Version
+
+Purpose: Version stamps that move whenever ledger data is written, for cache keys and ETags
+Created: 2025-11-10
+Priority: P1 (Cached results must not outlive a trade)
+
+RequestCtx.ledger_commit_hash names the Beancount ledger commit (or a
+placeholder), neither of which changes when trades are recorded in Postgres.
+Anything cached across requests on portfolio data (pattern results, stored
+factor exposures, ETags) is therefore also keyed by one of these stamps:
+
+    portfolio_data_version: one portfolio's transactions (count + last
+        insert/update, so deletes count too) and daily values (last
+        recompute, which covers backdated trades and restated prices once
+        the valuation job has rerun)
+    ledger_data_version: all transactions (coarse, for process-wide versions)
+
+Usage:
+    version = await portfolio_data_version(pool_or_conn, portfolio_id)
+    key = f"{pattern_id}:{ctx.pricing_pack_id}:{version}:..."
+"""
+
+import hashlib
+from typing import Any, Optional
+from uuid import UUID
+
+from app.db.query_registry import fetchrow_named, register_query
+
+PORTFOLIO_DATA_VERSION = register_query(
+    "portfolio.data_version",
+    """
+    SELECT
+        (SELECT COUNT(*) FROM transactions WHERE portfolio_id = $1) AS transactions,
+        (SELECT MAX(updated_at) FROM transactions WHERE portfolio_id = $1) AS transactions_updated,
+        (SELECT MAX(computed_at) FROM portfolio_daily_values WHERE portfolio_id = $1) AS values_computed
+    """,
+)
+
+LEDGER_DATA_VERSION = register_query(
+    "ledger.data_version",
+    """
+    SELECT COUNT(*) AS transactions, MAX(updated_at) AS transactions_updated
+    FROM transactions
+    """,
+)
+
+
+def _stamp(*parts: Any) -> str:
+    material = "|".join("" if part is None else str(part) for part in parts)
+    return hashlib.md5(material.encode()).hexdigest()[:12]
+
+
+async def portfolio_data_version(db, portfolio_id: Any) -> str:
+    """Stamp of one portfolio's transactions and daily values."""
+    if not isinstance(portfolio_id, UUID):
+        portfolio_id = UUID(str(portfolio_id))
+    row = await fetchrow_named(db, PORTFOLIO_DATA_VERSION, portfolio_id)
+    return _stamp(row["transactions"], row["transactions_updated"], row["values_computed"])
+
+
+async def ledger_data_version(db) -> Optional[str]:
+    """Stamp of all transactions (None without a database)."""
+    if db is None:
+        return None
+    row = await fetchrow_named(db, LEDGER_DATA_VERSION)
+    return _stamp(row["transactions"], row["transactions_updated"])
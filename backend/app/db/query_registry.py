@@ -0,0 +1,436 @@
+"""
+Named Query Registry and Instrumentation
+
+Purpose: Declare hot SQL once, reuse server-side plans, record per-query latency
+Created: 2025-11-10
+Priority: P1 (Query-level observability under load)
+
+Features:
+    - NamedQuery: SQL declared once with a stable identifier (e.g. "pricing.prices_for_securities")
+    - Plan reuse through asyncpg's per-connection statement cache (identical SQL text)
+    - Per-query histograms: latency, rows returned/affected, pool wait time
+    - Query time reported to profiled pattern runs (per-step db_seconds)
+    - Export to the observability metrics registry when available
+    - Slow-query log with optional EXPLAIN capture and plan-cost regression warnings
+
+Configuration (environment):
+    DB_SLOW_QUERY_MS=500          Slow-query threshold in milliseconds
+    DB_SLOW_QUERY_EXPLAIN=false   Capture EXPLAIN (FORMAT JSON) for slow named queries
+
+Usage:
+    from app.db.query_registry import register_query, fetch_named
+
+    DAILY_VALUES = register_query(
+        "metrics.daily_values",
+        "SELECT valuation_date, total_value FROM portfolio_daily_values WHERE portfolio_id = $1",
+    )
+
+    rows = await fetch_named(pool_or_conn, DAILY_VALUES, portfolio_id)
+
+    # connection.py helpers also accept NamedQuery:
+    rows = await execute_query(DAILY_VALUES, portfolio_id)
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import asyncpg
+
+from app.core.profiling import record_db_time
+
+logger = logging.getLogger("DawsOS.Database")
+
+# Optional import for observability (graceful degradation)
+try:
+    from observability.metrics import get_metrics
+except ImportError:
+    def get_metrics():
+        """Fallback metrics function when observability not available"""
+        return None
+
+UNNAMED_QUERY = "unnamed"
+
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+WAIT_BUCKETS_MS = LATENCY_BUCKETS_MS
+
+SLOW_QUERY_LOG_SIZE = 100
+EXPLAIN_INTERVAL_SECONDS = 300.0
+PLAN_REGRESSION_FACTOR = 2.0
+
+
+# ============================================================================
+# Registry
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    """SQL statement with a stable identifier."""
+    name: str
+    sql: str
+    description: str = ""
+
+
+class QueryRegistry:
+    """Process-wide catalogue of named queries."""
+
+    def __init__(self):
+        self._queries: Dict[str, NamedQuery] = {}
+
+    def register(self, name: str, sql: str, description: str = "") -> NamedQuery:
+        """
+        Declare a named query.
+
+        Re-registering the same name with identical SQL returns the existing
+        entry (module reloads); different SQL under an existing name raises.
+
+        Raises:
+            ValueError: If name is already registered with different SQL
+        """
+        sql = sql.strip()
+        existing = self._queries.get(name)
+        if existing is not None:
+            if existing.sql != sql:
+                raise ValueError(f"Query '{name}' already registered with different SQL")
+            return existing
+        query = NamedQuery(name=name, sql=sql, description=description)
+        self._queries[name] = query
+        return query
+
+    def get(self, name: str) -> NamedQuery:
+        """Look up a named query (KeyError if unknown)."""
+        return self._queries[name]
+
+    def names(self) -> List[str]:
+        return sorted(self._queries)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._queries
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+
+_registry = QueryRegistry()
+
+
+def get_query_registry() -> QueryRegistry:
+    """Get the process-wide query registry."""
+    return _registry
+
+
+def register_query(name: str, sql: str, description: str = "") -> NamedQuery:
+    """Declare a named query in the process-wide registry."""
+    return _registry.register(name, sql, description)
+
+
+# ============================================================================
+# Statistics
+# ============================================================================
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative counts exported as a dict)."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last = +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound containing the q-quantile (None if empty)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return float(bound)
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": round(self.max, 3),
+        }
+
+
+@dataclass
+class QueryStatsEntry:
+    """Histograms for one query name."""
+    latency_ms: Histogram = field(default_factory=lambda: Histogram(LATENCY_BUCKETS_MS))
+    rows: Histogram = field(default_factory=lambda: Histogram(ROW_BUCKETS))
+    pool_wait_ms: Histogram = field(default_factory=lambda: Histogram(WAIT_BUCKETS_MS))
+    errors: int = 0
+    slow: int = 0
+
+
+class QueryStats:
+    """Per-query histograms and slow-query log."""
+
+    def __init__(self, slow_query_ms: Optional[float] = None, explain_slow: Optional[bool] = None):
+        self.slow_query_ms = (
+            float(os.getenv("DB_SLOW_QUERY_MS", "500")) if slow_query_ms is None else slow_query_ms
+        )
+        self.explain_slow = (
+            os.getenv("DB_SLOW_QUERY_EXPLAIN", "false").lower() == "true"
+            if explain_slow is None else explain_slow
+        )
+        self.entries: Dict[str, QueryStatsEntry] = {}
+        self.slow_queries: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+        self._last_explain: Dict[str, float] = {}
+        self._plan_costs: Dict[str, float] = {}
+
+    def record(
+        self,
+        name: str,
+        duration_ms: float,
+        rows: int,
+        pool_wait_ms: Optional[float] = None,
+        error: bool = False,
+    ) -> bool:
+        """
+        Record one execution.
+
+        Returns:
+            True if the execution exceeded the slow-query threshold
+        """
+        entry = self.entries.setdefault(name, QueryStatsEntry())
+        entry.latency_ms.observe(duration_ms)
+        if error:
+            entry.errors += 1
+        else:
+            entry.rows.observe(rows)
+        if pool_wait_ms is not None:
+            entry.pool_wait_ms.observe(pool_wait_ms)
+
+        metrics = get_metrics()
+        if metrics:
+            self._export(metrics, name, duration_ms, rows, pool_wait_ms, error)
+
+        slow = duration_ms >= self.slow_query_ms
+        if slow:
+            entry.slow += 1
+        return slow
+
+    @staticmethod
+    def _export(metrics, name, duration_ms, rows, pool_wait_ms, error) -> None:
+        """Mirror observations into the observability registry (if it exposes them)."""
+        status = "error" if error else "success"
+        duration = getattr(metrics, "db_query_duration", None)
+        if duration is not None:
+            duration.labels(query=name, status=status).observe(duration_ms / 1000)
+        row_hist = getattr(metrics, "db_query_rows", None)
+        if row_hist is not None and not error:
+            row_hist.labels(query=name).observe(rows)
+        wait_hist = getattr(metrics, "db_pool_wait", None)
+        if wait_hist is not None and pool_wait_ms is not None:
+            wait_hist.labels(query=name).observe(pool_wait_ms / 1000)
+
+    def log_slow(self, name: str, sql: str, duration_ms: float, rows: int, pool_wait_ms) -> Dict[str, Any]:
+        record = {
+            "query": name,
+            "duration_ms": round(duration_ms, 2),
+            "rows": rows,
+            "pool_wait_ms": round(pool_wait_ms, 2) if pool_wait_ms is not None else None,
+            "timestamp": time.time(),
+            "sql": sql if name == UNNAMED_QUERY else None,
+            "plan": None,
+        }
+        self.slow_queries.append(record)
+        logger.warning(
+            f"Slow query {name}: {duration_ms:.1f}ms rows={rows}"
+            + (f" pool_wait={pool_wait_ms:.1f}ms" if pool_wait_ms is not None else "")
+            + (f" sql={' '.join(sql.split())[:200]}" if name == UNNAMED_QUERY else "")
+        )
+        return record
+
+    def should_explain(self, name: str) -> bool:
+        """Throttle EXPLAIN capture to once per EXPLAIN_INTERVAL_SECONDS per query."""
+        if not self.explain_slow or name == UNNAMED_QUERY:
+            return False
+        now = time.monotonic()
+        last = self._last_explain.get(name)
+        if last is not None and now - last < EXPLAIN_INTERVAL_SECONDS:
+            return False
+        self._last_explain[name] = now
+        return True
+
+    def record_plan(self, name: str, plan: Any, record: Dict[str, Any]) -> None:
+        """Store a captured plan and warn when estimated cost jumps."""
+        record["plan"] = plan
+        try:
+            cost = float(plan[0]["Plan"]["Total Cost"])
+        except (TypeError, KeyError, IndexError, ValueError):
+            return
+        previous = self._plan_costs.get(name)
+        if previous and cost > previous * PLAN_REGRESSION_FACTOR:
+            logger.warning(
+                f"Plan regression for {name}: estimated cost {previous:.1f} → {cost:.1f}"
+            )
+        self._plan_costs[name] = cost
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view (for /metrics and diagnostics)."""
+        return {
+            "slow_query_ms": self.slow_query_ms,
+            "queries": {
+                name: {
+                    "latency_ms": entry.latency_ms.snapshot(),
+                    "rows": entry.rows.snapshot(),
+                    "pool_wait_ms": entry.pool_wait_ms.snapshot(),
+                    "errors": entry.errors,
+                    "slow": entry.slow,
+                }
+                for name, entry in sorted(self.entries.items())
+            },
+            "recent_slow": list(self.slow_queries)[-10:],
+        }
+
+    def reset(self) -> None:
+        self.entries.clear()
+        self.slow_queries.clear()
+        self._last_explain.clear()
+        self._plan_costs.clear()
+
+
+_stats = QueryStats()
+
+
+def get_query_stats() -> QueryStats:
+    """Get the process-wide query statistics."""
+    return _stats
+
+
+# ============================================================================
+# Execution
+# ============================================================================
+
+def _row_count(mode: str, result: Any) -> int:
+    if mode == "fetch":
+        return len(result)
+    if mode == "fetchrow":
+        return 0 if result is None else 1
+    if mode == "fetchval":
+        return 0 if result is None else 1
+    # execute: status string such as "UPDATE 3" / "INSERT 0 5"
+    try:
+        return int(str(result).rsplit(" ", 1)[-1])
+    except ValueError:
+        return 0
+
+
+async def _run_on_connection(conn, mode: str, query: Union[str, NamedQuery], args, timeout):
+    # asyncpg prepares each distinct SQL text once per underlying connection
+    # (statement_cache_size) and re-prepares on schema changes. Explicit
+    # conn.prepare() statements are bound to one pool acquisition and cannot
+    # be reused after the connection is released, so they are not cached here.
+    sql = query.sql if isinstance(query, NamedQuery) else query
+    return await getattr(conn, mode)(sql, *args, timeout=timeout)
+
+
+async def run_query(
+    db,
+    mode: str,
+    query: Union[str, NamedQuery],
+    *args,
+    timeout: Optional[float] = None,
+) -> Any:
+    """
+    Execute a query on a pool or connection with instrumentation.
+
+    Args:
+        db: asyncpg Pool (a connection is acquired) or connection
+        mode: "fetch", "fetchrow", "fetchval" or "execute"
+        query: NamedQuery (tracked by name) or raw SQL ("unnamed")
+        *args: Query parameters
+        timeout: Query timeout (default: pool/connection default)
+
+    Returns:
+        Result of the corresponding asyncpg method
+    """
+    name = query.name if isinstance(query, NamedQuery) else UNNAMED_QUERY
+    sql = query.sql if isinstance(query, NamedQuery) else query
+    pool = db if hasattr(db, "acquire") else None
+    pool_wait_ms = None
+    started = time.perf_counter()
+    result = None
+    error = False
+
+    try:
+        if pool is not None:
+            async with pool.acquire() as conn:
+                acquired = time.perf_counter()
+                pool_wait_ms = (acquired - started) * 1000
+                started = acquired
+                result = await _run_on_connection(conn, mode, query, args, timeout)
+        else:
+            result = await _run_on_connection(db, mode, query, args, timeout)
+        return result
+    except Exception:
+        error = True
+        raise
+    finally:
+        duration_ms = (time.perf_counter() - started) * 1000
+        record_db_time((duration_ms + (pool_wait_ms or 0)) / 1000)
+        rows = 0 if error else _row_count(mode, result)
+        if _stats.record(name, duration_ms, rows, pool_wait_ms, error) and not error:
+            record = _stats.log_slow(name, sql, duration_ms, rows, pool_wait_ms)
+            if pool is not None and _stats.should_explain(name):
+                asyncio.ensure_future(_capture_explain(pool, name, sql, args, record))
+
+
+async def _capture_explain(pool, name: str, sql: str, args, record: Dict[str, Any]) -> None:
+    """EXPLAIN (no ANALYZE, so the statement is not executed again) a slow query."""
+    try:
+        async with pool.acquire() as conn:
+            plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {sql}", *args)
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        _stats.record_plan(name, plan, record)
+        logger.info(f"Captured plan for slow query {name}")
+    except Exception as e:
+        logger.debug(f"EXPLAIN capture failed for {name}: {e}")
+
+
+async def fetch_named(db, query: Union[str, NamedQuery], *args, timeout: Optional[float] = None) -> list:
+    """Instrumented fetch (all rows)."""
+    return await run_query(db, "fetch", query, *args, timeout=timeout)
+
+
+async def fetchrow_named(
+    db, query: Union[str, NamedQuery], *args, timeout: Optional[float] = None
+) -> Optional[asyncpg.Record]:
+    """Instrumented fetchrow (first row or None)."""
+    return await run_query(db, "fetchrow", query, *args, timeout=timeout)
+
+
+async def fetchval_named(db, query: Union[str, NamedQuery], *args, timeout: Optional[float] = None) -> Any:
+    """Instrumented fetchval (single value or None)."""
+    return await run_query(db, "fetchval", query, *args, timeout=timeout)
+
+
+async def execute_named(db, query: Union[str, NamedQuery], *args, timeout: Optional[float] = None) -> str:
+    """Instrumented execute (status string)."""
+    return await run_query(db, "execute", query, *args, timeout=timeout)
@@ -54,6 +54,7 @@
 """
 
 import logging
+import os
 import httpx
 from typing import Dict, List, Optional, Any
 from datetime import datetime, date
@@ -81,11 +82,12 @@ def __init__(self, api_key: str, base_url: str = "https://financialmodelingprep.
 
         Args:
             api_key: FMP API key
-            base_url: FMP base URL (default: https://financialmodelingprep.com/api)
+            base_url: FMP base URL (default: https://financialmodelingprep.com/api);
+                overridden by FMP_BASE_URL
         """
         config = ProviderConfig(
             name="FMP",
-            base_url=base_url,
+            base_url=os.getenv("FMP_BASE_URL", base_url),
             rate_limit_rpm=FMP_RATE_LIMIT_REQUESTS,  # From FMP API documentation
             max_retries=DEFAULT_MAX_RETRIES,
             retry_base_delay=DEFAULT_RETRY_DELAY,
@@ -176,6 +178,32 @@ async def get_profile(self, symbol: str) -> Dict:
         else:
             raise ProviderError(f"Unexpected response format for {symbol}")
 
+    @rate_limit(requests_per_minute=120)
+    async def get_profiles(self, symbols: List[str]) -> List[Dict]:
+        """
+        Get company profiles for several symbols in one request (bulk endpoint).
+
+        Args:
+            symbols: List of stock ticker symbols (max 100 per request)
+
+        Returns:
+            List of profile dicts (same fields as get_profile); symbols FMP does
+            not know are simply absent
+
+        Raises:
+            ValueError: If more than 100 symbols requested
+        """
+        if len(symbols) > 100:
+            raise ValueError(f"FMP profile endpoint limited to 100 symbols, got {len(symbols)}")
+
+        url = f"{self.config.base_url}/v3/profile/{','.join(symbols)}"
+        params = {"apikey": self.api_key}
+
+        response = await self._request("GET", url, params=params)
+        if isinstance(response, dict):
+            return [response]
+        return response or []
+
     @rate_limit(requests_per_minute=120)
     async def get_income_statement(
         self, symbol: str, period: str = "annual", limit: int = 5
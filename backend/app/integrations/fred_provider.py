@@ -31,6 +31,7 @@
 """
 
 import logging
+import os
 import httpx
 from typing import Dict, List, Optional, Any
 from datetime import datetime, date, timedelta
@@ -105,11 +106,12 @@ def __init__(self, api_key: str, base_url: str = "https://api.stlouisfed.org/fre
 
         Args:
             api_key: FRED API key (free from https://fred.stlouisfed.org/docs/api/api_key.html)
-            base_url: FRED base URL (default: https://api.stlouisfed.org/fred)
+            base_url: FRED base URL (default: https://api.stlouisfed.org/fred);
+                overridden by FRED_BASE_URL
         """
         config = ProviderConfig(
             name="FRED",
-            base_url=base_url,
+            base_url=os.getenv("FRED_BASE_URL", base_url),
             rate_limit_rpm=FRED_RATE_LIMIT_REQUESTS,  # From FRED API documentation
             max_retries=DEFAULT_MAX_RETRIES,
             retry_base_delay=DEFAULT_RETRY_DELAY,
@@ -28,6 +28,7 @@
 """
 
 import logging
+import os
 import httpx
 from typing import Dict, List, Optional, Any
 from datetime import datetime, date, timedelta
@@ -64,7 +65,8 @@ def __init__(
         Args:
             api_key: NewsAPI key
             tier: "dev" (free, metadata-only) or "business" (paid, full export)
-            base_url: NewsAPI base URL (default: https://newsapi.org/v2)
+            base_url: NewsAPI base URL (default: https://newsapi.org/v2);
+                overridden by NEWSAPI_BASE_URL
         """
         # Tier-specific configuration
         if tier == "dev":
@@ -78,7 +80,7 @@ def __init__(
 
         config = ProviderConfig(
             name=f"NewsAPI-{tier}",
-            base_url=base_url,
+            base_url=os.getenv("NEWSAPI_BASE_URL", base_url),
             rate_limit_rpm=rate_limit_rpm,
             max_retries=DEFAULT_MAX_RETRIES,
             retry_base_delay=DEFAULT_RETRY_DELAY,
@@ -26,6 +26,7 @@
 """
 
 import logging
+import os
 import httpx
 from typing import Dict, List, Optional, Any
 from datetime import datetime, date, timedelta
@@ -53,11 +54,12 @@ def __init__(self, api_key: str, base_url: str = "https://api.polygon.io"):
 
         Args:
             api_key: Polygon API key
-            base_url: Polygon base URL (default: https://api.polygon.io)
+            base_url: Polygon base URL (default: https://api.polygon.io);
+                overridden by POLYGON_BASE_URL
         """
         config = ProviderConfig(
             name="Polygon",
-            base_url=base_url,
+            base_url=os.getenv("POLYGON_BASE_URL", base_url),
             rate_limit_rpm=POLYGON_RATE_LIMIT_REQUESTS,  # From Polygon API documentation
             max_retries=DEFAULT_MAX_RETRIES,
             retry_base_delay=DEFAULT_RETRY_DELAY,
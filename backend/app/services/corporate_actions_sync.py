@@ -4,13 +4,24 @@
 Automatically fetches and processes corporate actions (dividends, splits) 
 from FMP API for portfolio holdings.
 
+Bulk Sync (2025-11-10):
+    BulkCorporateActionsSync applies a whole calendar window to every portfolio
+    (or a subset) with a fixed number of statements:
+        1. Lots for all calendar symbols (resolves symbols, holdings, base currency)
+        2. Already-recorded DIVIDEND/SPLIT transactions in the window (dedupe)
+        3. FX rates for all needed (pair, pay date) combinations
+        4. COPY of new DIVIDEND/SPLIT transactions into a staging table + one INSERT
+        5. One set-based UPDATE applying split ratios to all affected open lots
+
 Created: 2025-11-06
 """
 
-from uuid import UUID
+import asyncio
+from uuid import UUID, uuid4
+from dataclasses import dataclass
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import asyncpg
 import logging
 import os
@@ -505,4 +516,428 @@ async def sync_all(
             "dry_run": dry_run,
             "dividends": dividends_result,
             "splits": splits_result
-        }
\ No newline at end of file
+        }
+
+
+# ============================================================================
+# Bulk Sync
+# ============================================================================
+
+
+@dataclass
+class DividendEvent:
+    """Dividend announcement parsed from the FMP dividend calendar."""
+    symbol: str
+    ex_date: date
+    pay_date: date
+    amount: Decimal
+    currency: str
+
+
+@dataclass
+class SplitEvent:
+    """Stock split parsed from the FMP split calendar."""
+    symbol: str
+    split_date: date
+    ratio: Decimal
+    ratio_str: str
+
+
+def parse_dividend_calendar(dividends: List[Dict[str, Any]]) -> List[DividendEvent]:
+    """Parse FMP dividend calendar rows, skipping malformed entries."""
+    events = []
+    for dividend in dividends:
+        try:
+            # FMP uses "date" field for ex-dividend date
+            ex_date = datetime.strptime(dividend["date"], "%Y-%m-%d").date()
+            pay_date = (
+                datetime.strptime(dividend["paymentDate"], "%Y-%m-%d").date()
+                if dividend.get("paymentDate") else ex_date + timedelta(days=3)
+            )
+            amount = Decimal(str(dividend["dividend"]))
+        except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+            logger.debug(f"Skipping malformed dividend calendar row {dividend}: {e}")
+            continue
+        if not dividend.get("symbol") or amount <= 0:
+            continue
+        events.append(DividendEvent(
+            symbol=dividend["symbol"],
+            ex_date=ex_date,
+            pay_date=max(pay_date, ex_date),
+            amount=amount,
+            currency=dividend.get("currency") or "USD",
+        ))
+    return events
+
+
+def parse_split_calendar(splits: List[Dict[str, Any]]) -> List[SplitEvent]:
+    """Parse FMP split calendar rows, skipping malformed entries."""
+    events = []
+    for split in splits:
+        try:
+            # FMP uses "date" field for split date
+            split_date = datetime.strptime(split["date"], "%Y-%m-%d").date()
+            numerator = split.get("numerator", 1)
+            denominator = split.get("denominator", 1)
+            ratio = Decimal(str(numerator)) / Decimal(str(denominator))
+        except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+            logger.debug(f"Skipping malformed split calendar row {split}: {e}")
+            continue
+        if not split.get("symbol") or ratio <= 0:
+            continue
+        events.append(SplitEvent(
+            symbol=split["symbol"],
+            split_date=split_date,
+            ratio=ratio,
+            ratio_str=f"{numerator}:{denominator}",
+        ))
+    return events
+
+
+def shares_held_on(lots: List[Dict[str, Any]], target_date: date) -> Decimal:
+    """
+    Shares held on a date from a portfolio's lots for one symbol.
+
+    In-memory equivalent of CorporateActionsSyncService._get_shares_on_date:
+    lots acquired on/before the date and not closed by it count in full.
+    """
+    total = Decimal("0")
+    for lot in lots:
+        if lot["acquisition_date"] > target_date:
+            continue
+        if lot["closed_date"] is None or lot["closed_date"] > target_date:
+            total += lot["quantity_original"]
+    return total
+
+
+def plan_split_adjustments(
+    lots: List[Dict[str, Any]],
+    splits: List[SplitEvent],
+) -> Dict[UUID, Decimal]:
+    """
+    Cumulative split ratio per open lot.
+
+    Matches CorporateActionsService.record_split: every currently open lot of
+    the symbol is adjusted. Several splits of one symbol in the window compound.
+
+    Returns:
+        Dict mapping lot id → combined ratio
+    """
+    ratios: Dict[UUID, Decimal] = {}
+    for split in splits:
+        for lot in lots:
+            if lot["quantity_open"] > 0:
+                ratios[lot["id"]] = ratios.get(lot["id"], Decimal("1")) * split.ratio
+    return ratios
+
+
+class BulkCorporateActionsSync:
+    """
+    Set-based corporate actions sync for many portfolios at once.
+
+    Intended for the daily full-universe job (non-RLS job connection), but
+    works on an RLS connection too: only visible portfolios are touched.
+    """
+
+    TRANSACTION_COLUMNS = (
+        "id", "portfolio_id", "transaction_type", "security_id", "symbol",
+        "transaction_date", "ex_date", "pay_date", "quantity", "price", "amount",
+        "currency", "fee", "pay_fx_rate_id", "narration",
+    )
+
+    def __init__(self, conn: asyncpg.Connection, provider: Optional[FMPProvider] = None):
+        """
+        Initialize bulk sync.
+
+        Args:
+            conn: Database connection
+            provider: FMP provider (default: created from FMP_API_KEY)
+        """
+        self.conn = conn
+        self.provider = provider
+
+    async def fetch_calendar(
+        self, from_date: date, to_date: date
+    ) -> Tuple[List[DividendEvent], List[SplitEvent]]:
+        """Fetch dividend and split calendars for the window concurrently."""
+        if self.provider is None:
+            api_key = os.getenv("FMP_API_KEY")
+            if not api_key:
+                raise ValueError("FMP_API_KEY not configured")
+            self.provider = FMPProvider(api_key=api_key)
+
+        dividends, splits = await asyncio.gather(
+            self.provider.get_dividend_calendar(from_date, to_date),
+            self.provider.get_split_calendar(from_date, to_date),
+        )
+        return parse_dividend_calendar(dividends or []), parse_split_calendar(splits or [])
+
+    async def sync_window(
+        self,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        portfolio_ids: Optional[List[UUID]] = None,
+        dry_run: bool = False,
+        dividends: Optional[List[DividendEvent]] = None,
+        splits: Optional[List[SplitEvent]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Apply a calendar window of dividends and splits to all holdings.
+
+        Args:
+            from_date: Start date (default: 30 days ago)
+            to_date: End date (default: 30 days future)
+            portfolio_ids: Restrict to these portfolios (default: all active portfolios)
+            dry_run: If True, compute but don't write
+            dividends: Pre-fetched dividend events (default: fetched from FMP)
+            splits: Pre-fetched split events (default: fetched from FMP)
+
+        Returns:
+            Dict with counts of recorded/skipped dividends, splits and adjusted lots
+        """
+        if not from_date:
+            from_date = date.today() - timedelta(days=30)
+        if not to_date:
+            to_date = date.today() + timedelta(days=30)
+
+        if dividends is None or splits is None:
+            fetched_dividends, fetched_splits = await self.fetch_calendar(from_date, to_date)
+            dividends = fetched_dividends if dividends is None else dividends
+            splits = fetched_splits if splits is None else splits
+
+        symbols = sorted({e.symbol for e in dividends} | {e.symbol for e in splits})
+        summary: Dict[str, Any] = {
+            "date_range": {"from": from_date.isoformat(), "to": to_date.isoformat()},
+            "dry_run": dry_run,
+            "dividends_found": len(dividends),
+            "splits_found": len(splits),
+            "dividends_recorded": 0,
+            "dividends_skipped": 0,
+            "splits_recorded": 0,
+            "splits_skipped": 0,
+            "lots_adjusted": 0,
+            "portfolios_affected": 0,
+            "errors": [],
+        }
+        if not symbols:
+            return summary
+
+        # 1. Lots for every calendar symbol (also resolves symbol → security)
+        lots_by_key = await self._load_lots(symbols, from_date, to_date, portfolio_ids)
+        base_currency = {key[0]: lots[0]["base_currency"] for key, lots in lots_by_key.items()}
+
+        # 2. Already recorded events (dedupe)
+        existing = await self._load_existing_events(symbols, from_date, to_date)
+
+        # Dividends: per (portfolio, symbol) shares on ex-date
+        pending_dividends = []
+        for event in dividends:
+            for (portfolio_id, symbol), lots in lots_by_key.items():
+                if symbol != event.symbol:
+                    continue
+                if ("DIVIDEND", portfolio_id, symbol, event.ex_date, event.amount) in existing:
+                    summary["dividends_skipped"] += 1
+                    continue
+                shares = shares_held_on(lots, event.ex_date)
+                if shares <= 0:
+                    summary["dividends_skipped"] += 1
+                    continue
+                pending_dividends.append((portfolio_id, lots[0]["security_id"], event, shares))
+
+        # 3. FX for foreign-currency dividends, one query
+        fx_needed = {
+            (event.currency, base_currency[portfolio_id], event.pay_date)
+            for portfolio_id, _, event, _ in pending_dividends
+            if event.currency != base_currency[portfolio_id]
+        }
+        fx_rates = await self._load_fx_rates(fx_needed)
+
+        transaction_rows = []
+        today = date.today()
+        for portfolio_id, security_id, event, shares in pending_dividends:
+            net_amount = shares * event.amount
+            fx_rate_id = None
+            base = base_currency[portfolio_id]
+            if event.currency != base:
+                fx = fx_rates.get((event.currency, base, event.pay_date))
+                if fx is None:
+                    summary["errors"].append(
+                        f"{event.symbol}: FX rate for {event.currency}->{base} on pay date "
+                        f"{event.pay_date} not found"
+                    )
+                    continue
+                fx_rate_id, rate = fx
+                net_amount = net_amount * rate
+            transaction_rows.append((
+                uuid4(), portfolio_id, "DIVIDEND", security_id, event.symbol,
+                event.pay_date, event.ex_date, event.pay_date, shares, event.amount, net_amount,
+                event.currency, Decimal("0"), fx_rate_id, f"Auto-synced from FMP on {today}",
+            ))
+            summary["dividends_recorded"] += 1
+
+        # Splits: per (portfolio, symbol) held on split date
+        lot_ratios: Dict[UUID, Decimal] = {}
+        for (portfolio_id, symbol), lots in lots_by_key.items():
+            symbol_splits = []
+            for event in splits:
+                if event.symbol != symbol:
+                    continue
+                if ("SPLIT", portfolio_id, symbol, event.split_date, event.ratio) in existing:
+                    summary["splits_skipped"] += 1
+                    continue
+                if shares_held_on(lots, event.split_date) <= 0:
+                    summary["splits_skipped"] += 1
+                    continue
+                symbol_splits.append(event)
+                transaction_rows.append((
+                    uuid4(), portfolio_id, "SPLIT", lots[0]["security_id"], symbol,
+                    event.split_date, None, None, event.ratio, Decimal("0"), Decimal("0"),
+                    "USD", Decimal("0"), None,
+                    f"Auto-synced from FMP on {today}: {event.ratio_str} split",
+                ))
+                summary["splits_recorded"] += 1
+            lot_ratios.update(plan_split_adjustments(lots, symbol_splits))
+
+        summary["lots_adjusted"] = len(lot_ratios)
+        summary["portfolios_affected"] = len({row[1] for row in transaction_rows})
+
+        if dry_run or not transaction_rows:
+            return summary
+
+        async with self.conn.transaction():
+            await self._copy_transactions(transaction_rows)
+            if lot_ratios:
+                await self.conn.execute(
+                    """
+                    UPDATE lots AS l
+                    SET quantity_original = l.quantity_original * u.ratio,
+                        quantity_open = l.quantity_open * u.ratio,
+                        quantity = l.quantity_open * u.ratio,
+                        cost_basis_per_share = l.cost_basis / (l.quantity_original * u.ratio),
+                        updated_at = NOW()
+                    FROM unnest($1::uuid[], $2::numeric[]) AS u(id, ratio)
+                    WHERE l.id = u.id
+                    """,
+                    list(lot_ratios.keys()), list(lot_ratios.values())
+                )
+
+        logger.info(
+            f"Bulk corporate actions sync: {summary['dividends_recorded']} dividends, "
+            f"{summary['splits_recorded']} splits, {summary['lots_adjusted']} lots adjusted "
+            f"across {summary['portfolios_affected']} portfolios"
+        )
+        return summary
+
+    async def _load_lots(
+        self,
+        symbols: List[str],
+        from_date: date,
+        to_date: date,
+        portfolio_ids: Optional[List[UUID]],
+    ) -> Dict[Tuple[UUID, str], List[Dict[str, Any]]]:
+        """Load lots held during the window for all symbols, grouped by (portfolio, symbol)."""
+        rows = await self.conn.fetch(
+            """
+            SELECT l.id, l.portfolio_id, l.security_id, s.symbol,
+                   l.quantity_original, l.quantity_open, l.acquisition_date, l.closed_date,
+                   COALESCE(p.base_currency, 'USD') AS base_currency
+            FROM lots l
+            JOIN securities s ON l.security_id = s.id
+            JOIN portfolios p ON p.id = l.portfolio_id
+            WHERE s.symbol = ANY($1::text[])
+              AND p.is_active = true
+              AND l.acquisition_date <= $3
+              AND (l.closed_date IS NULL OR l.closed_date >= $2)
+              AND ($4::uuid[] IS NULL OR l.portfolio_id = ANY($4::uuid[]))
+            """,
+            symbols, from_date, to_date, portfolio_ids
+        )
+        grouped: Dict[Tuple[UUID, str], List[Dict[str, Any]]] = {}
+        for row in rows:
+            grouped.setdefault((row["portfolio_id"], row["symbol"]), []).append(dict(row))
+        return grouped
+
+    async def _load_existing_events(
+        self, symbols: List[str], from_date: date, to_date: date
+    ) -> set:
+        """Keys of DIVIDEND/SPLIT transactions already recorded in the window."""
+        rows = await self.conn.fetch(
+            """
+            SELECT portfolio_id, symbol, transaction_type,
+                   COALESCE(ex_date, transaction_date) AS event_date,
+                   CASE WHEN transaction_type = 'DIVIDEND' THEN price ELSE quantity END AS value
+            FROM transactions
+            WHERE transaction_type IN ('DIVIDEND', 'SPLIT')
+              AND symbol = ANY($1::text[])
+              AND COALESCE(ex_date, transaction_date) BETWEEN $2 AND $3
+            """,
+            symbols, from_date, to_date
+        )
+        return {
+            (row["transaction_type"], row["portfolio_id"], row["symbol"], row["event_date"], row["value"])
+            for row in rows
+        }
+
+    async def _load_fx_rates(
+        self, needed: set
+    ) -> Dict[Tuple[str, str, date], Tuple[UUID, Decimal]]:
+        """
+        Prefetch FX rates for (from_ccy, to_ccy, pay_date) in one query.
+
+        Uses the latest pack's rate on each date; falls back to the inverse pair,
+        mirroring CorporateActionsService._get_or_create_fx_rate.
+        """
+        if not needed:
+            return {}
+
+        currencies = sorted({c for pair in needed for c in pair[:2]})
+        dates = sorted({pair[2] for pair in needed})
+        rows = await self.conn.fetch(
+            """
+            SELECT DISTINCT ON (base_ccy, quote_ccy, asof_ts::date)
+                   id, base_ccy, quote_ccy, asof_ts::date AS asof_date, rate
+            FROM fx_rates
+            WHERE asof_ts::date = ANY($1::date[])
+              AND base_ccy = ANY($2::text[])
+              AND quote_ccy = ANY($2::text[])
+            ORDER BY base_ccy, quote_ccy, asof_ts::date, asof_ts DESC
+            """,
+            dates, currencies
+        )
+        direct = {(r["base_ccy"], r["quote_ccy"], r["asof_date"]): (r["id"], r["rate"]) for r in rows}
+
+        rates = {}
+        for from_ccy, to_ccy, pay_date in needed:
+            if (from_ccy, to_ccy, pay_date) in direct:
+                rates[(from_ccy, to_ccy, pay_date)] = direct[(from_ccy, to_ccy, pay_date)]
+            elif (to_ccy, from_ccy, pay_date) in direct:
+                rate_id, rate = direct[(to_ccy, from_ccy, pay_date)]
+                rates[(from_ccy, to_ccy, pay_date)] = (rate_id, Decimal("1.0") / rate)
+        return rates
+
+    async def _copy_transactions(self, rows: List[tuple]) -> None:
+        """
+        Bulk insert transactions via COPY into a staging table.
+
+        COPY goes to a temp table (COPY FROM is rejected on RLS-enabled tables),
+        then a single INSERT ... SELECT moves the rows into transactions.
+        """
+        await self.conn.execute(
+            """
+            CREATE TEMP TABLE IF NOT EXISTS ca_sync_transactions
+                (LIKE transactions INCLUDING DEFAULTS) ON COMMIT DROP
+            """
+        )
+        await self.conn.copy_records_to_table(
+            "ca_sync_transactions",
+            records=rows,
+            columns=list(self.TRANSACTION_COLUMNS),
+        )
+        columns = ", ".join(self.TRANSACTION_COLUMNS)
+        await self.conn.execute(
+            f"""
+            INSERT INTO transactions ({columns}, source, created_at)
+            SELECT {columns}, 'import', NOW()
+            FROM ca_sync_transactions
+            """
+        )
@@ -0,0 +1,325 @@
+"""
+Cycle Phase Timeline
+
+Purpose: Phase labels and composite scores for every date of the indicator archive in one pass
+Created: 2025-11-10
+Priority: P2 (Regime-history charts, risk.overlay_cycle_phases, scenario analogues)
+
+Approach:
+    - Pivot macro_indicators into a forward-filled date × indicator panel
+      (each date sees the latest observation on or before it, like the live snapshot)
+    - Scale, merge, validate and derive the whole panel column-wise with the
+      same functions CyclesService uses (scale_indicator, prepare_indicators)
+    - Classify every row per cycle with the detectors' classify_matrix
+    - Persist into cycle_phase_timeline; refreshes only append dates after the
+      last stored one (full=True rebuilds from the whole archive)
+
+Usage:
+    timelines = classify_panel(dates, X, columns)             # pure, in memory
+    await refresh_phase_timeline()                            # nightly / ad hoc
+    timelines = await load_phase_timeline(start=date(1995, 1, 1))
+    timelines["STDC"].transitions()
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.db.connection import POOL_BATCH, POOL_WRITE, get_pool
+from app.db.query_registry import fetch_named, fetchval_named, register_query
+from app.services.cycles import (
+    EMPIRE_PHASES,
+    GET_INDICATORS_ASOF,
+    INDICATOR_NAME_MAPPING,
+    LTDC_PHASES,
+    STDC_PHASES,
+    CivilOrderDetector,
+    EmpireDetector,
+    LTDCDetector,
+    STDCDetector,
+    prepare_indicators,
+    scale_indicator,
+)
+from app.services.indicator_config import IndicatorConfigManager
+
+logger = logging.getLogger("DawsOS.CycleTimeline")
+
+# cycle_type -> (detector, phase number -> name)
+CYCLES = {
+    "STDC": (STDCDetector(), STDC_PHASES),
+    "LTDC": (LTDCDetector(), LTDC_PHASES),
+    "EMPIRE": (EmpireDetector(), EMPIRE_PHASES),
+    "CIVIL": (CivilOrderDetector(), CivilOrderDetector.CIVIL_PHASES),
+}
+
+# Civil-specific defaults (same as CyclesService.detect_all_phases)
+CIVIL_DEFAULTS = {
+    "institutional_trust": 0.38,
+    "polarization_index": 0.78,
+    "social_unrest_score": 0.30,
+}
+
+
+@dataclass
+class PhaseTimeline:
+    """Daily phase classification of one cycle."""
+
+    cycle_type: str
+    dates: np.ndarray  # datetime64[D], ascending
+    phase_numbers: np.ndarray
+    composite_scores: np.ndarray
+
+    @property
+    def phase_names(self) -> Dict[int, str]:
+        return CYCLES[self.cycle_type][1]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def transition_indices(self) -> np.ndarray:
+        """Row indices where the phase differs from the previous row."""
+        return np.flatnonzero(np.diff(self.phase_numbers)) + 1
+
+    def transitions(self) -> List[Dict[str, Any]]:
+        """Phase changes in date order."""
+        names = self.phase_names
+        return [
+            {
+                "date": str(self.dates[i]),
+                "from_phase": names[int(self.phase_numbers[i - 1])],
+                "to_phase": names[int(self.phase_numbers[i])],
+                "composite_score": round(float(self.composite_scores[i]), 4),
+            }
+            for i in self.transition_indices()
+        ]
+
+    def spans(self) -> List[Dict[str, Any]]:
+        """Contiguous phase periods (start/end dates inclusive)."""
+        if not len(self):
+            return []
+        starts = np.concatenate(([0], self.transition_indices()))
+        ends = np.concatenate((starts[1:] - 1, [len(self) - 1]))
+        names = self.phase_names
+        return [
+            {
+                "phase": names[int(self.phase_numbers[s])],
+                "phase_number": int(self.phase_numbers[s]),
+                "start": str(self.dates[s]),
+                "end": str(self.dates[e]),
+                "mean_score": round(float(self.composite_scores[s:e + 1].mean()), 4),
+            }
+            for s, e in zip(starts, ends)
+        ]
+
+    def summary(self, max_transitions: int = 10) -> Dict[str, Any]:
+        """Current phase, since when, and the most recent transitions."""
+        if not len(self):
+            return {"current_phase": None, "since": None, "transitions": []}
+        last_span = self.spans()[-1]
+        return {
+            "current_phase": last_span["phase"],
+            "since": last_span["start"],
+            "as_of": str(self.dates[-1]),
+            "transitions": self.transitions()[-max_transitions:],
+        }
+
+
+# ============================================================================
+# Panel construction and classification
+# ============================================================================
+
+def build_indicator_panel(
+    config_manager: IndicatorConfigManager,
+    observations: Iterable[Tuple[str, date, float]],
+    seed: Optional[Dict[str, float]] = None,
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Forward-filled, scaled date × indicator matrix.
+
+    Args:
+        config_manager: Indicator defaults, scaling and validation
+        observations: (indicator_name, date, raw value); one panel row per distinct date
+        seed: Raw value per indicator_name before the first observation date
+              (incremental refresh); missing indicators fall back to defaults
+
+    Returns:
+        (dates, X, columns); NaN marks values a snapshot would not contain
+    """
+    seed = seed or {}
+    by_key: Dict[str, Tuple[List[date], List[float]]] = {}
+    all_dates = set()
+    for name, obs_date, value in sorted(observations, key=lambda o: o[1]):
+        code_key = INDICATOR_NAME_MAPPING.get(name)
+        if code_key is None:
+            continue
+        obs_dates, values = by_key.setdefault(code_key, ([], []))
+        obs_dates.append(obs_date)
+        values.append(float(value))
+        all_dates.add(obs_date)
+
+    dates = np.array(sorted(all_dates), dtype="datetime64[D]")
+    raw: Dict[str, np.ndarray] = {}
+    for name, code_key in INDICATOR_NAME_MAPPING.items():
+        obs_dates, values = by_key.get(code_key, ([], []))
+        before = float(seed[name]) if name in seed else np.nan
+        filled = np.concatenate(([before], np.asarray(values, dtype=np.float64)))
+        # Latest observation on or before each panel date (index 0 = seed)
+        idx = np.searchsorted(np.array(obs_dates, dtype="datetime64[D]"), dates, side="right")
+        column = filled[idx]
+        if np.isnan(column).all():
+            continue
+        raw[code_key] = column
+
+    db_indicators = {}
+    for code_key, column in raw.items():
+        scaled = np.asarray(scale_indicator(config_manager, code_key, column), dtype=np.float64)
+        if code_key in config_manager._indicators_cache:
+            # Not yet observed → configured default (a snapshot would not have the key)
+            scaled = np.where(np.isnan(scaled), config_manager.get_indicator(code_key), scaled)
+        db_indicators[code_key] = scaled
+
+    indicators = prepare_indicators(config_manager, db_indicators)
+    for key, default in CIVIL_DEFAULTS.items():
+        value = indicators.get(key, default)
+        indicators[key] = np.where(np.isnan(value), default, value) if isinstance(value, np.ndarray) else value
+
+    columns = sorted(indicators)
+    X = np.empty((len(dates), len(columns)), dtype=np.float64)
+    for j, key in enumerate(columns):
+        X[:, j] = indicators[key]
+    return dates, X, columns
+
+
+def classify_panel(
+    dates: np.ndarray,
+    X: np.ndarray,
+    columns: Sequence[str],
+    cycle_types: Sequence[str] = tuple(CYCLES),
+) -> Dict[str, PhaseTimeline]:
+    """Classify every row of a date × indicator matrix for each cycle."""
+    timelines = {}
+    for cycle_type in cycle_types:
+        detector, _ = CYCLES[cycle_type]
+        phase_numbers, scores = detector.classify_matrix(X, columns)
+        timelines[cycle_type] = PhaseTimeline(cycle_type, dates, phase_numbers, scores)
+    return timelines
+
+
+# ============================================================================
+# Persistence
+# ============================================================================
+
+GET_TIMELINE_LAST_DATE = register_query(
+    "cycles.timeline_last_date",
+    "SELECT MAX(date) FROM cycle_phase_timeline",
+)
+
+GET_INDICATOR_ARCHIVE = register_query(
+    "cycles.indicator_archive",
+    """
+    SELECT indicator_name, date, value
+    FROM macro_indicators
+    WHERE indicator_name = ANY($1::text[]) AND date > $2
+    ORDER BY date
+    """,
+)
+
+GET_TIMELINE = register_query(
+    "cycles.timeline",
+    """
+    SELECT cycle_type, date, phase_number, composite_score
+    FROM cycle_phase_timeline
+    WHERE cycle_type = ANY($1::text[]) AND date BETWEEN $2 AND $3
+    ORDER BY cycle_type, date
+    """,
+)
+
+TIMELINE_COLUMNS = ["cycle_type", "date", "phase_number", "phase", "composite_score"]
+
+
+async def refresh_phase_timeline(
+    full: bool = False,
+    config_manager: Optional[IndicatorConfigManager] = None,
+) -> Dict[str, Any]:
+    """
+    Append phases for indicator dates after the last stored date (or rebuild).
+
+    Args:
+        full: Rebuild the whole timeline (picks up revised history)
+        config_manager: Override indicator configuration (tests)
+
+    Returns:
+        {"dates": rows per cycle added, "since": previous last date, "seconds": elapsed}
+    """
+    config_manager = config_manager or IndicatorConfigManager()
+    started = time.perf_counter()
+    names = list(INDICATOR_NAME_MAPPING)
+
+    async with get_pool(POOL_BATCH).acquire() as conn:
+        since = None if full else await fetchval_named(conn, GET_TIMELINE_LAST_DATE)
+        seed = {}
+        if since is not None:
+            seed = {
+                row["indicator_name"]: float(row["value"])
+                for row in await fetch_named(conn, GET_INDICATORS_ASOF, since)
+            }
+        rows = await fetch_named(conn, GET_INDICATOR_ARCHIVE, names, since or date.min)
+
+    dates, X, columns = build_indicator_panel(
+        config_manager,
+        ((row["indicator_name"], row["date"], row["value"]) for row in rows),
+        seed,
+    )
+    timelines = classify_panel(dates, X, columns)
+
+    records = []
+    for cycle_type, timeline in timelines.items():
+        names_by_number = timeline.phase_names
+        records.extend(
+            (cycle_type, day, int(number), names_by_number[int(number)], float(score))
+            for day, number, score in zip(
+                timeline.dates.astype(object), timeline.phase_numbers, timeline.composite_scores
+            )
+        )
+
+    async with get_pool(POOL_WRITE).acquire() as conn:
+        async with conn.transaction():
+            if full:
+                await conn.execute("DELETE FROM cycle_phase_timeline")
+            if records:
+                await conn.copy_records_to_table("cycle_phase_timeline", records=records, columns=TIMELINE_COLUMNS)
+
+    result = {
+        "dates": len(dates),
+        "since": str(since) if since else None,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(f"Cycle phase timeline refreshed: {result}")
+    return result
+
+
+async def load_phase_timeline(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    cycle_types: Sequence[str] = tuple(CYCLES),
+) -> Dict[str, PhaseTimeline]:
+    """Read cached timelines (one query for all cycles)."""
+    rows = await fetch_named(
+        get_pool(), GET_TIMELINE, list(cycle_types), start or date.min, end or date.max
+    )
+    grouped: Dict[str, List[Any]] = {cycle_type: [] for cycle_type in cycle_types}
+    for row in rows:
+        grouped[row["cycle_type"]].append(row)
+    return {
+        cycle_type: PhaseTimeline(
+            cycle_type,
+            np.array([row["date"] for row in group], dtype="datetime64[D]"),
+            np.array([row["phase_number"] for row in group], dtype=np.int16),
+            np.array([float(row["composite_score"]) for row in group], dtype=np.float64),
+        )
+        for cycle_type, group in grouped.items()
+    }
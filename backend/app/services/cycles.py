@@ -11,6 +11,8 @@
     - Empire Cycle: Rise and decline of global powers
     - Composite score computation
     - Phase matching logic
+    - Shared per-as-of-date indicator snapshot (one query for all detectors)
+    - Write-behind phase persistence (detection never writes on the read path)
 
 Cycles:
     STDC (5-10 years):
@@ -36,24 +38,29 @@
         4. Collapse
 
 Architecture:
-    Indicators → CycleDetector → CompositeScore → Phase → Database
+    Indicators → Snapshot → CycleDetector → CompositeScore → Phase → (write-behind) Database
 
 Usage:
     service = CyclesService()
+    phases = await service.detect_all_phases()   # {"stdc", "ltdc", "empire", "civil"}
     stdc_phase = await service.detect_stdc_phase()
-    ltdc_phase = await service.detect_ltdc_phase()
-    empire_phase = await service.detect_empire_phase()
+    await service.flush_phases()                 # nightly job: persist queued phases now
 """
 
+import asyncio
 import logging
+import time
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 from enum import Enum
 from dataclasses import dataclass
 import json as json_module
 
-from app.db.connection import execute_query, execute_statement, execute_query_one
+import numpy as np
+
+from app.db.connection import POOL_WRITE, execute_query, get_pool
+from app.db.query_registry import register_query
 from app.services.indicator_config import IndicatorConfigManager
 from app.core.constants.macro import (
     EARLY_RECOVERY_YIELD_CURVE_WEIGHT,
@@ -141,11 +148,213 @@ class CyclePhase:
 }
 
 
+SNAPSHOT_TTL_SECONDS = 300  # Indicator snapshot reuse window per as-of date
+PHASE_FLUSH_DELAY_SECONDS = 2.0  # Write-behind delay (coalesces bursts of page views)
+
+# Latest value of each indicator on or before the as-of date
+GET_INDICATORS_ASOF = register_query(
+    "cycles.indicators_asof",
+    """
+    SELECT DISTINCT ON (indicator_name)
+        indicator_name,
+        value
+    FROM macro_indicators
+    WHERE date <= $1
+    ORDER BY indicator_name, date DESC
+    """,
+)
+
+STORE_PHASE_SQL = """
+    INSERT INTO cycle_phases (
+        cycle_type,
+        date,
+        phase,
+        phase_number,
+        composite_score,
+        indicators_json
+    ) VALUES ($1, $2, $3, $4, $5, $6)
+    ON CONFLICT (cycle_type, date)
+    DO UPDATE SET
+        phase = EXCLUDED.phase,
+        phase_number = EXCLUDED.phase_number,
+        composite_score = EXCLUDED.composite_score,
+        indicators_json = EXCLUDED.indicators_json
+"""
+
+
+# Map database indicator names to code keys
+INDICATOR_NAME_MAPPING = {
+    "GDP Growth Rate": "gdp_growth",
+    "Inflation": "inflation",
+    "Unemployment": "unemployment",
+    "Interest Rate": "interest_rate",
+    "Credit Growth": "credit_growth",
+    "Debt To Gdp": "debt_to_gdp",
+    "Fiscal Deficit": "fiscal_deficit",
+    "Trade Balance": "trade_balance",
+    "Productivity Growth": "productivity_growth",
+    "Yield Curve (10Y-2Y)": "yield_curve",
+    "Credit Spreads": "credit_spreads",
+    "VIX (Volatility Index)": "vix",
+    "Manufacturing PMI": "manufacturing_pmi",
+    "Gini Coefficient": "gini_coefficient",
+    "Real Interest Rate": "real_interest_rate",
+    "Corporate Profits Growth": "corporate_profits",
+    "Housing Starts": "housing_starts",
+    "Consumer Confidence Index": "consumer_confidence",
+    "M2 Money Supply": "m2_money_supply",
+    "Oil Prices": "oil_prices",
+    "US Dollar Index": "dollar_index",
+    "Initial Jobless Claims": "jobless_claims",
+    "Retail Sales Growth": "retail_sales",
+    "Industrial Production": "industrial_production",
+    "Credit Impulse": "credit_impulse",
+    "Debt Service Ratio": "debt_service_ratio",
+    "World Gdp Share": "world_gdp_share",
+    "World Trade Share": "world_trade_share",
+    "Military Dominance": "military_dominance",
+    "Education Score": "education_score",
+    "Top 1% Wealth Share": "top_1_percent_wealth",
+    "Political Polarization": "political_polarization",
+    "Institutional Trust Index": "institutional_trust",
+    "Data Quality Score": "data_quality_score",
+}
+
+
+def scale_indicator(config_manager: IndicatorConfigManager, code_key: str, raw_value):
+    """
+    Scale a raw macro_indicators value to detector units.
+
+    Works on scalars and NumPy arrays (historical panels) alike.
+    """
+    # Apply scaling based on configuration rules
+    scaling_rule = config_manager.get_scaling_rule(code_key)
+    if scaling_rule:
+        # Apply the scaling transformation
+        if code_key == "inflation":
+            value = raw_value / 10000.0
+        elif code_key in ("gdp_growth", "unemployment", "interest_rate"):
+            value = raw_value / 100.0
+        elif code_key == "credit_growth":
+            value = raw_value / 1000000.0
+        elif code_key == "debt_service_ratio":
+            value = raw_value / 10000000.0
+        elif code_key == "debt_to_gdp":
+            value = raw_value / 27436999
+        elif code_key in ("yield_curve", "fiscal_deficit", "productivity_growth"):
+            # Percentage conversion when the value looks like a percent
+            value = np.where(raw_value > 1, raw_value / 100.0, raw_value)
+        else:
+            value = raw_value
+    else:
+        # No scaling rule, use as-is
+        value = raw_value
+
+    # Special case for Manufacturing PMI: use configured default if value seems wrong
+    if code_key == "manufacturing_pmi":
+        value = np.where(value > 1000, config_manager.get_indicator("manufacturing_pmi"), value)
+    return value
+
+
+def prepare_indicators(config_manager: IndicatorConfigManager, db_indicators: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge scaled DB values with configured defaults, validate and derive.
+
+    Values may be floats (snapshot) or NumPy arrays (one entry per date);
+    configured defaults stay scalars and broadcast against arrays.
+    """
+    # Merge database values with configuration (database takes precedence)
+    indicators = config_manager.merge_with_database_values(db_indicators, prefer_db=True)
+    
+    # Validate all indicator values
+    validation_warnings = []
+    for key, value in indicators.items():
+        # Skip aliases for validation
+        if key in config_manager._alias_map:
+            continue
+            
+        if isinstance(value, np.ndarray):
+            valid = config_manager.valid_mask(key, value)
+            if not valid.all():
+                validation_warnings.append(f"{int((~valid).sum())} values of {key} out of range")
+                indicators[key] = np.where(valid, value, config_manager.get_indicator(key))
+            continue
+
+        is_valid, error_msg = config_manager.validate_indicator(key, value)
+        if not is_valid:
+            validation_warnings.append(error_msg)
+            # Use configuration default if validation fails
+            indicators[key] = config_manager.get_indicator(key)
+    
+    if validation_warnings:
+        logger.warning(f"Indicator validation issues: {validation_warnings[:5]}")  # Log first 5 warnings
+    
+    # Add any calculated indicators
+    if "interest_rate" in indicators and "inflation" in indicators:
+        indicators["real_interest_rate"] = indicators["interest_rate"] - indicators["inflation"]
+    
+    # Add change indicators for STDC detector
+    if "UNRATE" in indicators:
+        # For now, just duplicate the value (should be calculated from time series)
+        indicators["UNRATE_change"] = 0.001  # Small positive change
+    if "INDPRO" in indicators:
+        indicators["INDPRO_change"] = indicators.get("industrial_production", 0.021)
+    if "PAYEMS" in indicators:
+        indicators["PAYEMS_change"] = indicators.get("payroll_growth", 0.015)
+        
+    # Log metadata summary for monitoring
+    metadata_summary = config_manager.get_metadata_summary()
+    logger.debug(f"Using configuration version {metadata_summary.get('version')} with {metadata_summary.get('total_indicators')} indicators")
+    
+    return indicators
+
+
 # ============================================================================
 # Cycle Detectors
 # ============================================================================
 
 
+def _matrix_column(X: np.ndarray, columns: Sequence[str], key: str, default: float) -> np.ndarray:
+    """Column of a date × indicator matrix; missing column / NaN → default (like dict.get)."""
+    if key not in columns:
+        return np.full(X.shape[0], default, dtype=np.float64)
+    values = X[:, list(columns).index(key)]
+    return np.where(np.isnan(values), default, values)
+
+
+def _classify_weighted(
+    phase_weights: Dict[str, Dict[str, float]],
+    phases: Dict[int, str],
+    X: np.ndarray,
+    columns: Sequence[str],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized compute_composite_score + argmax over phases for every row.
+
+    Returns:
+        (phase_numbers, composite_scores), one entry per row of X
+    """
+    scores = np.empty((X.shape[0], len(phases)), dtype=np.float64)
+    for j, phase_name in enumerate(phases.values()):
+        weights = phase_weights.get(phase_name, {})
+        total_score = np.zeros(X.shape[0], dtype=np.float64)
+        total_weight = 0.0
+        for indicator_key, weight in weights.items():
+            value = _matrix_column(X, columns, indicator_key, 0.0)
+            # Positive weight rewards high values, negative weight rewards low values
+            total_score += np.maximum(np.sign(weight) * value, 0.0) * abs(weight)
+            total_weight += abs(weight)
+        if total_weight > 0:
+            scores[:, j] = np.clip((total_score / total_weight) / 100, MIN_REGIME_PROBABILITY, MAX_REGIME_PROBABILITY)
+        else:
+            scores[:, j] = MIN_REGIME_PROBABILITY
+
+    # argmax keeps the first phase on ties, like max(dict, key=...)
+    best = scores.argmax(axis=1)
+    phase_numbers = np.array(list(phases), dtype=np.int16)[best]
+    return phase_numbers, scores[np.arange(X.shape[0]), best]
+
+
 class STDCDetector:
     """
     Short-Term Debt Cycle (STDC) detector.
@@ -261,6 +470,15 @@ def detect_phase(self, indicators: Dict[str, float], as_of_date: date) -> CycleP
             indicators=indicators,
         )
 
+    def classify_matrix(self, X: np.ndarray, columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized detect_phase over a date × indicator matrix (NaN = missing).
+
+        Returns:
+            (phase_numbers, composite_scores), one entry per row
+        """
+        return _classify_weighted(self.PHASE_WEIGHTS, STDC_PHASES, X, columns)
+
 
 class LTDCDetector:
     """
@@ -357,6 +575,10 @@ def detect_phase(self, indicators: Dict[str, float], as_of_date: date) -> CycleP
             indicators=indicators,
         )
 
+    def classify_matrix(self, X: np.ndarray, columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized detect_phase for LTDC phases (see STDCDetector.classify_matrix)."""
+        return _classify_weighted(self.PHASE_WEIGHTS, LTDC_PHASES, X, columns)
+
 
 class EmpireDetector:
     """
@@ -442,6 +664,10 @@ def detect_phase(self, indicators: Dict[str, float], as_of_date: date) -> CycleP
             indicators=indicators,
         )
 
+    def classify_matrix(self, X: np.ndarray, columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized detect_phase for Empire phases (see STDCDetector.classify_matrix)."""
+        return _classify_weighted(self.PHASE_WEIGHTS, EMPIRE_PHASES, X, columns)
+
 
 # ============================================================================
 # Civil Order Detector
@@ -580,6 +806,49 @@ def compute_composite_score(self, indicators: Dict[str, float]) -> Tuple[str, fl
         
         return best_phase, confidence
 
+    def classify_matrix(self, X: np.ndarray, columns: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized compute_composite_score over a date × indicator matrix (NaN = missing).
+
+        Returns:
+            (phase_numbers, confidence_scores), one entry per row
+        """
+        gini = _matrix_column(X, columns, "GINI", np.nan)
+        gini = np.where(np.isnan(gini), _matrix_column(X, columns, "gini_coefficient", 0.418), gini)
+        gini = np.where(gini > 1.0, gini / 100.0, gini)  # Likely in percentage form
+        values = {
+            "gini_coefficient": gini,
+            "institutional_trust": _matrix_column(X, columns, "institutional_trust", 0.38),
+            "polarization_index": _matrix_column(X, columns, "polarization_index", 0.78),
+        }
+
+        phase_names = ["Harmony", "Rising Tensions", "Polarization", "Crisis", "Conflict/Revolution"]
+        scores = np.empty((X.shape[0], len(phase_names) + 1), dtype=np.float64)
+        for j, phase_name in enumerate(phase_names):
+            total = np.zeros(X.shape[0], dtype=np.float64)
+            for key, value in values.items():
+                min_val, max_val = self.PHASE_THRESHOLDS[phase_name][key]
+                total += np.where(
+                    (value >= min_val) & (value <= max_val),
+                    1.0,
+                    np.maximum(0, 1.0 - np.where(value < min_val, min_val - value, value - max_val) * 5),
+                )
+            scores[:, j] = total / len(values)
+
+        # Reconstruction only competes when indicators suggest improvement after a crisis
+        reconstruction = (
+            (values["gini_coefficient"] < 0.40)
+            & (values["institutional_trust"] > 0.3)
+            & (values["polarization_index"] < 0.7)
+            & (scores[:, phase_names.index("Crisis")] > 0.5)
+        )
+        scores[:, -1] = np.where(reconstruction, 0.6, -np.inf)
+
+        numbers = {name: num for num, name in self.CIVIL_PHASES.items()}
+        phase_numbers = np.array([numbers[name] for name in phase_names + ["Reconstruction"]], dtype=np.int16)
+        best = scores.argmax(axis=1)
+        return phase_numbers[best], scores[np.arange(X.shape[0]), best]
+
     def detect_phase(self, indicators: Dict[str, float], as_of_date: date) -> CyclePhase:
         """
         Detect current civil order phase.
@@ -628,7 +897,9 @@ class CyclesService:
     """
     Macro cycles service.
 
-    Detects STDC, LTDC, and Empire cycle phases.
+    Detects STDC, LTDC, Empire and Civil cycle phases from one shared
+    indicator snapshot per as-of date. Detected phases are queued and
+    persisted to cycle_phases in the background (or by flush_phases()).
     """
 
     def __init__(self, db_pool=None):
@@ -647,8 +918,50 @@ def __init__(self, db_pool=None):
         # Note: Could use DI container here, but CyclesService is initialized via DI container
         # and IndicatorConfigManager is stateless, so direct instantiation is acceptable
         self.config_manager = IndicatorConfigManager()
+        # as_of_date -> (expires_at, indicators); in-flight loads are shared
+        self._snapshots: Dict[date, Tuple[float, Dict[str, float]]] = {}
+        self._snapshot_loads: Dict[date, asyncio.Future] = {}
+        # Write-behind queue: (cycle_type, date) -> phase; _stored remembers what is in the DB
+        self._pending_phases: Dict[Tuple[str, date], CyclePhase] = {}
+        self._stored_phases: Dict[Tuple[str, date], Tuple[str, int, float]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def get_indicator_snapshot(self, as_of_date: Optional[date] = None) -> Dict[str, float]:
+        """
+        Scaled indicators as of a date, loaded once and shared by all detectors.
 
-    async def get_latest_indicators(self) -> Dict[str, float]:
+        Concurrent callers for the same date wait on a single load; the result
+        is reused for SNAPSHOT_TTL_SECONDS. Callers must not mutate the dict.
+        """
+        as_of_date = _coerce_date(as_of_date)
+        cached = self._snapshots.get(as_of_date)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+        pending = self._snapshot_loads.get(as_of_date)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._snapshot_loads[as_of_date] = future
+        try:
+            indicators = await self._load_indicators(as_of_date)
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        else:
+            self._snapshots[as_of_date] = (time.monotonic() + SNAPSHOT_TTL_SECONDS, indicators)
+            future.set_result(indicators)
+            return indicators
+        finally:
+            del self._snapshot_loads[as_of_date]
+
+    async def get_latest_indicators(self, as_of_date: Optional[date] = None) -> Dict[str, float]:
+        """Copy of the indicator snapshot (safe to modify)."""
+        return dict(await self.get_indicator_snapshot(as_of_date))
+
+    async def _load_indicators(self, as_of_date: date) -> Dict[str, float]:
         """
         Get latest macro indicators from database with configuration-based defaults.
         
@@ -658,6 +971,9 @@ async def get_latest_indicators(self) -> Dict[str, float]:
         3. Validate indicator ranges
         4. Handle aliases consistently
 
+        Args:
+            as_of_date: Use the latest value of each indicator on or before this date
+
         Returns:
             Dictionary of properly scaled indicator values with aliases
         """
@@ -665,199 +981,77 @@ async def get_latest_indicators(self) -> Dict[str, float]:
         indicators = self.config_manager.get_all_indicators(include_aliases=True)
         
         # Query database for latest values
-        query = """
-            SELECT
-                indicator_name,
-                value
-            FROM macro_indicators
-            WHERE (indicator_name, date) IN (
-                SELECT indicator_name, MAX(date)
-                FROM macro_indicators
-                GROUP BY indicator_name
-            )
-        """
-        rows = await execute_query(query)
-
-        # Map database names to code keys
-        name_mapping = {
-            "GDP Growth Rate": "gdp_growth",
-            "Inflation": "inflation",
-            "Unemployment": "unemployment",
-            "Interest Rate": "interest_rate",
-            "Credit Growth": "credit_growth",
-            "Debt To Gdp": "debt_to_gdp",
-            "Fiscal Deficit": "fiscal_deficit",
-            "Trade Balance": "trade_balance",
-            "Productivity Growth": "productivity_growth",
-            "Yield Curve (10Y-2Y)": "yield_curve",
-            "Credit Spreads": "credit_spreads",
-            "VIX (Volatility Index)": "vix",
-            "Manufacturing PMI": "manufacturing_pmi",
-            "Gini Coefficient": "gini_coefficient",
-            "Real Interest Rate": "real_interest_rate",
-            "Corporate Profits Growth": "corporate_profits",
-            "Housing Starts": "housing_starts",
-            "Consumer Confidence Index": "consumer_confidence",
-            "M2 Money Supply": "m2_money_supply",
-            "Oil Prices": "oil_prices",
-            "US Dollar Index": "dollar_index",
-            "Initial Jobless Claims": "jobless_claims",
-            "Retail Sales Growth": "retail_sales",
-            "Industrial Production": "industrial_production",
-            "Credit Impulse": "credit_impulse",
-            "Debt Service Ratio": "debt_service_ratio",
-            "World Gdp Share": "world_gdp_share",
-            "World Trade Share": "world_trade_share",
-            "Military Dominance": "military_dominance",
-            "Education Score": "education_score",
-            "Top 1% Wealth Share": "top_1_percent_wealth",
-            "Political Polarization": "political_polarization",
-            "Institutional Trust Index": "institutional_trust",
-            "Data Quality Score": "data_quality_score",
-        }
+        rows = await execute_query(GET_INDICATORS_ASOF, as_of_date)
 
         # Process database values with scaling
         db_indicators = {}
         for row in rows:
-            db_name = row["indicator_name"]
-            if db_name in name_mapping:
-                code_key = name_mapping[db_name]
-                raw_value = float(row["value"])
-                
-                # Apply scaling based on configuration rules
-                scaling_rule = self.config_manager.get_scaling_rule(code_key)
-                if scaling_rule:
-                    # Apply the scaling transformation
-                    if code_key == "inflation":
-                        db_indicators[code_key] = raw_value / 10000.0
-                    elif code_key == "gdp_growth":
-                        db_indicators[code_key] = raw_value / 100.0
-                    elif code_key == "unemployment":
-                        db_indicators[code_key] = raw_value / 100.0
-                    elif code_key == "interest_rate":
-                        db_indicators[code_key] = raw_value / 100.0
-                    elif code_key == "credit_growth":
-                        db_indicators[code_key] = raw_value / 1000000.0
-                    elif code_key == "debt_service_ratio":
-                        db_indicators[code_key] = raw_value / 10000000.0
-                    elif code_key == "debt_to_gdp":
-                        db_indicators[code_key] = raw_value / 27436999
-                    else:
-                        # Check if needs percentage conversion
-                        if raw_value > 1 and code_key in ["yield_curve", "fiscal_deficit", "productivity_growth"]:
-                            db_indicators[code_key] = raw_value / 100.0
-                        else:
-                            db_indicators[code_key] = raw_value
-                else:
-                    # No scaling rule, use as-is
-                    db_indicators[code_key] = raw_value
-                    
-                # Special case for Manufacturing PMI
-                if code_key == "manufacturing_pmi" and db_indicators[code_key] > 1000:
-                    # Use configured default if value seems wrong
-                    db_indicators[code_key] = self.config_manager.get_indicator("manufacturing_pmi")
+            code_key = INDICATOR_NAME_MAPPING.get(row["indicator_name"])
+            if code_key is not None:
+                db_indicators[code_key] = float(scale_indicator(self.config_manager, code_key, float(row["value"])))
         
         # Debug: log what keys we have from database
         logger.info(f"Raw indicator keys from DB: {list(db_indicators.keys())[:10]}")
         
-        # Merge database values with configuration (database takes precedence)
-        indicators = self.config_manager.merge_with_database_values(db_indicators, prefer_db=True)
-        
-        # Validate all indicator values
-        validation_warnings = []
-        for key, value in indicators.items():
-            # Skip aliases for validation
-            if key in self.config_manager._alias_map:
-                continue
-                
-            is_valid, error_msg = self.config_manager.validate_indicator(key, value)
-            if not is_valid:
-                validation_warnings.append(error_msg)
-                # Use configuration default if validation fails
-                indicators[key] = self.config_manager.get_indicator(key)
-        
-        if validation_warnings:
-            logger.warning(f"Indicator validation issues: {validation_warnings[:5]}")  # Log first 5 warnings
-        
-        # Add any calculated indicators
-        if "interest_rate" in indicators and "inflation" in indicators:
-            indicators["real_interest_rate"] = indicators["interest_rate"] - indicators["inflation"]
-        
-        # Add change indicators for STDC detector
-        if "UNRATE" in indicators:
-            # For now, just duplicate the value (should be calculated from time series)
-            indicators["UNRATE_change"] = 0.001  # Small positive change
-        if "INDPRO" in indicators:
-            indicators["INDPRO_change"] = indicators.get("industrial_production", 0.021)
-        if "PAYEMS" in indicators:
-            indicators["PAYEMS_change"] = indicators.get("payroll_growth", 0.015)
-            
-        # Log metadata summary for monitoring
-        metadata_summary = self.config_manager.get_metadata_summary()
-        logger.debug(f"Using configuration version {metadata_summary.get('version')} with {metadata_summary.get('total_indicators')} indicators")
-        
-        return indicators
+        return prepare_indicators(self.config_manager, db_indicators)
 
-    async def detect_stdc_phase(self, as_of_date: Optional[date] = None) -> CyclePhase:
+    async def detect_all_phases(self, as_of_date: Optional[date] = None) -> Dict[str, CyclePhase]:
         """
-        Detect current STDC phase.
+        Detect all four cycle phases from one indicator snapshot.
+
+        Read-only: phases are queued for write-behind persistence.
 
         Args:
             as_of_date: Date for phase classification (default: today)
 
         Returns:
-            CyclePhase
+            {"stdc": CyclePhase, "ltdc": CyclePhase, "empire": CyclePhase, "civil": CyclePhase}
         """
-        if as_of_date is None:
-            as_of_date = date.today()
-        elif isinstance(as_of_date, str):
-            # Convert string to date if needed
-            from datetime import datetime
-            as_of_date = datetime.fromisoformat(as_of_date).date()
-
-        indicators = await self.get_latest_indicators()
-        
+        as_of_date = _coerce_date(as_of_date)
+        indicators = await self.get_indicator_snapshot(as_of_date)
+
         # Debug logging
         logger.info(f"Indicators after scaling - inflation: {indicators.get('inflation', 'N/A')}, manufacturing_pmi: {indicators.get('manufacturing_pmi', 'N/A')}")
-        
-        phase = self.stdc_detector.detect_phase(indicators, as_of_date)
 
-        # Store in database
-        await self._store_phase(phase)
+        # Add default values for civil-specific indicators if not present
+        civil_indicators = {
+            "institutional_trust": 0.38,
+            "polarization_index": 0.78,
+            "social_unrest_score": 0.30,
+            **indicators,
+        }
 
-        return phase
+        phases = {
+            "stdc": self.stdc_detector.detect_phase(dict(indicators), as_of_date),
+            "ltdc": self.ltdc_detector.detect_phase(dict(indicators), as_of_date),
+            "empire": self.empire_detector.detect_phase(dict(indicators), as_of_date),
+            "civil": self.civil_detector.detect_phase(civil_indicators, as_of_date),
+        }
 
-    async def detect_ltdc_phase(self, as_of_date: Optional[date] = None) -> CyclePhase:
-        """Detect current LTDC phase."""
-        if as_of_date is None:
-            as_of_date = date.today()
-        elif isinstance(as_of_date, str):
-            # Convert string to date if needed
-            from datetime import datetime
-            as_of_date = datetime.fromisoformat(as_of_date).date()
+        # Civil has no cycle_phases type of its own (it reports EMPIRE), so only
+        # the three typed cycles are persisted
+        self._queue_phases([phases["stdc"], phases["ltdc"], phases["empire"]])
+        return phases
 
-        indicators = await self.get_latest_indicators()
-        phase = self.ltdc_detector.detect_phase(indicators, as_of_date)
+    async def detect_stdc_phase(self, as_of_date: Optional[date] = None) -> CyclePhase:
+        """
+        Detect current STDC phase.
 
-        await self._store_phase(phase)
+        Args:
+            as_of_date: Date for phase classification (default: today)
+
+        Returns:
+            CyclePhase
+        """
+        return (await self.detect_all_phases(as_of_date))["stdc"]
 
-        return phase
+    async def detect_ltdc_phase(self, as_of_date: Optional[date] = None) -> CyclePhase:
+        """Detect current LTDC phase."""
+        return (await self.detect_all_phases(as_of_date))["ltdc"]
 
     async def detect_empire_phase(self, as_of_date: Optional[date] = None) -> CyclePhase:
         """Detect current Empire phase."""
-        if as_of_date is None:
-            as_of_date = date.today()
-        elif isinstance(as_of_date, str):
-            # Convert string to date if needed
-            from datetime import datetime
-            as_of_date = datetime.fromisoformat(as_of_date).date()
-
-        indicators = await self.get_latest_indicators()
-        phase = self.empire_detector.detect_phase(indicators, as_of_date)
-
-        await self._store_phase(phase)
-
-        return phase
+        return (await self.detect_all_phases(as_of_date))["empire"]
 
     async def detect_civil_phase(self, as_of_date: Optional[date] = None) -> CyclePhase:
         """
@@ -869,60 +1063,76 @@ async def detect_civil_phase(self, as_of_date: Optional[date] = None) -> CyclePh
         Returns:
             CyclePhase
         """
-        if as_of_date is None:
-            as_of_date = date.today()
-        elif isinstance(as_of_date, str):
-            # Convert string to date if needed
-            from datetime import datetime
-            as_of_date = datetime.fromisoformat(as_of_date).date()
-
-        indicators = await self.get_latest_indicators()
-        
-        # Add default values for civil-specific indicators if not present
-        if "institutional_trust" not in indicators:
-            indicators["institutional_trust"] = 0.38
-        if "polarization_index" not in indicators:
-            indicators["polarization_index"] = 0.78
-        if "social_unrest_score" not in indicators:
-            indicators["social_unrest_score"] = 0.30
-            
-        phase = self.civil_detector.detect_phase(indicators, as_of_date)
-
-        await self._store_phase(phase)
-
-        return phase
-
-    async def _store_phase(self, phase: CyclePhase):
-        """Store cycle phase in database."""
-        query = """
-            INSERT INTO cycle_phases (
-                cycle_type,
-                date,
-                phase,
-                phase_number,
-                composite_score,
-                indicators_json
-            ) VALUES ($1, $2, $3, $4, $5, $6)
-            ON CONFLICT (cycle_type, date)
-            DO UPDATE SET
-                phase = EXCLUDED.phase,
-                phase_number = EXCLUDED.phase_number,
-                composite_score = EXCLUDED.composite_score,
-                indicators_json = EXCLUDED.indicators_json
+        return (await self.detect_all_phases(as_of_date))["civil"]
+
+    def _queue_phases(self, phases: List[CyclePhase]) -> None:
+        """Queue changed phases and schedule a background flush."""
+        for phase in phases:
+            key = (phase.cycle_type.value, phase.date)
+            if self._stored_phases.get(key) == _phase_signature(phase):
+                continue
+            self._pending_phases[key] = phase
+
+        if self._pending_phases and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(PHASE_FLUSH_DELAY_SECONDS)
+        try:
+            await self.flush_phases()
+        except Exception as e:
+            logger.warning(f"Deferred cycle phase write failed (will retry on next detection): {e}")
+
+    async def flush_phases(self) -> int:
         """
-        await execute_statement(
-            query,
-            phase.cycle_type.value,
-            phase.date,
-            phase.phase,
-            phase.phase_number,
-            Decimal(str(phase.composite_score)),
-            json_module.dumps(phase.indicators),
-        )
+        Persist queued phases to cycle_phases.
 
-        logger.info(
-            f"Stored {phase.cycle_type.value} phase: {phase.phase} ({phase.date})"
-        )
+        Returns:
+            Number of phases written
+        """
+        pending, self._pending_phases = self._pending_phases, {}
+        if not pending:
+            return 0
+
+        rows = [
+            (
+                phase.cycle_type.value,
+                phase.date,
+                phase.phase,
+                phase.phase_number,
+                Decimal(str(phase.composite_score)),
+                json_module.dumps(phase.indicators),
+            )
+            for phase in pending.values()
+        ]
+        try:
+            async with get_pool(POOL_WRITE).acquire() as conn:
+                await conn.executemany(STORE_PHASE_SQL, rows)
+        except Exception:
+            # Re-queue unless a newer detection replaced the entry meanwhile
+            for key, phase in pending.items():
+                self._pending_phases.setdefault(key, phase)
+            raise
+
+        for key, phase in pending.items():
+            self._stored_phases[key] = _phase_signature(phase)
+            logger.info(f"Stored {phase.cycle_type.value} phase: {phase.phase} ({phase.date})")
+        return len(rows)
+
+
+def _coerce_date(as_of_date) -> date:
+    """Default to today; accept ISO strings and datetimes."""
+    if as_of_date is None:
+        return date.today()
+    if isinstance(as_of_date, str):
+        return datetime.fromisoformat(as_of_date).date()
+    if isinstance(as_of_date, datetime):
+        return as_of_date.date()
+    return as_of_date
+
+
+def _phase_signature(phase: CyclePhase) -> Tuple[str, int, float]:
+    return (phase.phase, phase.phase_number, float(phase.composite_score))
 
 
 # ============================================================================
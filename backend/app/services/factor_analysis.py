@@ -37,7 +37,9 @@
     PricingPackNotFoundError,
     PricingPackValidationError,
 )
+from app.db.columnar_store import portfolio_value_returns
 from app.services.pricing import PricingService
+from app.services.rolling_factors import align_returns, rolling_factor_regressions
 from app.core.constants.financial import TRADING_DAYS_PER_YEAR
 from app.core.constants.risk import CONFIDENCE_LEVEL_95
 
@@ -208,6 +210,38 @@ async def compute_factor_exposure(
             "data_points": len(merged),
         }
 
+    async def compute_factor_exposure_history(
+        self,
+        portfolio_id: str,
+        window_ends: List[date],
+        lookback_days: int = TRADING_DAYS_PER_YEAR,
+    ) -> List[Dict]:
+        """
+        Compute factor exposures for many window ends from one data load.
+
+        Loads portfolio and factor returns once for the union of all windows and
+        runs the rolling regression engine (app/services/rolling_factors.py).
+
+        Args:
+            portfolio_id: Portfolio UUID
+            window_ends: Window end dates (e.g., historical pack dates)
+            lookback_days: Window length per end date (default TRADING_DAYS_PER_YEAR)
+
+        Returns:
+            One result per window end, in the same format as compute_factor_exposure
+        """
+        if not window_ends:
+            return []
+
+        start_date = min(window_ends) - timedelta(days=lookback_days)
+        end_date = max(window_ends)
+
+        portfolio_returns = await self._get_portfolio_returns(portfolio_id, start_date, end_date)
+        factor_returns = await self._get_factor_returns(start_date, end_date)
+        dates, y, X = align_returns(portfolio_returns, factor_returns)
+
+        return rolling_factor_regressions(dates, y, X, window_ends, lookback_days)
+
     async def compute_factor_var(
         self, portfolio_id: str, pack_id: str, confidence: float = CONFIDENCE_LEVEL_95
     ) -> Dict:
@@ -287,6 +321,10 @@ async def _get_portfolio_returns(
         Returns:
             List of {asof_date, portfolio_return}
         """
+        cached = await portfolio_value_returns(portfolio_id, start_date, end_date)
+        if cached is not None:
+            return [{"asof_date": d, "portfolio_return": r} for d, r in cached]
+
         values = await self.db.fetch(
             """
             SELECT valuation_date AS asof_date, total_value
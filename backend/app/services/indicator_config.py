@@ -38,6 +38,8 @@
 from decimal import Decimal
 import os
 
+import numpy as np
+
 logger = logging.getLogger("DawsOS.IndicatorConfig")
 
 
@@ -290,6 +292,29 @@ def validate_indicator(
                     
         return True, None
     
+    def valid_mask(self, key: str, values: np.ndarray) -> np.ndarray:
+        """
+        Vectorized validate_indicator: True where a value passes the same checks.
+
+        NaN (missing) values are treated as valid.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        valid = np.ones(values.shape, dtype=bool)
+        actual_key = self._alias_map.get(key, key)
+
+        if self._indicators_cache and actual_key in self._indicators_cache:
+            metadata = self._indicators_cache[actual_key]
+            with np.errstate(invalid="ignore"):
+                if "min" in metadata.range:
+                    valid &= ~(values < metadata.range["min"])
+                if "max" in metadata.range:
+                    valid &= ~(values > metadata.range["max"])
+                if metadata.unit == "coefficient" or (
+                    metadata.unit == "index" and metadata.display_unit == "score"
+                ):
+                    valid &= ~((values < 0) | (values > 1))
+        return valid
+    
     def get_scenario_indicators(
         self,
         scenario_name: str,
@@ -29,7 +29,7 @@
 import pandas as pd
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from app.core.types import (
     PricingPackNotFoundError,
@@ -40,9 +40,42 @@
 from app.services.portfolio_helpers import get_portfolio_value
 from app.core.constants.financial import TRADING_DAYS_PER_YEAR
 from app.core.constants.time_periods import DAYS_PER_YEAR
+from app.db.columnar_store import get_columnar_store
+from app.db.query_registry import fetch_named, register_query
 
 logger = logging.getLogger(__name__)
 
+# Hot metrics queries (declared once; prepared per connection and tracked by name)
+DAILY_VALUES_WITH_FLOWS = register_query(
+    "metrics.daily_values_with_flows",
+    """
+    SELECT valuation_date AS asof_date, total_value, cash_flows
+    FROM portfolio_daily_values
+    WHERE portfolio_id = $1 AND valuation_date BETWEEN $2 AND $3
+    ORDER BY valuation_date
+    """,
+)
+
+DAILY_VALUES = register_query(
+    "metrics.daily_values",
+    """
+    SELECT valuation_date AS asof_date, total_value
+    FROM portfolio_daily_values
+    WHERE portfolio_id = $1 AND valuation_date BETWEEN $2 AND $3
+    ORDER BY valuation_date
+    """,
+)
+
+CASH_FLOWS = register_query(
+    "metrics.cash_flows",
+    """
+    SELECT flow_date, amount
+    FROM portfolio_cash_flows
+    WHERE portfolio_id = $1 AND flow_date BETWEEN $2 AND $3
+    ORDER BY flow_date
+    """,
+)
+
 
 class PerformanceCalculator:
     """
@@ -114,13 +147,9 @@ async def compute_twr(
         # Get daily valuations from portfolio_daily_values hypertable
         # Note: Table may not exist in dev environment, handle gracefully
         try:
-            values = await self.db.fetch(
-                """
-                SELECT valuation_date AS asof_date, total_value, cash_flows
-                FROM portfolio_daily_values
-                WHERE portfolio_id = $1 AND valuation_date BETWEEN $2 AND $3
-                ORDER BY valuation_date
-            """,
+            values = await fetch_named(
+                self.db,
+                DAILY_VALUES_WITH_FLOWS,
                 portfolio_id,
                 start_date,
                 end_date,
@@ -269,13 +298,9 @@ async def compute_mwr(self, portfolio_id: str, pack_id: str) -> Dict:
         start_date = end_date - timedelta(days=DAYS_PER_YEAR)
 
         # Get all cash flows
-        cash_flows = await self.db.fetch(
-            """
-            SELECT flow_date, amount
-            FROM portfolio_cash_flows
-            WHERE portfolio_id = $1 AND flow_date BETWEEN $2 AND $3
-            ORDER BY flow_date
-        """,
+        cash_flows = await fetch_named(
+            self.db,
+            CASH_FLOWS,
             portfolio_id,
             start_date,
             end_date,
@@ -391,33 +416,13 @@ async def compute_max_drawdown(
         end_date = await self._get_pack_date(pack_id)
         start_date = end_date - timedelta(days=lookback_days)
 
-        try:
-            values = await self.db.fetch(
-                """
-                SELECT valuation_date AS asof_date, total_value
-                FROM portfolio_daily_values
-                WHERE portfolio_id = $1 AND valuation_date BETWEEN $2 AND $3
-                ORDER BY valuation_date
-            """,
-                portfolio_id,
-                start_date,
-                end_date,
-            )
-        except (ValueError, TypeError, KeyError, AttributeError) as e:
-            # Programming errors - should not happen, log and re-raise
-            logger.error(f"Programming error querying portfolio_daily_values for max_dd: {e}", exc_info=True)
-            raise
-        except Exception as e:
-            # Database/service errors - log and use empty dataset (graceful degradation)
-            logger.warning(f"Could not query portfolio_daily_values: {e}. Using empty dataset.")
-            # Don't raise DatabaseError here - graceful degradation is intentional
-            values = []
+        dates, values_arr = await self._get_daily_values(
+            portfolio_id, start_date, end_date, "max_dd"
+        )
 
-        if len(values) < 2:
+        if len(values_arr) < 2:
             return {"max_dd": 0.0, "error": "Insufficient data"}
 
-        values_arr = np.array([float(v["total_value"]) for v in values])
-
         # Compute running max and drawdown
         running_max = np.maximum.accumulate(values_arr)
         drawdowns = (values_arr - running_max) / running_max
@@ -428,7 +433,7 @@ async def compute_max_drawdown(
         peak_value = float(running_max[max_dd_idx])
         trough_value = float(values_arr[max_dd_idx])
 
-        recovery_days = self._compute_recovery_days(values, max_dd_idx)
+        recovery_days = self._compute_recovery_days(dates, values_arr, max_dd_idx)
 
         logger.info(
             f"Max drawdown for {portfolio_id}: {max_dd:.2%} "
@@ -437,32 +442,31 @@ async def compute_max_drawdown(
 
         return {
             "max_dd": round(max_dd, 6),
-            "max_dd_date": values[max_dd_idx]["asof_date"].isoformat(),
+            "max_dd_date": dates[max_dd_idx].isoformat(),
             "peak_value": round(peak_value, 2),
             "trough_value": round(trough_value, 2),
             "recovery_days": recovery_days,
         }
 
-    def _compute_recovery_days(self, values: List, dd_idx: int) -> int:
+    def _compute_recovery_days(self, dates: List[date], values: np.ndarray, dd_idx: int) -> int:
         """
         Compute days from max drawdown to recovery.
 
         Args:
-            values: List of daily values
+            dates: Valuation dates aligned with values
+            values: Daily total values
             dd_idx: Index of maximum drawdown
 
         Returns:
             Days to recover (-1 if not yet recovered)
         """
-        peak_value = max(float(v["total_value"]) for v in values[: dd_idx + 1])
+        peak_value = values[: dd_idx + 1].max()
+        recovered = np.flatnonzero(values[dd_idx:] >= peak_value)
 
-        for i in range(dd_idx, len(values)):
-            if float(values[i]["total_value"]) >= peak_value:
-                recovery_days = (
-                    values[i]["asof_date"] - values[dd_idx]["asof_date"]
-                ).days
-                logger.debug(f"Recovery took {recovery_days} days")
-                return recovery_days
+        if len(recovered):
+            recovery_days = (dates[dd_idx + int(recovered[0])] - dates[dd_idx]).days
+            logger.debug(f"Recovery took {recovery_days} days")
+            return recovery_days
 
         # Not yet recovered
         return -1
@@ -490,33 +494,14 @@ async def compute_rolling_volatility(
         end_date = await self._get_pack_date(pack_id)
         start_date = end_date - timedelta(days=max_window)
 
-        try:
-            values = await self.db.fetch(
-                """
-                SELECT valuation_date AS asof_date, total_value
-                FROM portfolio_daily_values
-                WHERE portfolio_id = $1 AND valuation_date BETWEEN $2 AND $3
-                ORDER BY valuation_date
-            """,
-                portfolio_id,
-                start_date,
-                end_date,
-            )
-        except (ValueError, TypeError, KeyError, AttributeError) as e:
-            # Programming errors - should not happen, log and re-raise
-            logger.error(f"Programming error querying portfolio_daily_values for volatility: {e}", exc_info=True)
-            raise
-        except Exception as e:
-            # Database/service errors - log and use empty dataset (graceful degradation)
-            logger.warning(f"Could not query portfolio_daily_values: {e}. Using empty dataset.")
-            # Don't raise DatabaseError here - graceful degradation is intentional
-            values = []
+        _, prices = await self._get_daily_values(
+            portfolio_id, start_date, end_date, "volatility"
+        )
 
-        if len(values) < 2:
+        if len(prices) < 2:
             return {f"vol_{w}d": 0.0 for w in windows}
 
         # Compute daily returns
-        prices = np.array([float(v["total_value"]) for v in values])
         returns = np.diff(prices) / prices[:-1]
 
         # Compute volatility for each window
@@ -531,6 +516,44 @@ async def compute_rolling_volatility(
 
         return result
 
+    async def _get_daily_values(
+        self, portfolio_id: str, start_date: date, end_date: date, purpose: str
+    ) -> Tuple[List[date], np.ndarray]:
+        """
+        Get daily total values as (dates, float64 array).
+
+        Served from the nightly columnar snapshot when it covers end_date for
+        this portfolio, otherwise from portfolio_daily_values.
+        """
+        series = await get_columnar_store().series(
+            "portfolio_daily_values", portfolio_id, start_date, end_date
+        )
+        if series is not None:
+            return series.dates.astype(date).tolist(), series.columns["total_value"]
+
+        try:
+            values = await fetch_named(
+                self.db,
+                DAILY_VALUES,
+                portfolio_id,
+                start_date,
+                end_date,
+            )
+        except (ValueError, TypeError, KeyError, AttributeError) as e:
+            # Programming errors - should not happen, log and re-raise
+            logger.error(f"Programming error querying portfolio_daily_values for {purpose}: {e}", exc_info=True)
+            raise
+        except Exception as e:
+            # Database/service errors - log and use empty dataset (graceful degradation)
+            logger.warning(f"Could not query portfolio_daily_values: {e}. Using empty dataset.")
+            # Don't raise DatabaseError here - graceful degradation is intentional
+            values = []
+
+        return (
+            [v["asof_date"] for v in values],
+            np.array([float(v["total_value"]) for v in values], dtype=np.float64),
+        )
+
     async def _get_pack_date(self, pack_id: str) -> date:
         """Get as-of date for pricing pack."""
         from app.core.di_container import ensure_initialized
@@ -0,0 +1,463 @@
+"""
+DawsOS News Impact Scorer
+
+Purpose: Score news articles against portfolio holdings in a single pass per article
+Updated: 2025-11-10
+Priority: P2 (Performance - news_impact_analysis pattern)
+
+Design:
+    - Each article is tokenized once with a precompiled regex; the resulting
+      token sets and keyword sentiment are cached by article id (URL).
+    - Sentiment keywords (and their common inflections) and position symbols
+      (plus dotted/dashed/collapsed aliases) are compiled into dictionaries,
+      so matching is a hash lookup per token instead of a substring scan per
+      keyword × position × article.
+    - Article × position hits form a sparse (row, col) matrix; impact scores
+      are computed for all hits at once with NumPy using position weights.
+
+Matching Semantics:
+    - Keywords and symbols match whole tokens ("up" no longer matches "update").
+    - Symbols of 1-2 characters (e.g. "T", "GE") only match upper-case tokens,
+      otherwise articles containing "a" or "t" would hit every such holding.
+
+Usage:
+    scorer = NewsImpactScorer()
+    result = scorer.compute_portfolio_impact(news_items, positions, min_threshold=0.1)
+"""
+
+import logging
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Scoring Configuration
+# ============================================================================
+
+POSITIVE_KEYWORDS = (
+    "up", "rise", "gain", "profit", "beat", "exceed", "strong", "growth",
+    "surge", "rally", "boost", "upgrade", "bullish", "record", "breakthrough",
+)
+NEGATIVE_KEYWORDS = (
+    "down", "fall", "drop", "loss", "miss", "weak", "decline", "crash",
+    "plunge", "slump", "cut", "downgrade", "bearish", "warning", "concern",
+)
+
+# Keyword inflections recognised as the same keyword ("gains", "surged", "rising")
+KEYWORD_SUFFIXES = ("", "s", "es", "d", "ed", "ing")
+
+TITLE_KEYWORD_WEIGHT = 0.15  # Title mentions are weighted higher
+CONTENT_KEYWORD_WEIGHT = 0.05
+
+DEFAULT_RELEVANCE = 0.5
+SHORT_SYMBOL_MAX_LEN = 2
+
+# Number of scored articles kept in the per-process cache
+DEFAULT_ARTICLE_CACHE_SIZE = 5000
+
+# Tokens are alphanumeric runs, optionally joined by "." or "-" (BRK.B, BRK-B)
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[.\-][A-Za-z0-9]+)*")
+
+
+def _build_keyword_index() -> Dict[str, Tuple[str, int]]:
+    """Map every keyword inflection to (base keyword, polarity)."""
+    index: Dict[str, Tuple[str, int]] = {}
+    for keywords, polarity in ((POSITIVE_KEYWORDS, 1), (NEGATIVE_KEYWORDS, -1)):
+        for keyword in keywords:
+            for suffix in KEYWORD_SUFFIXES:
+                index.setdefault(keyword + suffix, (keyword, polarity))
+            # "rise" -> "rising", "surge" -> "surging"
+            if keyword.endswith("e"):
+                index.setdefault(keyword[:-1] + "ing", (keyword, polarity))
+    return index
+
+
+_KEYWORD_INDEX = _build_keyword_index()
+
+
+def _tokenize(text: str) -> FrozenSet[str]:
+    """Return the set of raw (case-preserved) tokens in text, expanded with sub-tokens."""
+    tokens = set()
+    for token in _TOKEN_RE.findall(text):
+        tokens.add(token)
+        if "." in token or "-" in token:
+            tokens.update(part for part in re.split(r"[.\-]", token) if part)
+    return frozenset(tokens)
+
+
+def _sentiment_hits(tokens: FrozenSet[str]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Return (positive keywords, negative keywords) present in a token set."""
+    positive = set()
+    negative = set()
+    for token in tokens:
+        hit = _KEYWORD_INDEX.get(token.lower())
+        if hit is not None:
+            (positive if hit[1] > 0 else negative).add(hit[0])
+    return frozenset(positive), frozenset(negative)
+
+
+def sentiment_label(score: float) -> str:
+    """Map a sentiment score to positive/negative/neutral."""
+    if score > 0:
+        return "positive"
+    if score < 0:
+        return "negative"
+    return "neutral"
+
+
+# ============================================================================
+# Scored Article
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class ScoredArticle:
+    """
+    Portfolio-independent scoring of a single article.
+
+    Cached by article id, so re-scoring the same headline for another
+    portfolio (or the next page load) costs a dict lookup.
+    """
+
+    article_id: str
+    sentiment_score: float
+    raw_tokens: FrozenSet[str]
+    """Case-preserved tokens from title + content (used for short symbols)"""
+    lower_tokens: FrozenSet[str]
+    """Lower-cased tokens from title + content"""
+
+
+# ============================================================================
+# Scorer
+# ============================================================================
+
+
+class NewsImpactScorer:
+    """
+    News impact scoring engine.
+
+    Thread-safety: the article cache is a plain OrderedDict; callers run on a
+    single event loop, so no locking is required.
+    """
+
+    def __init__(self, cache_size: int = DEFAULT_ARTICLE_CACHE_SIZE):
+        """
+        Initialize scorer.
+
+        Args:
+            cache_size: Maximum number of scored articles kept in the LRU cache
+        """
+        self.cache_size = cache_size
+        self._article_cache: "OrderedDict[str, ScoredArticle]" = OrderedDict()
+
+    # ------------------------------------------------------------------------
+    # Article scoring
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def article_id(news_item: Dict[str, Any]) -> str:
+        """Stable article id (provider id, URL, or headline as last resort)."""
+        return str(
+            news_item.get("id")
+            or news_item.get("url")
+            or news_item.get("title")
+            or news_item.get("headline")
+            or ""
+        )
+
+    def score_article(self, news_item: Dict[str, Any]) -> ScoredArticle:
+        """
+        Tokenize and sentiment-score an article, using the cache when possible.
+
+        Sentiment rules (unchanged from the original keyword scan):
+            - Each distinct keyword present in the title: ±0.15
+            - Each distinct keyword present in the content: ±0.05
+            - Clamped to [-1, 1]
+        """
+        article_id = self.article_id(news_item)
+        cached = self._article_cache.get(article_id) if article_id else None
+        if cached is not None:
+            self._article_cache.move_to_end(article_id)
+            return cached
+
+        title = news_item.get("title") or news_item.get("headline") or ""
+        summary = news_item.get("summary") or ""
+        content = news_item.get("content") or summary or ""
+
+        title_tokens = _tokenize(title)
+        content_tokens = _tokenize(content)
+
+        title_pos, title_neg = _sentiment_hits(title_tokens)
+        content_pos, content_neg = _sentiment_hits(content_tokens)
+        sentiment = (
+            TITLE_KEYWORD_WEIGHT * (len(title_pos) - len(title_neg))
+            + CONTENT_KEYWORD_WEIGHT * (len(content_pos) - len(content_neg))
+        )
+        sentiment = max(-1.0, min(1.0, sentiment))
+
+        raw_tokens = title_tokens | content_tokens
+        scored = ScoredArticle(
+            article_id=article_id,
+            sentiment_score=sentiment,
+            raw_tokens=raw_tokens,
+            lower_tokens=frozenset(token.lower() for token in raw_tokens),
+        )
+
+        if article_id:
+            self._article_cache[article_id] = scored
+            if len(self._article_cache) > self.cache_size:
+                self._article_cache.popitem(last=False)
+
+        return scored
+
+    def score_relevance(self, title: str, description: str, query: str) -> Decimal:
+        """
+        Relevance of an article to a query (symbol or keyword).
+
+        Tiers:
+            - Exact match of the whole title: 1.00
+            - Query token in title (case-insensitive): 0.85
+            - Query token in description: 0.70
+            - No match: 0.50
+        """
+        if not query or not title:
+            return Decimal("0.50")
+        if query == title:
+            return Decimal("1.00")
+
+        query_tokens = {token.lower() for token in _TOKEN_RE.findall(query)}
+        if not query_tokens:
+            return Decimal("0.50")
+        if query_tokens <= {token.lower() for token in _tokenize(title)}:
+            return Decimal("0.85")
+        if query_tokens <= {token.lower() for token in _tokenize(description or "")}:
+            return Decimal("0.70")
+        return Decimal("0.50")
+
+    # ------------------------------------------------------------------------
+    # Symbol dictionary
+    # ------------------------------------------------------------------------
+
+    @staticmethod
+    def build_symbol_index(
+        symbols: List[str],
+    ) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        """
+        Compile position symbols and aliases into token → position-index maps.
+
+        Aliases: "BRK.B" → brk.b, brk-b, brkb.
+
+        Returns:
+            (case-insensitive index, upper-case-only index for short symbols)
+        """
+        lower_index: Dict[str, List[int]] = {}
+        short_index: Dict[str, List[int]] = {}
+        for col, symbol in enumerate(symbols):
+            if len(symbol) <= SHORT_SYMBOL_MAX_LEN:
+                short_index.setdefault(symbol.upper(), []).append(col)
+                continue
+            lowered = symbol.lower()
+            aliases = {
+                lowered,
+                lowered.replace(".", "-"),
+                lowered.replace("-", "."),
+                lowered.replace(".", "").replace("-", ""),
+            }
+            for alias in aliases:
+                lower_index.setdefault(alias, []).append(col)
+        return lower_index, short_index
+
+    # ------------------------------------------------------------------------
+    # Portfolio impact
+    # ------------------------------------------------------------------------
+
+    def compute_portfolio_impact(
+        self,
+        news_items: List[Dict[str, Any]],
+        positions: List[Dict[str, Any]],
+        min_threshold: float = 0.1,
+    ) -> Dict[str, Any]:
+        """
+        Compute portfolio impact of news items.
+
+        Args:
+            news_items: Articles (from news.search)
+            positions: Valued positions with "symbol" and "weight" (percent)
+            min_threshold: Minimum per-position impact score to report
+
+        Returns:
+            Dict in the news.compute_portfolio_impact result format
+        """
+        # Position lookup by symbol (last occurrence wins, as before)
+        position_lookup: Dict[str, Dict[str, Any]] = {}
+        for pos in positions:
+            if isinstance(pos, dict) and pos.get("symbol"):
+                position_lookup[pos["symbol"]] = pos
+
+        symbols = list(position_lookup.keys())
+        symbol_cols = {symbol: col for col, symbol in enumerate(symbols)}
+        weights = np.array(
+            [float(position_lookup[s].get("weight", 0.0) or 0.0) for s in symbols],
+            dtype=float,
+        )
+        lower_index, short_index = self.build_symbol_index(symbols)
+
+        articles: List[Dict[str, Any]] = []
+        sentiments: List[float] = []
+        relevances: List[float] = []
+        hit_rows: List[int] = []
+        hit_cols: List[int] = []
+
+        # Pass 1: one scan per article → sparse article × position hit matrix
+        for news_item in news_items:
+            if not isinstance(news_item, dict):
+                continue
+            scored = self.score_article(news_item)
+            row = len(articles)
+
+            cols: List[int] = []
+            seen = set()
+            for token in scored.lower_tokens:
+                for col in lower_index.get(token, ()):
+                    if col not in seen:
+                        seen.add(col)
+                        cols.append(col)
+            if short_index:
+                for token in scored.raw_tokens:
+                    for col in short_index.get(token, ()):
+                        if col not in seen:
+                            seen.add(col)
+                            cols.append(col)
+            cols.sort()
+
+            # Articles returned by news.search for a holding always count for it
+            matched_symbol = news_item.get("matched_symbol", "")
+            if matched_symbol:
+                original_symbol = matched_symbol.replace("-", ".")
+                col = symbol_cols.get(original_symbol)
+                if col is not None and col not in seen:
+                    cols.append(col)
+
+            articles.append(news_item)
+            sentiments.append(scored.sentiment_score)
+            relevances.append(float(news_item.get("relevance", DEFAULT_RELEVANCE)))
+            hit_rows.extend([row] * len(cols))
+            hit_cols.extend(cols)
+
+        rows = np.asarray(hit_rows, dtype=np.intp)
+        cols_arr = np.asarray(hit_cols, dtype=np.intp)
+        sentiment_arr = np.asarray(sentiments, dtype=float)
+        relevance_arr = np.asarray(relevances, dtype=float)
+
+        # Pass 2: vectorized impact = |sentiment| × relevance × weight / 100
+        if rows.size:
+            impact = np.abs(sentiment_arr[rows]) * relevance_arr[rows] * weights[cols_arr] / 100.0
+            keep = impact >= min_threshold
+        else:
+            impact = np.zeros(0, dtype=float)
+            keep = np.zeros(0, dtype=bool)
+
+        mention_counts = np.bincount(cols_arr, minlength=len(symbols)) if symbols else np.zeros(0)
+        total_impact_score = float(impact[keep].sum()) if keep.size else 0.0
+
+        # Group hits by article (hits are already ordered by row)
+        impact_analysis = []
+        boundaries = np.searchsorted(rows, np.arange(len(articles) + 1)) if articles else []
+        for row, news_item in enumerate(articles):
+            start, end = int(boundaries[row]), int(boundaries[row + 1])
+            if start == end:
+                continue
+            mentioned_symbols = [symbols[c] for c in cols_arr[start:end]]
+            sentiment_score = sentiments[row]
+            label = sentiment_label(sentiment_score)
+
+            position_impacts = [
+                {
+                    "symbol": symbols[col],
+                    "weight": float(weights[col]),
+                    "impact_score": round(float(score), 4),
+                    "sentiment": label,
+                    "sentiment_score": round(sentiment_score, 3),
+                }
+                for col, score, kept in zip(
+                    cols_arr[start:end], impact[start:end], keep[start:end]
+                )
+                if kept
+            ]
+            if not position_impacts:
+                continue
+
+            impact_analysis.append({
+                "headline": news_item.get("title", ""),
+                "summary": news_item.get("summary", ""),
+                "source": news_item.get("source", ""),
+                "published_at": news_item.get("published_at", ""),
+                "url": news_item.get("url", ""),
+                "sentiment": label,
+                "sentiment_score": round(sentiment_score, 3),
+                "impact_score": round(max(imp["impact_score"] for imp in position_impacts), 4),
+                "entities": mentioned_symbols,
+                "weight_affected": round(sum(imp["weight"] for imp in position_impacts), 2),
+                "mentioned_symbols": mentioned_symbols,
+                "position_impacts": position_impacts,
+            })
+
+        # Sort by impact score (highest impact first)
+        impact_analysis.sort(key=lambda x: x["impact_score"], reverse=True)
+
+        # Entity mentions for bar chart (top 10)
+        entity_mentions_list = sorted(
+            [
+                {"entity": symbols[col], "mention_count": int(count)}
+                for col, count in enumerate(mention_counts)
+                if count
+            ],
+            key=lambda x: x["mention_count"],
+            reverse=True,
+        )[:10]
+
+        exposed_positions = len({entity for item in impact_analysis for entity in item["entities"]})
+        exposed_portfolio_pct = (exposed_positions / len(positions) * 100) if positions else 0
+
+        if impact_analysis:
+            avg_sentiment = sum(item["sentiment_score"] for item in impact_analysis) / len(impact_analysis)
+            overall_sentiment = "positive" if avg_sentiment > 0.1 else "negative" if avg_sentiment < -0.1 else "neutral"
+        else:
+            overall_sentiment = "neutral"
+
+        total_weight = sum(float(pos.get("weight", 0)) for pos in positions if isinstance(pos, dict))
+        weighted_impact = (total_impact_score / total_weight * 100) if total_weight > 0 else 0
+
+        return {
+            # Core analysis results
+            "news_with_impact": impact_analysis,  # For news_items panel
+            "impact_analysis": impact_analysis,   # Backwards compatibility
+
+            # Summary metrics for impact_summary panel
+            "total_items": len(news_items),
+            "high_impact_count": len([item for item in impact_analysis if item["impact_score"] >= min_threshold]),
+            "weighted_impact": round(weighted_impact, 4),
+            "exposed_portfolio_pct": round(exposed_portfolio_pct, 2),
+            "overall_sentiment": overall_sentiment,
+
+            # Entity mentions for bar chart
+            "entity_mentions": entity_mentions_list,
+
+            # Additional metadata
+            "total_impact_score": round(total_impact_score, 4),
+            "min_threshold": min_threshold,
+            "positions_analyzed": len(positions),
+            "news_items_analyzed": len(news_items),
+            "_source": "newsapi" if news_items else "empty",
+        }
+
+    def clear_cache(self) -> None:
+        """Drop all cached article scores."""
+        self._article_cache.clear()
@@ -82,6 +82,7 @@
     logging.warning("Riskfolio-Lib not installed. Optimizer will return stub data.")
 
 from app.db.connection import get_db_pool
+from app.db.columnar_store import get_columnar_store
 from app.core.exceptions import BusinessLogicError, DatabaseError
 from app.core.constants.scenarios import (
     MIN_QUALITY_SCORE,
@@ -1140,6 +1141,18 @@ async def _fetch_price_history(
         asof_date = await self._get_pack_date(pricing_pack_id)
         start_date = asof_date - timedelta(days=lookback_days * 2)  # Extra buffer for weekends
 
+        # Nightly columnar snapshot: mmap slices instead of a row-per-price join
+        store = get_columnar_store()
+        if store.max_date("prices") is not None:
+            security_rows = await self.execute_query(
+                "SELECT DISTINCT security_id FROM lots WHERE symbol = ANY($1)", symbols
+            )
+            df = await store.frame(
+                "prices", [row["security_id"] for row in security_rows], "close", start_date, asof_date
+            )
+            if df is not None and not df.empty:
+                return df.ffill().bfill()
+
         # Query historical prices
         query = """
             SELECT
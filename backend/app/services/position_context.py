@@ -0,0 +1,465 @@
+"""
+Position Context
+
+Purpose: Load everything a holding deep dive needs once per (portfolio, security, pack)
+Created: 2025-11-10
+Priority: P1 (holding_deep_dive: get_position_details, compute_position_* , get_transaction_history)
+
+One RLS connection, four named queries:
+    position_context.header       pack date, portfolio base currency, security row
+    position_context.open_lots    every open lot of the portfolio with its pack close
+                                  (position and portfolio value from the same rows)
+    position_context.history      security closes, FX to base and portfolio twr_1d by date
+    position_context.transactions the security's transactions, newest first
+
+The pure functions below (position_details, position_return, ...) compute each
+deep-dive capability's result from a PositionContext without further I/O.
+
+Usage:
+    async with get_rls_read_connection(user_id) as conn:
+        pctx = await load_position_context(conn, portfolio_id, security_id, pack_id, lookback_days=252)
+    details = position_details(pctx)
+    perf = position_return(pctx, 252)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+import numpy as np
+
+from app.db.query_registry import fetch_named, fetchrow_named, register_query
+
+logger = logging.getLogger("DawsOS.PositionContext")
+
+# Pattern state key holding {(portfolio_id, security_id, pack_id): Future[PositionContext]}
+STATE_KEY = "_position_context"
+
+RISK_FREE_RATE = 0.04
+MIN_RISK_OBSERVATIONS = 30
+
+GET_HEADER = register_query(
+    "position_context.header",
+    """
+    SELECT
+        pp.date AS pack_date,
+        p.base_currency,
+        s.symbol,
+        s.name,
+        s.security_type,
+        s.trading_currency
+    FROM pricing_packs pp
+    CROSS JOIN portfolios p
+    LEFT JOIN securities s ON s.id = $3
+    WHERE pp.id = $2 AND p.id = $1
+    """,
+)
+
+GET_OPEN_LOTS = register_query(
+    "position_context.open_lots",
+    """
+    SELECT
+        l.security_id,
+        l.symbol,
+        l.acquisition_date,
+        l.quantity_open,
+        l.cost_basis_per_share,
+        l.currency,
+        pr.close
+    FROM lots l
+    LEFT JOIN prices pr ON pr.security_id = l.security_id AND pr.pricing_pack_id = $2
+    WHERE l.portfolio_id = $1
+      AND l.quantity_open > 0
+    ORDER BY l.acquisition_date
+    """,
+)
+
+GET_HISTORY = register_query(
+    "position_context.history",
+    """
+    SELECT
+        p.asof_date,
+        p.close,
+        fx.rate AS fx_rate,
+        pm.twr_1d
+    FROM prices p
+    LEFT JOIN fx_rates fx ON fx.pricing_pack_id = p.pricing_pack_id
+        AND fx.base_ccy = $4
+        AND fx.quote_ccy = $5
+    LEFT JOIN portfolio_metrics pm ON pm.portfolio_id = $6
+        AND pm.asof_date = p.asof_date
+        AND pm.pricing_pack_id = p.pricing_pack_id
+    WHERE p.security_id = $1
+      AND p.asof_date BETWEEN $2 AND $3
+    ORDER BY p.asof_date ASC
+    """,
+)
+
+GET_TRANSACTIONS = register_query(
+    "position_context.transactions",
+    """
+    SELECT
+        transaction_date,
+        transaction_type,
+        quantity,
+        price,
+        (quantity * price) AS total_value,
+        commission,
+        realized_pl
+    FROM transactions
+    WHERE portfolio_id = $1
+      AND security_id = $2
+    ORDER BY transaction_date DESC
+    """,
+)
+
+
+@dataclass
+class PositionContext:
+    """Lots, prices, FX, portfolio returns and transactions for one holding."""
+
+    portfolio_id: UUID
+    security_id: UUID
+    pack_id: str
+    pack_date: date
+    base_currency: str
+    symbol: Optional[str]
+    name: Optional[str]
+    security_type: Optional[str]
+    security_currency: str
+    portfolio_lots: List[Dict[str, Any]]  # all open lots of the portfolio
+    lots: List[Dict[str, Any]]            # open lots of this security
+    transactions: List[Dict[str, Any]]
+    history_days: int = 0
+    dates: np.ndarray = field(default_factory=lambda: np.array([], dtype="datetime64[D]"))
+    closes: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.float64))
+    fx_rates: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.float64))
+    portfolio_returns: np.ndarray = field(default_factory=lambda: np.array([], dtype=np.float64))
+    # Concurrent I/O started alongside the load (e.g. portfolio TWR, fundamentals)
+    pending: Dict[str, "asyncio.Future"] = field(default_factory=dict, repr=False)
+    _history_lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+    @property
+    def asset_class(self) -> Optional[str]:
+        return self.security_type
+
+    def window(self, lookback_days: int) -> np.ndarray:
+        """Boolean mask of history rows within lookback_days of the pack date."""
+        start = np.datetime64(self.pack_date - timedelta(days=int(lookback_days)), "D")
+        return self.dates >= start
+
+    async def ensure_history(self, conn_factory, lookback_days: int) -> None:
+        """Reload history when a caller needs a longer lookback than was loaded."""
+        if lookback_days <= self.history_days:
+            return
+        async with self._history_lock:
+            if lookback_days <= self.history_days:
+                return
+            async with conn_factory() as conn:
+                await _load_history(conn, self, lookback_days)
+
+
+async def _load_history(conn, pctx: PositionContext, lookback_days: int) -> None:
+    rows = await fetch_named(
+        conn, GET_HISTORY,
+        pctx.security_id,
+        pctx.pack_date - timedelta(days=int(lookback_days)),
+        pctx.pack_date,
+        pctx.security_currency,
+        pctx.base_currency,
+        pctx.portfolio_id,
+    )
+    pctx.dates = np.array([row["asof_date"] for row in rows], dtype="datetime64[D]")
+    pctx.closes = np.array([float(row["close"]) for row in rows], dtype=np.float64)
+    pctx.fx_rates = np.array(
+        [float(row["fx_rate"]) if row["fx_rate"] is not None else np.nan for row in rows], dtype=np.float64
+    )
+    pctx.portfolio_returns = np.array(
+        [float(row["twr_1d"]) if row["twr_1d"] is not None else np.nan for row in rows], dtype=np.float64
+    )
+    pctx.history_days = int(lookback_days)
+
+
+async def load_position_context(
+    conn,
+    portfolio_id: UUID,
+    security_id: UUID,
+    pack_id: str,
+    lookback_days: int = 252,
+) -> PositionContext:
+    """
+    Load a PositionContext on one (RLS) connection.
+
+    Raises:
+        ValueError: If the pricing pack / portfolio is unknown or the security
+                    has no open lots in the portfolio
+    """
+    header = await fetchrow_named(conn, GET_HEADER, portfolio_id, pack_id, security_id)
+    if header is None:
+        raise ValueError(f"Pricing pack {pack_id} or portfolio {portfolio_id} not found")
+
+    portfolio_lots = [dict(row) for row in await fetch_named(conn, GET_OPEN_LOTS, portfolio_id, pack_id)]
+    lots = [lot for lot in portfolio_lots if lot["security_id"] == security_id]
+    if not lots:
+        raise ValueError(f"No open position found for security {security_id}")
+
+    transactions = [dict(row) for row in await fetch_named(conn, GET_TRANSACTIONS, portfolio_id, security_id)]
+
+    pctx = PositionContext(
+        portfolio_id=portfolio_id,
+        security_id=security_id,
+        pack_id=pack_id,
+        pack_date=header["pack_date"],
+        base_currency=header["base_currency"] or "USD",
+        symbol=header["symbol"] or lots[0]["symbol"],
+        name=header["name"],
+        security_type=header["security_type"],
+        security_currency=lots[0]["currency"] or header["trading_currency"] or "USD",
+        portfolio_lots=portfolio_lots,
+        lots=lots,
+        transactions=transactions,
+    )
+    await _load_history(conn, pctx, lookback_days)
+    return pctx
+
+
+# ============================================================================
+# Capability computations (pure)
+# ============================================================================
+
+def position_details(pctx: PositionContext) -> Dict[str, Any]:
+    """get_position_details: quantity, cost, market value, weight, unrealized P&L."""
+    total_qty = sum(Decimal(str(lot["quantity_open"])) for lot in pctx.lots)
+    weighted_cost = sum(
+        Decimal(str(lot["quantity_open"])) * Decimal(str(lot["cost_basis_per_share"] or 0)) for lot in pctx.lots
+    )
+    avg_cost = weighted_cost / total_qty if total_qty > 0 else Decimal("0")
+
+    close = pctx.lots[0]["close"]
+    current_price = Decimal(str(close)) if close is not None else Decimal("0")
+    market_value = total_qty * current_price
+    unrealized_pnl = market_value - weighted_cost
+    unrealized_pnl_pct = (unrealized_pnl / weighted_cost) if weighted_cost > 0 else Decimal("0")
+
+    portfolio_value = sum(
+        Decimal(str(lot["quantity_open"])) * Decimal(str(lot["close"]))
+        for lot in pctx.portfolio_lots
+        if lot["close"] is not None
+    ) or Decimal("1")
+    weight = market_value / portfolio_value if portfolio_value > 0 else Decimal("0")
+
+    return {
+        "symbol": pctx.symbol,
+        "security_id": str(pctx.security_id),
+        "security_currency": pctx.security_currency,
+        "asset_class": pctx.asset_class,
+        "quantity": float(total_qty),
+        "avg_cost": float(avg_cost),
+        "current_price": float(current_price),
+        "market_value": float(market_value),
+        "weight": float(weight),
+        "unrealized_pnl": float(unrealized_pnl),
+        "unrealized_pnl_pct": float(unrealized_pnl_pct),
+        "lot_count": len(pctx.lots),
+    }
+
+
+def _daily_returns(closes: np.ndarray) -> np.ndarray:
+    """Simple returns close[i] / close[i-1] - 1 (NaN where the previous close is not positive)."""
+    prev, curr = closes[:-1], closes[1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(prev > 0, curr / prev - 1, np.nan)
+
+
+def position_return(pctx: PositionContext, lookback_days: int = 252) -> Dict[str, Any]:
+    """compute_position_return: total/annualized return, volatility, Sharpe, drawdown."""
+    mask = pctx.window(lookback_days)
+    dates, closes = pctx.dates[mask], pctx.closes[mask]
+    if len(closes) < 2:
+        return {"error": "Insufficient historical data", "data_points": int(len(closes)), "required_minimum": 2}
+
+    returns = _daily_returns(closes)
+    valid = ~np.isnan(returns)
+    if not valid.any():
+        return {"error": "No valid returns calculated", "data_points": int(len(closes))}
+    returns_array = returns[valid]
+    daily_returns = [
+        {"date": str(day), "return": float(r)} for day, r in zip(dates[1:][valid], returns_array)
+    ]
+
+    total_return = float(np.prod(1 + returns_array) - 1)
+    volatility = float(np.std(returns_array) * np.sqrt(252)) if len(returns_array) > 1 else 0.0
+    days_actual = len(returns_array)
+    ann_return = (1 + total_return) ** (252 / days_actual) - 1
+    sharpe = (ann_return - RISK_FREE_RATE) / volatility if volatility > 0 else 0.0
+
+    running_max = np.maximum.accumulate(closes)
+    drawdowns = (closes - running_max) / running_max
+    max_dd_idx = int(np.argmin(drawdowns))
+    recovered = np.flatnonzero(closes[max_dd_idx:] >= running_max[max_dd_idx])
+    recovery_days = int(recovered[0]) if len(recovered) else -1
+
+    return {
+        "security_id": str(pctx.security_id),
+        "total_return": round(total_return, 6),
+        "annualized_return": round(ann_return, 6),
+        "volatility": round(volatility, 6),
+        "sharpe": round(sharpe, 4),
+        "max_drawdown": round(float(drawdowns[max_dd_idx]), 6),
+        "recovery_days": recovery_days,
+        "data_points": int(len(closes)),
+        "lookback_days": lookback_days,
+        "daily_returns": daily_returns,
+    }
+
+
+def position_currency_attribution(
+    pctx: PositionContext,
+    lookback_days: int = 252,
+    base_currency: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """compute_position_currency_attribution: r_base = r_local + r_fx + r_local × r_fx."""
+    base_currency = base_currency or pctx.base_currency
+    security_currency = pctx.security_currency
+    if security_currency == base_currency:
+        details = details or position_details(pctx)
+        return {
+            "security_id": str(pctx.security_id),
+            "security_currency": security_currency,
+            "base_currency": base_currency,
+            "local_contribution": float(details.get("unrealized_pnl_pct", 0)),
+            "fx_contribution": 0.0,
+            "interaction_contribution": 0.0,
+            "total_contribution": float(details.get("unrealized_pnl_pct", 0)),
+            "note": "Position in base currency - no FX attribution",
+        }
+
+    mask = pctx.window(lookback_days)
+    closes, fx = pctx.closes[mask], np.nan_to_num(pctx.fx_rates[mask], nan=1.0)
+    if len(closes) < 2:
+        return {"error": "Insufficient historical data", "data_points": int(len(closes)), "required_minimum": 2}
+
+    r_local = (closes[-1] - closes[0]) / closes[0] if closes[0] > 0 else 0.0
+    r_fx = (fx[-1] - fx[0]) / fx[0] if fx[0] > 0 else 0.0
+    r_interaction = r_local * r_fx
+    return {
+        "security_id": str(pctx.security_id),
+        "security_currency": security_currency,
+        "base_currency": base_currency,
+        "local_contribution": float(r_local),
+        "fx_contribution": float(r_fx),
+        "interaction_contribution": float(r_interaction),
+        "total_contribution": float(r_local + r_fx + r_interaction),
+        "lookback_days": lookback_days,
+        "data_points": int(len(closes)),
+    }
+
+
+def position_risk(
+    pctx: PositionContext,
+    lookback_days: int = 252,
+    details: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """compute_position_risk: VaR, marginal VaR, beta/correlation to the portfolio (date-aligned)."""
+    details = details or position_details(pctx)
+    mask = pctx.window(lookback_days)
+    closes, portfolio = pctx.closes[mask], pctx.portfolio_returns[mask]
+    portfolio_points = int((~np.isnan(portfolio)).sum())
+    if len(closes) < 2 or portfolio_points < 2:
+        return {
+            "error": "Insufficient historical data",
+            "position_data_points": int(len(closes)),
+            "portfolio_data_points": portfolio_points,
+        }
+
+    position_returns = _daily_returns(closes)
+    portfolio_returns = portfolio[1:]
+    aligned = ~np.isnan(position_returns) & ~np.isnan(portfolio_returns)
+    position_returns, portfolio_returns = position_returns[aligned], portfolio_returns[aligned]
+    min_len = int(aligned.sum())
+    if min_len < MIN_RISK_OBSERVATIONS:
+        return {
+            "error": "Insufficient aligned data",
+            "aligned_data_points": min_len,
+            "required_minimum": MIN_RISK_OBSERVATIONS,
+        }
+
+    market_value = details.get("market_value", 0)
+    position_weight = details.get("weight", 0)
+    position_vol = float(np.std(position_returns) * np.sqrt(252))
+    portfolio_vol = float(np.std(portfolio_returns) * np.sqrt(252))
+    correlation = float(np.corrcoef(position_returns, portfolio_returns)[0, 1])
+    covariance = float(np.cov(position_returns, portfolio_returns)[0, 1])
+    portfolio_variance = float(np.var(portfolio_returns))
+    beta = covariance / portfolio_variance if portfolio_variance > 0 else 1.0
+
+    var_1d_pct = -1.645 * position_vol / np.sqrt(252)
+    portfolio_var_pct = -1.645 * portfolio_vol / np.sqrt(252)
+    marginal_var_pct = beta * position_weight * portfolio_var_pct
+    standalone_risk = position_weight * position_vol
+    portfolio_contribution = position_weight * beta * portfolio_vol
+    diversification_benefit = (
+        (standalone_risk - portfolio_contribution) / standalone_risk if standalone_risk > 0 else 0.0
+    )
+
+    return {
+        "security_id": str(pctx.security_id),
+        "market_value": float(market_value),
+        "position_weight": float(position_weight),
+        "var_1d": round(float(var_1d_pct * market_value), 2),
+        "var_1d_pct": round(float(var_1d_pct), 6),
+        "marginal_var": round(float(marginal_var_pct * market_value), 2),
+        "position_volatility": round(position_vol, 6),
+        "portfolio_volatility": round(portfolio_vol, 6),
+        "beta_to_portfolio": round(beta, 4),
+        "correlation": round(correlation, 4),
+        "diversification_benefit": round(float(diversification_benefit), 4),
+        "data_points": min_len,
+    }
+
+
+def portfolio_contribution(
+    details: Dict[str, Any],
+    position_return_result: Dict[str, Any],
+    portfolio_return: Decimal,
+) -> Dict[str, Any]:
+    """compute_portfolio_contribution: weight × position return vs portfolio return."""
+    weight = Decimal(str(details["weight"]))
+    position_ret = Decimal(str(position_return_result.get("total_return", 0.0)))
+    total_contribution = weight * position_ret
+    pct_of_portfolio_return = (
+        total_contribution / portfolio_return * 100 if portfolio_return > 0 else Decimal("0")
+    )
+    return {
+        "total_contribution": float(total_contribution),
+        "pct_of_portfolio_return": float(pct_of_portfolio_return),
+        "weight": float(weight),
+        "position_return": float(position_ret),
+        "portfolio_return": float(portfolio_return),
+        "note": "Contribution calculated from actual position and portfolio returns",
+    }
+
+
+def transaction_history(transactions: List[Dict[str, Any]], limit: int = 50) -> Dict[str, Any]:
+    """get_transaction_history: newest transactions first (rows of position_context.transactions)."""
+    transactions = transactions[: int(limit)] if limit else transactions
+    return {
+        "transactions": [
+            {
+                "transaction_date": str(t["transaction_date"]),
+                "transaction_type": t["transaction_type"],
+                "quantity": float(t["quantity"]) if t["quantity"] is not None else 0.0,
+                "price": float(t["price"]) if t["price"] is not None else 0.0,
+                "total_value": float(t["total_value"]) if t["total_value"] is not None else 0.0,
+                "commission": float(t["commission"]) if t["commission"] else 0.0,
+                "realized_pl": float(t["realized_pl"]) if t["realized_pl"] else None,
+            }
+            for t in transactions
+        ],
+        "count": len(transactions),
+    }
@@ -36,6 +36,7 @@
 
 from app.db.pricing_pack_queries import get_pricing_pack_queries
 from app.db.connection import execute_query_one, execute_query
+from app.db.query_registry import register_query
 from app.core.types import (
     PricingPackNotFoundError,
     PricingPackValidationError,
@@ -51,6 +52,108 @@
 UUID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
 
 
+# Hot pricing queries (declared once; prepared per connection and tracked by name)
+PRICE_BY_SECURITY = register_query(
+    "pricing.price_by_security",
+    """
+    SELECT
+        security_id,
+        pricing_pack_id,
+        asof_date,
+        close,
+        open,
+        high,
+        low,
+        volume,
+        currency,
+        source
+    FROM prices
+    WHERE security_id = $1 AND pricing_pack_id = $2
+    """,
+)
+
+PRICES_FOR_SECURITIES = register_query(
+    "pricing.prices_for_securities",
+    """
+    SELECT
+        security_id,
+        pricing_pack_id,
+        asof_date,
+        close,
+        open,
+        high,
+        low,
+        volume,
+        currency,
+        source
+    FROM prices
+    WHERE security_id = ANY($1) AND pricing_pack_id = $2
+    """,
+)
+
+CLOSES_FOR_SECURITIES = register_query(
+    "pricing.closes_for_securities",
+    """
+    SELECT security_id, close
+    FROM prices
+    WHERE security_id = ANY($1) AND pricing_pack_id = $2
+    """,
+)
+
+ALL_PRICES = register_query(
+    "pricing.all_prices",
+    """
+    SELECT
+        security_id,
+        pricing_pack_id,
+        asof_date,
+        close,
+        open,
+        high,
+        low,
+        volume,
+        currency,
+        source
+    FROM prices
+    WHERE pricing_pack_id = $1
+    ORDER BY security_id
+    """,
+)
+
+FX_RATE = register_query(
+    "pricing.fx_rate",
+    """
+    SELECT
+        base_ccy,
+        quote_ccy,
+        pricing_pack_id,
+        asof_ts,
+        rate,
+        source,
+        policy
+    FROM fx_rates
+    WHERE base_ccy = $1 AND quote_ccy = $2 AND pricing_pack_id = $3
+    """,
+)
+
+ALL_FX_RATES = register_query(
+    "pricing.all_fx_rates",
+    """
+    SELECT
+        base_ccy,
+        quote_ccy,
+        pricing_pack_id,
+        asof_ts,
+        rate,
+        source,
+        policy
+    FROM fx_rates
+    WHERE pricing_pack_id = $1
+    ORDER BY base_ccy, quote_ccy
+    """,
+)
+
+
 def validate_pack_id(pack_id: str) -> None:
     """
     Validate pricing pack ID format.
@@ -345,24 +448,8 @@ async def get_price(
                 source="stub",
             )
 
-        query = """
-            SELECT
-                security_id,
-                pricing_pack_id,
-                asof_date,
-                close,
-                open,
-                high,
-                low,
-                volume,
-                currency,
-                source
-            FROM prices
-            WHERE security_id = $1 AND pricing_pack_id = $2
-        """
-
         try:
-            row = await execute_query_one(query, security_id, pack_id)
+            row = await execute_query_one(PRICE_BY_SECURITY, security_id, pack_id)
 
             if not row:
                 logger.warning(f"No price found for security {security_id} in pack {pack_id}")
@@ -426,24 +513,8 @@ async def get_prices_for_securities(
                 for sec_id in security_ids
             }
 
-        query = """
-            SELECT
-                security_id,
-                pricing_pack_id,
-                asof_date,
-                close,
-                open,
-                high,
-                low,
-                volume,
-                currency,
-                source
-            FROM prices
-            WHERE security_id = ANY($1) AND pricing_pack_id = $2
-        """
-
         try:
-            rows = await execute_query(query, security_ids, pack_id)
+            rows = await execute_query(PRICES_FOR_SECURITIES, security_ids, pack_id)
 
             prices = {}
             for row in rows:
@@ -503,14 +574,8 @@ async def get_prices_as_decimals(
             logger.warning(f"get_prices_as_decimals: Using stub implementation")
             return {sec_id: Decimal("100.00") for sec_id in security_ids}
 
-        query = """
-            SELECT security_id, close
-            FROM prices
-            WHERE security_id = ANY($1) AND pricing_pack_id = $2
-        """
-
         try:
-            rows = await execute_query(query, security_ids, pack_id)
+            rows = await execute_query(CLOSES_FOR_SECURITIES, security_ids, pack_id)
 
             # Return plain dict of Decimals (no dataclass overhead)
             prices = {
@@ -549,25 +614,8 @@ async def get_all_prices(self, pack_id: str) -> List[SecurityPrice]:
             logger.warning(f"get_all_prices({pack_id}): Using stub implementation")
             return []
 
-        query = """
-            SELECT
-                security_id,
-                pricing_pack_id,
-                asof_date,
-                close,
-                open,
-                high,
-                low,
-                volume,
-                currency,
-                source
-            FROM prices
-            WHERE pricing_pack_id = $1
-            ORDER BY security_id
-        """
-
         try:
-            rows = await execute_query(query, pack_id)
+            rows = await execute_query(ALL_PRICES, pack_id)
 
             prices = []
             for row in rows:
@@ -639,21 +687,8 @@ async def get_fx_rate(
                 policy="WM4PM_CAD",
             )
 
-        query = """
-            SELECT
-                base_ccy,
-                quote_ccy,
-                pricing_pack_id,
-                asof_ts,
-                rate,
-                source,
-                policy
-            FROM fx_rates
-            WHERE base_ccy = $1 AND quote_ccy = $2 AND pricing_pack_id = $3
-        """
-
         try:
-            row = await execute_query_one(query, base_ccy, quote_ccy, pack_id)
+            row = await execute_query_one(FX_RATE, base_ccy, quote_ccy, pack_id)
 
             if not row:
                 logger.warning(f"No FX rate found for {base_ccy}/{quote_ccy} in pack {pack_id}")
@@ -699,22 +734,8 @@ async def get_all_fx_rates(self, pack_id: str) -> List[FXRate]:
             logger.warning(f"get_all_fx_rates({pack_id}): Using stub implementation")
             return []
 
-        query = """
-            SELECT
-                base_ccy,
-                quote_ccy,
-                pricing_pack_id,
-                asof_ts,
-                rate,
-                source,
-                policy
-            FROM fx_rates
-            WHERE pricing_pack_id = $1
-            ORDER BY base_ccy, quote_ccy
-        """
-
         try:
-            rows = await execute_query(query, pack_id)
+            rows = await execute_query(ALL_FX_RATES, pack_id)
 
             fx_rates = []
             for row in rows:
@@ -33,6 +33,7 @@
     PricingPackNotFoundError,
     PricingPackValidationError,
 )
+from app.db.columnar_store import portfolio_value_returns
 from app.services.pricing import PricingService
 from app.core.constants.risk import (
     CONFIDENCE_LEVEL_95,
@@ -415,6 +416,10 @@ async def _get_portfolio_returns(
         Returns:
             List of {asof_date, return}
         """
+        cached = await portfolio_value_returns(portfolio_id, start_date, end_date)
+        if cached is not None:
+            return [{"asof_date": d, "return": r} for d, r in cached]
+
         values = await self.db.fetch(
             """
             SELECT valuation_date as asof_date, total_value
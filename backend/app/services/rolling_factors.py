@@ -0,0 +1,276 @@
+"""
+Rolling Factor Exposures
+
+Purpose: Factor betas / R² / residual vol for many window ends from one data load
+Created: 2025-11-10
+Priority: P1 (risk.get_factor_exposure_history, macro_trend_monitor)
+
+Model (same as FactorAnalyzer.compute_factor_exposure):
+    r_portfolio = α + β·[real_rate, inflation, credit, usd, equity_risk_premium] + ε
+
+Approach:
+    - Load portfolio and factor returns once for [first window start, last window end]
+    - Prefix sums of x, y, x·xᵀ, x·y, y² over the aligned panel
+    - Each window's centred normal equations are differences of two prefix sums
+      (O(k²) per window end), solved as one stacked pseudo-inverse; this is the
+      same minimum-norm least-squares fit sklearn's LinearRegression produces
+    - Results are persisted per (portfolio, pricing pack, window) in
+      factor_exposure_history and reused on later requests while the
+      portfolio's data version (app/db/portfolio_version.py) is unchanged
+
+Usage:
+    store = FactorExposureHistoryStore()
+    history = await store.get_history(analyzer, portfolio_id, [(pack_id, pack_date), ...])
+"""
+
+import json
+import logging
+from datetime import date
+from typing import Any, Dict, List, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+
+from app.core.constants.financial import TRADING_DAYS_PER_YEAR
+from app.db.connection import POOL_READ, POOL_WRITE, execute_query, get_pool
+from app.db.portfolio_version import portfolio_data_version
+from app.db.query_registry import register_query
+
+logger = logging.getLogger(__name__)
+
+FACTOR_NAMES = ("real_rate", "inflation", "credit", "usd", "equity_risk_premium")
+MIN_OBSERVATIONS = 30
+
+
+# ============================================================================
+# Engine
+# ============================================================================
+
+def rolling_factor_regressions(
+    dates: np.ndarray,
+    y: np.ndarray,
+    X: np.ndarray,
+    window_ends: Sequence[date],
+    lookback_days: int = TRADING_DAYS_PER_YEAR,
+    min_obs: int = MIN_OBSERVATIONS,
+) -> List[Dict[str, Any]]:
+    """
+    Regress y on X for every window (end - lookback_days, end].
+
+    Args:
+        dates: datetime64[D] return dates, ascending
+        y: Portfolio returns aligned with dates
+        X: Factor returns, shape (len(dates), k)
+        window_ends: Window end dates
+        lookback_days: Calendar-day window length
+        min_obs: Minimum aligned observations per window
+
+    Returns:
+        One exposure dict per window end (same keys as compute_factor_exposure),
+        or {"error", "data_points"} when a window has too few observations
+    """
+    y = np.asarray(y, dtype=np.float64)
+    X = np.asarray(X, dtype=np.float64).reshape(len(y), -1)
+    k = X.shape[1]
+
+    # Prefix sums (index i = sum over the first i observations)
+    def prefix(values: np.ndarray) -> np.ndarray:
+        out = np.zeros((len(values) + 1,) + values.shape[1:])
+        np.cumsum(values, axis=0, out=out[1:])
+        return out
+
+    s_x, s_y, s_yy = prefix(X), prefix(y), prefix(y * y)
+    s_xx = prefix(X[:, :, None] * X[:, None, :])
+    s_xy = prefix(X * y[:, None])
+
+    ends = np.array(window_ends, dtype="datetime64[D]")
+    lo = np.searchsorted(dates, ends - np.timedelta64(lookback_days, "D"), side="right")
+    hi = np.searchsorted(dates, ends, side="right")
+    n = hi - lo
+    ok = n >= min_obs
+
+    results: List[Dict[str, Any]] = [
+        {"error": f"Insufficient data (minimum {min_obs} days required)", "data_points": int(count)}
+        for count in n
+    ]
+    if not ok.any():
+        return results
+
+    lo, hi, n_ok = lo[ok], hi[ok], n[ok].astype(np.float64)
+    sx = s_x[hi] - s_x[lo]
+    sy = s_y[hi] - s_y[lo]
+    x_mean = sx / n_ok[:, None]
+    y_mean = sy / n_ok
+
+    # Centred sums of squares / cross-products
+    sxx_c = (s_xx[hi] - s_xx[lo]) - n_ok[:, None, None] * x_mean[:, :, None] * x_mean[:, None, :]
+    sxy_c = (s_xy[hi] - s_xy[lo]) - n_ok[:, None] * x_mean * y_mean[:, None]
+    syy_c = (s_yy[hi] - s_yy[lo]) - n_ok * y_mean ** 2
+
+    betas = (np.linalg.pinv(sxx_c) @ sxy_c[:, :, None])[:, :, 0]
+    alphas = y_mean - np.einsum("wk,wk->w", x_mean, betas)
+    ssr = syy_c - 2 * np.einsum("wk,wk->w", betas, sxy_c) + np.einsum("wi,wij,wj->w", betas, sxx_c, betas)
+    ssr = np.maximum(ssr, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r_squared = np.where(syy_c > 0, 1 - ssr / syy_c, np.where(ssr == 0, 1.0, 0.0))
+    residual_vol = np.sqrt(ssr / n_ok) * np.sqrt(TRADING_DAYS_PER_YEAR)
+    attribution = betas * x_mean
+
+    for out_index, (i, beta) in zip(np.flatnonzero(ok), enumerate(betas)):
+        beta_map = {name: float(beta[j]) for j, name in enumerate(FACTOR_NAMES[:k])}
+        contrib = {name: float(attribution[i, j]) for j, name in enumerate(FACTOR_NAMES[:k])}
+        results[out_index] = {
+            "alpha": round(float(alphas[i]), 6),
+            "beta": {name: round(v, 4) for name, v in beta_map.items()},
+            "r_squared": round(float(r_squared[i]), 4),
+            "residual_vol": round(float(residual_vol[i]), 4),
+            "factor_attribution": {name: round(v, 6) for name, v in contrib.items()},
+            "total_explained": round(sum(contrib.values()), 6),
+            "total_return": round(float(sy[i]), 6),
+            "data_points": int(n_ok[i]),
+        }
+    return results
+
+
+def align_returns(
+    portfolio_returns: Sequence[Dict[str, Any]],
+    factor_returns: Sequence[Dict[str, Any]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Inner-join portfolio and factor returns on asof_date → (dates, y, X)."""
+    factors_by_date = {row["asof_date"]: row for row in factor_returns}
+    dates, y, X = [], [], []
+    for row in sorted(portfolio_returns, key=lambda r: r["asof_date"]):
+        factor_row = factors_by_date.get(row["asof_date"])
+        if factor_row is None:
+            continue
+        dates.append(row["asof_date"])
+        y.append(row["portfolio_return"])
+        X.append([float(factor_row[name]) for name in FACTOR_NAMES])
+    return (
+        np.array(dates, dtype="datetime64[D]"),
+        np.array(y, dtype=np.float64),
+        np.array(X, dtype=np.float64).reshape(len(y), len(FACTOR_NAMES)),
+    )
+
+
+def weekly_window_ends(packs: Sequence[Tuple[str, date]]) -> List[Tuple[str, date]]:
+    """Keep the last pack of each ISO week (packs in any order)."""
+    last: Dict[Tuple[int, int], Tuple[str, date]] = {}
+    for pack_id, pack_date in sorted(packs, key=lambda p: p[1]):
+        last[pack_date.isocalendar()[:2]] = (pack_id, pack_date)
+    return sorted(last.values(), key=lambda p: p[1])
+
+
+# ============================================================================
+# Persistence
+# ============================================================================
+
+GET_HISTORY = register_query(
+    "factor_history.get",
+    """
+    SELECT pricing_pack_id, exposure
+    FROM factor_exposure_history
+    WHERE portfolio_id = $1 AND window_days = $2 AND pricing_pack_id = ANY($3::text[])
+      AND data_version = $4
+    """,
+)
+
+UPSERT_HISTORY_SQL = """
+    INSERT INTO factor_exposure_history (
+        portfolio_id, pricing_pack_id, window_days, asof_date, exposure, data_version, computed_at
+    )
+    VALUES ($1, $2, $3, $4, $5::jsonb, $6, NOW())
+    ON CONFLICT (portfolio_id, pricing_pack_id, window_days) DO UPDATE SET
+        asof_date = EXCLUDED.asof_date,
+        exposure = EXCLUDED.exposure,
+        data_version = EXCLUDED.data_version,
+        computed_at = NOW()
+"""
+
+
+class FactorExposureHistoryStore:
+    """Per-pack factor exposure cache backed by factor_exposure_history."""
+
+    def __init__(self, lookback_days: int = TRADING_DAYS_PER_YEAR):
+        self.lookback_days = lookback_days
+
+    async def data_version(self, portfolio_id: UUID) -> str:
+        return await portfolio_data_version(get_pool(POOL_READ), portfolio_id)
+
+    async def load(
+        self, portfolio_id: UUID, pack_ids: Sequence[str], data_version: str
+    ) -> Dict[str, Dict[str, Any]]:
+        rows = await execute_query(GET_HISTORY, portfolio_id, self.lookback_days, list(pack_ids), data_version)
+        return {
+            row["pricing_pack_id"]: json.loads(row["exposure"]) if isinstance(row["exposure"], str) else row["exposure"]
+            for row in rows
+        }
+
+    async def save(
+        self,
+        portfolio_id: UUID,
+        computed: Sequence[Tuple[str, date, Dict[str, Any]]],
+        data_version: str,
+    ) -> None:
+        rows = [
+            (portfolio_id, pack_id, self.lookback_days, pack_date, json.dumps(exposure), data_version)
+            for pack_id, pack_date, exposure in computed
+            if "error" not in exposure
+        ]
+        if not rows:
+            return
+        async with get_pool(POOL_WRITE).acquire() as conn:
+            await conn.executemany(UPSERT_HISTORY_SQL, rows)
+
+    async def get_history(
+        self,
+        analyzer,
+        portfolio_id: UUID,
+        packs: Sequence[Tuple[str, date]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Exposures for each (pack_id, pack_date), newest first.
+
+        Cached packs are read from factor_exposure_history when they were
+        computed at the portfolio's current data version; the rest (including
+        rows left behind by later trades or revaluations) are computed from a
+        single panel load via analyzer.compute_factor_exposure_history and
+        persisted. Windows with insufficient data are dropped.
+        """
+        try:
+            version = await self.data_version(portfolio_id)
+            cached = await self.load(portfolio_id, [pack_id for pack_id, _ in packs], version)
+        except Exception as e:
+            # Table missing / DB error: compute everything, skip persistence
+            logger.warning(f"factor_exposure_history unavailable ({e}); computing without cache")
+            cached, persist = {}, False
+        else:
+            persist = True
+
+        missing = [(pack_id, pack_date) for pack_id, pack_date in packs if pack_id not in cached]
+        computed: List[Tuple[str, date, Dict[str, Any]]] = []
+        if missing:
+            exposures = await analyzer.compute_factor_exposure_history(
+                str(portfolio_id), [pack_date for _, pack_date in missing], self.lookback_days
+            )
+            computed = [(pack_id, pack_date, exposure) for (pack_id, pack_date), exposure in zip(missing, exposures)]
+            if persist:
+                try:
+                    await self.save(portfolio_id, computed, version)
+                except Exception as e:
+                    logger.warning(f"Could not persist factor exposure history for {portfolio_id}: {e}")
+
+        by_pack = {pack_id: exposure for pack_id, _, exposure in computed}
+        by_pack.update(cached)
+        history = []
+        for pack_id, pack_date in sorted(packs, key=lambda p: p[1], reverse=True):
+            exposure = by_pack.get(pack_id)
+            if exposure is None or "error" in exposure:
+                continue
+            history.append({**exposure, "asof_date": str(pack_date), "pack_id": pack_id})
+
+        logger.info(
+            f"Factor exposure history for {portfolio_id}: {len(packs)} packs, "
+            f"{len(cached)} cached, {len(missing)} computed, {len(history)} usable"
+        )
+        return history
@@ -0,0 +1,504 @@
+"""
+Incremental Rolling Performance Statistics
+
+Purpose: O(1)-per-day rolling volatility, Sharpe, beta and drawdown per portfolio
+Created: 2025-11-10
+Priority: P1 (Replaces on-demand window scans over portfolio_daily_values)
+
+Features:
+    - Running sums / sums of squares / cross products per (portfolio, window)
+    - Rolling peak NAV via a monotonic deque (amortised O(1) drawdown)
+    - Per-day metric rows in portfolio_rolling_stats (single-row lookups)
+    - Window state persisted in portfolio_rolling_state (JSONB)
+    - Full rebuild from portfolio_daily_values for backfills
+
+Returns are flow-adjusted: r_t = (NAV_t - flow_t) / NAV_{t-1} - 1.
+Benchmark returns arrive separately (metrics job) and only feed beta/alpha.
+
+Usage:
+    store = RollingStatsStore()
+
+    # Nightly: push new NAVs (already-applied dates are skipped)
+    await store.apply(portfolio_id, [(valuation_date, total_value, cash_flows)])
+
+    # After benchmark returns are known
+    await store.apply_benchmark(portfolio_id, asof_date, benchmark_return, risk_free_rate)
+
+    # Backfills
+    benchmark_returns_by_date, risk_free_rate = await load_benchmark_inputs(portfolio_id)
+    await store.rebuild(portfolio_id, benchmark_returns_by_date, risk_free_rate)
+"""
+
+import json
+import logging
+import math
+from collections import deque
+from datetime import date
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from app.core.constants.financial import TRADING_DAYS_PER_YEAR
+from app.db.connection import POOL_WRITE, execute_query, execute_query_one, get_pool
+from app.db.query_registry import register_query
+
+logger = logging.getLogger(__name__)
+
+# Window lengths in observations (trading days): 30d, 60d, 90d, 1y
+ROLLING_WINDOWS: Tuple[int, ...] = (30, 60, 90, TRADING_DAYS_PER_YEAR)
+
+
+class RollingWindowState:
+    """
+    Sliding-window statistics over the last `window` daily returns.
+
+    push() and set_benchmark() are O(1) (amortised for the peak deque); sums are
+    re-derived from the window once per `window` pushes to cap float drift.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self.returns: Deque[float] = deque()
+        self.bench: Deque[Optional[float]] = deque()
+        # Monotonic (seq, nav) deque: front is the peak NAV of the window
+        self.peak: Deque[Tuple[int, float]] = deque()
+        self.seq = 0
+        self.last_date: Optional[date] = None
+        self.last_nav: Optional[float] = None
+        self.risk_free_rate = 0.0
+        self._reset_sums()
+
+    def _reset_sums(self) -> None:
+        self.sum_r = 0.0
+        self.sum_r2 = 0.0
+        self.n_pair = 0
+        self.sum_rp = 0.0  # portfolio returns on days with a benchmark return
+        self.sum_b = 0.0
+        self.sum_b2 = 0.0
+        self.sum_rb = 0.0
+
+    def _add(self, r: float, b: Optional[float], sign: int) -> None:
+        self.sum_r += sign * r
+        self.sum_r2 += sign * r * r
+        if b is not None:
+            self.n_pair += sign
+            self.sum_rp += sign * r
+            self.sum_b += sign * b
+            self.sum_b2 += sign * b * b
+            self.sum_rb += sign * r * b
+
+    def _resync(self) -> None:
+        self._reset_sums()
+        for r, b in zip(self.returns, self.bench):
+            self._add(r, b, 1)
+
+    def push(self, day: date, nav: float, flow: float = 0.0, benchmark: Optional[float] = None) -> bool:
+        """
+        Add one daily NAV. Dates at or before the last applied date are ignored.
+
+        Returns:
+            True if the observation was applied
+        """
+        if self.last_date is not None and day <= self.last_date:
+            return False
+
+        if self.last_nav is not None and self.last_nav > 0:
+            r = (nav - flow) / self.last_nav - 1.0
+            self.returns.append(r)
+            self.bench.append(benchmark)
+            self._add(r, benchmark, 1)
+            if len(self.returns) > self.window:
+                self._add(self.returns.popleft(), self.bench.popleft(), -1)
+
+        while self.peak and self.peak[-1][1] <= nav:
+            self.peak.pop()
+        self.peak.append((self.seq, nav))
+        while self.peak[0][0] <= self.seq - self.window:
+            self.peak.popleft()
+
+        self.seq += 1
+        self.last_date = day
+        self.last_nav = nav
+        if self.seq % self.window == 0:
+            self._resync()
+        return True
+
+    def set_benchmark(self, day: date, benchmark: float) -> bool:
+        """Attach the benchmark return for the latest observation (if it is `day`)."""
+        if day != self.last_date or not self.returns or self.bench[-1] is not None:
+            return False
+        self.bench[-1] = benchmark
+        r = self.returns[-1]
+        self.n_pair += 1
+        self.sum_rp += r
+        self.sum_b += benchmark
+        self.sum_b2 += benchmark * benchmark
+        self.sum_rb += r * benchmark
+        return True
+
+    def metrics(self) -> Dict[str, Optional[float]]:
+        """Annualised statistics for the current window."""
+        n = len(self.returns)
+        mean = self.sum_r / n if n else None
+        volatility = sharpe = beta = alpha = None
+
+        if n >= 2:
+            variance = max((self.sum_r2 - self.sum_r * self.sum_r / n) / (n - 1), 0.0)
+            volatility = math.sqrt(variance) * math.sqrt(TRADING_DAYS_PER_YEAR)
+            if volatility > 0:
+                sharpe = (mean * TRADING_DAYS_PER_YEAR - self.risk_free_rate) / volatility
+
+        m = self.n_pair
+        if m >= 2:
+            var_b = self.sum_b2 - self.sum_b * self.sum_b / m
+            if var_b > 0:
+                beta = (self.sum_rb - self.sum_rp * self.sum_b / m) / var_b
+                alpha = (self.sum_rp / m - beta * self.sum_b / m) * TRADING_DAYS_PER_YEAR
+
+        peak = self.peak[0][1] if self.peak else None
+        drawdown = self.last_nav / peak - 1.0 if peak and self.last_nav is not None else None
+
+        return {
+            "n_obs": n,
+            "mean_return": mean,
+            "volatility": volatility,
+            "sharpe": sharpe,
+            "beta": beta,
+            "alpha": alpha,
+            "drawdown": drawdown,
+            "peak_value": peak,
+            "nav": self.last_nav,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "window": self.window,
+            "returns": list(self.returns),
+            "bench": list(self.bench),
+            "peak": [list(item) for item in self.peak],
+            "seq": self.seq,
+            "last_date": self.last_date.isoformat() if self.last_date else None,
+            "last_nav": self.last_nav,
+            "risk_free_rate": self.risk_free_rate,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RollingWindowState":
+        state = cls(data["window"])
+        state.returns = deque(data["returns"])
+        state.bench = deque(data["bench"])
+        state.peak = deque((seq, nav) for seq, nav in data["peak"])
+        state.seq = data["seq"]
+        state.last_date = date.fromisoformat(data["last_date"]) if data["last_date"] else None
+        state.last_nav = data["last_nav"]
+        state.risk_free_rate = data.get("risk_free_rate", 0.0)
+        state._resync()
+        return state
+
+
+# ============================================================================
+# Persistence
+# ============================================================================
+
+LOAD_STATE = register_query(
+    "rolling_stats.load_state",
+    """
+    SELECT window_days, state
+    FROM portfolio_rolling_state
+    WHERE portfolio_id = $1
+    """,
+)
+
+GET_STATS = register_query(
+    "rolling_stats.get",
+    """
+    SELECT *
+    FROM portfolio_rolling_stats
+    WHERE portfolio_id = $1 AND window_days = $2 AND asof_date = $3
+    """,
+)
+
+SAVE_STATE_SQL = """
+    INSERT INTO portfolio_rolling_state (portfolio_id, window_days, asof_date, state, updated_at)
+    VALUES ($1, $2, $3, $4::jsonb, NOW())
+    ON CONFLICT (portfolio_id, window_days) DO UPDATE SET
+        asof_date = EXCLUDED.asof_date,
+        state = EXCLUDED.state,
+        updated_at = NOW()
+"""
+
+UPSERT_STATS_SQL = """
+    INSERT INTO portfolio_rolling_stats (
+        portfolio_id, window_days, asof_date, n_obs, mean_return, volatility,
+        sharpe, beta, alpha, drawdown, peak_value, nav
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+    ON CONFLICT (portfolio_id, window_days, asof_date) DO UPDATE SET
+        n_obs = EXCLUDED.n_obs,
+        mean_return = EXCLUDED.mean_return,
+        volatility = EXCLUDED.volatility,
+        sharpe = EXCLUDED.sharpe,
+        beta = EXCLUDED.beta,
+        alpha = EXCLUDED.alpha,
+        drawdown = EXCLUDED.drawdown,
+        peak_value = EXCLUDED.peak_value,
+        nav = EXCLUDED.nav
+"""
+
+HISTORY_SQL = """
+    SELECT valuation_date, total_value, COALESCE(cash_flows, 0) AS cash_flows
+    FROM portfolio_daily_values
+    WHERE portfolio_id = $1
+    ORDER BY valuation_date
+"""
+
+
+BENCHMARK_CONTEXT_SQL = """
+    SELECT p.benchmark_id, p.base_currency,
+           MIN(v.valuation_date) AS first_date, MAX(v.valuation_date) AS last_date
+    FROM portfolios p
+    JOIN portfolio_daily_values v ON v.portfolio_id = p.id
+    WHERE p.id = $1
+    GROUP BY p.benchmark_id, p.base_currency
+"""
+
+RISK_FREE_RATE_SQL = """
+    SELECT value
+    FROM macro_indicators
+    WHERE series_id = 'DGS10'
+      AND asof_date <= $1
+    ORDER BY asof_date DESC
+    LIMIT 1
+"""
+
+
+async def load_benchmark_inputs(
+    portfolio_id: UUID,
+    benchmarks=None,
+) -> Tuple[Dict[date, float], Optional[float]]:
+    """
+    Load the hedged benchmark returns (by date) and risk-free rate for a rebuild.
+
+    Mirrors the nightly metrics job (hedged to base currency, DGS10 as the
+    risk-free rate) so a rebuild reproduces the beta/alpha it attached.
+
+    Args:
+        portfolio_id: Portfolio whose daily-values date range and benchmark are used
+        benchmarks: BenchmarkService to reuse across portfolios (default: a new one)
+
+    Returns:
+        (benchmark returns by date, annual risk-free rate or None)
+    """
+    row = await execute_query_one(BENCHMARK_CONTEXT_SQL, portfolio_id)
+    if not row:
+        return {}, None
+
+    risk_free_rate = None
+    rate = await execute_query_one(RISK_FREE_RATE_SQL, row["last_date"])
+    if rate and rate["value"] is not None:
+        risk_free_rate = float(rate["value"]) / 100
+
+    if not row["benchmark_id"]:
+        logger.warning(f"No benchmark configured for portfolio {portfolio_id}; beta/alpha stay empty")
+        return {}, risk_free_rate
+
+    from app.services.benchmarks import BenchmarkService
+
+    benchmarks = benchmarks or BenchmarkService()
+    returns = await benchmarks.get_benchmark_returns(
+        benchmark_id=row["benchmark_id"],
+        start_date=row["first_date"],
+        end_date=row["last_date"],
+        pack_id=f"PP_{row['last_date']}",
+        hedged=True,
+        base_currency=row["base_currency"],
+    )
+    return {r.asof_date: float(r.return_value) for r in returns}, risk_free_rate
+
+
+def _stats_row(portfolio_id: UUID, state: RollingWindowState, day: date) -> tuple:
+    m = state.metrics()
+    return (
+        portfolio_id, state.window, day, m["n_obs"], m["mean_return"], m["volatility"],
+        m["sharpe"], m["beta"], m["alpha"], m["drawdown"], m["peak_value"], m["nav"],
+    )
+
+
+class RollingStatsStore:
+    """Loads, advances and persists rolling window states for portfolios."""
+
+    def __init__(self, windows: Sequence[int] = ROLLING_WINDOWS):
+        self.windows = tuple(windows)
+
+    async def load(self, portfolio_id: UUID) -> Dict[int, RollingWindowState]:
+        rows = await execute_query(LOAD_STATE, portfolio_id)
+        states = {}
+        for row in rows:
+            data = row["state"]
+            states[row["window_days"]] = RollingWindowState.from_dict(
+                json.loads(data) if isinstance(data, str) else data
+            )
+        for window in self.windows:
+            states.setdefault(window, RollingWindowState(window))
+        return {window: states[window] for window in self.windows}
+
+    async def _save(
+        self,
+        portfolio_id: UUID,
+        states: Dict[int, RollingWindowState],
+        stats_rows: List[tuple],
+    ) -> None:
+        async with get_pool(POOL_WRITE).acquire() as conn:
+            async with conn.transaction():
+                await self._write(conn, portfolio_id, states, stats_rows)
+
+    @staticmethod
+    async def _write(
+        conn,
+        portfolio_id: UUID,
+        states: Dict[int, RollingWindowState],
+        stats_rows: List[tuple],
+    ) -> None:
+        """Persist stats rows and window states on conn (caller owns the transaction)."""
+        state_rows = [
+            (portfolio_id, window, state.last_date, json.dumps(state.to_dict()))
+            for window, state in states.items()
+            if state.last_date is not None
+        ]
+        if not state_rows:
+            return
+        if stats_rows:
+            await conn.executemany(UPSERT_STATS_SQL, stats_rows)
+        await conn.executemany(SAVE_STATE_SQL, state_rows)
+
+    async def apply(
+        self,
+        portfolio_id: UUID,
+        observations: Iterable[Tuple[date, Any, Any]],
+        benchmark_returns: Optional[Dict[date, float]] = None,
+        risk_free_rate: Optional[float] = None,
+        states: Optional[Dict[int, RollingWindowState]] = None,
+    ) -> int:
+        """
+        Advance all windows with (date, nav, flow) observations in date order.
+
+        Observations at or before the last applied date are skipped, so callers
+        can pass a full recomputed series and only new days cost anything. If the
+        series restates the NAV of the last applied date (backdated transactions),
+        the portfolio is rebuilt from portfolio_daily_values instead, with the
+        benchmark series and risk-free rate reloaded (load_benchmark_inputs).
+
+        Returns:
+            Number of new days applied
+        """
+        observations = list(observations)
+        if states is None:
+            states = await self.load(portfolio_id)
+            if self._restated(states, observations):
+                logger.info(f"Rolling stats: history restated for portfolio {portfolio_id}, rebuilding")
+                # Every row is rewritten, so beta/alpha need the full benchmark series
+                history, history_rate = await load_benchmark_inputs(portfolio_id)
+                return await self.rebuild(
+                    portfolio_id,
+                    {**history, **(benchmark_returns or {})},
+                    risk_free_rate if risk_free_rate is not None else history_rate,
+                )
+        applied, stats_rows = self._advance(portfolio_id, states, observations, benchmark_returns, risk_free_rate)
+        await self._save(portfolio_id, states, stats_rows)
+        if applied:
+            logger.debug(f"Rolling stats: applied {applied} day(s) for portfolio {portfolio_id}")
+        return applied
+
+    @staticmethod
+    def _advance(
+        portfolio_id: UUID,
+        states: Dict[int, RollingWindowState],
+        observations: Iterable[Tuple[date, Any, Any]],
+        benchmark_returns: Optional[Dict[date, float]],
+        risk_free_rate: Optional[float],
+    ) -> Tuple[int, List[tuple]]:
+        """Push observations into states in memory; returns (days applied, stats rows)."""
+        benchmark_returns = benchmark_returns or {}
+        stats_rows = []
+        applied = 0
+
+        for day, nav, flow in observations:
+            pushed = False
+            for state in states.values():
+                if risk_free_rate is not None:
+                    state.risk_free_rate = float(risk_free_rate)
+                bench = benchmark_returns.get(day)
+                if state.push(day, float(nav), float(flow or 0), None if bench is None else float(bench)):
+                    pushed = True
+                    stats_rows.append(_stats_row(portfolio_id, state, day))
+            applied += pushed
+        return applied, stats_rows
+
+    @staticmethod
+    def _restated(states: Dict[int, RollingWindowState], observations: List[tuple]) -> bool:
+        last_date = next((s.last_date for s in states.values() if s.last_date), None)
+        if last_date is None:
+            return False
+        last_nav = states[next(iter(states))].last_nav
+        for day, nav, _ in observations:
+            if day == last_date:
+                return not math.isclose(float(nav), last_nav, rel_tol=1e-9, abs_tol=1e-6)
+        return False
+
+    async def apply_benchmark(
+        self,
+        portfolio_id: UUID,
+        asof_date: date,
+        benchmark_return: Optional[float],
+        risk_free_rate: Optional[float] = None,
+    ) -> bool:
+        """Attach the benchmark return / risk-free rate for asof_date and refresh its rows."""
+        states = await self.load(portfolio_id)
+        changed = False
+        for state in states.values():
+            if state.last_date != asof_date:
+                continue
+            if risk_free_rate is not None:
+                state.risk_free_rate = float(risk_free_rate)
+                changed = True
+            if benchmark_return is not None:
+                changed = state.set_benchmark(asof_date, float(benchmark_return)) or changed
+        if changed:
+            await self._save(
+                portfolio_id,
+                states,
+                [_stats_row(portfolio_id, s, asof_date) for s in states.values() if s.last_date == asof_date],
+            )
+        return changed
+
+    async def rebuild(
+        self,
+        portfolio_id: UUID,
+        benchmark_returns: Optional[Dict[date, float]] = None,
+        risk_free_rate: Optional[float] = None,
+    ) -> int:
+        """
+        Recompute all windows from the full portfolio_daily_values history.
+
+        The delete, reload and rewrite share one transaction, so a failure part
+        way leaves the previous rows in place rather than an empty portfolio.
+        """
+        fresh = {window: RollingWindowState(window) for window in self.windows}
+        async with get_pool(POOL_WRITE).acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(HISTORY_SQL, portfolio_id)
+                applied, stats_rows = self._advance(
+                    portfolio_id,
+                    fresh,
+                    ((r["valuation_date"], r["total_value"], r["cash_flows"]) for r in rows),
+                    benchmark_returns,
+                    risk_free_rate,
+                )
+                await conn.execute("DELETE FROM portfolio_rolling_stats WHERE portfolio_id = $1", portfolio_id)
+                await conn.execute("DELETE FROM portfolio_rolling_state WHERE portfolio_id = $1", portfolio_id)
+                await self._write(conn, portfolio_id, fresh, stats_rows)
+        return applied
+
+    async def get(self, portfolio_id: UUID, window: int, asof_date: date) -> Optional[Dict[str, Any]]:
+        """Single-row lookup of rolling metrics for a window and date."""
+        row = await execute_query_one(GET_STATS, portfolio_id, window, asof_date)
+        return dict(row) if row else None
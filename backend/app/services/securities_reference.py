@@ -0,0 +1,407 @@
+"""
+Securities Reference Data
+
+Purpose: In-memory, indexed securities table with classification (sector, industry, country, currency)
+Created: 2025-11-10
+Priority: P1 (portfolio.sector_allocation, get_comparable_positions, fundamentals / ratings symbol lookups)
+
+Approach:
+    - One query loads every security at startup (and again when the table is
+      older than RELOAD_SECONDS or after a classification refresh)
+    - Rows are indexed by security id and symbol; each classification field is
+      dictionary-encoded (labels + int codes) so breakdowns are one np.bincount
+    - refresh_classifications() pulls FMP profiles in bulk (100 symbols per
+      request), writes sector / industry / country back with one UPDATE ... FROM
+      unnest(...) and swaps in a fresh table
+
+Usage:
+    reference = await get_securities_reference()
+    reference.get("AAPL")["sector"]                         # no I/O
+    reference.allocation(security_ids, market_values, by="sector")
+    reference.peers(security_id, by="sector", limit=5)
+
+    await refresh_classifications()                         # nightly / ad hoc
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence
+from uuid import UUID
+
+import numpy as np
+
+from app.core.symbol_utils import normalize_symbol_for_fmp
+from app.db.connection import POOL_WRITE, get_pool
+from app.db.query_registry import fetch_named, register_query
+
+logger = logging.getLogger("DawsOS.SecuritiesReference")
+
+# Label for securities (or fields) without a classification
+UNCLASSIFIED = "Other"
+
+# Dictionary-encoded fields usable in aggregate() / allocation() / peers()
+CLASSIFICATION_FIELDS = ("sector", "industry", "country", "currency", "security_type", "exchange")
+
+RELOAD_SECONDS = 3600
+FMP_BATCH_SIZE = 100
+
+# Sector for well-known symbols until their FMP profile has been stored
+KNOWN_SECTORS = {
+    "AAPL": "Technology",
+    "MSFT": "Technology",
+    "GOOGL": "Technology",
+    "AMZN": "Consumer Cyclical",
+    "TSLA": "Consumer Cyclical",
+    "JPM": "Financial Services",
+    "BAC": "Financial Services",
+    "JNJ": "Healthcare",
+    "PFE": "Healthcare",
+    "XOM": "Energy",
+    "CVX": "Energy",
+    "WMT": "Consumer Defensive",
+    "PG": "Consumer Defensive",
+    "NVDA": "Technology",
+    "META": "Technology",
+    "BRK.B": "Financial Services",
+    "UNH": "Healthcare",
+    "V": "Financial Services",
+    "MA": "Financial Services",
+    "HD": "Consumer Cyclical",
+    "DIS": "Communication Services",
+    "NFLX": "Communication Services",
+    "ADBE": "Technology",
+    "CRM": "Technology",
+    "NKE": "Consumer Cyclical",
+    "MCD": "Consumer Defensive",
+    "COST": "Consumer Defensive",
+    "PEP": "Consumer Defensive",
+    "KO": "Consumer Defensive",
+    "INTC": "Technology",
+    "AMD": "Technology",
+    "TMO": "Healthcare",
+    "ABT": "Healthcare",
+    "LLY": "Healthcare",
+    "ORCL": "Technology",
+    "VZ": "Communication Services",
+    "T": "Communication Services",
+    "CMCSA": "Communication Services",
+}
+
+GET_SECURITIES = register_query(
+    "securities_reference.all",
+    """
+    SELECT
+        id,
+        symbol,
+        name,
+        security_type,
+        exchange,
+        trading_currency,
+        domicile_country,
+        sector,
+        industry,
+        active
+    FROM securities
+    ORDER BY symbol
+    """,
+)
+
+UPDATE_CLASSIFICATION_SQL = """
+    UPDATE securities AS s SET
+        sector = COALESCE(v.sector, s.sector),
+        industry = COALESCE(v.industry, s.industry),
+        domicile_country = COALESCE(v.country, s.domicile_country),
+        exchange = COALESCE(s.exchange, v.exchange),
+        classification_updated_at = NOW()
+    FROM unnest($1::uuid[], $2::text[], $3::text[], $4::text[], $5::text[])
+        AS v(id, sector, industry, country, exchange)
+    WHERE s.id = v.id
+"""
+
+
+class SecuritiesReference:
+    """Immutable snapshot of the securities table, indexed by id and symbol."""
+
+    def __init__(self, rows: Sequence[Dict[str, Any]], loaded_at: Optional[float] = None):
+        self.loaded_at = loaded_at if loaded_at is not None else time.monotonic()
+        self.ids: List[str] = [str(row["id"]) for row in rows]
+        self.symbols: List[str] = [row["symbol"] for row in rows]
+        self.names: List[Optional[str]] = [row.get("name") for row in rows]
+        self.active = np.array([row.get("active") is not False for row in rows], dtype=bool)
+        # Stored sector (not the KNOWN_SECTORS fill) → candidates for refresh_classifications
+        self.classified = np.array([bool(row.get("sector")) for row in rows], dtype=bool)
+
+        self._row_by_key: Dict[str, int] = {}
+        for i, (security_id, symbol) in enumerate(zip(self.ids, self.symbols)):
+            self._row_by_key[security_id] = i
+            if symbol:
+                self._row_by_key.setdefault(symbol.upper(), i)
+
+        raw = {
+            "sector": [row.get("sector") or KNOWN_SECTORS.get((row["symbol"] or "").upper()) for row in rows],
+            "industry": [row.get("industry") for row in rows],
+            "country": [row.get("domicile_country") for row in rows],
+            "currency": [row.get("trading_currency") for row in rows],
+            "security_type": [row.get("security_type") for row in rows],
+            "exchange": [row.get("exchange") for row in rows],
+        }
+        self._labels: Dict[str, np.ndarray] = {}
+        self._codes: Dict[str, np.ndarray] = {}
+        for field_name, values in raw.items():
+            # Extra trailing UNCLASSIFIED code for keys that are not in the table
+            labels, codes = np.unique(
+                np.array([v or UNCLASSIFIED for v in values] + [UNCLASSIFIED], dtype=object).astype(str),
+                return_inverse=True,
+            )
+            self._labels[field_name] = labels
+            self._codes[field_name] = codes.reshape(-1).astype(np.int64)
+
+    @classmethod
+    def from_positions(cls, positions: Sequence[Dict[str, Any]]) -> "SecuritiesReference":
+        """Table built from the positions themselves (no I/O; KNOWN_SECTORS / position fields only)."""
+        rows = {}
+        for position in positions:
+            key = position.get("security_id") or position.get("symbol")
+            if key is None:
+                continue
+            rows.setdefault(str(key), {
+                "id": key,
+                "symbol": position.get("symbol") or "",
+                "name": position.get("name"),
+                "sector": position.get("sector"),
+                "trading_currency": position.get("currency"),
+            })
+        return cls(list(rows.values()))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: Any) -> bool:
+        return self.row(key) >= 0
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.loaded_at
+
+    def row(self, key: Any) -> int:
+        """Row index for a security id (str/UUID) or symbol; -1 when unknown."""
+        if key is None:
+            return -1
+        key = str(key)
+        i = self._row_by_key.get(key)
+        if i is None:
+            i = self._row_by_key.get(key.upper(), -1)
+        return i
+
+    def rows(self, keys: Sequence[Any]) -> np.ndarray:
+        """Row indices for many keys; unknown keys map to len(self) (the UNCLASSIFIED row)."""
+        indices = np.fromiter((self.row(key) for key in keys), dtype=np.int64, count=len(keys))
+        indices[indices < 0] = len(self)
+        return indices
+
+    def get(self, key: Any) -> Optional[Dict[str, Any]]:
+        """Reference record for a security id or symbol (None when unknown)."""
+        i = self.row(key)
+        if i < 0:
+            return None
+        record = {
+            "security_id": self.ids[i],
+            "symbol": self.symbols[i],
+            "name": self.names[i],
+            "active": bool(self.active[i]),
+        }
+        for field_name in CLASSIFICATION_FIELDS:
+            label = str(self._labels[field_name][self._codes[field_name][i]])
+            record[field_name] = None if label == UNCLASSIFIED and field_name != "sector" else label
+        return record
+
+    def labels(self, keys: Sequence[Any], by: str = "sector") -> List[str]:
+        """Classification label per key (UNCLASSIFIED for unknown keys)."""
+        labels = self._labels[by][self._codes[by][self.rows(keys)]]
+        return [str(label) for label in labels]
+
+    def aggregate(self, keys: Sequence[Any], values: Sequence[float], by: str = "sector") -> Dict[str, float]:
+        """Sum values per classification label (vectorized group-by)."""
+        if not len(keys):
+            return {}
+        codes = self._codes[by][self.rows(keys)]
+        sums = np.bincount(codes, weights=np.asarray(values, dtype=np.float64), minlength=len(self._labels[by]))
+        present = np.bincount(codes, minlength=len(self._labels[by])) > 0
+        return {str(self._labels[by][c]): float(sums[c]) for c in np.flatnonzero(present)}
+
+    def allocation(
+        self,
+        keys: Sequence[Any],
+        values: Sequence[float],
+        by: str = "sector",
+    ) -> Dict[str, float]:
+        """Percentage of the positive total per label (positions with value <= 0 are ignored)."""
+        values = np.asarray(values, dtype=np.float64)
+        positive = values > 0
+        keys = [key for key, keep in zip(keys, positive) if keep]
+        totals = self.aggregate(keys, values[positive], by)
+        total = float(values[positive].sum())
+        if total <= 0:
+            return {}
+        return {label: round(value / total * 100, 2) for label, value in totals.items()}
+
+    def peers(self, key: Any, by: str = "sector", label: Optional[str] = None, limit: int = 5) -> List[Dict[str, Any]]:
+        """Active securities sharing key's label (or the given label), ordered by symbol."""
+        i = self.row(key)
+        if label is None:
+            if i < 0:
+                return []
+            code = self._codes[by][i]
+            if self._labels[by][code] == UNCLASSIFIED:
+                return []
+        else:
+            matches = np.flatnonzero(self._labels[by] == label)
+            if not len(matches):
+                return []
+            code = matches[0]
+
+        mask = (self._codes[by][: len(self)] == code) & self.active
+        if i >= 0:
+            mask[i] = False
+        candidates = sorted(np.flatnonzero(mask), key=lambda r: self.symbols[r] or "")
+        return [self.get(self.ids[r]) for r in candidates[: int(limit)]]
+
+    def classification_targets(
+        self,
+        only_missing: bool = True,
+        security_types: Sequence[str] = ("equity", "stock"),
+    ) -> List[Dict[str, Any]]:
+        """Active securities of the given types (by default only those without a stored sector)."""
+        types = self._labels["security_type"][self._codes["security_type"][: len(self)]]
+        wanted = np.isin(types, list(security_types)) & self.active
+        if only_missing:
+            wanted &= ~self.classified
+        return [{"security_id": self.ids[r], "symbol": self.symbols[r]} for r in np.flatnonzero(wanted)]
+
+
+# ============================================================================
+# Process-wide instance
+# ============================================================================
+
+_reference: Optional[SecuritiesReference] = None
+_load_lock: Optional[asyncio.Lock] = None
+
+
+def current_reference() -> Optional[SecuritiesReference]:
+    """Loaded reference table without any I/O (None before the first load)."""
+    return _reference
+
+
+async def load_securities_reference() -> SecuritiesReference:
+    """Load the securities table and make it the process-wide reference."""
+    global _reference
+    started = time.perf_counter()
+    rows = await fetch_named(get_pool(), GET_SECURITIES)
+    _reference = SecuritiesReference([dict(row) for row in rows])
+    logger.info(
+        f"Securities reference loaded: {len(_reference)} securities in {time.perf_counter() - started:.3f}s"
+    )
+    return _reference
+
+
+async def get_securities_reference(max_age: float = RELOAD_SECONDS) -> SecuritiesReference:
+    """
+    Process-wide reference table, loading it on first use or when older than max_age.
+
+    A failed reload keeps serving the previous table.
+    """
+    global _load_lock
+    reference = _reference
+    if reference is not None and reference.age_seconds < max_age:
+        return reference
+    if _load_lock is None:
+        _load_lock = asyncio.Lock()
+    async with _load_lock:
+        if _reference is not None and _reference.age_seconds < max_age:
+            return _reference
+        try:
+            return await load_securities_reference()
+        except Exception as e:
+            if _reference is None:
+                raise
+            logger.warning(f"Securities reference reload failed, serving previous table: {e}")
+            return _reference
+
+
+def set_securities_reference(reference: Optional[SecuritiesReference]) -> None:
+    """Install (or clear) the process-wide reference table (tests, warm starts)."""
+    global _reference
+    _reference = reference
+
+
+async def refresh_classifications(
+    fmp=None,
+    full: bool = False,
+    batch_size: int = FMP_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Pull sector / industry / country from FMP profiles in bulk and reload the table.
+
+    Args:
+        fmp: FMPProvider (default: built from FMP_API_KEY)
+        full: Refresh every active equity, not only those without a stored sector
+        batch_size: Symbols per profile request (FMP maximum is 100)
+
+    Returns:
+        {"requested", "classified", "batches", "seconds"}
+    """
+    started = time.perf_counter()
+    reference = await load_securities_reference()
+    targets = reference.classification_targets(only_missing=not full)
+
+    result = {"requested": len(targets), "classified": 0, "batches": 0, "seconds": 0.0}
+    if not targets:
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        return result
+
+    owns_provider = fmp is None
+    if owns_provider:
+        api_key = os.getenv("FMP_API_KEY")
+        if not api_key:
+            logger.warning("FMP_API_KEY not configured; skipping classification refresh")
+            result["seconds"] = round(time.perf_counter() - started, 3)
+            return result
+        from app.integrations.fmp_provider import FMPProvider
+        fmp = FMPProvider(api_key=api_key)
+
+    by_fmp_symbol = {normalize_symbol_for_fmp(t["symbol"]): t["security_id"] for t in targets}
+    fmp_symbols = list(by_fmp_symbol)
+    ids, sectors, industries, countries, exchanges = [], [], [], [], []
+    try:
+        for start in range(0, len(fmp_symbols), batch_size):
+            batch = fmp_symbols[start:start + batch_size]
+            result["batches"] += 1
+            try:
+                profiles = await fmp.get_profiles(batch)
+            except Exception as e:
+                logger.warning(f"FMP profile batch {result['batches']} failed ({len(batch)} symbols): {e}")
+                continue
+            for profile in profiles:
+                security_id = by_fmp_symbol.get(profile.get("symbol"))
+                if security_id is None or not (profile.get("sector") or profile.get("industry")):
+                    continue
+                ids.append(UUID(security_id))
+                sectors.append(profile.get("sector") or None)
+                industries.append(profile.get("industry") or None)
+                countries.append(profile.get("country") or None)
+                exchanges.append(profile.get("exchangeShortName") or None)
+    finally:
+        if owns_provider:
+            await fmp.close()
+
+    if ids:
+        async with get_pool(POOL_WRITE).acquire() as conn:
+            await conn.execute(UPDATE_CLASSIFICATION_SQL, ids, sectors, industries, countries, exchanges)
+        await load_securities_reference()
+
+    result["classified"] = len(ids)
+    result["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(f"Security classification refresh: {result}")
+    return result
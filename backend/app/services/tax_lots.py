@@ -0,0 +1,770 @@
+"""
+Tax-Lot Engine
+
+Purpose: Realized/unrealized gains by term, wash sales and loss-harvest candidates over a portfolio's lot history
+Created: 2025-11-10
+Priority: P1 (tax.* capabilities: portfolio_tax_report, tax_harvesting_opportunities)
+
+Approach:
+    - Load the full lot history (lots) and every SELL (transactions) once into a
+      LotBook of numpy arrays; one book is shared by all steps of a pattern run
+    - Replay sells against lots per security:
+        FIFO:        cumulative-quantity interval matching (no per-sell loop)
+        LIFO / HIFO: heap sweep in sell-date order
+        specific:    per-lot dispositions are not stored, so FIFO is used
+    - Wash sales: (security, day) keys sorted once; replacement purchases within
+      ±30 days of each loss come from searchsorted + prefix sums
+    - Harvest candidates: open lots valued against the pricing pack, aggregated
+      per security with bincount
+
+Holding period: long-term when disposed after the first anniversary of
+acquisition (anniversary + 1 day or later).
+
+Usage:
+    book = await get_lot_book(user_id, portfolio_id, ctx.request_id)
+    disp = book.relieve("fifo")
+    report = realized_summary(book, disp, tax_year=2025)
+    wash = detect_wash_sales(book, disp)
+"""
+
+import heapq
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.db.connection import get_rls_read_connection
+from app.db.query_registry import fetch_named, register_query
+from app.services.trade_execution import InvalidTradeError, LotSelectionMethod
+
+logger = logging.getLogger("DawsOS.TaxLots")
+
+WASH_SALE_WINDOW_DAYS = 30
+DEFAULT_LONG_TERM_RATE = 0.15
+MAX_CACHED_BOOKS = 64
+QTY_EPSILON = 1e-9
+
+LOT_HISTORY_QUERY = register_query(
+    "tax.lot_history",
+    """
+    SELECT
+        l.id,
+        l.security_id,
+        l.symbol,
+        l.acquisition_date,
+        COALESCE(l.quantity_original, l.quantity) AS quantity_original,
+        l.quantity_open,
+        l.cost_basis,
+        l.currency,
+        p.base_currency
+    FROM lots l
+    JOIN portfolios p ON p.id = l.portfolio_id
+    WHERE l.portfolio_id = $1
+    ORDER BY l.acquisition_date, l.created_at
+    """,
+)
+
+SELL_HISTORY_QUERY = register_query(
+    "tax.sell_history",
+    """
+    SELECT id, security_id, symbol, transaction_date, quantity, amount, realized_pl
+    FROM transactions
+    WHERE portfolio_id = $1
+      AND transaction_type = 'SELL'
+      AND quantity IS NOT NULL
+    ORDER BY transaction_date, created_at
+    """,
+)
+
+
+def _as_float(value: Any) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def long_term_from(acquired: np.ndarray) -> np.ndarray:
+    """First disposal date that counts as long-term for each acquisition date."""
+    months = acquired.astype("datetime64[M]")
+    day_of_month = acquired - months.astype("datetime64[D]")
+    # Feb 29 + 12 months lands on Mar 1, matching the anniversary rule
+    anniversary = (months + 12).astype("datetime64[D]") + day_of_month
+    return anniversary + np.timedelta64(1, "D")
+
+
+@dataclass
+class Dispositions:
+    """Lot relief produced by replaying sells (one row per sell × lot)."""
+
+    lot: np.ndarray        # index into LotBook lot arrays
+    sell: np.ndarray       # index into LotBook sell arrays
+    date: np.ndarray       # datetime64[D] sale date
+    quantity: np.ndarray
+    cost: np.ndarray
+    proceeds: np.ndarray
+    long_term: np.ndarray  # bool
+    unmatched: np.ndarray  # per sell: quantity without any lot to relieve
+
+    @property
+    def gain(self) -> np.ndarray:
+        return self.proceeds - self.cost
+
+    def __len__(self) -> int:
+        return len(self.lot)
+
+    def in_year(self, tax_year: Optional[int]) -> np.ndarray:
+        if tax_year is None:
+            return np.ones(len(self), dtype=bool)
+        return self.date.astype("datetime64[Y]").astype(np.int64) + 1970 == int(tax_year)
+
+
+@dataclass
+class OpenLotValuation:
+    """Open lots valued against one pricing pack."""
+
+    lots: np.ndarray          # indices of open lots
+    quantity: np.ndarray
+    cost: np.ndarray
+    price: np.ndarray         # local price (NaN when the pack has none)
+    market_value: np.ndarray  # base currency
+    unrealized: np.ndarray
+    long_term: np.ndarray
+    days_to_long_term: np.ndarray
+
+    @property
+    def priced(self) -> np.ndarray:
+        return ~np.isnan(self.price)
+
+
+@dataclass
+class LotBook:
+    """A portfolio's lot history and sells as parallel arrays."""
+
+    securities: np.ndarray    # security_id per security code
+    symbols: np.ndarray       # symbol per security code
+    lot_ids: np.ndarray
+    lot_security: np.ndarray  # security code per lot
+    acquired: np.ndarray      # datetime64[D]
+    quantity: np.ndarray      # original quantity
+    quantity_open: np.ndarray
+    cost_per_share: np.ndarray
+    currency: np.ndarray
+    sell_ids: np.ndarray
+    sell_security: np.ndarray
+    sell_dates: np.ndarray
+    sell_quantity: np.ndarray
+    sell_price: np.ndarray    # net proceeds per share
+    sell_recorded_pl: np.ndarray
+    base_currency: str = "USD"
+    _cache: Dict[Any, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_rows(
+        cls,
+        lot_rows: Sequence[Any],
+        sell_rows: Sequence[Any],
+        base_currency: Optional[str] = None,
+    ) -> "LotBook":
+        """Build from tax.lot_history / tax.sell_history rows (any mapping)."""
+        codes: Dict[str, int] = {}
+        by_symbol: Dict[str, int] = {}
+        symbols: List[str] = []
+
+        def code_for(security_id: Any, symbol: Optional[str]) -> int:
+            key = str(security_id)
+            if key in codes:
+                return codes[key]
+            if symbol and symbol in by_symbol:
+                return by_symbol[symbol]
+            codes[key] = len(symbols)
+            symbols.append(symbol or "UNKNOWN")
+            if symbol:
+                by_symbol.setdefault(symbol, codes[key])
+            return codes[key]
+
+        lot_security = np.array([code_for(r["security_id"], r["symbol"]) for r in lot_rows], dtype=np.int64)
+        quantity = np.array([abs(_as_float(r["quantity_original"])) for r in lot_rows], dtype=np.float64)
+        cost_basis = np.array([abs(_as_float(r["cost_basis"])) for r in lot_rows], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cost_per_share = np.where(quantity > 0, cost_basis / quantity, 0.0)
+
+        sell_security = np.array([code_for(r["security_id"], r["symbol"]) for r in sell_rows], dtype=np.int64)
+        sell_quantity = np.array([abs(_as_float(r["quantity"])) for r in sell_rows], dtype=np.float64)
+        amount = np.array([abs(_as_float(r["amount"])) for r in sell_rows], dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sell_price = np.where(sell_quantity > 0, amount / sell_quantity, 0.0)
+
+        if base_currency is None:
+            base_currency = (lot_rows[0]["base_currency"] if lot_rows else None) or "USD"
+
+        securities = [None] * len(symbols)
+        for key, code in codes.items():
+            if securities[code] is None:
+                securities[code] = key
+
+        return cls(
+            securities=np.array(securities, dtype=object),
+            symbols=np.array(symbols, dtype=object),
+            lot_ids=np.array([str(r["id"]) for r in lot_rows], dtype=object),
+            lot_security=lot_security,
+            acquired=np.array([r["acquisition_date"] for r in lot_rows], dtype="datetime64[D]"),
+            quantity=quantity,
+            quantity_open=np.array([abs(_as_float(r["quantity_open"])) for r in lot_rows], dtype=np.float64),
+            cost_per_share=cost_per_share,
+            currency=np.array([r["currency"] or base_currency for r in lot_rows], dtype=object),
+            sell_ids=np.array([str(r["id"]) for r in sell_rows], dtype=object),
+            sell_security=sell_security,
+            sell_dates=np.array([r["transaction_date"] for r in sell_rows], dtype="datetime64[D]"),
+            sell_quantity=sell_quantity,
+            sell_price=sell_price,
+            sell_recorded_pl=np.array([_as_float(r["realized_pl"]) for r in sell_rows], dtype=np.float64),
+            base_currency=base_currency,
+        )
+
+    @property
+    def security_count(self) -> int:
+        return len(self.securities)
+
+    @property
+    def long_term_from(self) -> np.ndarray:
+        if "long_term_from" not in self._cache:
+            self._cache["long_term_from"] = long_term_from(self.acquired)
+        return self._cache["long_term_from"]
+
+    def relieve(self, method: str = LotSelectionMethod.FIFO.value) -> Dispositions:
+        """Replay every sell with the given lot selection method (memoized)."""
+        method = LotSelectionMethod(method)
+        if method == LotSelectionMethod.SPECIFIC:
+            method = LotSelectionMethod.FIFO
+        key = ("relief", method)
+        if key not in self._cache:
+            if method == LotSelectionMethod.FIFO:
+                lot, sell, qty, unmatched = _relieve_fifo(self)
+            else:
+                lot, sell, qty, unmatched = _relieve_sweep(self, method)
+            order = np.lexsort((lot, sell, self.sell_dates[sell]))
+            lot, sell, qty = lot[order], sell[order], qty[order]
+            dates = self.sell_dates[sell]
+            self._cache[key] = Dispositions(
+                lot=lot,
+                sell=sell,
+                date=dates,
+                quantity=qty,
+                cost=qty * self.cost_per_share[lot],
+                proceeds=qty * self.sell_price[sell],
+                long_term=dates >= self.long_term_from[lot],
+                unmatched=unmatched,
+            )
+        return self._cache[key]
+
+
+# ============================================================================
+# Lot relief
+# ============================================================================
+
+def _active_sells(book: LotBook) -> np.ndarray:
+    """Sells with quantity, ordered by (security, date, position)."""
+    sells = np.flatnonzero(book.sell_quantity > 0)
+    return sells[np.lexsort((sells, book.sell_dates[sells], book.sell_security[sells]))]
+
+
+def _relieve_fifo(book: LotBook) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    FIFO relief as interval intersection.
+
+    Lots (per security, oldest first) and sells (per security, by date) are laid
+    end to end on one cumulative-quantity axis; each security starts at the same
+    offset on both. Every overlap between a lot interval and a sell interval is
+    one disposition.
+    """
+    n_sec = book.security_count
+    lot_order = np.lexsort((np.arange(len(book.lot_ids)), book.acquired, book.lot_security))
+    lot_qty = book.quantity[lot_order]
+    lot_end = np.cumsum(lot_qty)
+    lot_start = lot_end - lot_qty
+    totals = np.bincount(book.lot_security, weights=book.quantity, minlength=n_sec)
+    offset = np.concatenate(([0.0], np.cumsum(totals)[:-1])) if n_sec else np.zeros(0)
+
+    unmatched = np.zeros(len(book.sell_ids), dtype=np.float64)
+    sell_order = _active_sells(book)
+    if not len(sell_order) or not len(lot_order):
+        unmatched[sell_order] = book.sell_quantity[sell_order]
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, np.zeros(0), unmatched
+
+    s_sec = book.sell_security[sell_order]
+    s_qty = book.sell_quantity[sell_order]
+    sold = np.bincount(s_sec, weights=s_qty, minlength=n_sec)
+    sold_before = np.cumsum(sold) - sold
+    within = np.cumsum(s_qty) - sold_before[s_sec]
+    cap = totals[s_sec]
+    s_start = offset[s_sec] + np.minimum(within - s_qty, cap)
+    s_end = offset[s_sec] + np.minimum(within, cap)
+    unmatched[sell_order] = np.maximum(s_qty - (s_end - s_start), 0.0)
+
+    edges = np.unique(np.concatenate((lot_start, lot_end, s_start, s_end)))
+    lo, hi = edges[:-1], edges[1:]
+    mid = (lo + hi) / 2
+    j = np.minimum(np.searchsorted(s_end, mid), len(s_end) - 1)
+    covered = (s_start[j] < mid) & (mid < s_end[j]) & (hi - lo > QTY_EPSILON)
+    i = np.searchsorted(lot_end, mid[covered])
+    return lot_order[i], sell_order[j[covered]], (hi - lo)[covered], unmatched
+
+
+def _relieve_sweep(
+    book: LotBook, method: LotSelectionMethod
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """LIFO / HIFO relief: per security, a heap of lots acquired by each sell date."""
+    acquired_days = book.acquired.astype(np.int64)
+    if method == LotSelectionMethod.LIFO:
+        keys = np.stack((-acquired_days, -np.arange(len(book.lot_ids)))).T.tolist()
+    elif method == LotSelectionMethod.HIFO:
+        keys = np.stack((-book.cost_per_share, acquired_days, np.arange(len(book.lot_ids)))).T.tolist()
+    else:
+        raise InvalidTradeError(f"Unsupported lot selection method: {method}")
+
+    lot_order = np.lexsort((np.arange(len(book.lot_ids)), acquired_days, book.lot_security))
+    lot_bounds = np.searchsorted(book.lot_security[lot_order], np.arange(book.security_count + 1))
+    remaining_open = book.quantity.copy()
+    unmatched = np.zeros(len(book.sell_ids), dtype=np.float64)
+    lots_out: List[int] = []
+    sells_out: List[int] = []
+    qty_out: List[float] = []
+
+    sell_order = _active_sells(book)
+    sell_days = book.sell_dates.astype(np.int64)
+    for code, group in _groups(book.sell_security[sell_order], sell_order):
+        candidates = lot_order[lot_bounds[code]:lot_bounds[code + 1]]
+        heap: List[Tuple[Any, int]] = []
+        ptr = 0
+        for s in group:
+            while ptr < len(candidates) and acquired_days[candidates[ptr]] <= sell_days[s]:
+                heapq.heappush(heap, (keys[candidates[ptr]], candidates[ptr]))
+                ptr += 1
+            remaining = book.sell_quantity[s]
+            while remaining > QTY_EPSILON:
+                if not heap:
+                    if ptr == len(candidates):
+                        break
+                    # Sold before any lot was recorded: relieve the next lot, like FIFO
+                    heapq.heappush(heap, (keys[candidates[ptr]], candidates[ptr]))
+                    ptr += 1
+                    continue
+                lot = heap[0][1]
+                take = min(remaining, remaining_open[lot])
+                lots_out.append(lot)
+                sells_out.append(s)
+                qty_out.append(take)
+                remaining -= take
+                remaining_open[lot] -= take
+                if remaining_open[lot] <= QTY_EPSILON:
+                    heapq.heappop(heap)
+            unmatched[s] = max(remaining, 0.0)
+
+    return (
+        np.array(lots_out, dtype=np.int64),
+        np.array(sells_out, dtype=np.int64),
+        np.array(qty_out, dtype=np.float64),
+        unmatched,
+    )
+
+
+def _groups(codes: np.ndarray, values: np.ndarray):
+    """Yield (code, values) for runs of equal codes (codes already grouped)."""
+    if not len(codes):
+        return
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1, [len(codes)]))
+    for a, b in zip(starts[:-1], starts[1:]):
+        yield int(codes[a]), values[a:b].tolist()
+
+
+# ============================================================================
+# Realized gains and wash sales
+# ============================================================================
+
+def _term_totals(gain: np.ndarray, long_term: np.ndarray) -> Dict[str, float]:
+    st, lt = gain[~long_term], gain[long_term]
+    return {
+        "short_term_gains": round(float(st[st > 0].sum()), 2),
+        "short_term_losses": round(float(st[st < 0].sum()), 2),
+        "short_term_net": round(float(st.sum()), 2),
+        "long_term_gains": round(float(lt[lt > 0].sum()), 2),
+        "long_term_losses": round(float(lt[lt < 0].sum()), 2),
+        "long_term_net": round(float(lt.sum()), 2),
+        "net_realized": round(float(gain.sum()), 2),
+    }
+
+
+def realized_summary(book: LotBook, disp: Dispositions, tax_year: Optional[int] = None) -> Dict[str, Any]:
+    """Realized gains by term, per security and per disposition for one tax year."""
+    mask = disp.in_year(tax_year)
+    lots, sells = disp.lot[mask], disp.sell[mask]
+    gain, long_term = disp.gain[mask], disp.long_term[mask]
+    codes = book.lot_security[lots]
+
+    n_sec = book.security_count
+    st_by_sec = np.bincount(codes, weights=np.where(long_term, 0.0, gain), minlength=n_sec)
+    lt_by_sec = np.bincount(codes, weights=np.where(long_term, gain, 0.0), minlength=n_sec)
+    proceeds_by_sec = np.bincount(codes, weights=disp.proceeds[mask], minlength=n_sec)
+    cost_by_sec = np.bincount(codes, weights=disp.cost[mask], minlength=n_sec)
+    by_security = [
+        {
+            "security_id": book.securities[c],
+            "symbol": book.symbols[c],
+            "proceeds": round(float(proceeds_by_sec[c]), 2),
+            "cost_basis": round(float(cost_by_sec[c]), 2),
+            "short_term": round(float(st_by_sec[c]), 2),
+            "long_term": round(float(lt_by_sec[c]), 2),
+            "net": round(float(st_by_sec[c] + lt_by_sec[c]), 2),
+        }
+        for c in np.unique(codes)
+    ]
+    by_security.sort(key=lambda row: row["net"])
+
+    dispositions = [
+        {
+            "sell_id": book.sell_ids[s],
+            "lot_id": book.lot_ids[lot],
+            "security_id": book.securities[book.lot_security[lot]],
+            "symbol": book.symbols[book.lot_security[lot]],
+            "acquisition_date": str(book.acquired[lot]),
+            "sale_date": str(day),
+            "quantity": round(float(q), 8),
+            "proceeds": round(float(p), 2),
+            "cost_basis": round(float(c), 2),
+            "gain": round(float(p - c), 2),
+            "term": "long" if lt else "short",
+        }
+        for lot, s, day, q, p, c, lt in zip(
+            lots, sells, disp.date[mask], disp.quantity[mask], disp.proceeds[mask], disp.cost[mask], long_term
+        )
+    ]
+
+    year_sells = np.unique(sells)
+    return {
+        **_term_totals(gain, long_term),
+        "total_proceeds": round(float(disp.proceeds[mask].sum()), 2),
+        "total_cost_basis": round(float(disp.cost[mask].sum()), 2),
+        "recorded_realized_pl": round(float(book.sell_recorded_pl[year_sells].sum()), 2),
+        "unmatched_quantity": round(float(disp.unmatched[year_sells].sum()), 8),
+        "sell_count": int(len(year_sells)),
+        "disposition_count": int(mask.sum()),
+        "by_security": by_security,
+        "dispositions": dispositions,
+    }
+
+
+class _PurchaseIndex:
+    """Lot acquisitions sorted by composite (security, day) key with quantity prefix sums."""
+
+    def __init__(self, book: LotBook, pad_days: int):
+        acquired_days = book.acquired.astype(np.int64)
+        all_days = np.concatenate((acquired_days, book.sell_dates.astype(np.int64)))
+        self.day0 = int(all_days.min()) - pad_days if len(all_days) else 0
+        self.span = int(all_days.max()) - self.day0 + pad_days + 1 if len(all_days) else 1
+        keys = book.lot_security * self.span + (acquired_days - self.day0)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+        self.prefix = np.concatenate(([0.0], np.cumsum(book.quantity[self.order])))
+
+    def bounds(self, codes: np.ndarray, first_day: np.ndarray, last_day: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted-position range [lo, hi) of purchases per row in `codes` on days [first_day, last_day]."""
+        lo = np.searchsorted(self.keys, codes * self.span + (first_day - self.day0), side="left")
+        hi = np.searchsorted(self.keys, codes * self.span + (last_day - self.day0), side="right")
+        return lo, hi
+
+    def quantity(self, lo: np.ndarray, hi: np.ndarray) -> np.ndarray:
+        return self.prefix[hi] - self.prefix[lo]
+
+
+def detect_wash_sales(
+    book: LotBook,
+    disp: Dispositions,
+    tax_year: Optional[int] = None,
+    window_days: int = WASH_SALE_WINDOW_DAYS,
+) -> Dict[str, Any]:
+    """
+    Loss dispositions with substantially identical purchases within ±window_days.
+
+    Replacement quantity counts every lot of the same security acquired in the
+    window except the lots relieved by that same sell. The disallowed loss is
+    the loss × min(1, replacement / quantity sold from the lot).
+    """
+    mask = disp.in_year(tax_year) & (disp.gain < -QTY_EPSILON)
+    idx = np.flatnonzero(mask)
+    lots, sells = disp.lot[idx], disp.sell[idx]
+    codes = book.lot_security[lots]
+    sale_days = disp.date[idx].astype(np.int64)
+
+    purchases = _PurchaseIndex(book, window_days)
+    in_window = purchases.quantity(*purchases.bounds(codes, sale_days - window_days, sale_days + window_days))
+
+    # Lots relieved by the same sell are not replacements
+    all_sale_days = disp.date.astype(np.int64)
+    own_in_window = np.abs(book.acquired[disp.lot].astype(np.int64) - all_sale_days) <= window_days
+    own_by_sell = np.bincount(
+        disp.sell, weights=np.where(own_in_window, book.quantity[disp.lot], 0.0), minlength=len(book.sell_ids)
+    )
+    replacement = np.maximum(in_window - own_by_sell[sells], 0.0)
+
+    hit = replacement > QTY_EPSILON
+    loss = -disp.gain[idx]
+    fraction = np.minimum(1.0, replacement / np.maximum(disp.quantity[idx], QTY_EPSILON))
+    disallowed = np.where(hit, loss * fraction, 0.0)
+    long_term = disp.long_term[idx]
+
+    wash_sales = [
+        {
+            "sell_id": book.sell_ids[s],
+            "lot_id": book.lot_ids[lot],
+            "security_id": book.securities[c],
+            "symbol": book.symbols[c],
+            "sale_date": str(book.sell_dates[s]),
+            "quantity": round(float(q), 8),
+            "loss": round(float(l), 2),
+            "replacement_quantity": round(float(r), 8),
+            "disallowed_loss": round(float(d), 2),
+            "term": "long" if lt else "short",
+        }
+        for lot, s, c, q, l, r, d, lt in zip(
+            lots[hit], sells[hit], codes[hit], disp.quantity[idx][hit], loss[hit],
+            replacement[hit], disallowed[hit], long_term[hit],
+        )
+    ]
+    return {
+        "wash_sales": wash_sales,
+        "count": len(wash_sales),
+        "total_disallowed": round(float(disallowed.sum()), 2),
+        "short_term_disallowed": round(float(disallowed[~long_term].sum()), 2),
+        "long_term_disallowed": round(float(disallowed[long_term].sum()), 2),
+        "loss_dispositions_checked": int(len(idx)),
+        "window_days": window_days,
+    }
+
+
+# ============================================================================
+# Open lots and harvesting
+# ============================================================================
+
+def value_open_lots(
+    book: LotBook,
+    prices: Dict[str, Any],
+    fx_rates: Dict[str, Any],
+    asof: date,
+) -> OpenLotValuation:
+    """
+    Value open lots.
+
+    Args:
+        book: Lot book
+        prices: security_id -> close in the pack (missing → NaN, excluded from totals)
+        fx_rates: lot currency -> rate into the base currency (missing → 1)
+        asof: Valuation date (holding period)
+    """
+    lots = np.flatnonzero(book.quantity_open > QTY_EPSILON)
+    price_by_code = np.array(
+        [float(prices[sid]) if prices.get(sid) is not None else np.nan for sid in book.securities],
+        dtype=np.float64,
+    )
+    currencies, currency_idx = np.unique(book.currency[lots].astype(str), return_inverse=True)
+    fx = np.array([float(fx_rates.get(ccy) or 1.0) for ccy in currencies], dtype=np.float64)[currency_idx]
+
+    quantity = book.quantity_open[lots]
+    cost = quantity * book.cost_per_share[lots]
+    price = price_by_code[book.lot_security[lots]]
+    market_value = quantity * price * fx
+    asof_day = np.datetime64(asof, "D")
+    lt_from = book.long_term_from[lots]
+    return OpenLotValuation(
+        lots=lots,
+        quantity=quantity,
+        cost=cost,
+        price=price,
+        market_value=market_value,
+        unrealized=market_value - cost,
+        long_term=asof_day >= lt_from,
+        days_to_long_term=np.maximum((lt_from - asof_day).astype(np.int64), 0),
+    )
+
+
+def open_lot_details(book: LotBook, valuation: OpenLotValuation) -> List[Dict[str, Any]]:
+    """Per-lot rows for an OpenLotValuation."""
+    rows = []
+    for k, lot in enumerate(valuation.lots):
+        code = book.lot_security[lot]
+        priced = not np.isnan(valuation.price[k])
+        rows.append({
+            "lot_id": book.lot_ids[lot],
+            "security_id": book.securities[code],
+            "symbol": book.symbols[code],
+            "acquisition_date": str(book.acquired[lot]),
+            "quantity": round(float(valuation.quantity[k]), 8),
+            "cost_basis": round(float(valuation.cost[k]), 2),
+            "cost_basis_per_share": round(float(book.cost_per_share[lot]), 6),
+            "price": round(float(valuation.price[k]), 6) if priced else None,
+            "market_value": round(float(valuation.market_value[k]), 2) if priced else None,
+            "unrealized_pl": round(float(valuation.unrealized[k]), 2) if priced else None,
+            "term": "long" if valuation.long_term[k] else "short",
+            "days_to_long_term": int(valuation.days_to_long_term[k]),
+        })
+    return rows
+
+
+def unrealized_summary(book: LotBook, valuation: OpenLotValuation) -> Dict[str, Any]:
+    """Unrealized gains by term, overall and per security."""
+    priced = valuation.priced
+    gain = np.where(priced, valuation.unrealized, 0.0)
+    long_term = valuation.long_term
+    codes = book.lot_security[valuation.lots]
+    n_sec = book.security_count
+
+    def by_code(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights=weights, minlength=n_sec)
+
+    st, lt = by_code(np.where(long_term, 0.0, gain)), by_code(np.where(long_term, gain, 0.0))
+    qty, cost = by_code(valuation.quantity), by_code(valuation.cost)
+    mv = by_code(np.where(priced, valuation.market_value, 0.0))
+    by_position = [
+        {
+            "security_id": book.securities[c],
+            "symbol": book.symbols[c],
+            "quantity": round(float(qty[c]), 8),
+            "cost_basis": round(float(cost[c]), 2),
+            "market_value": round(float(mv[c]), 2),
+            "unrealized_pl": round(float(st[c] + lt[c]), 2),
+            "short_term": round(float(st[c]), 2),
+            "long_term": round(float(lt[c]), 2),
+        }
+        for c in np.unique(codes)
+    ]
+    return {
+        "short_term": round(float(gain[~long_term].sum()), 2),
+        "long_term": round(float(gain[long_term].sum()), 2),
+        "total_unrealized": round(float(gain.sum()), 2),
+        "total_cost_basis": round(float(valuation.cost.sum()), 2),
+        "total_market_value": round(float(np.where(priced, valuation.market_value, 0.0).sum()), 2),
+        "unpriced_lots": int((~priced).sum()),
+        "by_position": by_position,
+    }
+
+
+def harvest_candidates(book: LotBook, valuation: OpenLotValuation, min_loss: float = 0.0) -> List[Dict[str, Any]]:
+    """Securities whose losing open lots add up to at least min_loss (largest loss first)."""
+    losing = valuation.priced & (valuation.unrealized < -QTY_EPSILON)
+    if not losing.any():
+        return []
+    lots = valuation.lots[losing]
+    codes = book.lot_security[lots]
+    loss = -valuation.unrealized[losing]
+    long_term = valuation.long_term[losing]
+    n_sec = book.security_count
+
+    def by_code(weights: np.ndarray) -> np.ndarray:
+        return np.bincount(codes, weights=weights, minlength=n_sec)
+
+    total_loss = by_code(loss)
+    st_loss, lt_loss = by_code(np.where(long_term, 0.0, loss)), by_code(np.where(long_term, loss, 0.0))
+    qty, cost, mv = by_code(valuation.quantity[losing]), by_code(valuation.cost[losing]), by_code(valuation.market_value[losing])
+
+    order = np.argsort(codes, kind="stable")
+    lot_groups = dict(_groups(codes[order], book.lot_ids[lots][order]))
+    selected = np.flatnonzero(total_loss >= max(float(min_loss), QTY_EPSILON))
+    selected = selected[np.argsort(-total_loss[selected], kind="stable")]
+    return [
+        {
+            "security_id": book.securities[c],
+            "symbol": book.symbols[c],
+            "lot_ids": lot_groups[int(c)],
+            "quantity": round(float(qty[c]), 8),
+            "cost_basis": round(float(cost[c]), 2),
+            "market_value": round(float(mv[c]), 2),
+            "unrealized_loss": round(float(total_loss[c]), 2),
+            "short_term_loss": round(float(st_loss[c]), 2),
+            "long_term_loss": round(float(lt_loss[c]), 2),
+        }
+        for c in selected
+    ]
+
+
+def wash_sale_risks(
+    book: LotBook,
+    candidates: Sequence[Dict[str, Any]],
+    asof: date,
+    window_days: int = WASH_SALE_WINDOW_DAYS,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Purchases in the window before a prospective sale on `asof`.
+
+    Selling the candidate lots now would wash against any other lot of the same
+    security acquired within window_days (the candidate lots themselves excluded).
+    """
+    risks: Dict[str, Dict[str, Any]] = {}
+    if not candidates:
+        return risks
+    code_of = {sid: c for c, sid in enumerate(book.securities)}
+    lot_index = {lot_id: i for i, lot_id in enumerate(book.lot_ids)}
+    known = [c for c in candidates if str(c.get("security_id")) in code_of]
+    codes = np.array([code_of[str(c["security_id"])] for c in known], dtype=np.int64)
+    asof_day = int(np.datetime64(asof, "D").astype(np.int64))
+
+    purchases = _PurchaseIndex(book, window_days)
+    lo, hi = purchases.bounds(codes, np.full(len(codes), asof_day - window_days), np.full(len(codes), asof_day))
+    bought = purchases.quantity(lo, hi)
+    repurchase_after = str(asof + timedelta(days=window_days + 1))
+    for candidate, a, b, total in zip(known, lo, hi, bought):
+        own = {lot_index[lot_id] for lot_id in candidate.get("lot_ids", []) if lot_id in lot_index}
+        window = purchases.order[a:b]
+        others = [i for i in window if i not in own]
+        replacement = max(float(total) - float(book.quantity[[i for i in window if i in own]].sum()), 0.0)
+        sold_qty = float(candidate.get("quantity") or 0.0)
+        risks[str(candidate["security_id"])] = {
+            "symbol": candidate.get("symbol"),
+            "at_risk": replacement > QTY_EPSILON,
+            "recent_purchase_quantity": round(replacement, 8),
+            "last_purchase_date": str(book.acquired[others[-1]]) if others else None,
+            "disallowed_fraction": round(min(1.0, replacement / sold_qty), 4) if sold_qty > 0 else 0.0,
+            "repurchase_after": repurchase_after,
+        }
+    return risks
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+_BOOKS: "OrderedDict[Tuple[str, Optional[str]], LotBook]" = OrderedDict()
+
+
+async def load_lot_book(conn, portfolio_id) -> LotBook:
+    """Read the lot history and sells of one portfolio (two named queries)."""
+    lot_rows = await fetch_named(conn, LOT_HISTORY_QUERY, portfolio_id)
+    sell_rows = await fetch_named(conn, SELL_HISTORY_QUERY, portfolio_id)
+    return LotBook.from_rows(lot_rows, sell_rows)
+
+
+async def get_lot_book(user_id, portfolio_id, request_id: Optional[str] = None) -> LotBook:
+    """
+    Lot book for a portfolio, loaded once per request.
+
+    Books are kept per (portfolio_id, request_id) so every tax.* step of one
+    pattern run shares a single load (and its memoized relief/valuations);
+    without a request_id the book is always reloaded.
+    """
+    key = (str(portfolio_id), request_id)
+    if request_id and key in _BOOKS:
+        _BOOKS.move_to_end(key)
+        return _BOOKS[key]
+
+    async with get_rls_read_connection(str(user_id)) as conn:
+        book = await load_lot_book(conn, portfolio_id)
+    logger.info(
+        f"Loaded lot book for {portfolio_id}: {len(book.lot_ids)} lots, "
+        f"{len(book.sell_ids)} sells, {book.security_count} securities"
+    )
+
+    if request_id:
+        _BOOKS[key] = book
+        while len(_BOOKS) > MAX_CACHED_BOOKS:
+            _BOOKS.popitem(last=False)
+    return book
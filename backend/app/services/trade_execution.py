@@ -7,10 +7,18 @@
 - lots: quantity_original, quantity_open, closed_date, quantity, is_open
 - transactions: transaction_date, quantity, amount, fee, narration
 
+Batch Execution (2025-11-10):
+- execute_batch() applies a list of TradeOrder (e.g. OptimizerService.propose_trades
+  output via TradeOrder.from_proposal) in a single transaction: one lot lock,
+  in-memory FIFO/LIFO/HIFO relief, executemany inserts and one set-based lot UPDATE.
+- COPY is not used because lots/transactions have row-level security enabled and
+  PostgreSQL does not support COPY FROM on RLS tables.
+
 Created: 2025-10-23
 """
 
 from uuid import UUID, uuid4
+from dataclasses import dataclass
 from datetime import date
 from decimal import Decimal
 from typing import Optional, List, Dict, Any, Tuple
@@ -50,6 +58,174 @@ class InvalidTradeError(TradeExecutionError):
     pass
 
 
+@dataclass
+class TradeOrder:
+    """Single order in a batch passed to TradeExecutionService.execute_batch()."""
+
+    symbol: str
+    trade_type: TradeType
+    qty: Decimal
+    price: Decimal
+    currency: str
+    trade_date: date
+    settlement_date: Optional[date] = None
+    lot_selection: Optional[LotSelectionMethod] = None
+    specific_lot_id: Optional[UUID] = None
+    fx_rate: Optional[Decimal] = None
+    fees: Decimal = Decimal("0")
+    notes: Optional[str] = None
+
+    @classmethod
+    def from_proposal(
+        cls,
+        proposal: Dict[str, Any],
+        trade_date: date,
+        currency: str = "USD",
+    ) -> Optional["TradeOrder"]:
+        """
+        Build an order from an OptimizerService trade proposal dict.
+
+        Args:
+            proposal: Trade proposal with symbol, action, quantity and current_price (or price)
+            trade_date: Execution date
+            currency: Trade currency
+
+        Returns:
+            TradeOrder, or None for HOLD / zero-quantity proposals
+        """
+        action = str(proposal.get("action", "")).upper()
+        qty = abs(Decimal(str(proposal.get("quantity", 0))))
+        if action not in (TradeType.BUY.value, TradeType.SELL.value) or qty == 0:
+            return None
+
+        price = proposal.get("current_price", proposal.get("price", 0))
+        return cls(
+            symbol=proposal["symbol"],
+            trade_type=TradeType(action),
+            qty=qty,
+            price=Decimal(str(price)),
+            currency=currency,
+            trade_date=trade_date,
+            notes=proposal.get("rationale"),
+        )
+
+
+# Portfolio cost_basis_method → lot selection method
+COST_BASIS_METHOD_MAPPING = {
+    "FIFO": LotSelectionMethod.FIFO,
+    "LIFO": LotSelectionMethod.LIFO,
+    "HIFO": LotSelectionMethod.HIFO,
+    "SPECIFIC_LOT": LotSelectionMethod.SPECIFIC,
+    "AVERAGE_COST": LotSelectionMethod.FIFO  # Fallback to FIFO for average cost
+}
+
+
+def _convert_to_base(
+    amount: Decimal,
+    currency: str,
+    base_currency: Optional[str],
+    fx_rate: Optional[Decimal],
+) -> Tuple[Decimal, Decimal]:
+    """
+    Convert a trade-currency amount to base currency.
+
+    Returns:
+        Tuple of (amount in base currency, fx rate used)
+    """
+    if not base_currency or base_currency == currency:
+        return amount, Decimal("1.0")
+    if fx_rate is None:
+        logger.warning(f"FX rate not provided for {currency}->{base_currency}, using 1.0")
+        return amount, Decimal("1.0")
+    return amount * fx_rate, fx_rate
+
+
+def order_lots(lots: List[Dict[str, Any]], lot_selection: LotSelectionMethod) -> List[Dict[str, Any]]:
+    """
+    Sort open lots in relief order (in-memory equivalent of _get_open_lots ORDER BY).
+
+    Lots must carry "_seq" (creation order) to break acquisition_date ties.
+    """
+    if lot_selection == LotSelectionMethod.FIFO:
+        return sorted(lots, key=lambda lot: (lot["acquisition_date"], lot["_seq"]))
+    if lot_selection == LotSelectionMethod.LIFO:
+        return sorted(lots, key=lambda lot: (lot["acquisition_date"], lot["_seq"]), reverse=True)
+    if lot_selection == LotSelectionMethod.HIFO:
+        # Highest cost basis per share first (maximize tax loss harvesting)
+        return sorted(
+            lots,
+            key=lambda lot: (
+                -(lot["cost_basis"] / lot["quantity_original"]),
+                lot["acquisition_date"],
+                lot["_seq"],
+            ),
+        )
+    raise InvalidTradeError(f"Unsupported lot selection method: {lot_selection}")
+
+
+def plan_lot_relief(
+    open_lots: List[Dict[str, Any]],
+    qty_to_sell: Decimal,
+    proceeds_per_share: Decimal,
+    trade_date: date,
+) -> Tuple[List[Dict[str, Any]], Decimal]:
+    """
+    Relieve lots in the given order without touching the database.
+
+    Mutates each relieved lot's "quantity_open" (and "closed_date" once fully
+    relieved) in place so consecutive sells in a batch see the remaining quantities.
+
+    Args:
+        open_lots: Open lots sorted by selection method
+        qty_to_sell: Total quantity to sell
+        proceeds_per_share: Proceeds per share (in base currency)
+        trade_date: Disposition date
+
+    Returns:
+        Tuple of (lots_closed, total_realized_pnl)
+    """
+    lots_closed = []
+    total_realized_pnl = Decimal("0")
+    remaining_qty = qty_to_sell
+
+    for lot in open_lots:
+        if remaining_qty <= 0:
+            break
+        if lot["quantity_open"] <= 0:
+            continue
+
+        # Determine how much to close from this lot
+        qty_to_close = min(remaining_qty, lot["quantity_open"])
+
+        # Calculate proportional cost basis
+        cost_basis_per_share = lot["cost_basis"] / lot["quantity_original"]
+        cost_basis_closed = qty_to_close * cost_basis_per_share
+
+        # Calculate realized P&L for this lot
+        proceeds_closed = qty_to_close * proceeds_per_share
+        realized_pnl = proceeds_closed - cost_basis_closed
+
+        lot["quantity_open"] = lot["quantity_open"] - qty_to_close
+        if lot["quantity_open"] == 0:
+            lot["closed_date"] = trade_date
+
+        lots_closed.append({
+            "lot_id": lot["id"],
+            "symbol": lot["symbol"],
+            "qty_closed": qty_to_close,
+            "cost_basis": cost_basis_closed,
+            "proceeds": proceeds_closed,
+            "realized_pnl": realized_pnl,
+            "acquisition_date": lot["acquisition_date"],
+            "disposition_date": trade_date
+        })
+
+        total_realized_pnl += realized_pnl
+        remaining_qty -= qty_to_close
+
+    return lots_closed, total_realized_pnl
+
+
 class TradeExecutionService:
     """
     Service for executing portfolio trades with lot tracking.
@@ -262,15 +438,7 @@ async def execute_sell(
             )
             if portfolio_row:
                 method_str = portfolio_row["cost_basis_method"]
-                # Map database value to enum
-                method_mapping = {
-                    "FIFO": LotSelectionMethod.FIFO,
-                    "LIFO": LotSelectionMethod.LIFO,
-                    "HIFO": LotSelectionMethod.HIFO,
-                    "SPECIFIC_LOT": LotSelectionMethod.SPECIFIC,
-                    "AVERAGE_COST": LotSelectionMethod.FIFO  # Fallback to FIFO for average cost
-                }
-                lot_selection = method_mapping.get(method_str, LotSelectionMethod.FIFO)
+                lot_selection = COST_BASIS_METHOD_MAPPING.get(method_str, LotSelectionMethod.FIFO)
                 logger.info(f"Using portfolio cost_basis_method: {method_str} -> {lot_selection}")
             else:
                 lot_selection = LotSelectionMethod.FIFO
@@ -375,6 +543,304 @@ async def execute_sell(
             "settlement_date": settlement_date
         }
 
+    async def execute_batch(
+        self,
+        portfolio_id: UUID,
+        orders: List[TradeOrder],
+        base_currency: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute a list of buy/sell orders in a single transaction.
+
+        Orders are applied in the given order against an in-memory copy of the
+        portfolio's open lots, so a later sell can relieve a lot bought earlier
+        in the same batch. Database work is a fixed number of statements
+        regardless of order count:
+            1. Resolve/create securities for all symbols
+            2. Lock all open lots for the traded symbols (FOR UPDATE)
+            3. Insert transactions and new lots (executemany)
+            4. Apply lot relief (one set-based UPDATE)
+
+        Args:
+            portfolio_id: Portfolio UUID
+            orders: Orders to execute (see TradeOrder.from_proposal for optimizer output)
+            base_currency: Portfolio base currency
+
+        Returns:
+            Dict with per-order results (same shape as execute_buy/execute_sell),
+            trade_count and total realized_pnl
+
+        Raises:
+            InvalidTradeError: If any order is invalid (nothing is written)
+            InsufficientSharesError: If any sell exceeds available shares (nothing is written)
+        """
+        if not orders:
+            return {"trades": [], "trade_count": 0, "realized_pnl": Decimal("0")}
+
+        # Validate everything up front so a bad order never half-applies a batch
+        for order in orders:
+            if order.qty <= 0:
+                raise InvalidTradeError(
+                    f"{order.trade_type.value.capitalize()} quantity must be positive, got {order.qty} ({order.symbol})"
+                )
+            if order.price < 0:
+                raise InvalidTradeError(f"Price cannot be negative, got {order.price} ({order.symbol})")
+            if order.lot_selection == LotSelectionMethod.SPECIFIC and not order.specific_lot_id:
+                raise InvalidTradeError("specific_lot_id required for SPECIFIC lot selection")
+
+        default_selection = LotSelectionMethod.FIFO
+        if any(o.trade_type == TradeType.SELL and o.lot_selection is None for o in orders):
+            portfolio_row = await self.conn.fetchrow(
+                "SELECT cost_basis_method FROM portfolios WHERE id = $1",
+                portfolio_id
+            )
+            if portfolio_row:
+                default_selection = COST_BASIS_METHOD_MAPPING.get(
+                    portfolio_row["cost_basis_method"], LotSelectionMethod.FIFO
+                )
+
+        symbols = sorted({order.symbol for order in orders})
+        sell_symbols = sorted({o.symbol for o in orders if o.trade_type == TradeType.SELL})
+
+        logger.info(
+            f"Executing batch: portfolio_id={portfolio_id}, orders={len(orders)}, "
+            f"symbols={len(symbols)}, sells={len(sell_symbols)}"
+        )
+
+        async with self.conn.transaction():
+            security_ids = await self._resolve_security_ids(orders)
+
+            # Lock every open lot that any sell could touch, once
+            lot_rows = []
+            if sell_symbols:
+                lot_rows = await self.conn.fetch(
+                    """
+                    SELECT id, security_id, symbol, quantity_open, cost_basis, acquisition_date,
+                           currency, quantity_original
+                    FROM lots
+                    WHERE portfolio_id = $1 AND symbol = ANY($2::text[]) AND quantity_open > 0
+                    ORDER BY acquisition_date ASC, created_at ASC
+                    FOR UPDATE
+                    """,
+                    portfolio_id, sell_symbols
+                )
+
+            lots_by_symbol: Dict[str, List[Dict[str, Any]]] = {}
+            for seq, row in enumerate(lot_rows):
+                lot = dict(row)
+                lot["_seq"] = seq
+                lots_by_symbol.setdefault(lot["symbol"], []).append(lot)
+            next_seq = len(lot_rows)
+
+            existing_lot_ids = {row["id"] for row in lot_rows}
+            new_lots: List[Dict[str, Any]] = []
+            relieved_lot_ids = set()
+            transaction_rows = []
+            results = []
+            total_realized_pnl = Decimal("0")
+
+            for order in orders:
+                settlement_date = order.settlement_date or order.trade_date
+                trade_id = uuid4()
+                security_id = security_ids[order.symbol]
+
+                if order.trade_type == TradeType.BUY:
+                    total_cost = order.qty * order.price + order.fees
+                    cost_basis_base, fx_rate_used = _convert_to_base(
+                        total_cost, order.currency, base_currency, order.fx_rate
+                    )
+                    lot = {
+                        "id": uuid4(),
+                        "security_id": security_id,
+                        "symbol": order.symbol,
+                        "quantity_original": order.qty,
+                        "quantity_open": order.qty,
+                        "cost_basis": cost_basis_base,
+                        "acquisition_date": order.trade_date,
+                        "currency": base_currency or order.currency,
+                        "_seq": next_seq,
+                    }
+                    next_seq += 1
+                    new_lots.append(lot)
+                    lots_by_symbol.setdefault(order.symbol, []).append(lot)
+
+                    transaction_rows.append((
+                        trade_id, portfolio_id, TradeType.BUY.value, security_id, order.symbol,
+                        order.trade_date, settlement_date, order.qty, order.price,
+                        -total_cost,  # Negative = outflow
+                        order.currency, order.fees, order.notes, None
+                    ))
+                    results.append({
+                        "trade_type": "buy",
+                        "trade_id": trade_id,
+                        "lot_id": lot["id"],
+                        "symbol": order.symbol,
+                        "qty": order.qty,
+                        "price": order.price,
+                        "currency": order.currency,
+                        "total_cost": total_cost,
+                        "cost_basis_base": cost_basis_base,
+                        "fx_rate": fx_rate_used,
+                        "trade_date": order.trade_date,
+                        "settlement_date": settlement_date,
+                        "fees": order.fees,
+                        "notes": order.notes,
+                    })
+                    continue
+
+                # SELL
+                net_proceeds = order.qty * order.price - order.fees
+                proceeds_base, fx_rate_used = _convert_to_base(
+                    net_proceeds, order.currency, base_currency, order.fx_rate
+                )
+                lot_selection = order.lot_selection or default_selection
+                symbol_lots = lots_by_symbol.get(order.symbol, [])
+
+                if lot_selection == LotSelectionMethod.SPECIFIC:
+                    candidates = [
+                        lot for lot in symbol_lots
+                        if lot["id"] == order.specific_lot_id and lot["quantity_open"] > 0
+                    ]
+                    if not candidates:
+                        raise InvalidTradeError(
+                            f"Lot {order.specific_lot_id} not found or already closed"
+                        )
+                else:
+                    candidates = order_lots(
+                        [lot for lot in symbol_lots if lot["quantity_open"] > 0], lot_selection
+                    )
+
+                total_available = sum((lot["quantity_open"] for lot in candidates), Decimal("0"))
+                if total_available < order.qty:
+                    raise InsufficientSharesError(
+                        f"Insufficient shares to sell: need {order.qty}, have {total_available} {order.symbol}"
+                    )
+
+                lots_closed, realized_pnl = plan_lot_relief(
+                    candidates, order.qty, proceeds_base / order.qty, order.trade_date
+                )
+                relieved_lot_ids.update(closed["lot_id"] for closed in lots_closed)
+                total_realized_pnl += realized_pnl
+
+                transaction_rows.append((
+                    trade_id, portfolio_id, TradeType.SELL.value, security_id, order.symbol,
+                    order.trade_date, settlement_date, order.qty, order.price,
+                    net_proceeds,  # Positive = inflow
+                    order.currency, order.fees, order.notes, realized_pnl
+                ))
+                results.append({
+                    "trade_type": "sell",
+                    "trade_id": trade_id,
+                    "symbol": order.symbol,
+                    "qty": order.qty,
+                    "price": order.price,
+                    "currency": order.currency,
+                    "net_proceeds": net_proceeds,
+                    "proceeds_base": proceeds_base,
+                    "fx_rate": fx_rate_used,
+                    "lots_closed": lots_closed,
+                    "realized_pnl": realized_pnl,
+                    "trade_date": order.trade_date,
+                    "settlement_date": settlement_date,
+                    "fees": order.fees,
+                    "notes": order.notes,
+                })
+
+            await self.conn.executemany(
+                """
+                INSERT INTO transactions (
+                    id, portfolio_id, transaction_type, security_id, symbol,
+                    transaction_date, settlement_date, quantity, price, amount,
+                    currency, fee, narration, realized_pl, source, created_at
+                )
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, 'manual', NOW())
+                """,
+                transaction_rows
+            )
+
+            # New lots are inserted with their post-batch open quantity
+            if new_lots:
+                await self.conn.executemany(
+                    """
+                    INSERT INTO lots (
+                        id, portfolio_id, security_id, symbol,
+                        acquisition_date, quantity_original, quantity_open, quantity,
+                        cost_basis, cost_basis_per_share, currency, is_open, closed_date, created_at
+                    )
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $7, $8, $9, $10, $7 > 0, $11, NOW())
+                    """,
+                    [
+                        (
+                            lot["id"], portfolio_id, lot["security_id"], lot["symbol"],
+                            lot["acquisition_date"], lot["quantity_original"], lot["quantity_open"],
+                            lot["cost_basis"], lot["cost_basis"] / lot["quantity_original"],
+                            lot["currency"],
+                            lot.get("closed_date"),
+                        )
+                        for lot in new_lots
+                    ]
+                )
+
+            updated_lots = [
+                lot
+                for symbol_lots in lots_by_symbol.values()
+                for lot in symbol_lots
+                if lot["id"] in existing_lot_ids and lot["id"] in relieved_lot_ids
+            ]
+            await self._apply_lot_updates(updated_lots)
+
+        logger.info(
+            f"Batch complete: portfolio_id={portfolio_id}, trades={len(results)}, "
+            f"lots_updated={len(updated_lots)}, lots_created={len(new_lots)}, "
+            f"realized_pnl={total_realized_pnl}"
+        )
+
+        return {
+            "trades": results,
+            "trade_count": len(results),
+            "realized_pnl": total_realized_pnl,
+        }
+
+    async def _resolve_security_ids(self, orders: List[TradeOrder]) -> Dict[str, UUID]:
+        """
+        Resolve security ids for all order symbols, creating missing securities.
+
+        Args:
+            orders: Orders in the batch
+
+        Returns:
+            Dict mapping symbol → security UUID
+        """
+        currencies = {}
+        for order in orders:
+            currencies.setdefault(order.symbol, order.currency)
+        symbols = list(currencies)
+
+        rows = await self.conn.fetch(
+            "SELECT id, symbol FROM securities WHERE symbol = ANY($1::text[])",
+            symbols
+        )
+        security_ids = {row["symbol"]: row["id"] for row in rows}
+
+        missing = [symbol for symbol in symbols if symbol not in security_ids]
+        if missing:
+            await self.conn.executemany(
+                """
+                INSERT INTO securities (id, symbol, name, security_type, currency, created_at)
+                VALUES ($1, $2, $2, 'EQUITY', $3, NOW())
+                ON CONFLICT (symbol) DO UPDATE SET updated_at = NOW()
+                """,
+                [(uuid4(), symbol, currencies[symbol]) for symbol in missing]
+            )
+            rows = await self.conn.fetch(
+                "SELECT id, symbol FROM securities WHERE symbol = ANY($1::text[])",
+                missing
+            )
+            security_ids.update({row["symbol"]: row["id"] for row in rows})
+            logger.info(f"Created {len(missing)} new securities: {missing}")
+
+        return security_ids
+
     async def _create_lot(
         self,
         portfolio_id: UUID,
@@ -454,7 +920,7 @@ async def _get_open_lots(
             # Get specific lot
             row = await self.conn.fetchrow(
                 """
-                SELECT id, security_id, symbol, quantity_open, cost_basis, acquisition_date, currency
+                SELECT id, security_id, symbol, quantity_open, cost_basis, acquisition_date, currency, quantity_original
                 FROM lots
                 WHERE portfolio_id = $1 AND id = $2 AND quantity_open > 0
                 """,
@@ -513,67 +979,48 @@ async def _close_lots(
         Returns:
             Tuple of (lots_closed, total_realized_pnl)
         """
-        lots_closed = []
-        total_realized_pnl = Decimal("0")
-        remaining_qty = qty_to_sell
-
-        for lot in open_lots:
-            if remaining_qty <= 0:
-                break
-
-            lot_id = lot["id"]
-            quantity_open = lot["quantity_open"]
-            cost_basis_total = lot["cost_basis"]
-            quantity_original = lot["quantity_original"]
-
-            # Determine how much to close from this lot
-            qty_to_close = min(remaining_qty, quantity_open)
-
-            # Calculate proportional cost basis
-            cost_basis_per_share = cost_basis_total / quantity_original
-            cost_basis_closed = qty_to_close * cost_basis_per_share
-
-            # Calculate realized P&L for this lot
-            proceeds_closed = qty_to_close * proceeds_per_share
-            realized_pnl = proceeds_closed - cost_basis_closed
+        relieved = [dict(lot) for lot in open_lots]
+        lots_closed, total_realized_pnl = plan_lot_relief(
+            relieved, qty_to_sell, proceeds_per_share, trade_date
+        )
 
-            # Update lot quantity_open
-            new_quantity_open = quantity_open - qty_to_close
-
-            await self.conn.execute(
-                """
-                UPDATE lots
-                SET quantity_open = $1,
-                    quantity = $1,
-                    closed_date = CASE WHEN $1 = 0 THEN $2 ELSE NULL END,
-                    is_open = CASE WHEN $1 = 0 THEN false ELSE true END,
-                    updated_at = NOW()
-                WHERE id = $3
-                """,
-                new_quantity_open, trade_date if new_quantity_open == 0 else None, lot_id
-            )
+        closed_ids = {closed["lot_id"] for closed in lots_closed}
+        await self._apply_lot_updates([lot for lot in relieved if lot["id"] in closed_ids])
 
+        for closed in lots_closed:
             logger.debug(
-                f"Closed lot: lot_id={lot_id}, qty_closed={qty_to_close}, "
-                f"cost_basis={cost_basis_closed}, proceeds={proceeds_closed}, "
-                f"realized_pnl={realized_pnl}"
+                f"Closed lot: lot_id={closed['lot_id']}, qty_closed={closed['qty_closed']}, "
+                f"cost_basis={closed['cost_basis']}, proceeds={closed['proceeds']}, "
+                f"realized_pnl={closed['realized_pnl']}"
             )
 
-            lots_closed.append({
-                "lot_id": lot_id,
-                "symbol": lot["symbol"],
-                "qty_closed": qty_to_close,
-                "cost_basis": cost_basis_closed,
-                "proceeds": proceeds_closed,
-                "realized_pnl": realized_pnl,
-                "acquisition_date": lot["acquisition_date"],
-                "disposition_date": trade_date
-            })
+        return lots_closed, total_realized_pnl
 
-            total_realized_pnl += realized_pnl
-            remaining_qty -= qty_to_close
+    async def _apply_lot_updates(self, lots: List[Dict[str, Any]]) -> None:
+        """
+        Write new quantity_open for relieved lots in one set-based UPDATE.
 
-        return lots_closed, total_realized_pnl
+        Args:
+            lots: Lots with updated "quantity_open" and, if fully relieved, "closed_date"
+        """
+        if not lots:
+            return
+
+        await self.conn.execute(
+            """
+            UPDATE lots AS l
+            SET quantity_open = u.quantity_open,
+                quantity = u.quantity_open,
+                closed_date = u.closed_date,
+                is_open = u.quantity_open > 0,
+                updated_at = NOW()
+            FROM unnest($1::uuid[], $2::numeric[], $3::date[]) AS u(id, quantity_open, closed_date)
+            WHERE l.id = u.id
+            """,
+            [lot["id"] for lot in lots],
+            [lot["quantity_open"] for lot in lots],
+            [lot.get("closed_date") if lot["quantity_open"] == 0 else None for lot in lots],
+        )
 
     async def get_portfolio_positions(
         self,
@@ -0,0 +1,15 @@
+"""
+DawsOS Benchmarks
+
+Purpose: Pattern load-test and latency benchmark harness
+Created: 2025-11-10
+
+Components:
+    - harness.py: CLI; drives patterns at concurrency, reports latency/queries/memory
+    - seed.py: Synthetic universe (securities, packs, prices, portfolios, lots, macro)
+    - fake_providers.py: Local FMP/FRED/Polygon/NewsAPI stand-ins
+    - baseline.py: Latency summaries, baseline storage, regression checks
+
+Usage:
+    cd backend && python -m benchmarks.harness --help
+"""
@@ -0,0 +1,132 @@
+"""
+Benchmark Results and Baselines
+
+Purpose: Latency summaries, baseline storage and regression checks
+Created: 2025-11-10
+Priority: P2 (Benchmark harness)
+
+A result file looks like:
+    {
+        "universe": {...UniverseSize...},
+        "concurrency": 8,
+        "patterns": {
+            "portfolio_overview": {
+                "latency_ms": {"count", "mean", "p50", "p95", "p99", "max"},
+                "errors": 0,
+                "capabilities": {"ledger.positions": {...latency summary...}},
+                "db": {"queries": {"metrics.daily_values": 40}, "pool_acquires": 120},
+                "memory": {"peak_traced_kb": ..., "max_rss_kb": ...}
+            }
+        }
+    }
+
+Baselines are result files saved under benchmarks/baselines/<name>.json.
+A pattern regresses when its p95 (or p99) exceeds the baseline by more than
+the tolerance, or when it issues more DB queries than the baseline.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_TOLERANCE = 0.20  # 20% slower p95/p99 counts as a regression
+MIN_REGRESSION_MS = 5.0  # ignore jitter on very fast patterns
+
+
+def summarize(latencies_ms: Sequence[float]) -> Dict[str, Any]:
+    """Latency summary (ms) with p50/p95/p99."""
+    if not latencies_ms:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    values = np.asarray(latencies_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean": round(float(values.mean()), 3),
+        "p50": round(float(p50), 3),
+        "p95": round(float(p95), 3),
+        "p99": round(float(p99), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def baseline_path(name: str) -> Path:
+    return BASELINE_DIR / f"{name}.json"
+
+
+def save_baseline(name: str, results: Dict[str, Any]) -> Path:
+    path = baseline_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True, default=str)
+    return path
+
+
+def load_baseline(name: str) -> Dict[str, Any]:
+    with open(baseline_path(name)) as f:
+        return json.load(f)
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """
+    Compare a run against a baseline.
+
+    Returns:
+        Human-readable regression messages (empty list = no regressions)
+    """
+    regressions = []
+    if current.get("universe") != baseline.get("universe"):
+        regressions.append(
+            f"universe differs from baseline ({current.get('universe')} vs {baseline.get('universe')})"
+        )
+
+    for pattern_id, base in baseline.get("patterns", {}).items():
+        run = current.get("patterns", {}).get(pattern_id)
+        if run is None:
+            continue
+
+        for quantile in ("p95", "p99"):
+            old, new = base["latency_ms"].get(quantile), run["latency_ms"].get(quantile)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > MIN_REGRESSION_MS:
+                regressions.append(
+                    f"{pattern_id}: {quantile} {new:.1f}ms vs baseline {old:.1f}ms "
+                    f"(+{(new / old - 1) * 100:.0f}%)"
+                )
+
+        old_queries = sum(base.get("db", {}).get("queries", {}).values())
+        new_queries = sum(run.get("db", {}).get("queries", {}).values())
+        old_count = base["latency_ms"].get("count") or 1
+        new_count = run["latency_ms"].get("count") or 1
+        if round(new_queries / new_count, 1) > round(old_queries / old_count, 1):
+            regressions.append(
+                f"{pattern_id}: {new_queries / new_count:.1f} named queries/run "
+                f"vs baseline {old_queries / old_count:.1f}"
+            )
+
+        if run.get("errors", 0) > base.get("errors", 0):
+            regressions.append(f"{pattern_id}: {run['errors']} errors vs baseline {base.get('errors', 0)}")
+
+    return regressions
+
+
+def format_table(results: Dict[str, Any]) -> str:
+    """Plain-text per-pattern latency table."""
+    lines = [f"{'pattern':<32} {'n':>5} {'p50':>9} {'p95':>9} {'p99':>9} {'err':>4} {'queries':>8} {'peak_kb':>9}"]
+    for pattern_id, run in sorted(results.get("patterns", {}).items()):
+        latency = run["latency_ms"]
+        fmt = lambda v: f"{v:9.1f}" if v is not None else f"{'-':>9}"
+        lines.append(
+            f"{pattern_id:<32} {latency['count']:>5} {fmt(latency['p50'])} {fmt(latency['p95'])} "
+            f"{fmt(latency['p99'])} {run.get('errors', 0):>4} "
+            f"{sum(run.get('db', {}).get('queries', {}).values()):>8} "
+            f"{run.get('memory', {}).get('peak_traced_kb', 0):>9}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,259 @@
+"""
+Fake Provider Servers
+
+Purpose: Local stand-ins for FMP, FRED, Polygon and NewsAPI during load tests
+Created: 2025-11-10
+Priority: P2 (Benchmark harness)
+
+One stdlib ThreadingHTTPServer serves all four APIs under path prefixes:
+    /fmp/api/v3/...        FMP (profile, quote, ratios, statements, calendars)
+    /fred/series/...       FRED (observations, series)
+    /polygon/v2/...        Polygon (aggs, last nbbo, snapshot)
+    /news/v2/...           NewsAPI (everything, top-headlines)
+
+Responses are deterministic per symbol/series (seeded from the path), shaped
+like the real APIs as far as the provider facades parse them. An optional
+fixed latency approximates a remote round trip.
+
+Usage:
+    with FakeProviders(latency_ms=20) as fake:
+        fake.install_env()   # FMP_BASE_URL, FRED_BASE_URL, ... + dummy API keys
+        ...                  # run patterns
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+PREFIXES = {
+    "fmp": ("/fmp/api", "FMP_BASE_URL", "FMP_API_KEY"),
+    "fred": ("/fred", "FRED_BASE_URL", "FRED_API_KEY"),
+    "polygon": ("/polygon", "POLYGON_BASE_URL", "POLYGON_API_KEY"),
+    "news": ("/news/v2", "NEWSAPI_BASE_URL", "NEWSAPI_KEY"),
+}
+
+
+def _seed(text: str) -> int:
+    return zlib.crc32(text.encode())
+
+
+def _price(symbol: str, day: date) -> float:
+    """Deterministic random-walk-ish price for a symbol on a day."""
+    base = 20 + _seed(symbol) % 480
+    wiggle = (_seed(f"{symbol}:{day.isoformat()}") % 2001 - 1000) / 10000
+    return round(base * (1 + wiggle), 2)
+
+
+def _days(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1) if (start + timedelta(days=i)).weekday() < 5]
+
+
+def _parse_date(value: Optional[str], default: date) -> date:
+    try:
+        return date.fromisoformat(value) if value else default
+    except ValueError:
+        return default
+
+
+# ============================================================================
+# Route handlers: (path parts, query) -> (status, body)
+# ============================================================================
+
+def fmp_response(parts: List[str], query: Dict[str, str]) -> Tuple[int, Any]:
+    if len(parts) < 2 or parts[0] != "v3":
+        return 404, {"Error Message": "unknown endpoint"}
+    endpoint = parts[1]
+    symbols = parts[2].split(",") if len(parts) > 2 else []
+    today = date.today()
+
+    if endpoint == "profile":
+        symbol = symbols[0]
+        return 200, [{
+            "symbol": symbol,
+            "companyName": f"{symbol} Corp",
+            "price": _price(symbol, today),
+            "beta": round(0.5 + _seed(symbol) % 100 / 100, 2),
+            "mktCap": 1_000_000_000 + _seed(symbol) % 10**11,
+            "currency": "USD",
+            "sector": ["Technology", "Financials", "Energy", "Health Care"][_seed(symbol) % 4],
+            "industry": "Synthetic",
+            "country": "US",
+            "exchangeShortName": "NASDAQ",
+        }]
+    if endpoint == "quote":
+        return 200, [
+            {"symbol": s, "price": _price(s, today), "previousClose": _price(s, today - timedelta(days=1)),
+             "volume": 1_000_000 + _seed(s) % 10**6, "timestamp": int(time.time())}
+            for s in symbols
+        ]
+    if endpoint == "ratios":
+        symbol = symbols[0]
+        seed = _seed(symbol)
+        return 200, [
+            {"symbol": symbol, "date": f"{today.year - i}-12-31",
+             "returnOnEquity": 0.08 + seed % 30 / 100, "returnOnAssets": 0.03 + seed % 10 / 100,
+             "netProfitMargin": 0.05 + seed % 25 / 100, "grossProfitMargin": 0.3 + seed % 40 / 100,
+             "currentRatio": 1 + seed % 20 / 10, "debtEquityRatio": seed % 30 / 10,
+             "dividendYield": seed % 50 / 1000, "payoutRatio": seed % 70 / 100,
+             "priceEarningsRatio": 10 + seed % 30, "priceToBookRatio": 1 + seed % 10}
+            for i in range(int(query.get("limit", 5)))
+        ]
+    if endpoint in ("income-statement", "balance-sheet-statement", "cash-flow-statement"):
+        symbol = symbols[0]
+        seed = _seed(symbol)
+        revenue = 1_000_000_000 + seed % 10**10
+        return 200, [
+            {"symbol": symbol, "date": f"{today.year - i}-12-31", "reportedCurrency": "USD",
+             "revenue": revenue, "grossProfit": revenue * 0.4, "operatingIncome": revenue * 0.2,
+             "netIncome": revenue * 0.12, "eps": 5.0, "totalAssets": revenue * 2, "totalLiabilities": revenue,
+             "totalStockholdersEquity": revenue, "totalDebt": revenue * 0.5, "cashAndCashEquivalents": revenue * 0.1,
+             "operatingCashFlow": revenue * 0.18, "capitalExpenditure": -revenue * 0.05,
+             "freeCashFlow": revenue * 0.13, "dividendsPaid": -revenue * 0.03}
+            for i in range(int(query.get("limit", 5)))
+        ]
+    if endpoint in ("stock_dividend_calendar", "stock_split_calendar", "earning_calendar"):
+        return 200, []
+    return 404, {"Error Message": "unknown endpoint"}
+
+
+def fred_response(parts: List[str], query: Dict[str, str]) -> Tuple[int, Any]:
+    series_id = query.get("series_id", "UNKNOWN")
+    if parts == ["series", "observations"]:
+        end = _parse_date(query.get("observation_end"), date.today())
+        start = _parse_date(query.get("observation_start"), end - timedelta(days=365))
+        base = 1 + _seed(series_id) % 300 / 10
+        return 200, {"observations": [
+            {"date": d.isoformat(), "value": str(round(base * (1 + (_seed(f"{series_id}:{d}") % 200 - 100) / 2000), 4))}
+            for d in _days(start, end)
+        ]}
+    if parts == ["series"]:
+        return 200, {"series": [{"id": series_id, "title": f"Synthetic {series_id}",
+                                 "units": "Percent", "frequency": "Daily"}]}
+    return 404, {"error_message": "unknown endpoint"}
+
+
+def polygon_response(parts: List[str], query: Dict[str, str]) -> Tuple[int, Any]:
+    # /v2/aggs/ticker/{symbol}/range/1/day/{start}/{end}
+    if len(parts) >= 9 and parts[:3] == ["v2", "aggs", "ticker"]:
+        symbol = parts[3]
+        bars = []
+        for d in _days(_parse_date(parts[7], date.today()), _parse_date(parts[8], date.today())):
+            close = _price(symbol, d)
+            bars.append({"t": int(datetime(d.year, d.month, d.day, 12).timestamp() * 1000),
+                         "o": close, "h": close * 1.01, "l": close * 0.99, "c": close,
+                         "v": 1_000_000, "vw": close, "n": 1000})
+        return 200, {"status": "OK", "results": bars, "resultsCount": len(bars)}
+    if parts[:3] == ["v2", "last", "nbbo"] and len(parts) > 3:
+        price = _price(parts[3], date.today())
+        return 200, {"status": "OK", "results": {"P": price, "S": 100, "p": price, "s": 100,
+                                                 "t": int(time.time() * 1e9), "x": 1}}
+    if parts[:2] == ["v2", "snapshot"]:
+        return 200, {"status": "OK", "tickers": []}
+    return 404, {"status": "NOT_FOUND"}
+
+
+def news_response(parts: List[str], query: Dict[str, str]) -> Tuple[int, Any]:
+    if parts and parts[0] in ("everything", "top-headlines"):
+        topic = query.get("q", "markets")
+        now = datetime.utcnow()
+        articles = [
+            {"source": {"id": None, "name": "Synthetic Wire"}, "author": "bench",
+             "title": f"{topic} update {i}", "description": f"Synthetic {topic} coverage {i}",
+             "url": f"http://localhost/news/{_seed(topic)}/{i}", "urlToImage": None,
+             "publishedAt": (now - timedelta(hours=i)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+             "content": f"Synthetic article about {topic}."}
+            for i in range(int(query.get("pageSize", 10)))
+        ]
+        return 200, {"status": "ok", "totalResults": len(articles), "articles": articles}
+    return 404, {"status": "error", "code": "notFound", "message": "unknown endpoint"}
+
+
+ROUTES = {
+    "fmp": fmp_response,
+    "fred": fred_response,
+    "polygon": polygon_response,
+    "news": news_response,
+}
+
+
+# ============================================================================
+# Server
+# ============================================================================
+
+class FakeProviders:
+    """Background HTTP server for all fake providers; tracks request counts per provider."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.requests: Dict[str, int] = {name: 0 for name in ROUTES}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+                status, body = 404, {"error": "unknown provider"}
+                for name, (prefix, _, _) in PREFIXES.items():
+                    if parsed.path.startswith(prefix + "/"):
+                        parts = [p for p in parsed.path[len(prefix):].split("/") if p]
+                        with fake._lock:
+                            fake.requests[name] += 1
+                        status, body = ROUTES[name](parts, query)
+                        break
+
+                if fake.latency_ms:
+                    time.sleep(fake.latency_ms / 1000)
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):  # keep benchmark output clean
+                pass
+
+        return Handler
+
+    def start(self) -> "FakeProviders":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-providers", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def env(self) -> Dict[str, str]:
+        """Provider base URL / API key environment pointing at this server."""
+        env = {}
+        for prefix, url_var, key_var in PREFIXES.values():
+            env[url_var] = self.base_url + prefix
+            env[key_var] = "benchmark"
+        return env
+
+    def install_env(self) -> None:
+        os.environ.update(self.env())
+
+    def __enter__(self) -> "FakeProviders":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Pattern Load-Test Harness
+
+Purpose: Drive every JSON pattern at configurable concurrency against a synthetic universe
+Created: 2025-11-10
+Priority: P2 (Catch latency / query-count regressions before production)
+
+Per pattern it reports p50/p95/p99 latency, per-capability step latency
+(from the execution trace), named DB query counts (query registry), pool
+acquires, errors and memory. Provider APIs (FMP, FRED, Polygon, NewsAPI) are
+served by local fake HTTP servers, so runs need only a local Postgres /
+TimescaleDB (DATABASE_URL).
+
+Usage:
+    # Seed a small universe, run all patterns, save as the baseline
+    python -m benchmarks.harness --portfolios 20 --securities 200 --days 756 \\
+        --iterations 50 --concurrency 8 --save-baseline local
+
+    # Later: re-run (reuse seeded data) and fail on regressions
+    python -m benchmarks.harness --skip-seed --iterations 50 --concurrency 8 --baseline local
+
+    # Subset of patterns, 30ms simulated provider latency, traced memory
+    python -m benchmarks.harness --patterns portfolio_overview,holding_deep_dive \\
+        --provider-latency-ms 30 --trace-memory --output /tmp/bench.json
+
+Exit codes: 0 = ok, 1 = regressions vs baseline, 2 = setup failure.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import resource
+import sys
+import time
+import tracemalloc
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from benchmarks.baseline import (
+    DEFAULT_TOLERANCE,
+    compare,
+    format_table,
+    load_baseline,
+    save_baseline,
+    summarize,
+)
+from benchmarks.fake_providers import FakeProviders
+from benchmarks.seed import SeededUniverse, UniverseSize, load_universe, seed_universe
+
+logger = logging.getLogger("DawsOS.Benchmarks")
+
+
+class _NoResultCache:
+    """Stands in for PatternResultCache so every iteration executes the pattern."""
+
+    def observe_generation(self, ctx) -> None:
+        pass
+
+    def make_key(self, pattern_id, ctx, inputs, data_version=None) -> str:
+        return pattern_id
+
+    async def get(self, key):
+        return None
+
+    async def set(self, *args, **kwargs) -> None:
+        pass
+
+
+def build_inputs(spec: Dict[str, Any], universe: SeededUniverse, rng: random.Random) -> Dict[str, Any]:
+    """Fill required pattern inputs from the seeded universe (defaults cover the rest)."""
+    portfolio_id = rng.choice(universe.portfolio_ids)
+    inputs: Dict[str, Any] = {}
+    for name in spec.get("inputs", {}):
+        if name == "portfolio_id":
+            inputs[name] = str(portfolio_id)
+        elif name == "security_id":
+            inputs[name] = str(rng.choice(universe.holdings[portfolio_id]))
+        elif name == "asof_date":
+            inputs[name] = universe.asof_date.isoformat()
+    return inputs
+
+
+def build_ctx(universe: SeededUniverse, inputs: Dict[str, Any]):
+    from app.core.types import RequestCtx
+
+    request_id = str(uuid.uuid4())
+    return RequestCtx(
+        pricing_pack_id=universe.pack_id,
+        ledger_commit_hash="benchmark",
+        trace_id=request_id,
+        user_id=universe.user_id,
+        request_id=request_id,
+        portfolio_id=uuid.UUID(inputs["portfolio_id"]) if "portfolio_id" in inputs else None,
+        asof_date=universe.asof_date,
+        require_fresh=False,
+    )
+
+
+def _pool_acquires() -> int:
+    from app.db.connection import get_pool_manager
+
+    return sum(pool["acquired"] for pool in get_pool_manager().snapshot().values())
+
+
+async def run_pattern_load(
+    orchestrator,
+    pattern_id: str,
+    universe: SeededUniverse,
+    iterations: int,
+    concurrency: int,
+    warmup: int,
+    trace_memory: bool,
+    rng: random.Random,
+) -> Dict[str, Any]:
+    """Run one pattern `iterations` times at `concurrency`; return its result entry."""
+    from app.db.query_registry import get_query_stats
+
+    spec = orchestrator.patterns[pattern_id]
+    jobs = [build_inputs(spec, universe, rng) for _ in range(warmup + iterations)]
+
+    async def one(inputs: Dict[str, Any]) -> Dict[str, Any]:
+        return await orchestrator.run_pattern(pattern_id, build_ctx(universe, inputs), inputs)
+
+    for inputs in jobs[:warmup]:
+        try:
+            await one(inputs)
+        except Exception as e:
+            logger.warning(f"{pattern_id} warmup failed: {e}")
+
+    stats = get_query_stats()
+    stats.reset()
+    acquires_before = _pool_acquires()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if trace_memory:
+        tracemalloc.start()
+
+    latencies: List[float] = []
+    capability_ms: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+    step_errors: Dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def timed(inputs: Dict[str, Any]) -> None:
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await one(inputs)
+            except Exception as e:
+                errors += 1
+                logger.debug(f"{pattern_id} failed: {e}")
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+            for step in result.get("trace", {}).get("steps", []):
+                if step.get("success"):
+                    capability_ms[step["capability"]].append(step["duration_seconds"] * 1000)
+                elif step.get("success") is False:
+                    step_errors[step["capability"]] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(inputs) for inputs in jobs[warmup:]))
+    elapsed = time.perf_counter() - started
+
+    peak_traced_kb = None
+    if trace_memory:
+        peak_traced_kb = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+
+    return {
+        "latency_ms": summarize(latencies),
+        "throughput_per_s": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "errors": errors,
+        "step_errors": dict(step_errors),
+        "capabilities": {cap: summarize(values) for cap, values in sorted(capability_ms.items())},
+        "db": {
+            "queries": {
+                name: entry.latency_ms.count for name, entry in sorted(stats.entries.items())
+            },
+            "pool_acquires": _pool_acquires() - acquires_before,
+        },
+        "memory": {
+            "peak_traced_kb": peak_traced_kb,
+            "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "max_rss_growth_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before,
+        },
+    }
+
+
+async def run(args) -> int:
+    size = UniverseSize(
+        portfolios=args.portfolios,
+        lots_per_portfolio=args.lots_per_portfolio,
+        securities=args.securities,
+        days=args.days,
+        macro_series=args.macro_series,
+        seed=args.seed,
+    )
+
+    with FakeProviders(latency_ms=args.provider_latency_ms) as fake:
+        fake.install_env()
+
+        from app.core.di_container import get_container
+        from app.core.service_initializer import initialize_services
+        from app.db.connection import POOL_WRITE, close_db_pool, get_db_pool, get_pool, init_db_pool
+
+        await init_db_pool()
+        try:
+            async with get_pool(POOL_WRITE).acquire() as conn:
+                if args.skip_seed:
+                    universe = await load_universe(conn)
+                else:
+                    started = time.perf_counter()
+                    async with conn.transaction():
+                        universe = await seed_universe(
+                            conn, size, uuid.UUID(args.user_id) if args.user_id else None
+                        )
+                    logger.info(f"Seeded universe in {time.perf_counter() - started:.1f}s")
+
+            container = get_container()
+            initialize_services(container, db_pool=get_db_pool())
+            orchestrator = container.resolve("pattern_orchestrator")
+            if not args.result_cache:
+                orchestrator.result_cache = _NoResultCache()
+
+            pattern_ids = args.patterns.split(",") if args.patterns else sorted(orchestrator.patterns)
+            rng = random.Random(args.seed)
+            results: Dict[str, Any] = {
+                "started_at": datetime.utcnow().isoformat(),
+                "universe": size.to_dict(),
+                "concurrency": args.concurrency,
+                "iterations": args.iterations,
+                "provider_latency_ms": args.provider_latency_ms,
+                "patterns": {},
+            }
+            for pattern_id in pattern_ids:
+                logger.info(f"Running {pattern_id} x{args.iterations} @ concurrency {args.concurrency}")
+                results["patterns"][pattern_id] = await run_pattern_load(
+                    orchestrator, pattern_id, universe, args.iterations, args.concurrency,
+                    args.warmup, args.trace_memory, rng,
+                )
+            results["provider_requests"] = dict(fake.requests)
+        finally:
+            await close_db_pool()
+
+    print(format_table(results))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        logger.info(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        logger.info(f"Baseline saved to {save_baseline(args.save_baseline, results)}")
+
+    if args.baseline:
+        regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+        for regression in regressions:
+            logger.error(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        logger.info(f"No regressions vs baseline '{args.baseline}'")
+    return 0
+
+
+def parse_args(argv: Optional[List[str]] = None):
+    defaults = UniverseSize()
+    parser = argparse.ArgumentParser(description="Pattern load-test and latency benchmark")
+    universe = parser.add_argument_group("universe")
+    universe.add_argument("--portfolios", type=int, default=defaults.portfolios)
+    universe.add_argument("--lots-per-portfolio", type=int, default=defaults.lots_per_portfolio)
+    universe.add_argument("--securities", type=int, default=defaults.securities)
+    universe.add_argument("--days", type=int, default=defaults.days, help="Business days of history")
+    universe.add_argument("--macro-series", type=int, default=defaults.macro_series)
+    universe.add_argument("--seed", type=int, default=defaults.seed)
+    universe.add_argument("--user-id", help="Portfolio owner (default: first user)")
+    universe.add_argument("--skip-seed", action="store_true", help="Reuse the previously seeded universe")
+
+    load = parser.add_argument_group("load")
+    load.add_argument("--patterns", help="Comma-separated pattern ids (default: all)")
+    load.add_argument("-n", "--iterations", type=int, default=50, help="Measured runs per pattern")
+    load.add_argument("-c", "--concurrency", type=int, default=8)
+    load.add_argument("--warmup", type=int, default=3, help="Unmeasured runs per pattern")
+    load.add_argument("--provider-latency-ms", type=float, default=0.0, help="Simulated provider latency")
+    load.add_argument("--result-cache", action="store_true", help="Keep the pattern result cache enabled")
+    load.add_argument("--trace-memory", action="store_true", help="tracemalloc peak per pattern (slower)")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--output", help="Write full results JSON here")
+    output.add_argument("--save-baseline", metavar="NAME", help="Save results as benchmarks/baselines/NAME.json")
+    output.add_argument("--baseline", metavar="NAME", help="Compare against benchmarks/baselines/NAME.json")
+    output.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed p95/p99 slowdown")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    args = parse_args(argv)
+    try:
+        return asyncio.run(run(args))
+    except Exception as e:
+        logger.error(f"Benchmark setup failed: {e}", exc_info=True)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""
+Synthetic Universe Seeder
+
+Purpose: Seed a configurable benchmark universe into a local Postgres/TimescaleDB
+Created: 2025-11-10
+Priority: P2 (Benchmark harness)
+
+Seeds (all tagged so re-seeding replaces only benchmark rows):
+    - securities:             BM0000..BMnnnn
+    - pricing_packs + prices: one pack per business day, last pack marked fresh
+    - portfolios + lots:      "bench-<n>" portfolios owned by one user
+    - portfolio_daily_values: daily NAVs with occasional cash flows
+    - macro_indicators:       FRED catalog series (existing rows are kept)
+
+Bulk rows go through COPY (copy_records_to_table); all prices are
+deterministic for a given --seed so runs are comparable across commits.
+"""
+
+import hashlib
+import json
+import logging
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("DawsOS.Benchmarks.Seed")
+
+SYMBOL_PREFIX = "BM"
+PORTFOLIO_PREFIX = "bench-"
+PACK_POLICY = "BENCH"
+FRED_CATALOG = Path(__file__).resolve().parents[2] / "data" / "seeds" / "macro" / "fred_series_catalog.json"
+
+
+@dataclass(frozen=True)
+class UniverseSize:
+    """Size of the synthetic universe."""
+
+    portfolios: int = 20
+    lots_per_portfolio: int = 25
+    securities: int = 200
+    days: int = 756
+    macro_series: int = 20
+    seed: int = 42
+
+    def to_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class SeededUniverse:
+    """Identifiers the harness needs to build pattern inputs."""
+
+    user_id: uuid.UUID
+    pack_id: str
+    asof_date: date
+    portfolio_ids: List[uuid.UUID]
+    holdings: Dict[uuid.UUID, List[uuid.UUID]]  # portfolio_id -> held security_ids
+
+
+def business_days(end: date, count: int) -> List[date]:
+    days: List[date] = []
+    day = end
+    while len(days) < count:
+        if day.weekday() < 5:
+            days.append(day)
+        day -= timedelta(days=1)
+    return days[::-1]
+
+
+async def clear_universe(conn) -> None:
+    """Delete previously seeded benchmark rows (macro rows are shared and kept)."""
+    # lots, portfolio_daily_values and prices cascade
+    await conn.execute("DELETE FROM portfolios WHERE name LIKE $1", f"{PORTFOLIO_PREFIX}%")
+    await conn.execute("DELETE FROM pricing_packs WHERE policy = $1", PACK_POLICY)
+    await conn.execute("DELETE FROM securities WHERE symbol LIKE $1", f"{SYMBOL_PREFIX}%")
+
+
+async def seed_universe(conn, size: UniverseSize, user_id: Optional[uuid.UUID] = None) -> SeededUniverse:
+    """
+    Seed the benchmark universe.
+
+    Args:
+        conn: asyncpg connection (caller owns the transaction)
+        size: Universe dimensions
+        user_id: Portfolio owner (default: first user in the users table)
+
+    Returns:
+        SeededUniverse with pack, portfolios and holdings
+    """
+    rng = random.Random(size.seed)
+    if user_id is None:
+        user_id = await conn.fetchval("SELECT id FROM users ORDER BY created_at LIMIT 1")
+        if user_id is None:
+            raise RuntimeError("No users found; create one or pass --user-id")
+
+    await clear_universe(conn)
+    days = business_days(date.today() - timedelta(days=1), size.days)
+    asof_date = days[-1]
+
+    # Securities
+    securities = [(uuid.UUID(int=rng.getrandbits(128)), f"{SYMBOL_PREFIX}{i:04d}") for i in range(size.securities)]
+    await conn.copy_records_to_table(
+        "securities",
+        records=[(sid, symbol, f"{symbol} Synthetic", "equity", "USD") for sid, symbol in securities],
+        columns=["id", "symbol", "name", "security_type", "trading_currency"],
+    )
+
+    # Pricing packs (one per day) and prices (geometric random walk)
+    pack_ids = [f"PP_{day.isoformat()}_{PACK_POLICY}" for day in days]
+    await conn.copy_records_to_table(
+        "pricing_packs",
+        records=[
+            (pack_id, day, PACK_POLICY, hashlib.sha256(pack_id.encode()).hexdigest(),
+             "fresh" if day == asof_date else "warming", day == asof_date, day == asof_date)
+            for pack_id, day in zip(pack_ids, days)
+        ],
+        columns=["id", "date", "policy", "hash", "status", "is_fresh", "prewarm_done"],
+    )
+
+    closes: Dict[uuid.UUID, List[float]] = {}
+    price_rows = []
+    for sid, _ in securities:
+        price = rng.uniform(10, 500)
+        drift, vol = rng.uniform(-0.0002, 0.0006), rng.uniform(0.008, 0.03)
+        series = []
+        for pack_id, day in zip(pack_ids, days):
+            price *= 1 + rng.gauss(drift, vol)
+            series.append(price)
+            price_rows.append((sid, pack_id, day, Decimal(f"{price:.8f}"), "USD", "benchmark"))
+        closes[sid] = series
+    await conn.copy_records_to_table(
+        "prices",
+        records=price_rows,
+        columns=["security_id", "pricing_pack_id", "asof_date", "close", "currency", "source"],
+    )
+
+    # Portfolios, lots and daily values
+    portfolio_ids, holdings, lot_rows, value_rows = [], {}, [], []
+    for n in range(size.portfolios):
+        portfolio_id = uuid.UUID(int=rng.getrandbits(128))
+        await conn.execute(
+            """
+            INSERT INTO portfolios (id, user_id, name, base_currency, benchmark_id)
+            VALUES ($1, $2, $3, 'USD', 'SPY')
+            """,
+            portfolio_id, user_id, f"{PORTFOLIO_PREFIX}{n:04d}",
+        )
+        held = rng.sample(securities, min(size.lots_per_portfolio, len(securities)))
+        quantities = {}
+        for sid, symbol in held:
+            start = rng.randrange(0, max(1, len(days) // 2))
+            qty = Decimal(rng.randrange(10, 1000))
+            cost = Decimal(f"{closes[sid][start]:.4f}")
+            quantities[sid] = (start, float(qty))
+            lot_rows.append((uuid.uuid4(), portfolio_id, sid, symbol, days[start],
+                             qty, qty, qty, qty * cost, cost, "USD", True))
+
+        for i, day in enumerate(days):
+            total = sum(closes[sid][i] * qty for sid, (start, qty) in quantities.items() if i >= start)
+            # Lots bought today are funded by an external deposit
+            flow = sum(closes[sid][i] * qty for sid, (start, qty) in quantities.items() if i == start)
+            value_rows.append((portfolio_id, day, Decimal(f"{total:.2f}"), Decimal(f"{total:.2f}"),
+                               Decimal(f"{flow:.2f}"), "USD"))
+
+        portfolio_ids.append(portfolio_id)
+        holdings[portfolio_id] = [sid for sid, _ in held]
+
+    await conn.copy_records_to_table(
+        "lots",
+        records=lot_rows,
+        columns=["id", "portfolio_id", "security_id", "symbol", "acquisition_date",
+                 "quantity_original", "quantity_open", "quantity", "cost_basis",
+                 "cost_basis_per_share", "currency", "is_open"],
+    )
+    await conn.copy_records_to_table(
+        "portfolio_daily_values",
+        records=value_rows,
+        columns=["portfolio_id", "valuation_date", "total_value", "positions_value", "cash_flows", "currency"],
+    )
+
+    # Macro indicators: only fill dates that are missing
+    with open(FRED_CATALOG) as f:
+        catalog = json.load(f)["series"]
+    macro_rows = []
+    for indicator_id in list(catalog)[: size.macro_series]:
+        value = rng.uniform(0.5, 10)
+        for day in days:
+            value *= 1 + rng.gauss(0, 0.002)
+            macro_rows.append((indicator_id, catalog[indicator_id].get("desc", indicator_id),
+                               day, Decimal(f"{value:.6f}"), "benchmark"))
+    await conn.executemany(
+        """
+        INSERT INTO macro_indicators (indicator_id, indicator_name, date, value, source)
+        VALUES ($1, $2, $3, $4, $5)
+        ON CONFLICT (indicator_id, date) DO NOTHING
+        """,
+        macro_rows,
+    )
+
+    logger.info(
+        f"Seeded {size.securities} securities x {len(days)} days, {size.portfolios} portfolios, "
+        f"{len(lot_rows)} lots, {len(macro_rows)} macro points (pack {pack_ids[-1]})"
+    )
+    return SeededUniverse(user_id, pack_ids[-1], asof_date, portfolio_ids, holdings)
+
+
+async def load_universe(conn) -> SeededUniverse:
+    """Reload identifiers of an already-seeded universe (--skip-seed)."""
+    pack = await conn.fetchrow(
+        "SELECT id, date FROM pricing_packs WHERE policy = $1 ORDER BY date DESC LIMIT 1", PACK_POLICY
+    )
+    if pack is None:
+        raise RuntimeError("No benchmark universe found; run without --skip-seed first")
+    rows = await conn.fetch(
+        """
+        SELECT p.id, p.user_id, array_agg(l.security_id) AS securities
+        FROM portfolios p JOIN lots l ON l.portfolio_id = p.id
+        WHERE p.name LIKE $1
+        GROUP BY p.id, p.user_id ORDER BY p.name
+        """,
+        f"{PORTFOLIO_PREFIX}%",
+    )
+    return SeededUniverse(
+        user_id=rows[0]["user_id"],
+        pack_id=pack["id"],
+        asof_date=pack["date"],
+        portfolio_ids=[row["id"] for row in rows],
+        holdings={row["id"]: list(row["securities"]) for row in rows},
+    )
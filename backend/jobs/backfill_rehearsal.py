@@ -12,12 +12,19 @@
     - Generate impact report
 
 Usage:
-    # Dry run (no database changes)
+    # Dry run (no database changes): replay daily values for the range in
+    # parallel chunks and report how many stored days would change
     python -m backend.jobs.backfill_rehearsal \
         --start-date 2025-09-01 \
         --end-date 2025-09-30 \
         --dry-run
 
+    # Re-seed daily values for the range (resumable via --checkpoint)
+    python -m backend.jobs.backfill_rehearsal \
+        --start-date 2022-01-01 \
+        --end-date 2025-09-30 \
+        --execute --concurrency 8
+
     # Execute supersede chain
     python -m backend.jobs.backfill_rehearsal \
         --pack-id PP_2025-10-21 \
@@ -49,6 +56,7 @@
 from app.db.connection import get_db_pool, execute_query_one, execute_query, execute_statement
 from app.db.pricing_pack_queries import PricingPackQueries, get_pricing_pack_queries
 from app.db.metrics_queries import MetricsQueries, get_metrics_queries
+from jobs.backfill_daily_values import ParallelDailyValueBackfill
 
 logger = logging.getLogger("DawsOS.BackfillRehearsal")
 logging.basicConfig(
@@ -328,6 +336,51 @@ async def analyze_pack(self, pack_id: str) -> Dict[str, Any]:
 
         return impact
 
+    async def rehearse_backfill(
+        self,
+        start_date: date,
+        end_date: Optional[date] = None,
+        chunk_days: int = 90,
+        max_concurrency: int = 4,
+        checkpoint_path: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Replay daily portfolio values for a date range.
+
+        Dry run computes every day and counts stored values that would change;
+        execute writes them (idempotent merge, resumable via checkpoint).
+
+        Args:
+            start_date: First valuation date to replay
+            end_date: Last valuation date to replay (default: today, or the
+                end date stored in the checkpoint of the interrupted replay)
+            chunk_days: Days per chunk
+            max_concurrency: Concurrent chunks / DB connections
+            checkpoint_path: Checkpoint file (execute mode only)
+
+        Returns:
+            Backfill summary dict
+        """
+        logger.info(
+            f"{'[DRY RUN] ' if self.dry_run else ''}Replaying daily values "
+            f"{start_date} → {end_date or 'open-ended'} ({chunk_days}-day chunks, concurrency {max_concurrency})"
+        )
+
+        engine = ParallelDailyValueBackfill(
+            await get_db_pool(),
+            chunk_days=chunk_days,
+            max_concurrency=max_concurrency,
+            checkpoint_path=None if self.dry_run else checkpoint_path,
+            dry_run=self.dry_run,
+        )
+        summary = await engine.run(window_start=start_date, end_date=end_date)
+        summary.update({
+            "start_date": start_date.isoformat(),
+            "end_date": summary["end_date"].isoformat(),
+            "timestamp": datetime.utcnow().isoformat(),
+        })
+        return summary
+
     async def list_supersede_chains(self) -> List[Dict[str, Any]]:
         """
         List all supersede chains in the database.
@@ -436,6 +489,39 @@ async def main():
         help="List all supersede chains",
     )
 
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        help="First date to replay daily values (YYYY-MM-DD)",
+    )
+
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        help="Last date to replay daily values (YYYY-MM-DD) [default: today, or the interrupted replay's end date]",
+    )
+
+    parser.add_argument(
+        "--chunk-days",
+        type=int,
+        default=90,
+        help="Days per replay chunk [default: 90]",
+    )
+
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Concurrent replay chunks / DB connections [default: 4]",
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        type=str,
+        default=".backfill_rehearsal.checkpoint.json",
+        help="Checkpoint file for resuming an interrupted replay",
+    )
+
     args = parser.parse_args()
 
     # Determine dry_run mode
@@ -468,6 +554,23 @@ async def main():
             print("\n=== Impact Analysis ===\n")
             print(json.dumps(impact, indent=2, default=str))
 
+        elif args.start_date:
+            # Replay daily values for a date range
+            summary = await tool.rehearse_backfill(
+                args.start_date,
+                args.end_date,
+                chunk_days=args.chunk_days,
+                max_concurrency=args.concurrency,
+                checkpoint_path=args.checkpoint,
+            )
+            summary.pop("results", None)
+            print("\n=== Backfill Replay ===\n")
+            print(json.dumps(summary, indent=2, default=str))
+
+            if dry_run:
+                print(f"\n[DRY RUN] No database changes made.")
+                print(f"Use --execute to write daily values.")
+
         elif args.pack_id and args.reason:
             # Simulate supersede
             impact = await tool.simulate_supersede(args.pack_id, args.reason)
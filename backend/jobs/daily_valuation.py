@@ -42,39 +42,43 @@ async def run(self, backfill_days: int = 365) -> Dict[str, int]:
         """
         logger.info(f"Starting daily valuation job (backfill_days={backfill_days})")
         
-        try:
-            # Get all portfolios
-            portfolios = await self._get_portfolios()
-            logger.info(f"Found {len(portfolios)} portfolios to process")
+        from app.db.connection import POOL_BATCH, use_pool
+
+        # Nightly work runs on the batch pool, away from interactive requests
+        with use_pool(POOL_BATCH):
+            try:
+                # Get all portfolios
+                portfolios = await self._get_portfolios()
+                logger.info(f"Found {len(portfolios)} portfolios to process")
             
-            total_records = 0
-            total_cash_flows = 0
+                total_records = 0
+                total_cash_flows = 0
             
-            for portfolio in portfolios:
-                portfolio_id = portfolio['id']
+                for portfolio in portfolios:
+                    portfolio_id = portfolio['id']
                 
-                # Process this portfolio
-                records, flows = await self._process_portfolio(
-                    portfolio_id, 
-                    backfill_days
-                )
+                    # Process this portfolio
+                    records, flows = await self._process_portfolio(
+                        portfolio_id, 
+                        backfill_days
+                    )
                 
-                total_records += records
-                total_cash_flows += flows
+                    total_records += records
+                    total_cash_flows += flows
                 
-                logger.info(f"Portfolio {portfolio_id}: {records} daily values, {flows} cash flows")
+                    logger.info(f"Portfolio {portfolio_id}: {records} daily values, {flows} cash flows")
             
-            logger.info(f"Daily valuation complete: {total_records} values, {total_cash_flows} flows")
+                logger.info(f"Daily valuation complete: {total_records} values, {total_cash_flows} flows")
             
-            return {
-                "portfolios": len(portfolios),
-                "daily_values": total_records,
-                "cash_flows": total_cash_flows
-            }
+                return {
+                    "portfolios": len(portfolios),
+                    "daily_values": total_records,
+                    "cash_flows": total_cash_flows
+                }
             
-        except Exception as e:
-            logger.error(f"Daily valuation job failed: {e}")
-            raise
+            except Exception as e:
+                logger.error(f"Daily valuation job failed: {e}")
+                raise
     
     async def _get_portfolios(self) -> List[asyncpg.Record]:
         """Get all active portfolios."""
@@ -203,8 +207,24 @@ async def _process_portfolio(
         
         # Store cash flows
         flows_created = await self._store_cash_flows(cash_flows)
+
+        # Advance rolling windows with the new days only (O(1) per day)
+        await self._update_rolling_stats(portfolio_id, daily_values)
         
         return records_created, flows_created
+
+    async def _update_rolling_stats(self, portfolio_id: UUID, daily_values: List[Dict]) -> None:
+        """Feed stored NAVs to the incremental rolling-statistics store."""
+        from app.services.rolling_stats import RollingStatsStore
+
+        try:
+            await RollingStatsStore().apply(
+                portfolio_id,
+                ((v['valuation_date'], v['total_value'], v['cash_flows']) for v in daily_values),
+            )
+        except Exception as e:
+            # Rolling stats are derived data; rebuild later rather than fail valuation
+            logger.warning(f"Rolling stats update failed for portfolio {portfolio_id}: {e}")
     
     async def _get_inception_date(self, portfolio_id: UUID) -> Optional[date]:
         """Get the earliest transaction date for a portfolio."""
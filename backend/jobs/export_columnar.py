@@ -0,0 +1,60 @@
+"""
+Export Columnar Snapshots Job
+
+Purpose: Write columnar (NumPy .npy) snapshots of long time-series tables
+Created: 2025-11-10
+Priority: P1 (Runs nightly after evaluate_alerts; safe to run ad hoc)
+
+Features:
+    - portfolio_daily_values, prices, macro_indicators (see app/db/columnar_store.py)
+    - Streams rows with a server-side cursor on the batch pool
+    - Atomic version swap; readers keep their mmaps until the next reload
+
+Usage:
+    # Export all datasets
+    python -m backend.jobs.export_columnar
+
+    # Export selected datasets to a custom directory
+    python -m backend.jobs.export_columnar --dataset prices --root /var/lib/dawsos/columnar
+"""
+
+import asyncio
+import argparse
+import logging
+import sys
+
+from app.db.connection import init_db_pool, close_db_pool
+from app.db.columnar_store import DATASETS, export_columnar_store
+
+logger = logging.getLogger("DawsOS.Jobs.ExportColumnar")
+
+
+async def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Export columnar time-series snapshots")
+    parser.add_argument("--dataset", action="append", choices=sorted(DATASETS), help="Dataset to export (repeatable)")
+    parser.add_argument("--root", help="Store directory (default: COLUMNAR_STORE_DIR or data/columnar)")
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        results = await export_columnar_store(root=args.root, datasets=args.dataset)
+        for name, stats in results.items():
+            logger.info(f"✅ {name}: {stats['rows']} rows, {stats['keys']} keys in {stats['seconds']}s")
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"❌ Failed: {e}")
+        sys.exit(1)
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    # Run
+    asyncio.run(main())
@@ -248,6 +248,9 @@ async def compute_portfolio_metrics(
         # Store metrics in DB
         await self._store_metrics(metrics)
 
+        # Benchmark return and risk-free rate feed rolling beta/alpha/Sharpe
+        await self._update_rolling_stats(portfolio_id, asof_date, benchmark_returns, risk_free_rate)
+
         # Compute and store currency attribution (if multi-currency portfolio)
         await self._compute_and_store_currency_attribution(
             portfolio_id=portfolio_id,
@@ -257,6 +260,29 @@ async def compute_portfolio_metrics(
 
         return metrics
 
+    async def _update_rolling_stats(
+        self,
+        portfolio_id: str,
+        asof_date: date,
+        benchmark_returns: List[float],
+        risk_free_rate: Decimal,
+    ) -> None:
+        """Attach asof_date's benchmark return to the incremental rolling-statistics store."""
+        if not self.use_db:
+            return
+
+        from app.services.rolling_stats import RollingStatsStore
+
+        try:
+            await RollingStatsStore().apply_benchmark(
+                UUID(str(portfolio_id)),
+                asof_date,
+                benchmark_returns[-1] if benchmark_returns else None,
+                float(risk_free_rate),
+            )
+        except Exception as e:
+            logger.warning(f"Rolling stats benchmark update failed for portfolio {portfolio_id}: {e}")
+
     async def _compute_and_store_currency_attribution(
         self,
         portfolio_id: str,
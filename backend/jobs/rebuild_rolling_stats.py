@@ -0,0 +1,89 @@
+"""
+Rebuild Rolling Stats Job
+
+Purpose: Recompute portfolio_rolling_stats / portfolio_rolling_state from full history
+Created: 2025-11-10
+Priority: P1 (Run after backfills or restated daily values)
+
+Features:
+    - Rebuilds one portfolio or every portfolio with daily values
+    - Runs on the batch pool (does not compete with interactive requests)
+    - Reloads the hedged benchmark series and risk-free rate so beta/alpha survive
+    - Nightly maintenance stays incremental (DailyValuationJob / metrics job)
+
+Usage:
+    # Rebuild all portfolios
+    python -m backend.jobs.rebuild_rolling_stats
+
+    # Rebuild one portfolio
+    python -m backend.jobs.rebuild_rolling_stats --portfolio-id <uuid>
+"""
+
+import asyncio
+import argparse
+import logging
+import sys
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from app.db.connection import POOL_BATCH, execute_query, init_db_pool, close_db_pool, use_pool
+from app.services.benchmarks import BenchmarkService
+from app.services.rolling_stats import RollingStatsStore, load_benchmark_inputs
+
+logger = logging.getLogger("DawsOS.Jobs.RebuildRollingStats")
+
+
+async def rebuild_rolling_stats(portfolio_ids: Optional[List[UUID]] = None) -> Dict[str, int]:
+    """
+    Rebuild rolling statistics from portfolio_daily_values.
+
+    Args:
+        portfolio_ids: Portfolios to rebuild (default: all with daily values)
+
+    Returns:
+        Dict of portfolio_id -> days applied
+    """
+    with use_pool(POOL_BATCH):
+        if portfolio_ids is None:
+            rows = await execute_query("SELECT DISTINCT portfolio_id FROM portfolio_daily_values")
+            portfolio_ids = [row["portfolio_id"] for row in rows]
+
+        store = RollingStatsStore()
+        benchmarks = BenchmarkService()
+        results = {}
+        for portfolio_id in portfolio_ids:
+            benchmark_returns, risk_free_rate = await load_benchmark_inputs(portfolio_id, benchmarks)
+            days = await store.rebuild(portfolio_id, benchmark_returns, risk_free_rate)
+            results[str(portfolio_id)] = days
+            logger.info(f"Rebuilt rolling stats for {portfolio_id}: {days} days")
+
+    return results
+
+
+async def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Rebuild incremental rolling statistics")
+    parser.add_argument("--portfolio-id", type=UUID, help="Rebuild a single portfolio")
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        results = await rebuild_rolling_stats([args.portfolio_id] if args.portfolio_id else None)
+        logger.info(f"✅ Rebuilt {len(results)} portfolio(s)")
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"❌ Failed: {e}")
+        sys.exit(1)
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    # Run
+    asyncio.run(main())
@@ -28,6 +28,13 @@
     - Extract positions by account
     - Compare to DB positions from pricing pack
 
+Incremental Mode:
+    - Parsed ledger state is cached per ledger path, keyed by file hash + ledger commit
+    - Unchanged ledger → no reparse
+    - Append-only change → only the appended entries are parsed and folded in
+    - Anything else (edits, includes, plugins, reductions needing booking) → full reload
+    - DB positions and cash for all portfolios are fetched in one query each
+
 Usage:
     report = await reconcile_ledger(pack_id, ledger_path=".ledger/main.beancount")
     if report.status != 'PASS':
@@ -35,8 +42,12 @@
         raise ReconciliationError(report.errors)
 """
 
+import asyncio
+import copy
+import hashlib
 import logging
-from typing import Dict, List, Optional
+import os
+from typing import Any, Dict, List, Optional
 from datetime import date, datetime
 from decimal import Decimal
 from dataclasses import dataclass, field
@@ -44,6 +55,101 @@
 
 logger = logging.getLogger(__name__)
 
+CASH_CURRENCIES = ('USD', 'CAD', 'EUR', 'GBP')
+
+
+class IncrementalParseUnsupported(Exception):
+    """Appended ledger entries cannot be folded in without a full reload."""
+
+
+@dataclass
+class ParsedLedgerState:
+    """Parsed Beancount state cached between reconciliation runs."""
+    ledger_path: str
+    file_hash: str
+    commit_hash: str
+    byte_length: int
+    include_paths: List[str]
+    has_plugins: bool
+    inventories: Dict[str, Any]  # account -> beancount Inventory
+    ledger_data: Dict = field(default_factory=dict)
+    appended_entries: int = 0
+
+
+# Ledger path -> parsed state (survives across runs within the scheduler process)
+_LEDGER_STATE_CACHE: Dict[str, ParsedLedgerState] = {}
+
+
+def clear_ledger_cache() -> None:
+    """Drop all cached ledger state (forces a full reload on next run)."""
+    _LEDGER_STATE_CACHE.clear()
+
+
+def _hash_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _hash_files(paths: List[str]) -> str:
+    """Combined hash over several ledger files (main file + includes)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def appended_tail(content: bytes, state: ParsedLedgerState) -> Optional[bytes]:
+    """
+    Return the bytes appended to the ledger since state was parsed.
+
+    Returns None when the file was not modified append-only: it shrank, its
+    prefix changed, or the old content did not end on a line boundary.
+    """
+    if len(content) <= state.byte_length or state.byte_length == 0:
+        return None
+    if content[state.byte_length - 1:state.byte_length] != b'\n':
+        return None
+    if _hash_bytes(content[:state.byte_length]) != state.file_hash:
+        return None
+    return content[state.byte_length:]
+
+
+def ledger_data_from_inventories(inventories: Dict[str, Any]) -> Dict:
+    """
+    Convert per-account inventories into the reconciliation ledger shape.
+
+    Positions without cost are cash (when in CASH_CURRENCIES); positions with
+    cost are security holdings keyed by ticker.
+    """
+    ledger_data = {}
+
+    for account, inventory in inventories.items():
+        holdings = []
+        cash_balance = Decimal('0')
+
+        for pos in inventory:
+            currency = pos.units.currency
+            qty = Decimal(str(pos.units.number))
+
+            if pos.cost is None:
+                if currency in CASH_CURRENCIES:
+                    cash_balance += qty
+                continue
+
+            holdings.append({
+                "currency": currency,  # Ticker symbol in Beancount
+                "qty": qty,
+                "cost_per_unit": Decimal(str(pos.cost.number)),
+                "cost_currency": pos.cost.currency,
+            })
+
+        ledger_data[account] = {
+            "holdings": holdings,
+            "cash_balance": cash_balance,
+        }
+
+    return ledger_data
+
 
 @dataclass
 class ReconciliationError:
@@ -144,11 +250,9 @@ async def reconcile_ledger(
         )
 
         try:
-            # Load Beancount ledger
-            ledger_data = self._load_beancount_ledger(ledger_path)
-
-            # Get pack date
-            pack_date = await self._get_pack_date(pack_id)
+            # Load Beancount ledger (cached / incremental)
+            commit_hash = await self._get_ledger_commit_hash(ledger_path)
+            ledger_data = self._load_beancount_ledger(ledger_path, commit_hash)
 
             # Get all portfolios
             portfolios = await self.db.fetch("""
@@ -158,19 +262,32 @@ async def reconcile_ledger(
             """)
 
             report.portfolios_checked = len(portfolios)
+            portfolio_ids = [portfolio['id'] for portfolio in portfolios]
 
-            # Reconcile each portfolio
+            # One query per dataset for all portfolios, issued concurrently
+            pack_date, positions_by_portfolio, cash_by_portfolio = await asyncio.gather(
+                self._get_pack_date(pack_id),
+                self._get_db_positions_bulk(portfolio_ids, pack_id),
+                self._get_db_cash_balances_bulk(portfolio_ids),
+            )
+
+            # Reconcile each portfolio against prefetched data (no per-account I/O)
             for portfolio in portfolios:
+                account_name = portfolio['account_name']
                 portfolio_errors = await self._reconcile_portfolio(
                     portfolio_id=str(portfolio['id']),
-                    account_name=portfolio['account_name'],
+                    account_name=account_name,
                     pack_id=pack_id,
                     pack_date=pack_date,
                     ledger_data=ledger_data,
+                    db_positions=positions_by_portfolio.get(str(portfolio['id']), []),
+                    db_cash=cash_by_portfolio.get(str(portfolio['id']), Decimal('0')),
                 )
 
                 report.errors.extend(portfolio_errors)
-                report.positions_checked += len(portfolio_errors)
+                ledger_account = ledger_data.get(account_name)
+                if ledger_account:
+                    report.positions_checked += len(ledger_account["holdings"])
 
             # Compute max error
             valuation_errors = [
@@ -216,12 +333,19 @@ async def reconcile_ledger(
 
         return report
 
-    def _load_beancount_ledger(self, ledger_path: str) -> Dict:
+    def _load_beancount_ledger(
+        self, ledger_path: str, commit_hash: Optional[str] = None
+    ) -> Dict:
         """
         Load Beancount ledger and extract positions.
 
+        Uses the cached parsed state when the ledger file (and its includes)
+        and commit are unchanged, and folds in only appended entries when the
+        main file grew append-only.
+
         Args:
             ledger_path: Path to Beancount file
+            commit_hash: Ledger commit hash (part of the cache key)
 
         Returns:
             {
@@ -244,9 +368,54 @@ def _load_beancount_ledger(self, ledger_path: str) -> Dict:
             FileNotFoundError: If ledger file not found
             ValueError: If Beancount parsing fails
         """
+        state = self._load_ledger_state(ledger_path, commit_hash or "")
+        return state.ledger_data
+
+    def _load_ledger_state(self, ledger_path: str, commit_hash: str) -> ParsedLedgerState:
+        """
+        Resolve parsed ledger state from cache, incremental parse or full reload.
+
+        Args:
+            ledger_path: Path to Beancount file
+            commit_hash: Ledger commit hash
+
+        Returns:
+            ParsedLedgerState with ledger_data populated
+        """
+        cache_key = os.path.abspath(ledger_path)
+        cached = _LEDGER_STATE_CACHE.get(cache_key)
+
+        with open(ledger_path, 'rb') as f:
+            content = f.read()
+
+        if cached is not None:
+            single_file = cached.include_paths == [cache_key]
+            file_hash = (
+                _hash_bytes(content) if single_file else _hash_files(cached.include_paths)
+            )
+
+            if file_hash == cached.file_hash and commit_hash == cached.commit_hash:
+                logger.info(f"Ledger unchanged ({commit_hash[:8]}), using cached state")
+                return cached
+
+            tail = appended_tail(content, cached) if single_file and not cached.has_plugins else None
+            if tail is not None:
+                try:
+                    state = self._apply_appended_entries(cached, tail, content, commit_hash)
+                    _LEDGER_STATE_CACHE[cache_key] = state
+                    return state
+                except IncrementalParseUnsupported as e:
+                    logger.info(f"Incremental ledger parse not possible ({e}), reloading")
+
+        state = self._parse_full_ledger(ledger_path, commit_hash)
+        _LEDGER_STATE_CACHE[cache_key] = state
+        return state
+
+    def _parse_full_ledger(self, ledger_path: str, commit_hash: str) -> ParsedLedgerState:
+        """Load and book the full ledger with the Beancount loader."""
         try:
             from beancount import loader
-            from beancount.core import getters, amount
+            from beancount.core import data, inventory
         except ImportError:
             raise ImportError(
                 "Beancount not installed. Install with: pip install beancount"
@@ -260,40 +429,121 @@ def _load_beancount_ledger(self, ledger_path: str) -> Dict:
             for error in errors[:5]:  # Log first 5 errors
                 logger.warning(f"  {error}")
 
-        # Extract positions by account
-        ledger_data = {}
-
-        for account, positions_list in getters.get_account_positions(entries).items():
-            holdings = []
-            cash_balance = Decimal('0')
-
-            for pos in positions_list:
-                # Position structure: pos.units (Amount), pos.cost (Cost or None)
-                currency = pos.units.currency
-                qty = Decimal(str(pos.units.number))
-
-                # Cash positions (no cost)
-                if pos.cost is None:
-                    if currency in ['USD', 'CAD', 'EUR', 'GBP']:
-                        cash_balance += qty
-                    continue
-
-                # Security positions (with cost)
-                holdings.append({
-                    "currency": currency,  # Ticker symbol in Beancount
-                    "qty": qty,
-                    "cost_per_unit": Decimal(str(pos.cost.number)),
-                    "cost_currency": pos.cost.currency,
-                })
-
-            ledger_data[account] = {
-                "holdings": holdings,
-                "cash_balance": cash_balance,
-            }
+        # Accumulate booked postings into per-account inventories
+        inventories: Dict[str, Any] = {}
+        for entry in entries:
+            if not isinstance(entry, data.Transaction):
+                continue
+            for posting in entry.postings:
+                inventories.setdefault(posting.account, inventory.Inventory()).add_position(posting)
+
+        include_paths = [os.path.abspath(p) for p in options.get("include") or [ledger_path]]
+        main_path = os.path.abspath(ledger_path)
+
+        with open(ledger_path, 'rb') as f:
+            content = f.read()
+
+        state = ParsedLedgerState(
+            ledger_path=main_path,
+            file_hash=_hash_bytes(content) if include_paths == [main_path] else _hash_files(include_paths),
+            commit_hash=commit_hash,
+            byte_length=len(content),
+            include_paths=include_paths,
+            has_plugins=bool(options.get("plugin")),
+            inventories=inventories,
+        )
+        state.ledger_data = ledger_data_from_inventories(inventories)
 
-        logger.info(f"Loaded Beancount ledger: {len(ledger_data)} accounts")
+        logger.info(f"Loaded Beancount ledger: {len(state.ledger_data)} accounts")
 
-        return ledger_data
+        return state
+
+    def _apply_appended_entries(
+        self,
+        cached: ParsedLedgerState,
+        tail: bytes,
+        content: bytes,
+        commit_hash: str,
+    ) -> ParsedLedgerState:
+        """
+        Parse only the appended ledger text and fold it into cached inventories.
+
+        Only fully specified postings are accepted: explicit units, per-unit
+        cost for augmentations, and no cost-based reductions (those need the
+        booking engine's lot matching).
+
+        Raises:
+            IncrementalParseUnsupported: If the tail needs a full reload
+        """
+        try:
+            from beancount.parser import parser
+            from beancount.core import data, inventory, position
+            from beancount.core.number import MISSING
+        except ImportError:
+            raise ImportError(
+                "Beancount not installed. Install with: pip install beancount"
+            )
+
+        entries, errors, options = parser.parse_string(tail.decode('utf-8'))
+
+        if errors:
+            raise IncrementalParseUnsupported(f"{len(errors)} parse errors in appended entries")
+        if options.get("include") or options.get("plugin"):
+            raise IncrementalParseUnsupported("appended include/plugin directive")
+
+        inventories = dict(cached.inventories)
+        touched = set()
+        transactions = 0
+
+        for entry in entries:
+            if not isinstance(entry, data.Transaction):
+                continue
+            transactions += 1
+
+            for posting in entry.postings:
+                units = posting.units
+                if units is None or units.number is MISSING or units.currency is MISSING:
+                    raise IncrementalParseUnsupported("posting requires interpolation")
+
+                cost = None
+                if posting.cost is not None:
+                    spec = posting.cost
+                    if units.number < 0:
+                        raise IncrementalParseUnsupported("cost-based reduction requires booking")
+                    if spec.number_per is MISSING or spec.number_per is None or spec.number_total is not None:
+                        raise IncrementalParseUnsupported("incomplete cost specification")
+                    cost = position.Cost(
+                        spec.number_per, spec.currency, spec.date or entry.date, spec.label
+                    )
+
+                if posting.account not in touched:
+                    inventories[posting.account] = copy.copy(
+                        inventories.get(posting.account) or inventory.Inventory()
+                    )
+                    touched.add(posting.account)
+                inventories[posting.account].add_amount(units, cost)
+
+        state = ParsedLedgerState(
+            ledger_path=cached.ledger_path,
+            file_hash=_hash_bytes(content),
+            commit_hash=commit_hash,
+            byte_length=len(content),
+            include_paths=cached.include_paths,
+            has_plugins=cached.has_plugins,
+            inventories=inventories,
+            appended_entries=cached.appended_entries + transactions,
+        )
+        state.ledger_data = dict(cached.ledger_data)
+        state.ledger_data.update(
+            ledger_data_from_inventories({a: inventories[a] for a in touched})
+        )
+
+        logger.info(
+            f"Applied {transactions} appended ledger transactions "
+            f"({len(touched)} accounts touched)"
+        )
+
+        return state
 
     async def _reconcile_portfolio(
         self,
@@ -302,6 +552,8 @@ async def _reconcile_portfolio(
         pack_id: str,
         pack_date: date,
         ledger_data: Dict,
+        db_positions: Optional[List[Dict]] = None,
+        db_cash: Optional[Decimal] = None,
     ) -> List[ReconciliationError]:
         """
         Reconcile single portfolio against ledger.
@@ -312,6 +564,8 @@ async def _reconcile_portfolio(
             pack_id: Pricing pack UUID
             pack_date: Pack as-of date
             ledger_data: Loaded Beancount data
+            db_positions: Prefetched DB positions (fetched if None)
+            db_cash: Prefetched DB cash balance (fetched if None)
 
         Returns:
             List of reconciliation errors
@@ -325,16 +579,20 @@ async def _reconcile_portfolio(
             return errors
 
         # Get DB positions
-        db_positions = await self._get_db_positions(portfolio_id, pack_id)
+        if db_positions is None:
+            db_positions = await self._get_db_positions(portfolio_id, pack_id)
+
+        # Index DB positions by symbol (first lot wins, as before)
+        db_by_symbol: Dict[str, Dict] = {}
+        for p in db_positions:
+            db_by_symbol.setdefault(p["symbol"], p)
 
         # Reconcile each ledger position
         for ledger_holding in ledger_positions["holdings"]:
             symbol = ledger_holding["currency"]  # Ticker symbol
 
             # Find matching DB position
-            db_holding = next(
-                (p for p in db_positions if p["symbol"] == symbol), None
-            )
+            db_holding = db_by_symbol.get(symbol)
 
             if not db_holding:
                 errors.append(
@@ -412,7 +670,8 @@ async def _reconcile_portfolio(
 
         # Reconcile cash balance
         ledger_cash = ledger_positions["cash_balance"]
-        db_cash = await self._get_db_cash_balance(portfolio_id)
+        if db_cash is None:
+            db_cash = await self._get_db_cash_balance(portfolio_id)
 
         if abs(db_cash - ledger_cash) > Decimal('0.01'):  # 1 cent tolerance
             errors.append(
@@ -465,6 +724,80 @@ async def _get_db_positions(self, portfolio_id: str, pack_id: str) -> List[Dict]
             for row in rows
         ]
 
+    async def _get_db_positions_bulk(
+        self, portfolio_ids: List[Any], pack_id: str
+    ) -> Dict[str, List[Dict]]:
+        """
+        Get DB positions for many portfolios from pricing pack in one query.
+
+        Args:
+            portfolio_ids: Portfolio UUIDs
+            pack_id: Pricing pack UUID
+
+        Returns:
+            {portfolio_id (str): [position records]}
+        """
+        if not portfolio_ids:
+            return {}
+
+        rows = await self.db.fetch("""
+            SELECT
+                l.portfolio_id,
+                s.symbol,
+                l.quantity_open as qty,
+                l.cost_per_unit_ccy as cost_per_unit,
+                p.close as price,
+                (l.quantity_open * p.close * COALESCE(fx.rate, 1.0)) as market_value
+            FROM lots l
+            JOIN portfolios pf ON pf.id = l.portfolio_id
+            JOIN securities s ON l.security_id = s.id
+            JOIN prices p ON l.security_id = p.security_id AND p.pricing_pack_id = $2
+            LEFT JOIN fx_rates fx ON s.currency = fx.base_ccy
+                AND fx.quote_ccy = pf.base_ccy
+                AND fx.pricing_pack_id = $2
+            WHERE l.portfolio_id = ANY($1::uuid[]) AND l.quantity_open > 0
+        """, portfolio_ids, pack_id)
+
+        positions: Dict[str, List[Dict]] = {}
+        for row in rows:
+            positions.setdefault(str(row["portfolio_id"]), []).append({
+                "symbol": row["symbol"],
+                "qty": Decimal(str(row["qty"])),
+                "cost_per_unit": Decimal(str(row["cost_per_unit"])),
+                "price": Decimal(str(row["price"])),
+                "market_value": Decimal(str(row["market_value"])),
+            })
+        return positions
+
+    async def _get_db_cash_balances_bulk(self, portfolio_ids: List[Any]) -> Dict[str, Decimal]:
+        """
+        Get cash balances for many portfolios in one query.
+
+        Args:
+            portfolio_ids: Portfolio UUIDs
+
+        Returns:
+            {portfolio_id (str): cash balance}
+        """
+        if not portfolio_ids:
+            return {}
+
+        rows = await self.db.fetch("""
+            SELECT portfolio_id, COALESCE(SUM(cash_balance), 0) as total_cash
+            FROM portfolio_cash
+            WHERE portfolio_id = ANY($1::uuid[])
+            GROUP BY portfolio_id
+        """, portfolio_ids)
+
+        return {str(row["portfolio_id"]): Decimal(str(row["total_cash"])) for row in rows}
+
+    async def _get_ledger_commit_hash(self, ledger_path: str) -> str:
+        """Get commit hash of the git repository holding the ledger file."""
+        from app.db.pricing_pack_queries import get_pricing_pack_queries
+
+        ledger_repo = os.path.dirname(os.path.abspath(ledger_path))
+        return await get_pricing_pack_queries().get_ledger_commit_hash(ledger_repo)
+
     async def _get_db_cash_balance(self, portfolio_id: str) -> Decimal:
         """
         Get cash balance for portfolio from DB.
@@ -0,0 +1,58 @@
+"""
+Refresh Cycle Phase Timeline Job
+
+Purpose: Classify every indicator date into STDC/LTDC/Empire/Civil phases
+Created: 2025-11-10
+Priority: P2 (Runs nightly from JOB 3; safe to run ad hoc)
+
+Features:
+    - Incremental by default: only dates after the last stored one
+    - --full rebuilds from the whole macro_indicators archive (after backfills
+      or indicator revisions)
+
+Usage:
+    # Append new dates
+    python -m backend.jobs.refresh_cycle_timeline
+
+    # Rebuild the full history
+    python -m backend.jobs.refresh_cycle_timeline --full
+"""
+
+import asyncio
+import argparse
+import logging
+import sys
+
+from app.db.connection import init_db_pool, close_db_pool
+from app.services.cycle_timeline import refresh_phase_timeline
+
+logger = logging.getLogger("DawsOS.Jobs.RefreshCycleTimeline")
+
+
+async def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Refresh the cached cycle phase timeline")
+    parser.add_argument("--full", action="store_true", help="Rebuild from the whole indicator archive")
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        result = await refresh_phase_timeline(full=args.full)
+        logger.info(f"✅ {result['dates']} dates classified in {result['seconds']}s")
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"❌ Failed: {e}")
+        sys.exit(1)
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    # Run
+    asyncio.run(main())
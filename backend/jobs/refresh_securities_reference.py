@@ -0,0 +1,61 @@
+"""
+Refresh Securities Reference Job
+
+Purpose: Bulk-refresh sector / industry / country of securities from FMP profiles
+Created: 2025-11-10
+Priority: P1 (Runs nightly as JOB 8; safe to run ad hoc)
+
+Features:
+    - Incremental by default: only active equities without a stored sector
+    - --full re-classifies every active equity (sector changes, re-listings)
+    - 100 symbols per FMP profile request, one UPDATE for all results
+
+Usage:
+    # Classify new securities
+    python -m backend.jobs.refresh_securities_reference
+
+    # Re-classify everything
+    python -m backend.jobs.refresh_securities_reference --full
+"""
+
+import asyncio
+import argparse
+import logging
+import sys
+
+from app.db.connection import init_db_pool, close_db_pool
+from app.services.securities_reference import refresh_classifications
+
+logger = logging.getLogger("DawsOS.Jobs.RefreshSecuritiesReference")
+
+
+async def main():
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Refresh security classification from FMP profiles")
+    parser.add_argument("--full", action="store_true", help="Re-classify every active equity")
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        result = await refresh_classifications(full=args.full)
+        logger.info(
+            f"✅ {result['classified']}/{result['requested']} securities classified "
+            f"in {result['batches']} batches ({result['seconds']}s)"
+        )
+        sys.exit(0)
+    except Exception as e:
+        logger.error(f"❌ Failed: {e}")
+        sys.exit(1)
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    # Configure logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    # Run
+    asyncio.run(main())
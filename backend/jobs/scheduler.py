@@ -12,6 +12,8 @@
     4. prewarm_ratings     → Buffett quality scores
     5. mark_pack_fresh     → Enable executor freshness gate
     6. evaluate_alerts     → Check conditions, dedupe, deliver
+    7. export_columnar     → Columnar snapshots of daily values, prices, macro (non-blocking)
+    8. refresh_classification → Bulk FMP sector/industry refresh of the securities reference (non-blocking)
 
 Critical Requirements:
     - Jobs MUST run in order (no parallelization)
@@ -36,6 +38,8 @@
 from apscheduler.triggers.cron import CronTrigger
 import os
 
+from app.db.connection import POOL_BATCH, use_pool
+
 # Job imports
 from jobs.build_pricing_pack import PricingPackBuilder
 from jobs.metrics import MetricsComputer
@@ -75,7 +79,7 @@ class NightlyJobScheduler:
     Sacred Order (NON-NEGOTIABLE):
         1. build_pack → 2. compute_daily_metrics →
         3. prewarm_factors → 4. prewarm_ratings → 5. mark_pack_fresh →
-        6. evaluate_alerts
+        6. evaluate_alerts → 7. export_columnar
 
     Critical Rules:
         - Jobs run sequentially (no parallelization)
@@ -133,9 +137,20 @@ def start(self):
             max_instances=1,
         )
 
+        # Add corporate actions sync (daily at 06:00, after FMP calendars update)
+        self.scheduler.add_job(
+            self.run_corporate_actions_sync,
+            trigger=CronTrigger(hour=6, minute=0),
+            id="corporate_actions_sync",
+            name="Corporate Actions Sync (Daily)",
+            replace_existing=True,
+            max_instances=1,
+        )
+
         self.scheduler.start()
         logger.info(f"Scheduler started. Nightly jobs will run at {self.run_hour:02d}:{self.run_minute:02d}")
         logger.info("DLQ replay will run hourly at :05")
+        logger.info("Corporate actions sync will run daily at 06:00")
 
     def stop(self):
         """Stop the scheduler."""
@@ -153,6 +168,7 @@ async def run_nightly_jobs(self, asof_date: Optional[date] = None) -> NightlyRun
             4. prewarm_ratings
             5. mark_pack_fresh
             6. evaluate_alerts
+            7. export_columnar
 
         Args:
             asof_date: Date for pricing pack (default: yesterday)
@@ -260,6 +276,32 @@ async def run_nightly_jobs(self, asof_date: Optional[date] = None) -> NightlyRun
             else:
                 logger.info(f"✅ Alerts evaluated")
 
+            # JOB 7: Export Columnar Snapshots (after all writes for asof_date)
+            job8_result = await self._run_job(
+                job_name="export_columnar",
+                job_func=self._job_export_columnar,
+                job_args=(pack_id, asof_date),
+            )
+            report.jobs.append(job8_result)
+
+            if not job8_result.success:
+                logger.warning("Columnar export failed (non-blocking, readers fall back to Postgres)")
+            else:
+                logger.info(f"✅ Columnar snapshots exported")
+
+            # JOB 8: Refresh Security Classification (FMP profiles, bulk)
+            job9_result = await self._run_job(
+                job_name="refresh_classification",
+                job_func=self._job_refresh_classification,
+                job_args=(),
+            )
+            report.jobs.append(job9_result)
+
+            if not job9_result.success:
+                logger.warning("Security classification refresh failed (non-blocking)")
+            else:
+                logger.info(f"✅ Security classification refreshed")
+
             # All jobs completed successfully
             report.success = True
             logger.info(f"=" * 80)
@@ -301,7 +343,9 @@ async def _run_job(
         started_at = datetime.now()
 
         try:
-            result = await job_func(*job_args)
+            # Jobs run on the batch pool so they cannot starve interactive requests
+            with use_pool(POOL_BATCH):
+                result = await job_func(*job_args)
             completed_at = datetime.now()
             duration = (completed_at - started_at).total_seconds()
 
@@ -424,15 +468,25 @@ async def _job_prewarm_factors(self, pack_id: str, asof_date: date) -> Dict[str,
             regime_result = await macro_service.detect_regime(asof_date)
             logger.info(f"Regime detected: {regime_result.get('regime', 'unknown')}")
 
-            # Compute cycle analysis
-            cycles_result = await macro_service.compute_cycles(asof_date)
-            logger.info(f"Cycles computed: {len(cycles_result.get('cycles', []))} cycles")
+            # Compute cycle analysis and persist the phases now (the read
+            # path only queues them)
+            cycles_service = container.resolve("cycles")
+            phases = await cycles_service.detect_all_phases(asof_date)
+            stored = await cycles_service.flush_phases()
+            logger.info(f"Cycles computed: {len(phases)} cycles ({stored} phases stored)")
+
+            # Extend the cached phase timeline with any new indicator dates
+            try:
+                from app.services.cycle_timeline import refresh_phase_timeline
+                await refresh_phase_timeline()
+            except Exception as e:
+                logger.warning(f"Cycle phase timeline refresh failed (non-blocking): {e}")
 
             return {
                 "num_portfolios": num_portfolios,
                 "regime": regime_result.get("regime"),
                 "regime_confidence": float(regime_result.get("confidence", 0.0)),
-                "cycles_computed": len(cycles_result.get("cycles", [])),
+                "cycles_computed": len(phases),
                 "factors": ["real_rate", "inflation", "credit", "usd", "risk_free"],
             }
 
@@ -557,6 +611,40 @@ async def _job_evaluate_alerts(self, pack_id: str, asof_date: date) -> Dict[str,
             logger.error(f"Alert evaluation failed: {e}", exc_info=True)
             raise
 
+    async def _job_export_columnar(self, pack_id: str, asof_date: date) -> Dict[str, Any]:
+        """
+        JOB 7: Export columnar time-series snapshots.
+
+        Writes portfolio_daily_values, prices and macro_indicators as mmap-able
+        NumPy arrays (app/db/columnar_store.py). Readers only use a snapshot
+        whose max date covers the requested range.
+
+        Returns:
+            {dataset: {"rows": int, "keys": int, "seconds": float}}
+        """
+        logger.info(f"Exporting columnar snapshots for {asof_date}")
+
+        from app.db.columnar_store import export_columnar_store
+
+        return await export_columnar_store()
+
+    async def _job_refresh_classification(self) -> Dict[str, Any]:
+        """
+        JOB 8: Refresh security classification from FMP profiles.
+
+        Fetches profiles 100 symbols per request for active equities without a
+        stored sector and writes sector / industry / country back in one
+        statement (app/services/securities_reference.py).
+
+        Returns:
+            {"requested": int, "classified": int, "batches": int, "seconds": float}
+        """
+        logger.info("Refreshing security classification")
+
+        from app.services.securities_reference import refresh_classifications
+
+        return await refresh_classifications()
+
     async def run_dlq_replay(self):
         """
         Run DLQ replay job (hourly).
@@ -593,6 +681,22 @@ async def run_dlq_replay(self):
             logger.exception(f"DLQ replay job failed: {e}")
             # Don't raise - hourly job should continue on failure
 
+    async def run_corporate_actions_sync(self):
+        """
+        Run corporate actions sync job (daily).
+
+        Applies the FMP dividend/split calendars to every active portfolio
+        with a fixed number of set-based statements.
+        """
+        try:
+            from jobs.sync_corporate_actions import run_corporate_actions_sync
+
+            await run_corporate_actions_sync()
+
+        except Exception as e:
+            logger.exception(f"Corporate actions sync job failed: {e}")
+            # Don't raise - daily job should continue on failure
+
     def _log_summary(self, report: NightlyRunReport):
         """Log summary of nightly run."""
         logger.info("")
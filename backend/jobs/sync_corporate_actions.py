@@ -0,0 +1,111 @@
+"""
+Corporate Actions Sync Job
+
+Purpose: Daily full-universe dividend/split sync from the FMP calendars
+Updated: 2025-11-10
+Priority: P2
+
+Features:
+    - One FMP calendar fetch (dividends + splits) for the window
+    - Set-based application to every active portfolio (BulkCorporateActionsSync)
+    - Dry-run mode for previewing
+
+Schedule:
+    - Runs daily at 06:00 (registered in jobs.scheduler)
+
+Usage:
+    # Run manually (default window: 7 days back, 7 days forward)
+    python -m jobs.sync_corporate_actions
+    python -m jobs.sync_corporate_actions --days-back 30 --days-forward 30 --dry-run
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Optional
+
+from app.db.connection import get_db_connection
+from app.services.corporate_actions_sync import BulkCorporateActionsSync
+
+logger = logging.getLogger("DawsOS.Jobs.CorporateActionsSync")
+
+DEFAULT_DAYS_BACK = 7
+DEFAULT_DAYS_FORWARD = 7
+
+
+async def run_corporate_actions_sync(
+    asof_date: Optional[date] = None,
+    days_back: int = DEFAULT_DAYS_BACK,
+    days_forward: int = DEFAULT_DAYS_FORWARD,
+    dry_run: bool = False,
+) -> Dict[str, Any]:
+    """
+    Sync dividends and splits for all active portfolios.
+
+    Args:
+        asof_date: Window anchor date (default: today)
+        days_back: Days before asof_date to include
+        days_forward: Days after asof_date to include
+        dry_run: If True, compute but don't write
+
+    Returns:
+        Summary dict from BulkCorporateActionsSync.sync_window
+    """
+    asof_date = asof_date or date.today()
+    from_date = asof_date - timedelta(days=days_back)
+    to_date = asof_date + timedelta(days=days_forward)
+
+    started_at = datetime.now()
+    logger.info(f"Corporate actions sync: {from_date} → {to_date} (dry_run={dry_run})")
+
+    async with get_db_connection() as conn:
+        summary = await BulkCorporateActionsSync(conn).sync_window(
+            from_date=from_date,
+            to_date=to_date,
+            dry_run=dry_run,
+        )
+
+    summary["duration_seconds"] = (datetime.now() - started_at).total_seconds()
+    logger.info(
+        f"Corporate actions sync completed in {summary['duration_seconds']:.2f}s: "
+        f"dividends={summary['dividends_recorded']}, splits={summary['splits_recorded']}, "
+        f"lots_adjusted={summary['lots_adjusted']}, errors={len(summary['errors'])}"
+    )
+    return summary
+
+
+# ===========================
+# STANDALONE EXECUTION
+# ===========================
+
+async def main() -> int:
+    """Run corporate actions sync immediately."""
+    parser = argparse.ArgumentParser(description="Sync corporate actions from FMP for all portfolios")
+    parser.add_argument("--days-back", type=int, default=DEFAULT_DAYS_BACK)
+    parser.add_argument("--days-forward", type=int, default=DEFAULT_DAYS_FORWARD)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    from app.db.connection import init_db_pool, close_db_pool
+
+    await init_db_pool()
+    try:
+        summary = await run_corporate_actions_sync(
+            days_back=args.days_back,
+            days_forward=args.days_forward,
+            dry_run=args.dry_run,
+        )
+    finally:
+        await close_db_pool()
+
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark RLS-Scoped Connections
+
+Purpose: Compare the legacy SET LOCAL path with parameterised and lazy read-only RLS sessions
+Created: 2025-11-10
+
+Runs the same per-user read (open lots for a portfolio) through:
+    - legacy:       transaction + interpolated SET LOCAL (previous implementation)
+    - rls:          get_db_connection_with_rls() (parameterised set_config)
+    - rls_readonly: get_db_connection_with_rls(readonly=True)
+    - read_session: get_rls_read_connection() (BEGIN + set_config in one message)
+
+Usage:
+    python scripts/benchmark_rls_connections.py --user-id <uuid> --portfolio-id <uuid> -n 500
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+# Add backend to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db.connection import (
+    close_db_pool,
+    get_db_connection_with_rls,
+    get_db_pool,
+    get_rls_read_connection,
+    init_db_pool,
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+QUERY = "SELECT security_id, quantity_open FROM lots WHERE portfolio_id = $1 AND is_open = true"
+
+
+async def legacy_path(user_id, portfolio_id):
+    async with get_db_pool().acquire() as conn:
+        async with conn.transaction():
+            await conn.execute(f"SET LOCAL app.user_id = '{user_id}'")
+            return await conn.fetch(QUERY, portfolio_id)
+
+
+async def rls_path(user_id, portfolio_id):
+    async with get_db_connection_with_rls(user_id) as conn:
+        return await conn.fetch(QUERY, portfolio_id)
+
+
+async def rls_readonly_path(user_id, portfolio_id):
+    async with get_db_connection_with_rls(user_id, readonly=True) as conn:
+        return await conn.fetch(QUERY, portfolio_id)
+
+
+async def read_session_path(user_id, portfolio_id):
+    async with get_rls_read_connection(user_id) as conn:
+        return await conn.fetch(QUERY, portfolio_id)
+
+
+PATHS = {
+    "legacy": legacy_path,
+    "rls": rls_path,
+    "rls_readonly": rls_readonly_path,
+    "read_session": read_session_path,
+}
+
+
+async def run_path(func, user_id, portfolio_id, iterations, concurrency):
+    """Run func iterations times with bounded concurrency; return per-call latencies in ms."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            await func(user_id, portfolio_id)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    # Warm connections and statement caches
+    for _ in range(min(10, iterations)):
+        await func(user_id, portfolio_id)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(iterations)))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def summarize(name, latencies, elapsed):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1] if ordered else 0.0
+    return (
+        f"{name:<13} p50={statistics.median(ordered):7.2f}ms  p95={p95:7.2f}ms  "
+        f"mean={statistics.fmean(ordered):7.2f}ms  throughput={len(ordered) / elapsed:8.1f}/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark RLS connection paths")
+    parser.add_argument("--user-id", required=True, help="User UUID for app.user_id")
+    parser.add_argument("--portfolio-id", required=True, help="Portfolio UUID owned by the user")
+    parser.add_argument("-n", "--iterations", type=int, default=500)
+    parser.add_argument("-c", "--concurrency", type=int, default=8)
+    parser.add_argument("--paths", default=",".join(PATHS), help="Comma-separated subset of paths")
+    args = parser.parse_args()
+
+    await init_db_pool()
+    try:
+        for name in args.paths.split(","):
+            latencies, elapsed = await run_path(
+                PATHS[name], args.user_id, args.portfolio_id, args.iterations, args.concurrency
+            )
+            logger.info(summarize(name, latencies, elapsed))
+    finally:
+        await close_db_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,16 +6,20 @@
 Priority: P0 (Critical for comprehensive testing)
 
 Fixtures:
-    - Mock database connections
+    - Recording database connections / pools (scriptable results)
+    - Fake agent runtime, request contexts and orchestrators for pattern tests
     - Mock service dependencies
     - Sample data generators
     - Decimal comparison utilities
 """
 
+import inspect
 import pytest
+from collections import Counter
+from contextlib import asynccontextmanager
 from decimal import Decimal
 from datetime import date, datetime, timedelta
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional
 from uuid import UUID, uuid4
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -24,31 +28,256 @@
 # Mock Database Fixtures
 # ============================================================================
 
-@pytest.fixture
-def mock_db_pool():
-    """Mock AsyncPG pool for unit tests."""
-    pool = AsyncMock()
+# What asyncpg returns for a statement nobody scripted a result for
+_EMPTY_RESULTS = {
+    "fetch": [],
+    "fetchrow": None,
+    "fetchval": None,
+    "execute": "OK",
+    "executemany": None,
+    "copy_records_to_table": "COPY 0",
+}
+
+
+class FakeTransaction:
+    """Connection.transaction() stand-in; logs BEGIN/COMMIT/ROLLBACK on the connection."""
+
+    def __init__(self, conn, readonly=False):
+        self.conn = conn
+        self.readonly = readonly
+
+    async def __aenter__(self):
+        self.conn.calls.append(("transaction", "BEGIN", (self.readonly,)))
+        self.conn.in_transaction = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.conn.in_transaction = False
+        self.conn.calls.append(("transaction", "ROLLBACK" if exc_type else "COMMIT", ()))
+        return False
+
+
+class FakeStatement:
+    """Prepared statement stand-in; runs through the connection that prepared it."""
+
+    def __init__(self, conn, sql):
+        self.conn = conn
+        self.sql = sql
+
+    async def fetch(self, *args, timeout=None):
+        return await self.conn._call("fetch", self.sql, args)
+
+    async def fetchrow(self, *args, timeout=None):
+        return await self.conn._call("fetchrow", self.sql, args)
+
+
+class FakeConnection:
+    """
+    Recording asyncpg connection.
+
+    Every statement is appended to `calls` as (method, sql, args) and answered by
+    `respond(method, sql, args)` (empty asyncpg results when None). Transactions
+    are logged in the same list as ("transaction", "BEGIN" / "COMMIT" / "ROLLBACK", ...).
+    """
+
+    def __init__(self, respond: Optional[Callable[[str, str, tuple], Any]] = None):
+        self.respond = respond
+        self.calls: List[tuple] = []
+        self.in_transaction = False
+        self.prepares = 0
+
+    async def _call(self, method: str, sql: str, args: tuple) -> Any:
+        self.calls.append((method, sql, args))
+        if self.respond is None:
+            return _EMPTY_RESULTS[method]
+        return self.respond(method, sql, args)
+
+    def statements(self) -> List[tuple]:
+        """Recorded calls without the transaction markers."""
+        return [call for call in self.calls if call[0] != "transaction"]
+
+    def transaction(self, readonly=False, **kwargs):
+        return FakeTransaction(self, readonly)
+
+    async def prepare(self, sql):
+        self.prepares += 1
+        return FakeStatement(self, sql)
+
+    async def fetch(self, sql, *args, timeout=None):
+        return await self._call("fetch", sql, args)
+
+    async def fetchrow(self, sql, *args, timeout=None):
+        return await self._call("fetchrow", sql, args)
+
+    async def fetchval(self, sql, *args, timeout=None):
+        return await self._call("fetchval", sql, args)
+
+    async def execute(self, sql, *args, timeout=None):
+        return await self._call("execute", sql, args)
+
+    async def executemany(self, sql, rows, timeout=None):
+        return await self._call("executemany", sql, list(rows))
+
+    async def copy_records_to_table(self, table, records=None, columns=None, **kwargs):
+        return await self._call("copy_records_to_table", table, list(records))
+
+
+class FakePool:
+    """asyncpg pool over one FakeConnection (acquire and the pool-level query shortcuts)."""
+
+    def __init__(self, conn: Optional[FakeConnection] = None, name: str = "primary", max_size: int = 10):
+        self.conn = conn or FakeConnection()
+        self.name = name
+        self.max_size = max_size
+        self.acquisitions = 0
+        self.closed = False
+
+    def get_max_size(self):
+        return self.max_size
+
+    def get_size(self):
+        return self.max_size
+
+    def get_idle_size(self):
+        return self.max_size
+
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        self.acquisitions += 1
+        yield self.conn
+
+    async def fetch(self, sql, *args, timeout=None):
+        return await self.conn.fetch(sql, *args)
 
-    # Mock acquire context manager
-    connection = AsyncMock()
-    pool.acquire.return_value.__aenter__.return_value = connection
-    pool.acquire.return_value.__aexit__.return_value = None
+    async def fetchrow(self, sql, *args, timeout=None):
+        return await self.conn.fetchrow(sql, *args)
 
-    return pool
+    async def fetchval(self, sql, *args, timeout=None):
+        return await self.conn.fetchval(sql, *args)
+
+    async def execute(self, sql, *args, timeout=None):
+        return await self.conn.execute(sql, *args)
+
+    async def close(self):
+        self.closed = True
 
 
 @pytest.fixture
 def mock_db_connection():
-    """Mock AsyncPG connection for unit tests."""
-    conn = AsyncMock()
+    """Recording asyncpg connection; set `.respond` to script results."""
+    return FakeConnection()
+
+
+@pytest.fixture
+def mock_db_pool(mock_db_connection):
+    """Pool handing out mock_db_connection."""
+    return FakePool(mock_db_connection)
+
+
+@pytest.fixture
+def fake_pool():
+    """Factory for extra pools: fake_pool(name="replica", respond=...)."""
+    def make(name: str = "primary", respond=None, max_size: int = 10) -> FakePool:
+        return FakePool(FakeConnection(respond), name=name, max_size=max_size)
+    return make
+
+
+@pytest.fixture
+def make_lot():
+    """Factory for lot rows as the lots queries return them; keyword overrides win."""
+    def make(symbol="AAPL", qty="10", cost="1000", acquired=date(2024, 1, 1), **fields) -> Dict[str, Any]:
+        lot = {
+            "id": uuid4(),
+            "portfolio_id": uuid4(),
+            "security_id": uuid4(),
+            "symbol": symbol,
+            "quantity_original": Decimal(qty),
+            "quantity_open": Decimal(qty),
+            "cost_basis": Decimal(cost),
+            "acquisition_date": acquired,
+            "closed_date": None,
+            "currency": "USD",
+            "base_currency": "USD",
+        }
+        lot.update(fields)
+        return lot
+    return make
+
+
+# ============================================================================
+# Pattern Execution Fixtures
+# ============================================================================
+
+
+class FakeRuntime:
+    """
+    AgentRuntime stand-in for orchestrator tests.
+
+    Calls are recorded in `calls` as (capability, args) and answered by
+    `respond(capability, ctx, state, **args)` (sync or async); without it the
+    result is {"capability": ..., "args": ...}.
+    """
+
+    def __init__(self, respond=None, capability_map=None, agents=None):
+        self.respond = respond
+        self.capability_map = dict(capability_map or {})
+        self.agents = dict(agents or {})
+        self.calls: List[tuple] = []
+
+    async def execute_capability(self, capability, ctx, state, **args):
+        self.calls.append((capability, args))
+        if self.respond is None:
+            return {"capability": capability, "args": args}
+        result = self.respond(capability, ctx, state, **args)
+        return await result if inspect.isawaitable(result) else result
+
+    def call_counts(self) -> Counter:
+        return Counter(capability for capability, _ in self.calls)
+
+    def get_cache_stats(self, request_id):
+        return {}
+
+    def clear_request_cache(self, request_id):
+        pass
 
-    # Common query mocks
-    conn.fetchval = AsyncMock()
-    conn.fetchrow = AsyncMock()
-    conn.fetch = AsyncMock()
-    conn.execute = AsyncMock()
 
-    return conn
+@pytest.fixture
+def fake_runtime():
+    """Factory: fake_runtime(respond=None, capability_map=None, agents=None)."""
+    return FakeRuntime
+
+
+@pytest.fixture
+def make_ctx():
+    """Factory for RequestCtx with fresh ids; keyword overrides win."""
+    from app.core.types import RequestCtx
+
+    def make(**fields):
+        values = {
+            "pricing_pack_id": "PP_2025-11-10",
+            "ledger_commit_hash": "abc123",
+            "trace_id": str(uuid4()),
+            "user_id": uuid4(),
+            "request_id": str(uuid4()),
+        }
+        values.update(fields)
+        return RequestCtx(**values)
+    return make
+
+
+@pytest.fixture
+def make_orchestrator():
+    """Factory: PatternOrchestrator over `runtime` with `specs` compiled and registered."""
+    from app.core.pattern_orchestrator import PatternOrchestrator
+    from app.core.pattern_plan import compile_pattern
+
+    def make(runtime, *specs):
+        orchestrator = PatternOrchestrator(runtime, db=object())
+        for spec in specs:
+            orchestrator.patterns[spec["id"]] = spec
+            orchestrator.plans[spec["id"]] = compile_pattern(spec)
+        return orchestrator
+    return make
 
 
 # ============================================================================
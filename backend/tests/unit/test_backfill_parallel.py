@@ -0,0 +1,201 @@
+"""
+Unit Tests for Parallel Daily Value Backfill
+
+Purpose: Cover chunking, price matrix forward-fill, in-memory replay and checkpoints
+Created: 2025-11-10
+Priority: P2
+"""
+
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from jobs.backfill_daily_values import (
+    BackfillCheckpoint,
+    ParallelDailyValueBackfill,
+    build_price_matrix,
+    chunk_date_range,
+    replay_transactions,
+    value_chunk,
+)
+
+
+def txn(day, txn_type, security_id=None, quantity=None, amount=None):
+    return {
+        "transaction_date": day,
+        "transaction_type": txn_type,
+        "security_id": security_id,
+        "quantity": quantity,
+        "price": None,
+        "amount": amount,
+        "currency": "USD",
+    }
+
+
+def test_chunk_date_range_covers_range_without_gaps():
+    chunks = chunk_date_range(date(2025, 1, 1), date(2025, 1, 10), 4)
+
+    assert chunks == [
+        (date(2025, 1, 1), date(2025, 1, 4)),
+        (date(2025, 1, 5), date(2025, 1, 8)),
+        (date(2025, 1, 9), date(2025, 1, 10)),
+    ]
+
+
+def test_build_price_matrix_seeds_and_forward_fills():
+    a, b = uuid4(), uuid4()
+    start = date(2025, 1, 1)
+    matrix = build_price_matrix(
+        start,
+        4,
+        [a, b],
+        [
+            (a, date(2024, 12, 20), Decimal("9")),
+            (a, date(2024, 12, 30), Decimal("10")),
+            (a, date(2025, 1, 3), Decimal("12")),
+            (b, date(2025, 1, 2), Decimal("50")),
+        ],
+    )
+
+    assert list(matrix[:, 0]) == [Decimal("10"), Decimal("10"), Decimal("12"), Decimal("12")]
+    assert list(matrix[:, 1]) == [Decimal("100"), Decimal("50"), Decimal("50"), Decimal("50")]
+
+
+def test_replay_matches_serial_rules():
+    sec = uuid4()
+    start = date(2025, 1, 1)
+    transactions = [
+        txn(start, "DEPOSIT", amount=Decimal("500")),
+        txn(start + timedelta(days=1), "BUY", sec, Decimal("10"), Decimal("1000")),
+        txn(start + timedelta(days=3), "SELL", sec, Decimal("4"), Decimal("480")),
+        txn(start + timedelta(days=3), "WITHDRAWAL", amount=Decimal("100")),
+    ]
+
+    state = replay_transactions(transactions, start, start + timedelta(days=4))
+    prices = build_price_matrix(start, 5, state.security_ids, [(sec, start, Decimal("110"))])
+    dates, cash, positions, total = value_chunk(state, prices, start, start + timedelta(days=4))
+
+    assert list(cash) == [Decimal("1000500"), Decimal("999500"), Decimal("999500"), Decimal("999880"), Decimal("999880")]
+    assert list(positions) == [Decimal("0"), Decimal("1100"), Decimal("1100"), Decimal("660"), Decimal("660")]
+    assert total[-1] == Decimal("1000540")
+    assert state.cash_flows == {
+        (start, "DEPOSIT"): Decimal("500"),
+        (start + timedelta(days=3), "WITHDRAWAL"): Decimal("-100"),
+    }
+
+
+def test_value_chunk_slices_mid_range():
+    sec = uuid4()
+    start = date(2025, 1, 1)
+    state = replay_transactions(
+        [txn(start, "BUY", sec, Decimal("2"), Decimal("200"))], start, start + timedelta(days=9)
+    )
+    chunk_start = start + timedelta(days=5)
+    prices = build_price_matrix(chunk_start, 5, state.security_ids, [])
+
+    dates, cash, positions, _ = value_chunk(state, prices, chunk_start, start + timedelta(days=9))
+
+    assert dates[0] == chunk_start and len(dates) == 5
+    assert all(p == Decimal("200") for p in positions)
+    assert all(c == Decimal("999800") for c in cash)
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_resumes_only_matching_signature(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = BackfillCheckpoint(path)
+    await checkpoint.mark_done("p1", "sig-a", date(2025, 1, 1))
+
+    reloaded = BackfillCheckpoint(path)
+    assert reloaded.is_done("p1", "sig-a", date(2025, 1, 1))
+    assert not reloaded.is_done("p1", "sig-b", date(2025, 1, 1))
+    assert not reloaded.is_done("p2", "sig-a", date(2025, 1, 1))
+
+
+@pytest.mark.asyncio
+async def test_open_ended_run_resumes_with_its_original_end_date(tmp_path, monkeypatch):
+    import jobs.backfill_daily_values as backfill_module
+
+    today = [date(2025, 11, 10)]
+
+    class Clock(date):
+        @classmethod
+        def today(cls):
+            return today[0]
+
+    monkeypatch.setattr(backfill_module, "date", Clock)
+    path = str(tmp_path / "checkpoint.json")
+    portfolios = [{"id": uuid4(), "first_transaction": date(2025, 1, 1), "base_currency": "USD"}]
+    end_dates = []
+
+    async def backfill_portfolio(portfolio_id, start_date, end_date, base_currency="USD", window_start=None):
+        end_dates.append(end_date)
+        if len(end_dates) == 1:
+            raise RuntimeError("interrupted")
+        return {"chunks_run": 0, "chunks_skipped": 0, "rows": 0, "rows_changed": 0}
+
+    for attempt in range(2):
+        engine = ParallelDailyValueBackfill(pool=None, checkpoint_path=path)
+        engine.backfill_portfolio = backfill_portfolio
+        if attempt == 0:
+            with pytest.raises(RuntimeError):
+                await engine.run(portfolios)
+            # Resumed on a later day
+            today[0] = date(2025, 11, 12)
+        else:
+            await engine.run(portfolios)
+
+    # Same end date on resume, so chunk signatures still match the checkpoint
+    assert end_dates == [date(2025, 11, 10), date(2025, 11, 10)]
+    assert BackfillCheckpoint(path).resumable_end_date() is None
+
+
+@pytest.mark.asyncio
+async def test_rehearsal_replay_without_end_date_resumes_with_checkpoint_end_date(tmp_path, monkeypatch, capsys):
+    import json
+    import sys
+    import jobs.backfill_daily_values as backfill_module
+    import jobs.backfill_rehearsal as rehearsal_module
+
+    today = [date(2025, 11, 10)]
+
+    class Clock(date):
+        @classmethod
+        def today(cls):
+            return today[0]
+
+    rows = [{"id": uuid4(), "first_transaction": date(2025, 1, 1), "base_currency": "USD"}]
+    end_dates = []
+
+    class Engine(ParallelDailyValueBackfill):
+        async def backfill_portfolio(self, portfolio_id, start_date, end_date, base_currency="USD", window_start=None):
+            end_dates.append(end_date)
+            if len(end_dates) == 1:
+                raise RuntimeError("interrupted")
+            return {"chunks_run": 0, "chunks_skipped": 0, "rows": 0, "rows_changed": 0}
+
+        async def run(self, portfolios=None, window_start=None, end_date=None):
+            return await super().run(rows, window_start=window_start, end_date=end_date)
+
+    async def get_db_pool():
+        return None
+
+    monkeypatch.setattr(backfill_module, "date", Clock)
+    monkeypatch.setattr(rehearsal_module, "ParallelDailyValueBackfill", Engine)
+    monkeypatch.setattr(rehearsal_module, "get_db_pool", get_db_pool)
+    path = str(tmp_path / "rehearsal.checkpoint.json")
+    monkeypatch.setattr(sys, "argv", [
+        "backfill_rehearsal", "--start-date", "2025-06-01", "--execute", "--checkpoint", path,
+    ])
+
+    await rehearsal_module.main()  # interrupted (error is logged and printed)
+    today[0] = date(2025, 11, 12)
+    capsys.readouterr()
+    await rehearsal_module.main()
+
+    output = capsys.readouterr().out
+    summary = json.loads(output[output.index("{"):output.rindex("}") + 1])
+    assert end_dates == [date(2025, 11, 10), date(2025, 11, 10)]
+    assert summary["end_date"] == "2025-11-10"
+    assert BackfillCheckpoint(path).resumable_end_date() is None
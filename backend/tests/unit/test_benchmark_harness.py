@@ -0,0 +1,113 @@
+"""
+Unit Tests for the Benchmark Harness
+
+Purpose: Check latency summaries, baseline regression rules, fake provider routing and a default pattern run
+Created: 2025-11-10
+Priority: P2
+"""
+
+import json
+import random
+import urllib.request
+import uuid
+from datetime import date
+
+import pytest
+
+from benchmarks.baseline import compare, summarize
+from benchmarks.fake_providers import FakeProviders
+
+
+def run_entry(p95, p99=None, queries=10, count=10, errors=0):
+    return {
+        "latency_ms": {"count": count, "p95": p95, "p99": p99 if p99 is not None else p95},
+        "db": {"queries": {"metrics.daily_values": queries}},
+        "errors": errors,
+    }
+
+
+def results(**patterns):
+    return {"universe": {"portfolios": 2}, "patterns": patterns}
+
+
+def test_summarize_percentiles():
+    summary = summarize(list(range(1, 101)))
+
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(50.5)
+    assert summary["p99"] == pytest.approx(99.01)
+    assert summarize([])["p95"] is None
+
+
+def test_compare_flags_latency_query_and_error_regressions():
+    baseline = results(a=run_entry(100.0), b=run_entry(100.0), c=run_entry(100.0))
+    current = results(
+        a=run_entry(130.0),                # +30% p95/p99
+        b=run_entry(100.0, queries=20),    # 2 queries/run instead of 1
+        c=run_entry(100.0, errors=1),
+    )
+
+    regressions = compare(current, baseline, tolerance=0.2)
+
+    assert len(regressions) == 4
+    assert any(r.startswith("a: p95") for r in regressions)
+    assert any("named queries/run" in r for r in regressions)
+    assert any(r.startswith("c:") and "errors" in r for r in regressions)
+
+
+def test_compare_ignores_small_absolute_jitter_and_missing_patterns():
+    baseline = results(fast=run_entry(2.0), gone=run_entry(10.0))
+    current = results(fast=run_entry(4.0))
+
+    assert compare(current, baseline, tolerance=0.2) == []
+
+
+def test_fake_providers_route_by_prefix_and_install_env(monkeypatch):
+    with FakeProviders() as fake:
+        env = fake.env()
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+
+        url = f"{env['FRED_BASE_URL']}/series/observations?series_id=UNRATE&observation_start=2024-01-01&observation_end=2024-01-05"
+        with urllib.request.urlopen(url) as response:
+            observations = json.load(response)["observations"]
+        with urllib.request.urlopen(f"{env['FMP_BASE_URL']}/v3/quote/AAA,BBB") as response:
+            quotes = json.load(response)
+
+        assert [o["date"] for o in observations] == ["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+        assert [q["symbol"] for q in quotes] == ["AAA", "BBB"]
+        assert fake.requests["fred"] == 1 and fake.requests["fmp"] == 1
+
+        from app.integrations.fred_provider import FREDProvider
+
+        assert FREDProvider(api_key="x").config.base_url == env["FRED_BASE_URL"]
+
+
+@pytest.mark.asyncio
+async def test_default_run_executes_a_cacheable_pattern(fake_runtime, make_orchestrator):
+    from benchmarks.harness import _NoResultCache, run_pattern_load
+    from benchmarks.seed import SeededUniverse
+
+    orchestrator = make_orchestrator(fake_runtime())
+    assert orchestrator.plans["portfolio_overview"].cache_ttl_seconds
+    orchestrator.result_cache = _NoResultCache()  # what the harness installs without --result-cache
+
+    async def data_version(db, portfolio_id):
+        return "v1"
+
+    orchestrator.portfolio_data_version = data_version
+    portfolio_id, security_id = uuid.uuid4(), uuid.uuid4()
+    universe = SeededUniverse(
+        user_id=uuid.uuid4(),
+        pack_id="PP_2025-11-10",
+        asof_date=date(2025, 11, 10),
+        portfolio_ids=[portfolio_id],
+        holdings={portfolio_id: [security_id]},
+    )
+
+    entry = await run_pattern_load(
+        orchestrator, "portfolio_overview", universe,
+        iterations=2, concurrency=1, warmup=0, trace_memory=False, rng=random.Random(1),
+    )
+
+    assert entry["errors"] == 0 and entry["latency_ms"]["count"] == 2
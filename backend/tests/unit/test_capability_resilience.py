@@ -0,0 +1,193 @@
+"""
+Unit Tests for Capability Resilience
+
+Purpose: Check latency budgets, deadline propagation, hedged reads and circuit breakers in AgentRuntime
+Created: 2025-11-10
+Priority: P1
+"""
+
+import asyncio
+import time
+from dataclasses import replace
+from uuid import uuid4
+
+import pytest
+
+from app.agents.base_agent import BaseAgent
+from app.core.agent_runtime import AgentRuntime
+from app.core.pattern_orchestrator import PATTERN_DEADLINE_SECONDS, with_request_deadline
+from app.core.capability_contract import capability
+from app.core.exceptions import CapabilityTimeoutError, CircuitOpenError
+from app.core.resilience import CircuitBreaker, call_with_budget, policy_for
+
+
+class FlakyProvider(BaseAgent):
+    def __init__(self):
+        super().__init__("flaky_provider", {})
+        self.calls = 0
+        self.fail = False
+        self.bug = False
+        self.delay = 0.0
+
+    def get_capabilities(self):
+        return ["provider.fetch_quote", "ledger.slow"]
+
+    @capability(
+        name="provider.fetch_quote",
+        inputs={"symbol": str},
+        outputs={"price": float},
+        latency_budget_ms=100,
+    )
+    async def provider_fetch_quote(self, ctx, state, symbol):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("provider down")
+        if self.bug:
+            raise KeyError("price")
+        return {"symbol": symbol, "price": 10.0 + self.calls}
+
+    async def ledger_slow(self, ctx, state):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"ok": True}
+
+
+def make_runtime():
+    agent = FlakyProvider()
+    runtime = AgentRuntime({"db": None}, enable_rights_enforcement=False)
+    runtime.register_agent(agent)
+    runtime.retry_delays = [0, 0, 0]
+    return runtime, agent
+
+
+def test_policy_contract_overrides_prefix_defaults():
+    assert policy_for("provider.fetch_quote").hedge is True
+    assert policy_for("ledger.positions").hedge is False
+    assert policy_for("provider.fetch_quote", {"latency_budget_ms": 250}).budget_seconds == 0.25
+    # No prefix policy or contract budget: unbounded
+    assert policy_for("ledger.positions").budget_seconds is None
+    # Hedging is only allowed for idempotent capabilities
+    assert policy_for("ledger.positions", {"hedge": True}).hedge is False
+
+
+@pytest.mark.asyncio
+async def test_budget_timeout_is_not_retried(make_ctx):
+    runtime, agent = make_runtime()
+    agent.delay = 1.0
+
+    started = time.monotonic()
+    with pytest.raises(CapabilityTimeoutError):
+        await runtime.execute_capability("provider.fetch_quote", make_ctx(), {}, symbol="AAPL")
+
+    assert time.monotonic() - started < 0.5
+    assert agent.calls == 1
+    assert runtime.get_resilience_stats()["provider.fetch_quote"]["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_request_deadline_caps_the_budget(make_ctx):
+    runtime, agent = make_runtime()
+    agent.delay = 1.0
+    ctx = make_ctx().with_deadline(0.05)
+
+    started = time.monotonic()
+    with pytest.raises(CapabilityTimeoutError):
+        await runtime.execute_capability("ledger.slow", ctx, {})
+    assert time.monotonic() - started < 0.5
+
+    with pytest.raises(CapabilityTimeoutError, match="deadline passed"):
+        await runtime.execute_capability("ledger.slow", ctx.with_deadline(-1), {})
+
+
+@pytest.mark.asyncio
+async def test_hedge_returns_first_success_and_cancels_the_slow_call():
+    delays = [1.0, 0.01]
+    cancelled = []
+
+    async def call():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    result, hedged = await call_with_budget(call, timeout=2.0, hedge_delay=0.02)
+    await asyncio.sleep(0)
+
+    assert result == 0.01 and hedged is True
+    assert cancelled == [1.0]
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_serves_last_good_result_then_fails_fast(make_ctx):
+    runtime, agent = make_runtime()
+    runtime.max_retries = 0
+    ctx = make_ctx()
+
+    good = await runtime.execute_capability("provider.fetch_quote", ctx, {}, symbol="AAPL")
+    agent.fail = True
+    # 9 failures in the last 10 calls opens the circuit
+    for _ in range(9):
+        with pytest.raises(ConnectionError):
+            await runtime.execute_capability("provider.fetch_quote", make_ctx(), {}, symbol="MSFT")
+
+    calls = agent.calls
+    same_user = replace(ctx, request_id=str(uuid4()))
+    served = await runtime.execute_capability("provider.fetch_quote", same_user, {}, symbol="AAPL")
+    assert served["price"] == good["price"] and served["_provenance"]["type"] == "cached"
+    # Other users never receive this user's result
+    with pytest.raises(CircuitOpenError):
+        await runtime.execute_capability("provider.fetch_quote", make_ctx(), {}, symbol="AAPL")
+    assert agent.calls == calls
+    assert runtime.get_resilience_stats()["provider.fetch_quote"]["breaker"] == "open"
+
+
+def test_breaker_half_open_trial_closes_or_reopens():
+    now = [0.0]
+    breaker = CircuitBreaker(window=4, min_calls=4, error_rate=0.5, cooldown_seconds=10, clock=lambda: now[0])
+    for success in (True, False, True, False):
+        breaker.record(success)
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] = 10.0
+    assert breaker.allow() and not breaker.allow()  # one trial at a time
+    breaker.record(False)
+    assert breaker.state == "open"
+
+    now[0] = 20.0
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == "closed" and breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_unbudgeted_capabilities_only_follow_the_request_deadline(make_ctx):
+    runtime, agent = make_runtime()
+    agent.delay = 0.05
+    policy = policy_for("ledger.slow")
+
+    assert runtime._attempt_timeout("ledger.slow", make_ctx(), policy) is None
+    assert await runtime.execute_capability("ledger.slow", make_ctx(), {}) == {"ok": True}
+    assert await call_with_budget(lambda: asyncio.sleep(0.01, "done"), None) == ("done", False)
+
+    # Only interactive entrypoints add the pattern deadline
+    assert make_ctx().remaining_seconds() is None
+    remaining = with_request_deadline(make_ctx()).remaining_seconds()
+    assert 0 < remaining <= PATTERN_DEADLINE_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_programming_errors_do_not_open_the_circuit(make_ctx):
+    runtime, agent = make_runtime()
+    runtime.max_retries = 0
+    agent.bug = True
+
+    for _ in range(12):
+        with pytest.raises(KeyError):
+            await runtime.execute_capability("provider.fetch_quote", make_ctx(), {}, symbol="AAPL")
+
+    assert agent.calls == 12
+    assert runtime.get_resilience_stats()["provider.fetch_quote"]["breaker"] == "closed"
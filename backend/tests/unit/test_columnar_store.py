@@ -0,0 +1,120 @@
+"""
+Unit Tests for Columnar Time-Series Store
+
+Purpose: Check mmap slicing, per-key coverage and restatement fallback, and atomic version swaps
+Created: 2025-11-10
+Priority: P1
+"""
+
+import numpy as np
+import pytest
+from datetime import date, datetime, timedelta, timezone
+
+from app.db.columnar_store import ColumnarStore, portfolio_value_returns, write_dataset
+
+PID_A = "11111111-1111-1111-1111-111111111111"
+PID_B = "22222222-2222-2222-2222-222222222222"
+EXPORTED_AT = datetime(2024, 6, 1, tzinfo=timezone.utc)
+
+
+def make_store(root, changed=()):
+    calls = []
+
+    async def changed_keys(name, exported_at, max_date):
+        calls.append((name, exported_at, max_date))
+        return set(changed)
+
+    store = ColumnarStore(root, changed_keys=changed_keys)
+    store.calls = calls
+    return store
+
+
+def write_values(root, values_a, values_b, start=date(2024, 1, 1)):
+    keys, dates, totals = [], [], []
+    for pid, values in ((PID_A, values_a), (PID_B, values_b)):
+        for i, value in enumerate(values):
+            keys.append(pid)
+            dates.append(start + timedelta(days=i))
+            totals.append(value)
+    write_dataset(
+        root,
+        "portfolio_daily_values",
+        ("total_value", "cash_flows"),
+        keys,
+        np.array(dates, dtype="datetime64[D]"),
+        {"total_value": np.array(totals), "cash_flows": np.zeros(len(totals))},
+        EXPORTED_AT,
+    )
+
+
+@pytest.mark.asyncio
+async def test_series_slices_one_key_by_date_range(tmp_path):
+    write_values(tmp_path, [100.0, 101.0, 102.0, 103.0], [5.0, 6.0])
+    store = make_store(tmp_path)
+
+    series = await store.series("portfolio_daily_values", PID_A, date(2024, 1, 2), date(2024, 1, 3))
+
+    assert series.dates.astype(date).tolist() == [date(2024, 1, 2), date(2024, 1, 3)]
+    assert series.columns["total_value"].tolist() == [101.0, 102.0]
+    assert isinstance(series.columns["total_value"].base, np.memmap)
+    assert store.calls == [("portfolio_daily_values", EXPORTED_AT, date(2024, 1, 4))]
+
+
+@pytest.mark.asyncio
+async def test_uncovered_end_date_or_missing_dataset_falls_back(tmp_path):
+    write_values(tmp_path, [100.0, 101.0], [5.0])
+    store = make_store(tmp_path)
+
+    assert await store.series("portfolio_daily_values", PID_A, date(2024, 1, 1), date(2024, 1, 3)) is None
+    assert await store.series("prices", "any", None, date(2024, 1, 1)) is None
+    assert store.max_date("portfolio_daily_values") == date(2024, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_absent_keys_and_per_key_gaps_fall_back(tmp_path):
+    write_values(tmp_path, [100.0, 101.0, 102.0], [5.0])
+    store = make_store(tmp_path)
+
+    # Dataset runs to 2024-01-03, but PID_B stops on 2024-01-01
+    assert await store.series("portfolio_daily_values", "missing", None, date(2024, 1, 2)) is None
+    assert await store.series("portfolio_daily_values", PID_B, None, date(2024, 1, 2)) is None
+    assert len(await store.series("portfolio_daily_values", PID_B, None, date(2024, 1, 1))) == 1
+    assert await store.frame("portfolio_daily_values", [PID_A, PID_B], "total_value", None, date(2024, 1, 3)) is None
+
+
+@pytest.mark.asyncio
+async def test_restated_keys_and_unverifiable_snapshots_fall_back(tmp_path):
+    write_values(tmp_path, [100.0, 101.0], [5.0, 6.0])
+    store = make_store(tmp_path, changed={PID_B})
+
+    assert await store.series("portfolio_daily_values", PID_A, None, date(2024, 1, 2)) is not None
+    assert await store.series("portfolio_daily_values", PID_B, None, date(2024, 1, 2)) is None
+    assert len(store.calls) == 1  # change check is cached between reads
+
+    write_dataset(
+        tmp_path, "portfolio_daily_values", ("total_value",), [PID_A],
+        np.array([date(2024, 1, 1)], dtype="datetime64[D]"), {"total_value": np.array([1.0])},
+    )
+    assert await store.series("portfolio_daily_values", PID_A, None, date(2024, 1, 1)) is None
+
+
+def test_new_version_is_picked_up_and_old_versions_pruned(tmp_path):
+    store = make_store(tmp_path)
+    for n in range(2, 5):
+        write_values(tmp_path, [100.0 + i for i in range(n)], [5.0])
+
+    assert store.max_date("portfolio_daily_values") == date(2024, 1, 4)
+    versions = [p for p in (tmp_path / "portfolio_daily_values").iterdir() if p.is_dir()]
+    assert len(versions) == 2
+
+
+@pytest.mark.asyncio
+async def test_value_returns_match_pairwise_database_path(tmp_path):
+    write_values(tmp_path, [100.0, 110.0, 0.0, 50.0, 55.0], [5.0])
+
+    returns = await portfolio_value_returns(
+        PID_A, date(2024, 1, 1), date(2024, 1, 5), store=make_store(tmp_path)
+    )
+
+    assert [d for d, _ in returns] == [date(2024, 1, 2), date(2024, 1, 3), date(2024, 1, 5)]
+    assert [r for _, r in returns] == pytest.approx([0.10, -1.0, 0.10])
@@ -0,0 +1,153 @@
+"""
+Unit Tests for Conditional GET Helpers
+
+Purpose: Check ETag derivation, If-None-Match handling, version caching and response compression
+Created: 2025-11-10
+Priority: P1
+"""
+
+import asyncio
+import gzip
+import json
+from decimal import Decimal
+
+import pytest
+from starlette.requests import Request
+
+import app.api.conditional as conditional_module
+from app.api.conditional import (
+    MIN_COMPRESS_BYTES,
+    ConditionalGet,
+    DataVersion,
+    DataVersionProvider,
+    etag_matches,
+    json_response,
+    make_etag,
+    negotiate_encoding,
+)
+
+VERSION = DataVersion("PP_2025-11-10", "abc123")
+
+
+def make_request(**headers):
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/api/holdings",
+        "headers": [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()],
+    })
+
+
+def test_etag_changes_with_every_key_part():
+    base = make_etag("/api/holdings", "u1", VERSION, {"page": 1, "page_size": 50})
+
+    assert base == make_etag("/api/holdings", "u1", VERSION, {"page_size": 50, "page": 1})
+    assert base.startswith('"') and not base.startswith('W/')
+    variants = {
+        make_etag("/api/portfolio", "u1", VERSION, {"page": 1, "page_size": 50}),
+        make_etag("/api/holdings", "u2", VERSION, {"page": 1, "page_size": 50}),
+        make_etag("/api/holdings", "u1", DataVersion("PP_2025-11-11", "abc123"), {"page": 1, "page_size": 50}),
+        make_etag("/api/holdings", "u1", DataVersion("PP_2025-11-10", "def456"), {"page": 1, "page_size": 50}),
+        make_etag("/api/holdings", "u1", VERSION, {"page": 2, "page_size": 50}),
+    }
+    assert base not in variants and len(variants) == 5
+
+
+def test_if_none_match_lists_weak_tags_and_wildcard():
+    etag = '"abc"'
+
+    assert etag_matches('"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"abcd"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_encoding_negotiation_respects_q_values():
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0, identity") is None
+    assert negotiate_encoding(None) is None
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("br, gzip", "br"),
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("br, gzip;q=0.8", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("br; q=0, gzip;q=0", None),
+    ("*;q=0.3, gzip;q=0.1", "br"),
+    ("gzip;q=0.5, *", "br"),
+    ("*;q=0", None),
+])
+def test_brotli_negotiation_follows_q_values(monkeypatch, header, expected):
+    monkeypatch.setattr(conditional_module, "BROTLI_AVAILABLE", True)
+
+    assert negotiate_encoding(header) == expected
+
+
+def test_brotli_is_never_chosen_when_unavailable(monkeypatch):
+    monkeypatch.setattr(conditional_module, "BROTLI_AVAILABLE", False)
+
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("br, *;q=0.2") == "gzip"
+
+
+def test_large_bodies_are_compressed_small_ones_are_not():
+    payload = {"rows": [{"value": Decimal("1.25"), "symbol": f"S{i}"} for i in range(200)]}
+
+    large = json_response(payload, "gzip")
+    small = json_response({"ok": True}, "gzip")
+
+    assert large.headers["content-encoding"] == "gzip"
+    assert json.loads(gzip.decompress(large.body))["rows"][0] == {"value": 1.25, "symbol": "S0"}
+    assert len(small.body) < MIN_COMPRESS_BYTES and "content-encoding" not in small.headers
+
+
+@pytest.mark.asyncio
+async def test_version_provider_shares_loads_within_ttl():
+    loads = []
+
+    async def loader():
+        loads.append(1)
+        await asyncio.sleep(0)
+        return VERSION
+
+    provider = DataVersionProvider(loader, ttl_seconds=60)
+    results = await asyncio.gather(*(provider.current() for _ in range(5)))
+    await provider.current()
+
+    assert results == [VERSION] * 5 and len(loads) == 1
+    provider.invalidate()
+    await provider.current()
+    assert len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_matching_etag_answers_304_before_work_and_fallbacks_are_untagged():
+    async def loader():
+        return VERSION
+
+    provider = DataVersionProvider(loader)
+    first = await ConditionalGet.open(make_request(), provider, "/api/portfolio", "u1")
+    response = first.respond({"data": 1})
+    etag = response.headers["etag"]
+
+    repeat = await ConditionalGet.open(make_request(if_none_match=etag), provider, "/api/portfolio", "u1")
+    assert repeat.not_modified.status_code == 304
+    assert repeat.not_modified.headers["etag"] == etag
+
+    fallback = first.respond({"data": 0}, cacheable=False)
+    assert "etag" not in fallback.headers
+
+
+@pytest.mark.asyncio
+async def test_unavailable_version_serves_unconditionally():
+    async def loader():
+        raise RuntimeError("database down")
+
+    conditional = await ConditionalGet.open(
+        make_request(if_none_match="*"), DataVersionProvider(loader), "/api/portfolio", "u1"
+    )
+
+    assert conditional.not_modified is None
+    assert "etag" not in conditional.respond({"data": 1}).headers
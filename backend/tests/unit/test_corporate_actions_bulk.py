@@ -0,0 +1,78 @@
+"""
+Unit Tests for Bulk Corporate Actions Sync
+
+Purpose: Cover calendar parsing, in-memory holdings and set-based split planning
+Created: 2025-11-10
+Priority: P2
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+from app.services.corporate_actions_sync import (
+    BulkCorporateActionsSync,
+    parse_dividend_calendar,
+    parse_split_calendar,
+    plan_split_adjustments,
+    shares_held_on,
+)
+
+
+def test_parse_calendars():
+    dividends = parse_dividend_calendar([
+        {"symbol": "AAPL", "date": "2025-11-07", "paymentDate": "2025-11-14", "dividend": 0.24},
+        {"symbol": "BAD", "date": "not-a-date", "dividend": 1},
+    ])
+    splits = parse_split_calendar([{"symbol": "NVDA", "date": "2025-06-10", "numerator": 10, "denominator": 1}])
+
+    assert [d.symbol for d in dividends] == ["AAPL"]
+    assert dividends[0].amount == Decimal("0.24")
+    assert splits[0].ratio == Decimal("10")
+
+
+def test_shares_and_split_plan(make_lot):
+    pid = uuid4()
+    held = make_lot(portfolio_id=pid)
+    closed = make_lot(portfolio_id=pid, quantity_open=Decimal("0"), closed_date=date(2025, 1, 1))
+    later = make_lot(portfolio_id=pid, acquired=date(2025, 6, 1))
+    splits = parse_split_calendar([
+        {"symbol": "AAPL", "date": "2025-03-01", "numerator": 2, "denominator": 1},
+        {"symbol": "AAPL", "date": "2025-07-01", "numerator": 3, "denominator": 1},
+    ])
+
+    assert shares_held_on([held, closed, later], date(2025, 3, 1)) == Decimal("10")
+    ratios = plan_split_adjustments([held, closed, later], splits)
+    assert ratios == {held["id"]: Decimal("6"), later["id"]: Decimal("6")}
+
+
+@pytest.mark.asyncio
+async def test_sync_window_fixed_statements(make_lot, mock_db_connection):
+    lots = [make_lot() for _ in range(25)]
+    conn = mock_db_connection
+
+    def respond(method, sql, args):
+        if method == "fetch" and "FROM lots" in sql:
+            return lots
+        return [] if method == "fetch" else None
+
+    conn.respond = respond
+    dividends = parse_dividend_calendar([
+        {"symbol": "AAPL", "date": "2025-11-07", "paymentDate": "2025-11-14", "dividend": 0.25},
+    ])
+    splits = parse_split_calendar([{"symbol": "AAPL", "date": "2025-11-10", "numerator": 4, "denominator": 1}])
+
+    summary = await BulkCorporateActionsSync(conn).sync_window(
+        date(2025, 11, 1), date(2025, 11, 30), dividends=dividends, splits=splits
+    )
+
+    assert summary["dividends_recorded"] == 25
+    assert summary["splits_recorded"] == 25
+    assert summary["lots_adjusted"] == 25
+    # lots, existing events, staging table, COPY, INSERT ... SELECT, split UPDATE
+    statements = conn.statements()
+    assert [method for method, _, _ in statements] == [
+        "fetch", "fetch", "execute", "copy_records_to_table", "execute", "execute",
+    ]
+    assert len(statements[3][2]) == 50
@@ -0,0 +1,104 @@
+"""
+Unit Tests for Vectorized Cycle Phase Timeline
+
+Purpose: Panel classification must match the per-snapshot detectors row by row
+Created: 2025-11-10
+Priority: P2
+"""
+
+import random
+import numpy as np
+import pytest
+from datetime import date, timedelta
+from unittest.mock import AsyncMock
+
+import app.services.cycles as cycles
+from app.services.cycles import CyclesService
+from app.services.cycle_timeline import PhaseTimeline, build_indicator_panel, classify_panel
+
+SERIES = {
+    "GDP Growth Rate": (-400, 600),
+    "Inflation": (0, 90000),
+    "Unemployment": (300, 1200),
+    "Interest Rate": (0, 600),
+    "Credit Growth": (-5e6, 9e6),
+    "Yield Curve (10Y-2Y)": (-2, 3),
+    "Debt To Gdp": (1e7, 4e7),
+    "Gini Coefficient": (25, 50),
+    "Institutional Trust Index": (0.1, 0.9),
+    "Manufacturing PMI": (40, 1200),
+}
+
+
+def make_observations(days=80, seed=3):
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    observations = []
+    for name, (lo, hi) in SERIES.items():
+        step = rng.choice([1, 5, 20])
+        for i in range(rng.randrange(0, 10), days, step):
+            observations.append((name, start + timedelta(days=i), rng.uniform(lo, hi)))
+    return observations
+
+
+async def snapshot_phases(observations, asof, monkeypatch):
+    latest = {}
+    for name, obs_date, value in sorted(observations, key=lambda o: o[1]):
+        if obs_date <= asof:
+            latest[name] = value
+    rows = [{"indicator_name": name, "value": value} for name, value in latest.items()]
+    monkeypatch.setattr(cycles, "execute_query", AsyncMock(return_value=rows))
+    service = CyclesService()
+    service._queue_phases = lambda phases: None
+    return await service.detect_all_phases(asof)
+
+
+@pytest.mark.asyncio
+async def test_panel_matches_snapshot_detectors(monkeypatch):
+    observations = make_observations()
+    service = CyclesService()
+    dates, X, columns = build_indicator_panel(service.config_manager, observations)
+    timelines = classify_panel(dates, X, columns)
+
+    for i in range(0, len(dates), 7):
+        asof = dates[i].astype(object)
+        phases = await snapshot_phases(observations, asof, monkeypatch)
+        for cycle_type, key in (("STDC", "stdc"), ("LTDC", "ltdc"), ("EMPIRE", "empire"), ("CIVIL", "civil")):
+            assert timelines[cycle_type].phase_numbers[i] == phases[key].phase_number, (cycle_type, asof)
+            assert timelines[cycle_type].composite_scores[i] == pytest.approx(phases[key].composite_score)
+
+
+def test_incremental_panel_matches_full_rebuild():
+    observations = make_observations()
+    config = CyclesService().config_manager
+    full_dates, full_X, columns = build_indicator_panel(config, observations)
+
+    cutoff = full_dates[40].astype(object)
+    seed = {}
+    for name, obs_date, value in sorted(observations, key=lambda o: o[1]):
+        if obs_date <= cutoff:
+            seed[name] = value
+    tail = [obs for obs in observations if obs[1] > cutoff]
+    dates, X, tail_columns = build_indicator_panel(config, tail, seed)
+
+    assert tail_columns == columns
+    np.testing.assert_array_equal(dates, full_dates[41:])
+    np.testing.assert_allclose(X, full_X[41:])
+
+
+def test_transitions_and_spans():
+    timeline = PhaseTimeline(
+        "STDC",
+        np.array(["2024-01-01", "2024-01-02", "2024-01-03", "2024-01-04"], dtype="datetime64[D]"),
+        np.array([1, 1, 2, 4], dtype=np.int16),
+        np.array([0.2, 0.3, 0.4, 0.5]),
+    )
+
+    assert [t["date"] for t in timeline.transitions()] == ["2024-01-03", "2024-01-04"]
+    assert timeline.transitions()[0]["from_phase"] == "Early Recovery"
+    spans = timeline.spans()
+    assert [(s["start"], s["end"]) for s in spans] == [
+        ("2024-01-01", "2024-01-02"), ("2024-01-03", "2024-01-03"), ("2024-01-04", "2024-01-04"),
+    ]
+    assert spans[0]["mean_score"] == pytest.approx(0.25)
+    assert timeline.summary()["since"] == "2024-01-04"
@@ -0,0 +1,82 @@
+"""
+Unit Tests for Cycle Indicator Snapshot and Write-Behind
+
+Purpose: One indicator query for all four detectors; no writes on the read path
+Created: 2025-11-10
+Priority: P1
+"""
+
+import asyncio
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock
+
+import app.services.cycles as cycles
+from app.services.cycles import CyclesService
+
+ROWS = [
+    {"indicator_name": "Yield Curve (10Y-2Y)", "value": 0.5},
+    {"indicator_name": "Unemployment", "value": 4.1},
+]
+
+
+@pytest.fixture
+def service(monkeypatch, mock_db_pool):
+    query = AsyncMock(return_value=ROWS)
+    pool = mock_db_pool
+    monkeypatch.setattr(cycles, "execute_query", query)
+    monkeypatch.setattr(cycles, "get_pool", lambda role: pool)
+    monkeypatch.setattr(cycles, "PHASE_FLUSH_DELAY_SECONDS", 3600)
+    svc = CyclesService()
+    svc.query, svc.pool = query, pool
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_all_detectors_share_one_indicator_query(service):
+    asof = date(2025, 11, 7)
+    phases, stdc, civil = await asyncio.gather(
+        service.detect_all_phases(asof),
+        service.detect_stdc_phase(asof),
+        service.detect_civil_phase(asof.isoformat()),
+    )
+
+    assert service.query.await_count == 1
+    assert service.query.await_args.args[1] == asof
+    assert set(phases) == {"stdc", "ltdc", "empire", "civil"}
+    assert stdc.phase == phases["stdc"].phase
+    assert civil.indicators["institutional_trust"] == 0.38
+    assert service.pool.conn.calls == []
+    service._flush_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_flush_writes_changed_phases_once(service):
+    asof = date(2025, 11, 7)
+    await service.detect_all_phases(asof)
+    service._flush_task.cancel()
+
+    assert await service.flush_phases() == 3
+    method, _, rows = service.pool.conn.calls[-1]
+    assert method == "executemany"
+    assert sorted(row[0] for row in rows) == ["EMPIRE", "LTDC", "STDC"]
+
+    # Unchanged phases are not queued again
+    await service.detect_all_phases(asof)
+    assert service._pending_phases == {}
+    assert await service.flush_phases() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_requeues_phases(service):
+    await service.detect_all_phases(date(2025, 11, 7))
+    service._flush_task.cancel()
+
+    def db_down(method, sql, args):
+        raise RuntimeError("db down")
+
+    service.pool.conn.respond = db_down
+
+    with pytest.raises(RuntimeError):
+        await service.flush_phases()
+    assert len(service._pending_phases) == 3
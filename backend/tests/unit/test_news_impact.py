@@ -0,0 +1,94 @@
+"""
+Unit Tests for News Impact Scoring
+
+Purpose: Cover the single-pass news scorer behind news.compute_portfolio_impact
+Created: 2025-11-10
+Priority: P2
+
+Test Coverage:
+- Keyword sentiment (title vs content weighting, inflections, clamping)
+- Symbol/alias matching and short-symbol guard
+- Vectorized impact scores and threshold filtering
+- Article cache reuse
+"""
+
+import pytest
+
+from app.services.news_impact import NewsImpactScorer
+
+
+@pytest.fixture
+def scorer():
+    return NewsImpactScorer(cache_size=10)
+
+
+@pytest.fixture
+def positions():
+    return [
+        {"symbol": "AAPL", "weight": 40.0},
+        {"symbol": "BRK.B", "weight": 30.0},
+        {"symbol": "T", "weight": 30.0},
+    ]
+
+
+class TestSentiment:
+    def test_title_and_content_weights(self, scorer):
+        scored = scorer.score_article({
+            "url": "u1",
+            "title": "Apple shares surge",
+            "summary": "Record profit reported",
+        })
+        # surge (title 0.15) + record, profit (content 0.05 each)
+        assert scored.sentiment_score == pytest.approx(0.25)
+
+    def test_whole_token_matching(self, scorer):
+        scored = scorer.score_article({"url": "u2", "title": "Software update shipped"})
+        assert scored.sentiment_score == 0.0
+
+    def test_clamped(self, scorer):
+        title = " ".join(["crash plunge slump cut downgrade bearish warning concern"])
+        scored = scorer.score_article({"url": "u3", "title": title, "summary": title})
+        assert scored.sentiment_score == -1.0
+
+
+class TestPortfolioImpact:
+    def test_alias_and_short_symbol(self, scorer, positions):
+        news = [
+            {"url": "a", "title": "BRK-B gains on strong results", "relevance": 1.0},
+            {"url": "b", "title": "a weak quarter for t-mobile rivals", "relevance": 1.0},
+            {"url": "c", "title": "T shares drop after guidance cut", "relevance": 1.0},
+        ]
+        result = scorer.compute_portfolio_impact(news, positions, min_threshold=0.0)
+
+        mentioned = {item["url"]: item["mentioned_symbols"] for item in result["news_with_impact"]}
+        assert mentioned["a"] == ["BRK.B"]
+        assert "b" not in mentioned
+        assert mentioned["c"] == ["T"]
+
+    def test_impact_score_and_threshold(self, scorer, positions):
+        news = [{"url": "x", "title": "AAPL rally", "relevance": 0.5}]
+        result = scorer.compute_portfolio_impact(news, positions, min_threshold=0.0)
+        impact = result["news_with_impact"][0]["position_impacts"][0]
+        # |0.15| × 0.5 × 40 / 100
+        assert impact["impact_score"] == pytest.approx(0.03)
+
+        filtered = scorer.compute_portfolio_impact(news, positions, min_threshold=0.1)
+        assert filtered["news_with_impact"] == []
+        assert filtered["entity_mentions"] == [{"entity": "AAPL", "mention_count": 1}]
+
+    def test_matched_symbol_counts(self, scorer, positions):
+        news = [{"url": "m", "title": "Buffett letter boosts outlook", "matched_symbol": "BRK-B"}]
+        result = scorer.compute_portfolio_impact(news, positions, min_threshold=0.0)
+        assert result["news_with_impact"][0]["mentioned_symbols"] == ["BRK.B"]
+
+    def test_article_cache_reused(self, scorer, positions):
+        news = [{"url": "z", "title": "AAPL surge"}]
+        scorer.compute_portfolio_impact(news, positions)
+        first = scorer.score_article(news[0])
+        scorer.compute_portfolio_impact(news, positions)
+        assert scorer.score_article(news[0]) is first
+
+    def test_empty_inputs(self, scorer):
+        result = scorer.compute_portfolio_impact([], [], min_threshold=0.1)
+        assert result["news_with_impact"] == []
+        assert result["_source"] == "empty"
@@ -0,0 +1,199 @@
+"""
+Unit Tests for Batch Pattern Execution
+
+Purpose: Cover shared-step analysis, result sharing, error isolation and concurrency bounds
+Created: 2025-11-10
+Priority: P1
+"""
+
+import asyncio
+import pytest
+
+from app.core.pattern_plan import compile_pattern, shared_step_indexes, varying_inputs
+
+
+class MacroAgent:
+    async def macro_regime(self, ctx, state, asof_date=None):
+        pass
+
+    async def macro_summary(self, ctx, state):
+        return state.get("regime")
+
+    async def macro_outlook(self, ctx, state, regime=None):
+        pass
+
+
+class LedgerAgent:
+    async def ledger_positions(self, ctx, state, portfolio_id=None):
+        pass
+
+    async def risk_overlay(self, ctx, state, positions=None, regime=None):
+        pass
+
+
+class BatchCapabilities:
+    """Capability results for the batch pattern; tracks concurrency and request deadlines."""
+
+    capability_map = {
+        "macro.regime": "macro",
+        "macro.summary": "macro",
+        "macro.outlook": "macro",
+        "ledger.positions": "ledger",
+        "risk.overlay": "ledger",
+    }
+
+    def __init__(self, fail_portfolio=None, regime_failures=0):
+        self.deadlines = set()
+        self.fail_portfolio = fail_portfolio
+        self.regime_failures = regime_failures
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, capability, ctx, state, **args):
+        self.deadlines.add(ctx.deadline)
+        if capability == "ledger.positions":
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+            if args["portfolio_id"] == self.fail_portfolio:
+                raise RuntimeError("ledger unavailable")
+            return {"portfolio_id": args["portfolio_id"]}
+        if capability == "macro.regime":
+            if self.regime_failures:
+                self.regime_failures -= 1
+                raise RuntimeError("macro provider timeout")
+            return {"regime": "expansion", "_metadata": {"agent_name": "macro"}}
+        return {"capability": capability, "args": args}
+
+
+SPEC = {
+    "id": "batch_unit",
+    "name": "Batch Unit",
+    "inputs": {"portfolio_id": {"required": True}, "lookback": {"default": 30}},
+    "steps": [
+        {"capability": "macro.regime", "as": "regime", "args": {"asof_date": "{{ctx.asof_date}}"}},
+        {"capability": "ledger.positions", "as": "positions",
+         "args": {"portfolio_id": "{{inputs.portfolio_id}}"}},
+        {"capability": "macro.summary", "as": "summary"},
+        {"capability": "risk.overlay", "as": "overlay",
+         "args": {"positions": "{{positions}}", "regime": "{{regime}}"}},
+    ],
+    "outputs": ["regime", "positions", "summary", "overlay"],
+}
+
+
+@pytest.fixture
+def orchestrator_for(fake_runtime, make_orchestrator):
+    """(runtime, capabilities, orchestrator) for the batch pattern plus `specs`."""
+    def make(*specs, **kwargs):
+        capabilities = BatchCapabilities(**kwargs)
+        runtime = fake_runtime(
+            capabilities,
+            capability_map=BatchCapabilities.capability_map,
+            agents={"macro": MacroAgent(), "ledger": LedgerAgent()},
+        )
+        return runtime, capabilities, make_orchestrator(runtime, SPEC, *specs)
+    return make
+
+
+async def collect(iterator):
+    return [event async for event in iterator]
+
+
+def test_shared_steps_exclude_varying_and_dependent_steps(orchestrator_for):
+    plan = compile_pattern(SPEC)
+    varying = varying_inputs([{"portfolio_id": "p1", "lookback": 30}, {"portfolio_id": "p2", "lookback": 30}])
+    _, _, orchestrator = orchestrator_for()
+
+    shared = shared_step_indexes(plan, varying, orchestrator._is_portfolio_bound)
+
+    assert varying == {"portfolio_id"}
+    # macro.summary reads pattern state directly, so it is never shared
+    assert shared == {0}
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_shared_steps_once(orchestrator_for, make_ctx):
+    runtime, _, orchestrator = orchestrator_for()
+    input_sets = [{"portfolio_id": f"p{i}"} for i in range(5)]
+
+    events = await collect(orchestrator.run_pattern_batch("batch_unit", make_ctx(), input_sets))
+
+    items = sorted((e for e in events if e["event"] == "item"), key=lambda e: e["index"])
+    assert events[0]["event"] == "shared" and events[0]["steps"][0]["as"] == "regime"
+    assert runtime.call_counts()["macro.regime"] == 1
+    assert runtime.call_counts()["ledger.positions"] == 5
+    assert [item["data"]["positions"]["portfolio_id"] for item in items] == [f"p{i}" for i in range(5)]
+    assert items[0]["data"]["regime"] == {"regime": "expansion"}
+    assert items[0]["trace"]["steps"][0]["shared"] is True
+    assert events[-1] == {**events[-1], "event": "complete", "total": 5, "succeeded": 5, "failed": 0}
+
+
+@pytest.mark.asyncio
+async def test_batch_isolates_item_errors_and_bounds_concurrency(orchestrator_for, make_ctx):
+    _, capabilities, orchestrator = orchestrator_for(fail_portfolio="p2")
+    input_sets = [{"portfolio_id": f"p{i}"} for i in range(6)]
+
+    events = await collect(
+        orchestrator.run_pattern_batch("batch_unit", make_ctx(), input_sets, max_concurrency=2)
+    )
+
+    errors = [e for e in events if e["event"] == "item_error"]
+    assert [e["index"] for e in errors] == [2]
+    assert "ledger unavailable" in errors[0]["error"]
+    assert events[-1]["succeeded"] == 5 and events[-1]["failed"] == 1
+    assert capabilities.max_in_flight <= 2
+
+
+@pytest.mark.asyncio
+async def test_single_item_batch_shares_nothing(orchestrator_for, make_ctx):
+    runtime, _, orchestrator = orchestrator_for()
+
+    events = await collect(
+        orchestrator.run_pattern_batch("batch_unit", make_ctx(), [{"portfolio_id": "p1"}])
+    )
+
+    assert events[0]["steps"] == []
+    assert runtime.call_counts()["macro.regime"] == 1
+    assert events[1]["event"] == "item"
+
+
+@pytest.mark.asyncio
+async def test_failed_shared_step_drops_its_shared_dependents(orchestrator_for, make_ctx):
+    spec = {
+        "id": "batch_chain",
+        "name": "Batch Chain",
+        "inputs": {"portfolio_id": {"required": True}},
+        "steps": [
+            {"capability": "macro.regime", "as": "regime", "args": {"asof_date": "{{ctx.asof_date}}"}},
+            {"capability": "macro.outlook", "as": "outlook", "args": {"regime": "{{regime}}"}},
+            {"capability": "ledger.positions", "as": "positions",
+             "args": {"portfolio_id": "{{inputs.portfolio_id}}"}},
+        ],
+        "outputs": ["regime", "outlook", "positions"],
+    }
+    runtime, _, orchestrator = orchestrator_for(spec, regime_failures=1)
+    input_sets = [{"portfolio_id": f"p{i}"} for i in range(3)]
+
+    events = await collect(orchestrator.run_pattern_batch("batch_chain", make_ctx(), input_sets))
+
+    # Neither the failed step nor the step reading its result is shared
+    assert events[0]["steps"] == []
+    assert runtime.call_counts()["macro.outlook"] == 3
+    items = [e for e in events if e["event"] == "item"]
+    assert all(item["data"]["outlook"]["args"]["regime"] == {"regime": "expansion"} for item in items)
+    assert events[-1]["succeeded"] == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_items_do_not_inherit_the_request_deadline(orchestrator_for, make_ctx):
+    _, capabilities, orchestrator = orchestrator_for()
+    input_sets = [{"portfolio_id": f"p{i}"} for i in range(3)]
+
+    events = await collect(
+        orchestrator.run_pattern_batch("batch_unit", make_ctx().with_deadline(60), input_sets)
+    )
+
+    assert events[-1]["succeeded"] == 3
+    assert capabilities.deadlines == {None}
@@ -0,0 +1,132 @@
+"""
+Unit Tests for Pattern Result Cache
+
+Purpose: Cover key scoping, LRU/Redis tiers, invalidation and cache-served traces
+Created: 2025-11-10
+Priority: P1
+"""
+
+import pytest
+from decimal import Decimal
+from uuid import uuid4
+
+from app.core.pattern_cache import PatternResultCache
+
+USER_ID = uuid4()
+
+
+@pytest.fixture
+def make_ctx(make_ctx):
+    """Contexts for one user, so only the overridden field changes the key."""
+    def make(**fields):
+        return make_ctx(**{"user_id": USER_ID, **fields})
+    return make
+
+
+class FakeAsyncRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.store[key] = value
+
+
+def test_key_scopes_pack_ledger_user_and_inputs(make_ctx):
+    cache = PatternResultCache()
+    ctx = make_ctx()
+    key = cache.make_key("p", ctx, {"a": 1, "b": 2})
+
+    assert key == cache.make_key("p", make_ctx(), {"b": 2, "a": 1})
+    assert key != cache.make_key("p", make_ctx(pricing_pack_id="PP_2025-11-11"), {"a": 1, "b": 2})
+    assert key != cache.make_key("p", make_ctx(ledger_commit_hash="def456"), {"a": 1, "b": 2})
+    assert key != cache.make_key("p", make_ctx(user_id=uuid4()), {"a": 1, "b": 2})
+    assert key != cache.make_key("p", ctx, {"a": 1, "b": 3})
+    assert key != cache.make_key("p", ctx, {"a": 1, "b": 2}, data_version="v2")
+
+
+@pytest.mark.asyncio
+async def test_lru_hit_returns_copy_and_evicts_oldest(make_ctx):
+    cache = PatternResultCache(max_entries=2)
+    ctx = make_ctx()
+    await cache.set("k1", {"data": {"x": [1]}}, 60, ctx)
+    await cache.set("k2", {"data": {}}, 60, ctx)
+
+    hit = await cache.get("k1")
+    hit["data"]["x"].append(2)
+    assert (await cache.get("k1"))["data"]["x"] == [1]
+    assert hit["_cache"]["tier"] == "memory"
+
+    await cache.set("k3", {"data": {}}, 60, ctx)
+    assert await cache.get("k2") is None  # least recently used
+
+
+@pytest.mark.asyncio
+async def test_new_pack_purges_old_generation(make_ctx):
+    cache = PatternResultCache()
+    old = make_ctx()
+    cache.observe_generation(old)
+    await cache.set("k", {"data": {}}, 60, old)
+
+    cache.observe_generation(make_ctx(pricing_pack_id="PP_2025-11-11"))
+
+    assert await cache.get("k") is None
+    assert cache.stats["invalidated"] == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_serves_other_processes(make_ctx):
+    redis = FakeAsyncRedis()
+    ctx = make_ctx()
+    await PatternResultCache(redis=redis).set("k", {"data": {"v": Decimal("2.5")}}, 60, ctx)
+
+    hit = await PatternResultCache(redis=redis).get("k")
+
+    assert hit["data"]["v"] == 2.5
+    assert hit["_cache"]["tier"] == "redis"
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_serves_repeat_runs_from_cache(fake_runtime, make_orchestrator, make_ctx):
+    runtime = fake_runtime(lambda capability, ctx, state, **args: {"value": Decimal("1.5"), "args": args})
+    versions = {"p1": "v1", "p2": "v1"}
+
+    async def data_version(db, portfolio_id):
+        return versions[portfolio_id]
+
+    spec = {
+        "id": "cached_unit",
+        "name": "Cached Unit",
+        "cache": {"enabled": True, "ttl_seconds": 60},
+        "inputs": {"portfolio_id": {"required": True}},
+        "steps": [{"capability": "a.b", "as": "out", "args": {"pid": "{{inputs.portfolio_id}}"}}],
+        "outputs": ["out"],
+    }
+    orchestrator = make_orchestrator(runtime, spec)
+    orchestrator.portfolio_data_version = data_version
+
+    first = await orchestrator.run_pattern("cached_unit", make_ctx(), {"portfolio_id": "p1"})
+    second_ctx = make_ctx()
+    second = await orchestrator.run_pattern("cached_unit", second_ctx, {"portfolio_id": "p1"})
+    await orchestrator.run_pattern("cached_unit", make_ctx(), {"portfolio_id": "p2"})
+
+    assert len(runtime.calls) == 2
+    assert first["trace"]["cache"] == {"served": False}
+    assert second["trace"]["cache"]["served"] is True
+    assert second["trace"]["request_id"] == second_ctx.request_id
+    assert second["data"] == first["data"]
+
+    # A trade recorded for p1 moves its data version: the cached result is not served
+    versions["p1"] = "v2"
+    third = await orchestrator.run_pattern("cached_unit", make_ctx(), {"portfolio_id": "p1"})
+    assert len(runtime.calls) == 3 and third["trace"]["cache"] == {"served": False}
+
+    # Without a data version the pattern runs uncached
+    async def unavailable(db, portfolio_id):
+        raise ConnectionError("db down")
+
+    orchestrator.portfolio_data_version = unavailable
+    fourth = await orchestrator.run_pattern("cached_unit", make_ctx(), {"portfolio_id": "p1"})
+    assert len(runtime.calls) == 4 and "cache" not in fourth["trace"]
@@ -0,0 +1,120 @@
+"""
+Unit Tests for Compiled Pattern Plans
+
+Purpose: Verify compiled plan resolution, conditions and execution
+Created: 2025-11-10
+Priority: P1
+"""
+
+import pytest
+
+from app.core.pattern_plan import compile_condition, compile_pattern, compile_value
+
+
+@pytest.fixture
+def orchestrator(fake_runtime, make_orchestrator):
+    return make_orchestrator(fake_runtime())
+
+
+STATE = {
+    "ctx": {"pricing_pack_id": "PP_2025-11-10", "portfolio_id": "p1"},
+    "inputs": {"include_performance": True, "flag": False, "symbol": "AAPL", "n": 3},
+    "position": {"asset_class": "equity", "qty": 1.5},
+    "fundamentals": {"pe": 20},
+    "positions": [1, 2, 3],
+}
+
+
+@pytest.mark.parametrize("condition,expected", [
+    ("{{inputs.include_performance}}", True),
+    ("{{inputs.flag}}", False),
+    ("{{position.asset_class}} == 'equity'", True),
+    ("{{position.asset_class}} != 'equity'", False),
+    ("{{fundamentals}} != null", False),
+    ("{{missing}} == null", True),
+    ("positions.length > 2", True),
+    ("{{inputs.n}} >= 3 and {{inputs.symbol}} == 'AAPL'", True),
+    ("{{inputs.flag}} or {{position.qty}} > 1", True),
+    ("not {{inputs.flag}}", True),
+    ("true", True),
+])
+def test_compiled_conditions(condition, expected):
+    assert compile_condition(condition).evaluate(STATE) is expected
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("{{ctx.pricing_pack_id}}", "PP_2025-11-10"),
+    ("{{position.asset_class}}", "equity"),
+    ({"nested": ["{{inputs.symbol}}", 5], "plain": "text"}, {"nested": ["AAPL", 5], "plain": "text"}),
+    (42, 42),
+])
+def test_compiled_values(value, expected):
+    assert compile_value(value).resolve(STATE) == expected
+
+
+def test_required_ctx_arg_raises_when_none():
+    plan = compile_pattern({
+        "id": "p",
+        "steps": [{"capability": "x.y", "args": {"pack": "{{ctx.pricing_pack_id}}"}}],
+        "outputs": [],
+    })
+
+    with pytest.raises(ValueError, match="ctx.pricing_pack_id"):
+        plan.steps[0].resolve_args({"ctx": {"pricing_pack_id": None}})
+
+
+def test_plan_records_dependencies_and_defaults():
+    plan = compile_pattern({
+        "id": "p",
+        "inputs": {"portfolio_id": {"required": True}, "lookback": {"default": 252}},
+        "steps": [
+            {"capability": "a.b", "as": "positions", "args": {"portfolio_id": "{{inputs.portfolio_id}}"}},
+            {"capability": "c.d", "as": "perf", "args": {"rows": "{{positions.positions}}"},
+             "condition": "{{inputs.lookback}} > 0"},
+        ],
+        "outputs": ["perf"],
+    })
+
+    assert plan.steps[1].depends_on == {"positions", "inputs"}
+    assert plan.apply_defaults({"portfolio_id": "x"}) == {"portfolio_id": "x", "lookback": 252}
+    assert plan.missing_inputs({}) == ("portfolio_id",)
+    with pytest.raises(Exception):
+        plan.steps[0].index = 5  # frozen
+
+
+def test_all_repo_patterns_compile(orchestrator):
+    assert orchestrator.plans
+    assert set(orchestrator.plans) == set(orchestrator.patterns)
+
+
+@pytest.mark.asyncio
+async def test_run_pattern_uses_plan_and_caches_validation(orchestrator, make_ctx, monkeypatch):
+    spec = {
+        "id": "unit_plan",
+        "name": "Unit Plan",
+        "inputs": {"symbol": {"default": "AAPL"}},
+        "steps": [
+            {"capability": "a.quote", "as": "quote", "args": {"symbol": "{{inputs.symbol}}"}},
+            {"capability": "a.skip", "as": "skipped", "condition": "{{inputs.never}} == true"},
+        ],
+        "outputs": ["quote", "skipped"],
+    }
+    orchestrator.patterns["unit_plan"] = spec
+    orchestrator.plans["unit_plan"] = compile_pattern(spec)
+
+    calls = []
+    original = orchestrator._validate_capabilities
+
+    def counting(pattern_id, spec):
+        calls.append(pattern_id)
+        return original(pattern_id, spec)
+
+    monkeypatch.setattr(orchestrator, "_validate_capabilities", counting)
+
+    ctx = make_ctx()
+    first = await orchestrator.run_pattern("unit_plan", ctx, {})
+    await orchestrator.run_pattern("unit_plan", ctx, {})
+
+    assert first["data"]["quote"]["args"] == {"symbol": "AAPL"}
+    assert first["data"]["skipped"] is None
+    assert calls == ["unit_plan"]
@@ -0,0 +1,117 @@
+"""
+Unit Tests for Streaming Pattern Execution
+
+Purpose: Cover per-step events from stream_pattern and SSE/NDJSON encoding
+Created: 2025-11-10
+Priority: P1
+"""
+
+import asyncio
+import json
+import pytest
+from decimal import Decimal
+from uuid import uuid4
+
+from app.api.streaming import (
+    NDJSON_MEDIA_TYPE,
+    SSE_MEDIA_TYPE,
+    encode_event,
+    encode_stream,
+    negotiate_stream_format,
+)
+
+SPEC = {
+    "id": "stream_unit",
+    "name": "Stream Unit",
+    "steps": [
+        {"capability": "a.first", "as": "first"},
+        {"capability": "a.skip", "as": "skipped", "condition": "{{inputs.never}} == true"},
+        {"capability": "a.second", "as": "second"},
+    ],
+    "outputs": ["first", "second"],
+}
+
+
+@pytest.fixture
+def orchestrator_for(fake_runtime, make_orchestrator):
+    """(runtime, orchestrator) whose capabilities fail or block on the named capability."""
+    def make(fail_on=None, block_on=None):
+        async def respond(capability, ctx, state, **args):
+            if capability == fail_on:
+                raise RuntimeError("provider down")
+            if capability == block_on:
+                try:
+                    await asyncio.sleep(60)
+                except asyncio.CancelledError:
+                    runtime.cancelled = True
+                    raise
+            return {"capability": capability, "value": Decimal("1.5")}
+
+        runtime = fake_runtime(respond)
+        runtime.cancelled = False
+        return runtime, make_orchestrator(runtime, SPEC)
+    return make
+
+
+async def collect(iterator):
+    return [event async for event in iterator]
+
+
+@pytest.mark.asyncio
+async def test_stream_yields_step_events_then_complete(orchestrator_for, make_ctx):
+    _, orchestrator = orchestrator_for()
+
+    events = await collect(orchestrator.stream_pattern("stream_unit", make_ctx(), {}))
+
+    assert [e["event"] for e in events] == ["step", "step", "step", "complete"]
+    assert [e["as"] for e in events[:3]] == ["first", "skipped", "second"]
+    assert events[0]["output"]["capability"] == "a.first"
+    assert events[1]["output"] is None and events[1]["trace"]["skipped"] is True
+    assert events[2]["step_count"] == 3 and events[2]["is_output"] is True
+    assert events[-1]["data"]["second"]["capability"] == "a.second"
+
+
+@pytest.mark.asyncio
+async def test_stream_reports_failure_as_error_event(orchestrator_for, make_ctx):
+    _, orchestrator = orchestrator_for(fail_on="a.second")
+
+    events = await collect(orchestrator.stream_pattern("stream_unit", make_ctx(), {}))
+
+    assert [e["event"] for e in events] == ["step", "step", "error"]
+    assert "provider down" in events[-1]["error"]
+
+
+@pytest.mark.asyncio
+async def test_closing_stream_cancels_running_pattern(orchestrator_for, make_ctx):
+    runtime, orchestrator = orchestrator_for(block_on="a.second")
+
+    stream = orchestrator.stream_pattern("stream_unit", make_ctx(), {})
+    first = await stream.__anext__()
+    await stream.aclose()
+    await asyncio.sleep(0)
+
+    assert first["as"] == "first"
+    assert runtime.cancelled is True
+
+
+def test_negotiate_and_encode_formats():
+    assert negotiate_stream_format(None) == SSE_MEDIA_TYPE
+    assert negotiate_stream_format("application/x-ndjson") == NDJSON_MEDIA_TYPE
+
+    event = {"event": "step", "output": {"v": Decimal("2.5"), "id": uuid4()}}
+    sse = encode_event(event, SSE_MEDIA_TYPE)
+    ndjson = encode_event(event, NDJSON_MEDIA_TYPE)
+
+    assert sse.startswith("event: step\ndata: ") and sse.endswith("\n\n")
+    assert json.loads(ndjson)["output"]["v"] == 2.5
+
+
+@pytest.mark.asyncio
+async def test_encode_stream_turns_exceptions_into_error_event():
+    async def events():
+        yield {"event": "step"}
+        raise RuntimeError("boom")
+
+    lines = await collect(encode_stream(events(), NDJSON_MEDIA_TYPE))
+
+    assert [json.loads(line)["event"] for line in lines] == ["step", "error"]
@@ -0,0 +1,133 @@
+"""
+Unit Tests for Role Pool Routing
+
+Purpose: Cover read/batch/write routing, fallbacks, per-pool limits and wait metrics
+Created: 2025-11-10
+Priority: P1
+"""
+
+import asyncio
+import pytest
+
+from app.db import connection
+from app.db.connection import (
+    POOL_BATCH,
+    POOL_READ,
+    POOL_WRITE,
+    ManagedPool,
+    PoolManager,
+    execute_query,
+    execute_statement,
+    get_db_pool,
+    get_pool,
+    use_pool,
+)
+
+
+@pytest.fixture
+def named_pool(fake_pool):
+    """Pool whose rows and statuses name the pool that served them."""
+    def make(name):
+        def respond(method, sql, args):
+            return [{"pool": name}] if method == "fetch" else f"INSERT 0 1 {name}"
+        return fake_pool(name, respond)
+    return make
+
+
+@pytest.fixture
+def manager(monkeypatch, named_pool):
+    storage = connection._get_pool_storage()
+    manager = PoolManager()
+    monkeypatch.setattr(storage, "manager", manager)
+    monkeypatch.setattr(storage, "pool", named_pool("primary"))
+    manager.register(POOL_WRITE, storage.pool)
+    return manager
+
+
+@pytest.mark.asyncio
+async def test_roles_fall_back_to_primary(manager):
+    rows = await execute_query("SELECT 1")
+
+    assert rows == [{"pool": "primary"}]
+    assert get_pool(POOL_BATCH).name == POOL_WRITE
+
+
+@pytest.mark.asyncio
+async def test_reads_route_to_read_pool_and_writes_to_primary(manager, named_pool):
+    manager.register(POOL_READ, named_pool("replica"), replica=True)
+
+    rows = await execute_query("SELECT 1")
+    status = await execute_statement("INSERT INTO t VALUES (1)")
+    with use_pool(POOL_WRITE):
+        primary_rows = await execute_query("SELECT 1")
+
+    assert rows == [{"pool": "replica"}]
+    assert status.endswith("primary")
+    assert primary_rows == [{"pool": "primary"}]
+    assert manager.snapshot()[POOL_READ]["acquired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_scope_routes_everything_to_batch_pool(manager, named_pool):
+    manager.register(POOL_READ, named_pool("replica"))
+    manager.register(POOL_BATCH, named_pool("batch"))
+
+    async def job():
+        rows = await execute_query("SELECT 1")
+        status = await execute_statement("UPDATE t SET x = 1")
+        return rows, status
+
+    with use_pool(POOL_BATCH):
+        rows, status = await asyncio.create_task(job())
+        legacy = get_db_pool()
+
+    assert rows == [{"pool": "batch"}]
+    assert status.endswith("batch")
+    assert legacy.name == POOL_BATCH
+    assert get_db_pool().name == "primary"
+
+
+@pytest.mark.asyncio
+async def test_managed_pool_enforces_limit_and_records_waits(fake_pool):
+    managed = ManagedPool("batch", fake_pool("batch"), limit=2)
+    release = asyncio.Event()
+
+    async def hold():
+        async with managed.acquire():
+            await release.wait()
+
+    holders = [asyncio.create_task(hold()) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert managed.in_use == 2 and managed.waiting == 1
+
+    release.set()
+    await asyncio.gather(*holders)
+    snapshot = managed.snapshot()
+    assert snapshot["peak_in_use"] == 2
+    assert snapshot["acquired"] == 3
+    assert snapshot["wait_ms"]["count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_acquire_timeout_is_counted(fake_pool):
+    managed = ManagedPool("read", fake_pool("read"), limit=1, acquire_timeout=0.01)
+
+    async with managed.acquire():
+        with pytest.raises(asyncio.TimeoutError):
+            async with managed.acquire():
+                pass
+
+    assert managed.timeouts == 1
+    assert managed.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_close_keeps_primary_for_owner(manager, fake_pool):
+    batch = fake_pool("batch")
+    manager.register(POOL_BATCH, batch)
+    primary = manager.pools[POOL_WRITE].pool
+
+    await manager.close(keep=primary)
+
+    assert batch.closed and not primary.closed
+    assert manager.pools == {}
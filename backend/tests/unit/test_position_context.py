@@ -0,0 +1,183 @@
+"""
+Unit Tests for the Shared Position Context
+
+Purpose: Check deep-dive computations from an in-memory PositionContext and the once-per-run load
+Created: 2025-11-10
+Priority: P1
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+import app.agents.financial_analyst as financial_analyst_module
+import app.services.position_context as position_context_module
+from app.agents.financial_analyst import FinancialAnalyst
+from app.core.types import RequestCtx
+from app.services.position_context import (
+    PositionContext,
+    portfolio_contribution,
+    position_currency_attribution,
+    position_details,
+    position_return,
+    position_risk,
+    transaction_history,
+)
+
+PORTFOLIO_ID = uuid4()
+SECURITY_ID = uuid4()
+OTHER_ID = uuid4()
+PACK_DATE = date(2025, 11, 10)
+
+
+class Service:
+    """Placeholder for services the deep-dive capabilities do not use."""
+
+
+def make_context(days=120, security_currency="USD", seed=7):
+    rng = np.random.default_rng(seed)
+    dates = np.array([PACK_DATE - timedelta(days=days - 1 - i) for i in range(days)], dtype="datetime64[D]")
+    portfolio_returns = rng.normal(0.0004, 0.01, days)
+    position_returns = 1.5 * portfolio_returns + rng.normal(0, 0.002, days)
+    closes = 100 * np.cumprod(1 + position_returns)
+    portfolio_returns[10:15] = np.nan  # missing portfolio_metrics rows
+    lots = [
+        {"security_id": SECURITY_ID, "symbol": "AAA", "quantity_open": Decimal("10"),
+         "cost_basis_per_share": Decimal("90"), "currency": security_currency, "close": Decimal(str(closes[-1]))},
+        {"security_id": SECURITY_ID, "symbol": "AAA", "quantity_open": Decimal("30"),
+         "cost_basis_per_share": Decimal("110"), "currency": security_currency, "close": Decimal(str(closes[-1]))},
+    ]
+    other = [
+        {"security_id": OTHER_ID, "symbol": "BBB", "quantity_open": Decimal("100"),
+         "cost_basis_per_share": Decimal("50"), "currency": "USD", "close": Decimal("60")},
+    ]
+    return PositionContext(
+        portfolio_id=PORTFOLIO_ID,
+        security_id=SECURITY_ID,
+        pack_id="PP_2025-11-10",
+        pack_date=PACK_DATE,
+        base_currency="USD",
+        symbol="AAA",
+        name="Alpha Corp",
+        security_type="equity",
+        security_currency=security_currency,
+        portfolio_lots=lots + other,
+        lots=lots,
+        transactions=[
+            {"transaction_date": date(2025, 6, 1), "transaction_type": "BUY", "quantity": Decimal("30"),
+             "price": Decimal("110"), "total_value": Decimal("3300"), "commission": None, "realized_pl": None},
+            {"transaction_date": date(2025, 1, 2), "transaction_type": "BUY", "quantity": Decimal("10"),
+             "price": Decimal("90"), "total_value": Decimal("900"), "commission": Decimal("1"), "realized_pl": None},
+        ],
+        history_days=365,
+        dates=dates,
+        closes=closes,
+        fx_rates=np.linspace(1.0, 1.1, days),
+        portfolio_returns=portfolio_returns,
+    )
+
+
+def test_details_weight_and_cost_from_shared_lots():
+    pctx = make_context()
+    price = float(pctx.lots[0]["close"])
+
+    details = position_details(pctx)
+
+    assert details["quantity"] == 40
+    assert details["avg_cost"] == pytest.approx(105)
+    assert details["market_value"] == pytest.approx(40 * price)
+    assert details["weight"] == pytest.approx(40 * price / (40 * price + 6000))
+    assert details["asset_class"] == "equity"
+
+
+def test_return_and_risk_align_position_with_portfolio_dates():
+    pctx = make_context()
+
+    perf = position_return(pctx, 60)
+    risk = position_risk(pctx, 252)
+
+    window = pctx.closes[pctx.window(60)]
+    assert perf["total_return"] == pytest.approx(window[-1] / window[0] - 1, abs=1e-6)
+    assert perf["data_points"] == 61
+    # 119 daily returns, 5 missing portfolio rows
+    assert risk["data_points"] == 114
+    assert risk["beta_to_portfolio"] == pytest.approx(1.5, abs=0.1)
+    assert risk["correlation"] > 0.95
+
+
+def test_currency_attribution_and_contribution():
+    pctx = make_context(security_currency="EUR")
+
+    attribution = position_currency_attribution(pctx, 252)
+    contribution = portfolio_contribution(position_details(pctx), {"total_return": 0.2}, Decimal("0.1"))
+
+    assert attribution["fx_contribution"] == pytest.approx(0.1)
+    assert attribution["total_contribution"] == pytest.approx(
+        attribution["local_contribution"] * 1.1 + 0.1
+    )
+    assert contribution["pct_of_portfolio_return"] == pytest.approx(contribution["weight"] * 200)
+
+
+def test_transaction_history_limits_newest_first():
+    history = transaction_history(make_context().transactions, limit=1)
+
+    assert history["count"] == 1
+    assert history["transactions"][0]["transaction_date"] == "2025-06-01"
+    assert history["transactions"][0]["commission"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_deep_dive_steps_share_one_context_load(monkeypatch):
+    loads = []
+
+    async def fake_load(conn, portfolio_id, security_id, pack_id, lookback_days=252):
+        loads.append((portfolio_id, security_id, pack_id))
+        await asyncio.sleep(0)
+        return make_context()
+
+    @asynccontextmanager
+    async def fake_connection(user_id):
+        yield object()
+
+    agent = FinancialAnalyst(
+        "financial_analyst",
+        {name: Service() for name in ("pricing_service", "optimizer_service", "ratings_service")},
+    )
+
+    async def fake_twr(ctx, state, portfolio_id=None, asof_date=None, pack_id=None, lookback_days=None):
+        return {"twr_1y": 0.08}
+
+    async def fake_fundamentals(ctx, security_id, symbol, name, asset_class):
+        return {"symbol": symbol, "asset_class": asset_class}
+
+    monkeypatch.setattr(position_context_module, "load_position_context", fake_load)
+    monkeypatch.setattr(financial_analyst_module, "get_rls_read_connection", fake_connection)
+    monkeypatch.setattr(agent, "metrics_compute_twr", fake_twr)
+    monkeypatch.setattr(agent, "_fetch_fundamentals", fake_fundamentals)
+
+    ctx = RequestCtx(
+        pricing_pack_id="PP_2025-11-10", ledger_commit_hash="abc", trace_id="t",
+        user_id=uuid4(), request_id="r", base_currency="USD",
+    )
+    state = {}
+    args = (ctx, state, str(PORTFOLIO_ID), str(SECURITY_ID))
+    details, perf, contribution, risk = await asyncio.gather(
+        agent.get_position_details(*args),
+        agent.compute_position_return(*args),
+        agent.compute_portfolio_contribution(*args),
+        agent.compute_position_risk(*args),
+    )
+    fundamentals = await agent.get_security_fundamentals(ctx, state, str(SECURITY_ID))
+    transactions = await agent.get_transaction_history(*args)
+
+    assert len(loads) == 1
+    assert contribution["portfolio_return"] == pytest.approx(0.08)
+    assert contribution["weight"] == pytest.approx(details["weight"])
+    assert fundamentals == {"symbol": "AAA", "asset_class": "equity"}
+    assert transactions["count"] == 2
+    assert "error" not in risk and "error" not in perf
@@ -0,0 +1,163 @@
+"""
+Unit Tests for Pattern Profiling
+
+Purpose: Check sampled call trees, per-step cpu/db/await breakdown and rolling flame graphs
+Created: 2025-11-10
+Priority: P2
+"""
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import replace
+from uuid import uuid4
+
+import pytest
+
+from app.agents.base_agent import BaseAgent
+from app.core.agent_runtime import AgentRuntime
+from app.core.profiling import (
+    FlameGraphStore,
+    build_call_tree,
+    get_flame_graph_store,
+    header_requests_profile,
+    record_db_time,
+)
+
+
+def burn_cpu(seconds):
+    until = time.perf_counter() + seconds
+    while time.perf_counter() < until:
+        sum(range(200))
+
+
+async def respond(capability, ctx, state, **args):
+    if capability == "calc.crunch":
+        burn_cpu(0.15)
+    elif capability == "db.load":
+        await asyncio.sleep(0.05)
+        record_db_time(0.05)
+    else:
+        await asyncio.sleep(0.1)
+    return {"capability": capability}
+
+
+SPEC = {
+    "id": "profile_unit",
+    "name": "Profile Unit",
+    "steps": [
+        {"capability": "calc.crunch", "as": "crunch"},
+        {"capability": "db.load", "as": "rows"},
+        {"capability": "provider.wait", "as": "quote"},
+    ],
+    "outputs": ["crunch", "rows", "quote"],
+}
+
+
+@pytest.fixture
+def orchestrator(fake_runtime, make_orchestrator):
+    return make_orchestrator(fake_runtime(respond), SPEC)
+
+
+@pytest.mark.asyncio
+async def test_profiled_run_attributes_cpu_db_and_await_time_per_step(orchestrator, make_ctx):
+    get_flame_graph_store().clear()
+
+    result = await orchestrator.run_pattern("profile_unit", make_ctx(profile=True), {})
+
+    steps = {step["capability"]: step["time_breakdown"] for step in result["trace"]["steps"]}
+    assert steps["calc.crunch"]["cpu_seconds"] > 0.08
+    assert steps["db.load"]["db_seconds"] == pytest.approx(0.05)
+    assert steps["provider.wait"]["await_seconds"] > 0.08
+    assert steps["provider.wait"]["cpu_seconds"] < 0.03
+
+    profile = result["trace"]["profile"]
+    assert profile["samples"] > 0
+    tree = profile["call_tree"]
+    assert tree["name"] == "profile_unit" and tree["children"][0]["name"] == "calc.crunch"
+    assert "burn_cpu" in str(tree)
+
+    graphs = get_flame_graph_store().graphs()
+    assert ("pattern", "profile_unit") in graphs and ("capability", "calc.crunch") in graphs
+    assert "burn_cpu" in get_flame_graph_store().folded(kind="capability", name="calc.crunch")
+
+
+@pytest.mark.asyncio
+async def test_unprofiled_runs_carry_no_profile(orchestrator, make_ctx):
+    orchestrator.profile_sample_rate = 0
+
+    result = await orchestrator.run_pattern("profile_unit", make_ctx(), {})
+
+    assert "profile" not in result["trace"]
+    assert all("time_breakdown" not in step for step in result["trace"]["steps"])
+    # Outside a profiled run DB time goes nowhere
+    record_db_time(1.0)
+
+
+def test_profile_flag_survives_context_updates(make_ctx):
+    ctx = make_ctx(profile=True)
+
+    assert ctx.with_portfolio(uuid4()).profile and ctx.with_deadline(5).profile
+    assert replace(ctx, profile=False) == ctx
+    assert header_requests_profile("1") and header_requests_profile(" True ")
+    assert not header_requests_profile(None) and not header_requests_profile("0")
+
+
+def test_flame_graphs_roll_over_the_window():
+    now = [0.0]
+    store = FlameGraphStore(window_seconds=120, bucket_seconds=60, max_stacks=2, clock=lambda: now[0])
+    store.add("pattern", "p", {("a", "b"): 0.2, ("a", "c"): 0.1})
+    now[0] = 70.0
+    store.add("pattern", "p", {("a", "b"): 0.3, ("a", "d"): 0.05})
+
+    graph = store.graphs("pattern", "p")[("pattern", "p")]
+    assert graph["profiles"] == 2
+    assert graph["stacks"][("a", "b")] == pytest.approx(0.5)
+    assert store.folded().splitlines()[0] == "pattern:p;a;b 500"
+
+    now[0] = 250.0
+    assert store.graphs() == {}
+
+
+def test_call_tree_drops_small_subtrees_and_deep_frames():
+    stacks = Counter({("step", "f", "g", "h"): 0.98, ("step", "tiny"): 0.01, ("other",): 0.01})
+
+    tree = build_call_tree(stacks, "root", min_fraction=0.02, max_depth=3)
+
+    assert tree["seconds"] == 1.0
+    assert [child["name"] for child in tree["children"]] == ["step"]
+    step = tree["children"][0]
+    assert step["children"][0]["children"][0] == {"name": "g", "seconds": 0.98}
+
+
+class CrunchAgent(BaseAgent):
+    def __init__(self):
+        super().__init__("crunch_agent", {})
+
+    def get_capabilities(self):
+        return ["calc.crunch"]
+
+    async def calc_crunch(self, ctx, state):
+        burn_cpu(0.3)
+        return {"ok": True}
+
+
+@pytest.mark.asyncio
+async def test_capabilities_run_by_agent_runtime_are_attributed(make_orchestrator, make_ctx):
+    # AgentRuntime runs each attempt in its own task (call_with_budget), off the run_pattern frame
+    runtime = AgentRuntime({"db": None}, enable_rights_enforcement=False)
+    runtime.register_agent(CrunchAgent())
+    spec = {
+        "id": "profile_runtime",
+        "name": "Profile Runtime",
+        "steps": [{"capability": "calc.crunch", "as": "crunch"}],
+        "outputs": ["crunch"],
+    }
+    orchestrator = make_orchestrator(runtime, spec)
+
+    result = await orchestrator.run_pattern("profile_runtime", make_ctx(profile=True), {})
+
+    breakdown = result["trace"]["steps"][0]["time_breakdown"]
+    assert breakdown["cpu_seconds"] > 0.15
+    profile = result["trace"]["profile"]
+    assert profile["samples"] > 0 and "burn_cpu" in str(profile["call_tree"])
@@ -0,0 +1,161 @@
+"""
+Unit Tests for Named Query Registry
+
+Purpose: Cover registration, pooled-connection reuse, histograms and slow-query logging
+Created: 2025-11-10
+Priority: P1
+"""
+
+import pytest
+from contextlib import asynccontextmanager
+
+import asyncpg
+
+from app.db import query_registry
+from app.db.query_registry import (
+    Histogram,
+    QueryRegistry,
+    QueryStats,
+    execute_named,
+    fetch_named,
+    fetchrow_named,
+    register_query,
+)
+
+
+class ReleasedStatement:
+    """Mirrors asyncpg: a statement is bound to the acquisition it was prepared on."""
+
+    def __init__(self, proxy, sql):
+        self.proxy = proxy
+        self.release_ctr = proxy.release_ctr
+
+    async def fetch(self, *args, timeout=None):
+        if self.proxy.released or self.release_ctr != self.proxy.release_ctr:
+            raise asyncpg.exceptions.InterfaceError(
+                "cannot call PreparedStatement.fetch(): the underlying connection "
+                "has been released back to the pool"
+            )
+        return []
+
+
+class FakeProxy:
+    """Per-acquire wrapper around one pooled connection (like PoolConnectionProxy)."""
+
+    def __init__(self, con, release_ctr):
+        self._con = con
+        self.release_ctr = release_ctr
+        self.released = False
+
+    def __getattr__(self, attr):
+        if self.released:
+            raise asyncpg.exceptions.InterfaceError("connection has been released back to the pool")
+        return getattr(self._con, attr)
+
+    async def prepare(self, sql):
+        self._con.prepares += 1
+        return ReleasedStatement(self, sql)
+
+
+RESULTS = {"execute": "UPDATE 3", "fetch": [{"n": 1}, {"n": 2}], "fetchrow": None}
+
+
+def respond(method, sql, args):
+    return RESULTS[method]
+
+
+@pytest.fixture
+def pool(mock_db_pool):
+    """Pool whose acquisitions are released like asyncpg's (statements die with them)."""
+    mock_db_pool.conn.respond = respond
+    acquire = mock_db_pool.acquire
+
+    @asynccontextmanager
+    async def releasing_acquire(timeout=None):
+        async with acquire() as conn:
+            proxy = FakeProxy(conn, mock_db_pool.acquisitions)
+            try:
+                yield proxy
+            finally:
+                proxy.released = True
+
+    mock_db_pool.acquire = releasing_acquire
+    return mock_db_pool
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    stats = QueryStats(slow_query_ms=10_000, explain_slow=False)
+    monkeypatch.setattr(query_registry, "_stats", stats)
+    return stats
+
+
+def test_registry_rejects_conflicting_sql():
+    registry = QueryRegistry()
+    first = registry.register("q", "SELECT 1")
+
+    assert registry.register("q", "  SELECT 1\n") is first
+    with pytest.raises(ValueError, match="already registered"):
+        registry.register("q", "SELECT 2")
+
+
+@pytest.mark.asyncio
+async def test_named_query_survives_release_and_reacquire(fresh_stats, pool):
+    query = register_query("test.reuse", "SELECT n FROM t WHERE id = $1")
+
+    await fetch_named(pool, query, 1)
+    # Same underlying connection, new acquisition
+    rows = await fetch_named(pool, query, 2)
+
+    assert pool.acquisitions == 2
+    assert len(rows) == 2
+    # Plan reuse is left to the connection's statement cache (same SQL text)
+    assert pool.conn.prepares == 0
+    assert pool.conn.calls == [("fetch", query.sql, (1,)), ("fetch", query.sql, (2,))]
+    stats = fresh_stats.snapshot()["queries"]["test.reuse"]
+    assert stats["latency_ms"]["count"] == 2
+    assert stats["rows"]["p50"] == 10.0  # 2 rows fall in the <=10 bucket
+    assert stats["pool_wait_ms"]["count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_and_unnamed_queries_are_tracked(fresh_stats, mock_db_connection):
+    conn = mock_db_connection
+    conn.respond = respond
+    statement = register_query("test.update", "UPDATE t SET x = 1")
+
+    status = await execute_named(conn, statement)
+    await fetchrow_named(conn, register_query("test.row", "SELECT 1"))
+    await fetch_named(conn, "SELECT * FROM adhoc")
+
+    assert status == "UPDATE 3"
+    assert fresh_stats.entries["test.update"].rows.max == 3
+    assert fresh_stats.entries["test.row"].pool_wait_ms.count == 0  # direct connection
+    assert fresh_stats.entries["unnamed"].latency_ms.count == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_logged_and_errors_counted(fresh_stats, mock_db_connection):
+    fresh_stats.slow_query_ms = 0
+
+    await fetch_named(mock_db_connection, "SELECT * FROM slow_table")
+
+    def broken(method, sql, args):
+        raise RuntimeError("connection lost")
+
+    mock_db_connection.respond = broken
+    with pytest.raises(RuntimeError):
+        await fetch_named(mock_db_connection, "SELECT 1")
+
+    assert fresh_stats.slow_queries[-1]["sql"] == "SELECT * FROM slow_table"
+    assert fresh_stats.entries["unnamed"].errors == 1
+
+
+def test_histogram_quantiles():
+    hist = Histogram((1, 10, 100))
+    for value in (0.5, 5, 5, 50, 500):
+        hist.observe(value)
+
+    assert hist.quantile(0.5) == 10.0
+    assert hist.quantile(0.99) == 500
+    assert hist.snapshot()["count"] == 5
@@ -0,0 +1,161 @@
+"""
+Unit Tests for Incremental Ledger Reconciliation
+
+Purpose: Cover ledger state caching, append detection and bulk DB reconciliation
+Created: 2025-11-10
+Priority: P1
+"""
+
+import pytest
+from collections import namedtuple
+from decimal import Decimal
+from uuid import uuid4
+
+from jobs import reconciliation
+from jobs.reconciliation import (
+    LedgerReconciliator,
+    ParsedLedgerState,
+    appended_tail,
+    clear_ledger_cache,
+    ledger_data_from_inventories,
+)
+
+Amount = namedtuple("Amount", "number currency")
+Cost = namedtuple("Cost", "number currency date label")
+Position = namedtuple("Position", "units cost")
+
+
+def make_state(path, content, commit="c1", ledger_data=None):
+    return ParsedLedgerState(
+        ledger_path=str(path),
+        file_hash=reconciliation._hash_bytes(content),
+        commit_hash=commit,
+        byte_length=len(content),
+        include_paths=[str(path)],
+        has_plugins=False,
+        inventories={},
+        ledger_data=ledger_data or {},
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    clear_ledger_cache()
+    yield
+    clear_ledger_cache()
+
+
+def test_appended_tail_detects_append_only_changes(tmp_path):
+    original = b"2025-01-01 open Assets:Cash\n"
+    state = make_state(tmp_path / "main.beancount", original)
+
+    assert appended_tail(original + b"2025-01-02 * \"x\"\n", state) == b"2025-01-02 * \"x\"\n"
+    assert appended_tail(original, state) is None
+    assert appended_tail(b"2025-01-01 open Assets:Bank\n" + b"more\n", state) is None
+
+
+def test_ledger_data_from_inventories_splits_cash_and_holdings():
+    inventories = {
+        "Assets:Brokerage": [
+            Position(Amount(Decimal("100"), "AAPL"), Cost(Decimal("150.00"), "USD", None, None)),
+            Position(Amount(Decimal("2500.50"), "USD"), None),
+            Position(Amount(Decimal("3"), "JPY"), None),
+        ]
+    }
+
+    data = ledger_data_from_inventories(inventories)
+
+    assert data["Assets:Brokerage"]["cash_balance"] == Decimal("2500.50")
+    assert data["Assets:Brokerage"]["holdings"] == [
+        {"currency": "AAPL", "qty": Decimal("100"), "cost_per_unit": Decimal("150.00"), "cost_currency": "USD"}
+    ]
+
+
+def test_load_ledger_state_reuses_cache_and_parses_only_appended(tmp_path, monkeypatch):
+    ledger = tmp_path / "main.beancount"
+    ledger.write_bytes(b"line one\n")
+    reconciliator = LedgerReconciliator(db_pool=None)
+    calls = []
+
+    def full(path, commit):
+        calls.append("full")
+        return make_state(ledger.resolve(), ledger.read_bytes(), commit, {"A": {}})
+
+    def incremental(cached, tail, content, commit):
+        calls.append(("tail", tail))
+        return make_state(ledger.resolve(), content, commit, {"A": {}, "B": {}})
+
+    monkeypatch.setattr(reconciliator, "_parse_full_ledger", full)
+    monkeypatch.setattr(reconciliator, "_apply_appended_entries", incremental)
+
+    reconciliator._load_ledger_state(str(ledger), "c1")
+    reconciliator._load_ledger_state(str(ledger), "c1")
+    assert calls == ["full"]
+
+    ledger.write_bytes(b"line one\nline two\n")
+    state = reconciliator._load_ledger_state(str(ledger), "c2")
+    assert calls == ["full", ("tail", b"line two\n")]
+    assert set(state.ledger_data) == {"A", "B"}
+
+    ledger.write_bytes(b"rewritten\n")
+    reconciliator._load_ledger_state(str(ledger), "c3")
+    assert calls[-1] == "full"
+
+
+def bulk_results(portfolios, positions, cash):
+    """Answer the reconciliation's bulk queries by the table they read."""
+    def respond(method, sql, args):
+        if method == "fetchrow":
+            return {"asof_date": None}
+        if "FROM lots" in sql:
+            return positions
+        if "FROM portfolio_cash" in sql:
+            return cash
+        if "FROM portfolios" in sql:
+            return portfolios
+        return []
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_reconcile_ledger_uses_bulk_queries(monkeypatch, mock_db_pool):
+    p1, p2 = uuid4(), uuid4()
+    mock_db_pool.conn.respond = bulk_results(
+        portfolios=[
+            {"id": p1, "account_name": "Assets:One", "base_ccy": "USD"},
+            {"id": p2, "account_name": "Assets:Two", "base_ccy": "USD"},
+        ],
+        positions=[
+            {"portfolio_id": p1, "symbol": "AAPL", "qty": 10, "cost_per_unit": 100, "price": 110, "market_value": 1100},
+            {"portfolio_id": p2, "symbol": "MSFT", "qty": 5, "cost_per_unit": 200, "price": 210, "market_value": 1050},
+        ],
+        cash=[{"portfolio_id": p1, "total_cash": 50}],
+    )
+    ledger_data = {
+        "Assets:One": {
+            "holdings": [{"currency": "AAPL", "qty": Decimal("10"), "cost_per_unit": Decimal("100"), "cost_currency": "USD"}],
+            "cash_balance": Decimal("50"),
+        },
+        "Assets:Two": {
+            "holdings": [{"currency": "MSFT", "qty": Decimal("4"), "cost_per_unit": Decimal("200"), "cost_currency": "USD"}],
+            "cash_balance": Decimal("0"),
+        },
+    }
+
+    reconciliator = LedgerReconciliator(mock_db_pool)
+
+    async def commit_hash(path):
+        return "c1"
+
+    monkeypatch.setattr(reconciliator, "_get_ledger_commit_hash", commit_hash)
+    monkeypatch.setattr(reconciliator, "_load_beancount_ledger", lambda path, commit: ledger_data)
+
+    report = await reconciliator.reconcile_ledger("PP_2025-11-10")
+
+    assert report.status == "FAIL"
+    assert report.portfolios_checked == 2
+    assert report.positions_checked == 2
+    assert [e.account for e in report.errors] == ["Assets:Two:MSFT", "Assets:Two:MSFT"]
+    assert {e.error_type for e in report.errors} == {"QUANTITY_MISMATCH", "VALUATION_MISMATCH"}
+    # portfolios + pack date + one positions query + one cash query
+    assert len(mock_db_pool.conn.calls) == 4
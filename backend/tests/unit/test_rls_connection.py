@@ -0,0 +1,129 @@
+"""
+Unit Tests for RLS-Scoped Connections
+
+Purpose: Cover parameterised RLS context, lazy read-only sessions and UUID validation
+Created: 2025-11-10
+Priority: P0 (Security)
+"""
+
+import pytest
+from uuid import uuid4
+
+from app.db import connection
+from app.db.connection import (
+    POOL_READ,
+    POOL_WRITE,
+    SET_RLS_USER_SQL,
+    PoolManager,
+    get_db_connection_with_rls,
+    get_rls_read_connection,
+)
+from app.db.query_registry import fetch_named, register_query
+
+
+@pytest.fixture
+def pools(monkeypatch, fake_pool):
+    storage = connection._get_pool_storage()
+    manager = PoolManager()
+    write, read = fake_pool(POOL_WRITE, max_size=5), fake_pool(POOL_READ, max_size=5)
+    manager.register(POOL_WRITE, write)
+    manager.register(POOL_READ, read)
+    monkeypatch.setattr(storage, "manager", manager)
+    monkeypatch.setattr(storage, "pool", write)
+    return write, read
+
+
+@pytest.mark.asyncio
+async def test_rls_connection_uses_parameterised_set_config(pools):
+    write, read = pools
+    user_id = uuid4()
+
+    async with get_db_connection_with_rls(str(user_id)) as conn:
+        await conn.fetch("SELECT * FROM portfolios")
+
+    assert write.conn.calls[0] == ("transaction", "BEGIN", (False,))
+    assert write.conn.calls[1] == ("execute", SET_RLS_USER_SQL, (str(user_id),))
+    assert write.conn.calls[-1] == ("transaction", "COMMIT", ())
+    assert read.conn.calls == []
+
+
+@pytest.mark.asyncio
+async def test_readonly_rls_connection_uses_read_pool(pools):
+    write, read = pools
+
+    async with get_db_connection_with_rls(str(uuid4()), readonly=True):
+        pass
+
+    assert read.conn.calls[0] == ("transaction", "BEGIN", (True,))
+    assert write.conn.calls == []
+
+
+@pytest.mark.asyncio
+async def test_read_session_begins_with_first_query_in_one_message(pools):
+    _, read = pools
+    user_id = uuid4()
+
+    async with get_rls_read_connection(user_id) as conn:
+        assert read.conn.calls == []
+        await conn.fetch("SELECT 1")
+        await conn.fetch("SELECT 2")
+
+    _, sql, args = read.conn.calls[0]
+    assert sql == f"BEGIN READ ONLY; SELECT set_config('app.user_id', '{user_id}', true)"
+    assert args == ()
+    assert [sql for _, sql, _ in read.conn.calls[1:]] == ["SELECT 1", "SELECT 2", "COMMIT"]
+
+
+@pytest.mark.asyncio
+async def test_unused_read_session_costs_no_round_trips(pools):
+    _, read = pools
+
+    async with get_rls_read_connection(str(uuid4())):
+        pass
+
+    assert read.conn.calls == []
+
+
+@pytest.mark.asyncio
+async def test_read_session_rolls_back_on_error(pools):
+    _, read = pools
+
+    with pytest.raises(KeyError):
+        async with get_rls_read_connection(str(uuid4())) as conn:
+            await conn.fetch("SELECT 1")
+            raise KeyError("boom")
+
+    assert read.conn.calls[-1] == ("execute", "ROLLBACK", ())
+
+
+@pytest.mark.asyncio
+async def test_named_queries_start_the_read_session(pools):
+    _, read = pools
+    query = register_query("test.rls_named", "SELECT * FROM lots")
+
+    async with get_rls_read_connection(str(uuid4())) as conn:
+        await fetch_named(conn, query)
+
+    assert read.conn.calls[0][1].startswith("BEGIN READ ONLY")
+    assert read.conn.calls[1] == ("fetch", "SELECT * FROM lots", ())
+
+
+@pytest.mark.asyncio
+async def test_non_uuid_user_is_rejected_before_acquire(pools):
+    write, read = pools
+
+    with pytest.raises(ValueError, match="Invalid user_id"):
+        async with get_rls_read_connection("x'; DROP TABLE lots; --"):
+            pass
+    with pytest.raises(ValueError):
+        async with get_db_connection_with_rls("user-001"):
+            pass
+
+    assert write.conn.calls == [] and read.conn.calls == []
+
+
+@pytest.mark.asyncio
+async def test_read_session_refuses_nested_transactions(pools):
+    async with get_rls_read_connection(str(uuid4())) as conn:
+        with pytest.raises(RuntimeError, match="do not support transactions"):
+            conn.transaction()
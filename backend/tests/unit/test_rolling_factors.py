@@ -0,0 +1,126 @@
+"""
+Unit Tests for Rolling Factor Regressions
+
+Purpose: Check prefix-sum window regressions against per-window least squares
+Created: 2025-11-10
+Priority: P1
+"""
+
+import numpy as np
+import pytest
+from datetime import date, timedelta
+from uuid import uuid4
+
+from app.services.rolling_factors import (
+    FACTOR_NAMES,
+    FactorExposureHistoryStore,
+    rolling_factor_regressions,
+    weekly_window_ends,
+)
+
+
+def make_panel(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    start = np.datetime64("2023-01-02")
+    dates = start + np.cumsum(rng.integers(1, 4, size=n)).astype("timedelta64[D]")
+    X = rng.normal(0, 0.01, size=(n, len(FACTOR_NAMES)))
+    y = 0.0002 + X @ np.array([0.5, -0.3, 0.8, 0.1, 1.1]) + rng.normal(0, 0.004, size=n)
+    return dates, y, X
+
+
+def lstsq_window(dates, y, X, end, lookback):
+    mask = (dates > np.datetime64(end) - np.timedelta64(lookback, "D")) & (dates <= np.datetime64(end))
+    design = np.column_stack([np.ones(mask.sum()), X[mask]])
+    coef, *_ = np.linalg.lstsq(design, y[mask], rcond=None)
+    resid = y[mask] - design @ coef
+    r2 = 1 - resid @ resid / ((y[mask] - y[mask].mean()) ** 2).sum()
+    return coef, r2, np.sqrt(resid @ resid / mask.sum()) * np.sqrt(252), mask.sum()
+
+
+def test_windows_match_per_window_least_squares():
+    dates, y, X = make_panel()
+    ends = [date(2023, 9, 1) + timedelta(days=30 * i) for i in range(8)]
+
+    results = rolling_factor_regressions(dates, y, X, ends, lookback_days=252)
+
+    for end, result in zip(ends, results):
+        coef, r2, resid_vol, n = lstsq_window(dates, y, X, end, 252)
+        assert result["data_points"] == n
+        assert result["alpha"] == pytest.approx(coef[0], abs=1e-6)
+        for j, name in enumerate(FACTOR_NAMES):
+            assert result["beta"][name] == pytest.approx(coef[j + 1], abs=1e-4)
+        assert result["r_squared"] == pytest.approx(r2, abs=1e-4)
+        assert result["residual_vol"] == pytest.approx(resid_vol, abs=1e-4)
+
+
+def test_constant_factor_column_gets_zero_beta():
+    dates, y, X = make_panel()
+    X[:, 3] = 0.0
+    end = date(2024, 3, 1)
+
+    result = rolling_factor_regressions(dates, y, X, [end])[0]
+
+    coef, r2, _, _ = lstsq_window(dates, y, np.delete(X, 3, axis=1), end, 252)
+    assert result["beta"]["usd"] == 0.0
+    assert result["beta"]["equity_risk_premium"] == pytest.approx(coef[4], abs=1e-4)
+    assert result["r_squared"] == pytest.approx(r2, abs=1e-4)
+
+
+def test_short_windows_report_insufficient_data():
+    dates, y, X = make_panel(n=40)
+    results = rolling_factor_regressions(dates, y, X, [date(2023, 1, 10), date(2024, 1, 1)], lookback_days=365)
+
+    assert "error" in results[0] and results[0]["data_points"] < 30
+    assert "error" not in results[1] and results[1]["data_points"] == 40
+
+
+def test_weekly_window_ends_keeps_last_pack_per_week():
+    packs = [(f"PP_{d}", d) for d in (date(2024, 1, 5), date(2024, 1, 2), date(2024, 1, 8), date(2024, 1, 4))]
+
+    assert weekly_window_ends(packs) == [("PP_2024-01-05", date(2024, 1, 5)), ("PP_2024-01-08", date(2024, 1, 8))]
+
+
+class FakeAnalyzer:
+    def __init__(self):
+        self.calls = []
+
+    async def compute_factor_exposure_history(self, portfolio_id, window_ends, lookback_days):
+        self.calls.append(list(window_ends))
+        return [{"alpha": 0.0, "r_squared": 0.5} for _ in window_ends]
+
+
+class MemoryHistoryStore(FactorExposureHistoryStore):
+    def __init__(self):
+        super().__init__()
+        self.version = "v1"
+        self.rows = {}
+
+    async def data_version(self, portfolio_id):
+        return self.version
+
+    async def load(self, portfolio_id, pack_ids, data_version):
+        return {
+            pack_id: exposure
+            for (pack_id, version), exposure in self.rows.items()
+            if pack_id in pack_ids and version == data_version
+        }
+
+    async def save(self, portfolio_id, computed, data_version):
+        for pack_id, _, exposure in computed:
+            self.rows[(pack_id, data_version)] = exposure
+
+
+@pytest.mark.asyncio
+async def test_stored_exposures_recomputed_after_portfolio_data_changes():
+    store, analyzer = MemoryHistoryStore(), FakeAnalyzer()
+    packs = [("PP_2024-01-05", date(2024, 1, 5)), ("PP_2024-01-12", date(2024, 1, 12))]
+    portfolio_id = uuid4()
+
+    await store.get_history(analyzer, portfolio_id, packs)
+    await store.get_history(analyzer, portfolio_id, packs)
+    assert len(analyzer.calls) == 1
+
+    store.version = "v2"  # e.g. a backdated trade restated past returns
+    history = await store.get_history(analyzer, portfolio_id, packs)
+    assert len(analyzer.calls) == 2 and len(analyzer.calls[1]) == 2
+    assert [row["pack_id"] for row in history] == ["PP_2024-01-12", "PP_2024-01-05"]
@@ -0,0 +1,154 @@
+"""
+Unit Tests for Incremental Rolling Statistics
+
+Purpose: Check O(1) window updates against full-window numpy recomputation
+Created: 2025-11-10
+Priority: P1
+"""
+
+import numpy as np
+import pytest
+from datetime import date, timedelta
+from uuid import uuid4
+
+from app.services.rolling_stats import RollingStatsStore, RollingWindowState
+
+
+def make_series(n, seed=7):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0004, 0.012, n)
+    bench = 0.8 * returns + rng.normal(0, 0.004, n)
+    navs = 100_000 * np.cumprod(np.concatenate([[1.0], 1 + returns]))
+    days = [date(2024, 1, 1) + timedelta(days=i) for i in range(n + 1)]
+    return days, navs, returns, bench
+
+
+def test_window_matches_full_recomputation():
+    window = 30
+    days, navs, returns, bench = make_series(200)
+    state = RollingWindowState(window)
+    state.risk_free_rate = 0.02
+
+    state.push(days[0], navs[0])
+    for i in range(1, len(days)):
+        state.push(days[i], navs[i], benchmark=bench[i - 1])
+
+    r = returns[-window:]
+    b = bench[-window:]
+    metrics = state.metrics()
+    assert metrics["n_obs"] == window
+    assert metrics["mean_return"] == pytest.approx(r.mean(), rel=1e-9)
+    assert metrics["volatility"] == pytest.approx(np.std(r, ddof=1) * np.sqrt(252), rel=1e-9)
+    assert metrics["sharpe"] == pytest.approx((r.mean() * 252 - 0.02) / (np.std(r, ddof=1) * np.sqrt(252)), rel=1e-9)
+    assert metrics["beta"] == pytest.approx(np.cov(r, b)[0, 1] / np.var(b, ddof=1), rel=1e-9)
+    peak = navs[-window:].max()
+    assert metrics["peak_value"] == pytest.approx(peak)
+    assert metrics["drawdown"] == pytest.approx(navs[-1] / peak - 1)
+
+
+def test_flows_are_removed_from_returns_and_old_dates_skipped():
+    state = RollingWindowState(5)
+    state.push(date(2024, 1, 1), 1000.0)
+    state.push(date(2024, 1, 2), 1510.0, flow=500.0)  # deposit: 1% return
+
+    assert state.push(date(2024, 1, 2), 9999.0) is False
+    assert list(state.returns) == [pytest.approx(0.01)]
+
+
+def test_benchmark_attached_later_feeds_beta():
+    days, navs, returns, bench = make_series(10)
+    with_bench, late_bench = RollingWindowState(20), RollingWindowState(20)
+    for i, day in enumerate(days):
+        b = bench[i - 1] if i else None
+        with_bench.push(day, navs[i], benchmark=b)
+        late_bench.push(day, navs[i])
+        if i:
+            assert late_bench.set_benchmark(day, b)
+
+    assert late_bench.set_benchmark(days[-1], 0.5) is False  # already attached
+    assert late_bench.metrics()["beta"] == pytest.approx(with_bench.metrics()["beta"])
+
+
+def test_state_round_trips_through_json_dict():
+    days, navs, _, bench = make_series(50)
+    state = RollingWindowState(30)
+    for i, day in enumerate(days[:40]):
+        state.push(day, navs[i], benchmark=bench[i - 1] if i else None)
+
+    restored = RollingWindowState.from_dict(state.to_dict())
+    for i in range(40, len(days)):
+        state.push(days[i], navs[i])
+        restored.push(days[i], navs[i])
+
+    assert restored.metrics() == pytest.approx(state.metrics())
+
+
+def test_restated_history_detected():
+    state = RollingWindowState(30)
+    state.push(date(2024, 1, 1), 100.0)
+    state.push(date(2024, 1, 2), 101.0)
+    states = {30: state}
+
+    unchanged = [(date(2024, 1, 2), 101.0, 0), (date(2024, 1, 3), 102.0, 0)]
+    restated = [(date(2024, 1, 2), 99.0, 0), (date(2024, 1, 3), 102.0, 0)]
+
+    assert RollingStatsStore._restated(states, unchanged) is False
+    assert RollingStatsStore._restated(states, restated) is True
+    assert RollingStatsStore._restated(states, [(date(2024, 1, 3), 102.0, 0)]) is False
+
+
+@pytest.mark.asyncio
+async def test_rebuild_deletes_and_rewrites_in_one_transaction(monkeypatch, mock_db_pool):
+    history = [
+        {"valuation_date": date(2024, 1, d), "total_value": 100.0 + d, "cash_flows": 0}
+        for d in range(1, 6)
+    ]
+    conn = mock_db_pool.conn
+    conn.respond = lambda method, sql, args: history if method == "fetch" else None
+    monkeypatch.setattr("app.services.rolling_stats.get_pool", lambda name: mock_db_pool)
+    benchmark = {date(2024, 1, d): 0.001 * d for d in range(2, 6)}
+
+    applied = await RollingStatsStore(windows=(30,)).rebuild(uuid4(), benchmark, 0.04)
+
+    assert applied == 5
+    assert conn.calls[0] == ("transaction", "BEGIN", (False,))
+    assert conn.calls[-1] == ("transaction", "COMMIT", ())
+    statements = conn.statements()
+    assert [(method, sql.split()[0]) for method, sql, _ in statements] == [
+        ("fetch", "SELECT"),
+        ("execute", "DELETE"),
+        ("execute", "DELETE"),
+        ("executemany", "INSERT"),
+        ("executemany", "INSERT"),
+    ]
+    stats_rows = statements[3][2]
+    assert stats_rows[-1][7] is not None  # beta from the benchmark series survives the rebuild
+
+
+@pytest.mark.asyncio
+async def test_restated_apply_rebuilds_with_the_benchmark_series(monkeypatch):
+    state = RollingWindowState(30)
+    state.push(date(2024, 1, 1), 100.0)
+    state.push(date(2024, 1, 2), 101.0)
+    store = RollingStatsStore(windows=(30,))
+    rebuilt = []
+
+    async def load(portfolio_id):
+        return {30: state}
+
+    async def load_benchmark_inputs(portfolio_id):
+        return {date(2024, 1, 2): 0.01, date(2024, 1, 3): 0.02}, 0.04
+
+    async def rebuild(portfolio_id, benchmark_returns=None, risk_free_rate=None):
+        rebuilt.append((benchmark_returns, risk_free_rate))
+        return 3
+
+    monkeypatch.setattr(store, "load", load)
+    monkeypatch.setattr(store, "rebuild", rebuild)
+    monkeypatch.setattr("app.services.rolling_stats.load_benchmark_inputs", load_benchmark_inputs)
+
+    # Daily valuation passes no benchmark; the restated NAV on 2024-01-02 triggers a rebuild
+    applied = await store.apply(uuid4(), [(date(2024, 1, 2), 99.0, 0), (date(2024, 1, 3), 102.0, 0)])
+
+    assert applied == 3
+    assert rebuilt == [({date(2024, 1, 2): 0.01, date(2024, 1, 3): 0.02}, 0.04)]
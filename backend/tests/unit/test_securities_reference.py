@@ -0,0 +1,123 @@
+"""
+Unit Tests for the Securities Reference Table
+
+Purpose: Check indexed lookups, vectorized allocation group-by, peers and the bulk FMP classification refresh
+Created: 2025-11-10
+Priority: P1
+"""
+
+from uuid import UUID, uuid4
+
+import pytest
+
+import app.services.securities_reference as securities_reference_module
+from app.services.securities_reference import (
+    SecuritiesReference,
+    current_reference,
+    refresh_classifications,
+    set_securities_reference,
+)
+
+
+def security(symbol, sector=None, security_type="equity", active=True, industry=None, currency="USD"):
+    return {
+        "id": uuid4(), "symbol": symbol, "name": f"{symbol} Inc", "security_type": security_type,
+        "exchange": None, "trading_currency": currency, "domicile_country": None,
+        "sector": sector, "industry": industry, "active": active,
+    }
+
+
+ROWS = [
+    security("AAPL"),                                   # KNOWN_SECTORS fill
+    security("MSFT", sector="Technology", industry="Software"),
+    security("ORCL", sector="Technology", active=False),
+    security("RY.TO", sector="Financial Services", currency="CAD"),
+    security("XIU.TO", security_type="etf", currency="CAD"),
+    security("ZZZ"),
+]
+
+
+@pytest.fixture(autouse=True)
+def reset_reference():
+    yield
+    set_securities_reference(None)
+
+
+def test_lookup_by_id_and_symbol():
+    reference = SecuritiesReference(ROWS)
+
+    by_id = reference.get(ROWS[1]["id"])
+    assert by_id == reference.get("msft")
+    assert by_id["sector"] == "Technology" and by_id["industry"] == "Software"
+    assert reference.get("AAPL")["sector"] == "Technology"
+    assert reference.get("ZZZ")["sector"] == "Other" and reference.get("ZZZ")["industry"] is None
+    assert reference.get("NOPE") is None and "NOPE" not in reference
+
+
+def test_allocation_groups_values_and_ignores_non_positive():
+    reference = SecuritiesReference(ROWS)
+    keys = [ROWS[0]["id"], "MSFT", "RY.TO", "XIU.TO", "UNKNOWN", "ZZZ"]
+    values = [300.0, 200.0, 250.0, 250.0, -50.0, 0.0]
+
+    assert reference.allocation(keys, values, by="sector") == {
+        "Technology": 50.0, "Financial Services": 25.0, "Other": 25.0,
+    }
+    assert reference.aggregate(keys, values, by="currency") == {"USD": 500.0, "CAD": 500.0, "Other": -50.0}
+    assert reference.labels(["RY.TO", "UNKNOWN"], by="country") == ["Other", "Other"]
+
+
+def test_peers_are_active_same_sector_ordered_by_symbol():
+    reference = SecuritiesReference(ROWS)
+
+    assert [p["symbol"] for p in reference.peers("MSFT")] == ["AAPL"]
+    assert [p["symbol"] for p in reference.peers("ZZZ")] == []
+    assert [p["symbol"] for p in reference.peers(None, label="Technology")] == ["AAPL", "MSFT"]
+
+
+def test_positions_table_classifies_without_database():
+    reference = SecuritiesReference.from_positions([
+        {"security_id": "s1", "symbol": "JPM", "market_value": 10},
+        {"security_id": "s2", "symbol": "NEWCO", "market_value": 30},
+    ])
+
+    assert reference.allocation(["s1", "s2"], [10, 30]) == {"Financial Services": 25.0, "Other": 75.0}
+
+
+@pytest.mark.asyncio
+async def test_refresh_classifies_in_bulk_and_reloads(monkeypatch, mock_db_pool):
+    rows = [dict(row) for row in ROWS]
+
+    def classify(method, sql, args):
+        ids, sectors, industries, countries, exchanges = args
+        for security_id, sector, industry in zip(ids, sectors, industries):
+            row = next(r for r in rows if r["id"] == security_id)
+            row["sector"], row["industry"] = sector, industry
+        return "UPDATE"
+
+    mock_db_pool.conn.respond = classify
+
+    async def fake_fetch(conn, query, *args):
+        return [dict(row) for row in rows]
+
+    class FakeFMP:
+        def __init__(self):
+            self.batches = []
+
+        async def get_profiles(self, symbols):
+            self.batches.append(list(symbols))
+            return [
+                {"symbol": s, "sector": "Technology" if s == "AAPL" else "Industrials", "industry": "Hardware"}
+                for s in symbols if s != "ZZZ"
+            ]
+
+    monkeypatch.setattr(securities_reference_module, "fetch_named", fake_fetch)
+    monkeypatch.setattr(securities_reference_module, "get_pool", lambda name=None: mock_db_pool)
+    fmp = FakeFMP()
+
+    result = await refresh_classifications(fmp=fmp, batch_size=1)
+
+    # Unclassified active equities only (AAPL, ZZZ); ETFs and inactive rows skipped
+    assert fmp.batches == [["AAPL"], ["ZZZ"]]
+    assert result["requested"] == 2 and result["classified"] == 1 and [len(args[0]) for _, _, args in mock_db_pool.conn.calls] == [1]
+    assert isinstance(rows[0]["id"], UUID) and rows[0]["industry"] == "Hardware"
+    assert current_reference().get("AAPL")["industry"] == "Hardware"
@@ -0,0 +1,121 @@
+"""
+Unit Tests for Fast JSON Serialization
+
+Purpose: Check the orjson encoder renders like jsonable_encoder, the stdlib fallback and log summaries
+Created: 2025-11-10
+Priority: P1
+"""
+
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+import app.core.serialization as serialization_module
+from app.core.serialization import ORJSONResponse, dumps, loads, summarize
+from app.services.risk import DaRResult
+from app.services.scenarios import ScenarioResult, ShockType
+
+
+class Envelope(BaseModel):
+    status: str = "success"
+    data: dict
+
+
+def scenario_result():
+    return ScenarioResult(
+        portfolio_id=str(uuid4()),
+        shock_type=ShockType.RATES_UP,
+        shock_name="Rates +100bp",
+        as_of_date=date(2025, 11, 10),
+        pre_shock_nav=Decimal("1000000.00"),
+        post_shock_nav=Decimal("985000"),
+        total_delta_pl=Decimal("-15000.50"),
+        total_delta_pl_pct=-0.015,
+        positions=[],
+        winners=[],
+        losers=[],
+        factor_contributions={"real_rates": Decimal("-12000.25")},
+    )
+
+
+def payload():
+    return {
+        "id": uuid4(),
+        "asof": date(2025, 11, 10),
+        "updated": datetime(2025, 11, 10, 16, 30, 5, 120000, tzinfo=timezone.utc),
+        "values": [Decimal("12"), Decimal("1.25"), Decimal("-0.005")],
+        "tags": {"b", "a"},
+        "scenario": scenario_result(),
+        "dar": DaRResult(
+            portfolio_id="p1", regime="MID_EXPANSION", confidence=0.95, dar=-0.12,
+            horizon_days=30, simulations=1000, worst_drawdown=-0.3, median_drawdown=-0.05,
+            best_case=0.08, as_of_date=date(2025, 11, 10), nav=Decimal("250000.5"),
+        ),
+        "model": Envelope(data={"nav": Decimal("10.5")}),
+    }
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_renders_like_jsonable_encoder(monkeypatch, use_orjson):
+    if use_orjson and not serialization_module.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(serialization_module, "ORJSON_AVAILABLE", use_orjson)
+    content = payload()
+
+    decoded = loads(dumps(content))
+
+    expected = jsonable_encoder(content)
+    expected["tags"] = sorted(expected["tags"])
+    assert decoded == expected
+    assert decoded["values"] == [12, 1.25, -0.005] and isinstance(decoded["values"][0], int)
+    assert decoded["scenario"]["shock_type"] == "rates_up"
+    assert decoded["dar"]["nav"] == 250000.5
+
+
+def test_non_string_keys_and_nan():
+    if not serialization_module.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+
+    decoded = json.loads(dumps({date(2025, 1, 2): 1, 3: float("nan")}))
+
+    assert decoded == {"2025-01-02": 1, "3": None}
+
+
+def test_stdlib_fallback_writes_null_for_non_finite_floats(monkeypatch):
+    monkeypatch.setattr(serialization_module, "ORJSON_AVAILABLE", False)
+    content = {
+        "nav": float("nan"),
+        "series": [1.5, float("inf"), (float("-inf"), 2)],
+        "scenario": {"delta": Decimal("NaN"), "ok": Decimal("1.5")},
+    }
+
+    body = dumps(content)
+
+    assert b"NaN" not in body and b"Infinity" not in body
+    assert json.loads(body) == {
+        "nav": None,
+        "series": [1.5, None, [None, 2]],
+        "scenario": {"delta": None, "ok": 1.5},
+    }
+
+
+def test_response_renders_models_like_response_model():
+    response = ORJSONResponse(Envelope(data={"nav": Decimal("10.50"), "asof": date(2025, 11, 10)}))
+
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"status": "success", "data": {"nav": "10.50", "asof": "2025-11-10"}}
+
+
+def test_summaries_are_size_bounded():
+    positions = [{"symbol": f"S{i}", "value": Decimal(i)} for i in range(10_000)]
+    result = {f"key_{i}": i for i in range(50)}
+
+    assert summarize(positions) == "list[10000]"
+    assert summarize(result).startswith("dict[50](key_0, key_1") and summarize(result).endswith(", ...)")
+    assert len(summarize("x" * 5000)) <= 200
+    assert len(summarize({"k" * 300: 1})) == 200
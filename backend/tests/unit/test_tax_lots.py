@@ -0,0 +1,159 @@
+"""
+Unit Tests for the Tax-Lot Engine
+
+Purpose: Check vectorized lot relief, term split and wash-sale sweeps against straightforward references
+Created: 2025-11-10
+Priority: P1
+"""
+
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from app.services.tax_lots import (
+    LotBook,
+    detect_wash_sales,
+    harvest_candidates,
+    realized_summary,
+    value_open_lots,
+    wash_sale_risks,
+)
+from app.services.trade_execution import LotSelectionMethod, order_lots, plan_lot_relief
+
+
+def lot(lot_id, security, acquired, qty, cost, qty_open=None):
+    return {
+        "id": lot_id, "security_id": security, "symbol": security.upper(), "acquisition_date": acquired,
+        "quantity_original": qty, "quantity_open": qty if qty_open is None else qty_open,
+        "cost_basis": cost, "currency": "USD", "base_currency": "USD",
+    }
+
+
+def sell(sell_id, security, sold, qty, amount, realized_pl=None):
+    return {
+        "id": sell_id, "security_id": security, "symbol": security.upper(), "transaction_date": sold,
+        "quantity": qty, "amount": amount, "realized_pl": realized_pl,
+    }
+
+
+def random_history(seed, securities=4, lots_per_security=12, sells_per_security=6):
+    rng = random.Random(seed)
+    lots, sells = [], []
+    for s in range(securities):
+        security = f"sec{s}"
+        day = date(2020, 1, 2)
+        for k in range(lots_per_security):
+            day += timedelta(days=rng.randrange(0, 40))
+            qty = rng.randrange(1, 50)
+            lots.append(lot(f"{security}-L{k}", security, day, qty, qty * rng.uniform(20, 80)))
+        total = sum(l["quantity_original"] for l in lots if l["security_id"] == security)
+        sell_day = date(2020, 3, 1)
+        for k in range(sells_per_security):
+            sell_day += timedelta(days=rng.randrange(1, 90))
+            qty = rng.randrange(1, max(2, total // sells_per_security))
+            sells.append(sell(f"{security}-S{k}", security, sell_day, qty, qty * rng.uniform(20, 80)))
+    rng.shuffle(sells)
+    return lots, sells
+
+
+def reference_relief(lots, sells, method):
+    """Replay with trade_execution's sequential planner (the path executed trades use)."""
+    state = [
+        {**l, "_seq": i, "quantity_original": Decimal(str(l["quantity_original"])),
+         "quantity_open": Decimal(str(l["quantity_original"])), "cost_basis": Decimal(str(l["cost_basis"]))}
+        for i, l in enumerate(lots)
+    ]
+    realized = {}
+    for s in sorted(sells, key=lambda s: s["transaction_date"]):
+        eligible = [l for l in state if l["security_id"] == s["security_id"] and l["acquisition_date"] <= s["transaction_date"]]
+        qty = Decimal(str(s["quantity"]))
+        _, pnl = plan_lot_relief(order_lots(eligible, method), qty, Decimal(str(s["amount"])) / qty, s["transaction_date"])
+        realized[s["id"]] = float(pnl)
+    return realized
+
+
+@pytest.mark.parametrize("method", [LotSelectionMethod.FIFO, LotSelectionMethod.LIFO, LotSelectionMethod.HIFO])
+def test_relief_matches_sequential_planner(method):
+    lots, sells = random_history(seed=3)
+    book = LotBook.from_rows(lots, sells)
+
+    disp = book.relieve(method.value)
+
+    by_sell = np.bincount(disp.sell, weights=disp.gain, minlength=len(sells))
+    expected = reference_relief(lots, sells, method)
+    for i, sell_id in enumerate(book.sell_ids):
+        assert by_sell[i] == pytest.approx(expected[sell_id], abs=1e-6)
+    assert disp.unmatched.sum() == 0
+
+
+def test_fifo_oversell_reports_unmatched_quantity():
+    book = LotBook.from_rows(
+        [lot("L1", "a", date(2024, 1, 2), 10, 1000)],
+        [sell("S1", "a", date(2024, 2, 1), 6, 720), sell("S2", "a", date(2024, 3, 1), 6, 720)],
+    )
+
+    disp = book.relieve("fifo")
+
+    assert disp.quantity.tolist() == [6, 4]
+    assert disp.unmatched.tolist() == [0, 2]
+
+
+def test_term_split_uses_anniversary_plus_one_day():
+    lots = [lot("L1", "a", date(2023, 3, 15), 10, 1000), lot("L2", "a", date(2023, 3, 16), 10, 1000)]
+    book = LotBook.from_rows(lots, [sell("S1", "a", date(2024, 3, 16), 20, 2400)])
+
+    report = realized_summary(book, book.relieve("fifo"), tax_year=2024)
+
+    assert report["long_term_net"] == pytest.approx(200)
+    assert report["short_term_net"] == pytest.approx(200)
+    assert [d["term"] for d in report["dispositions"]] == ["long", "short"]
+    assert realized_summary(book, book.relieve("fifo"), tax_year=2023)["disposition_count"] == 0
+
+
+def test_wash_sale_counts_only_replacement_purchases():
+    lots = [
+        lot("L1", "a", date(2024, 1, 2), 100, 10000),
+        lot("L2", "a", date(2024, 6, 10), 40, 3200),   # bought 20 days after the loss sale
+        lot("L3", "b", date(2024, 5, 25), 50, 5000),   # other security
+        lot("L4", "c", date(2024, 5, 10), 30, 3000),   # sold together with its own lot only
+    ]
+    sells = [
+        sell("S1", "a", date(2024, 5, 21), 100, 8000),
+        sell("S2", "b", date(2024, 6, 1), 50, 4000),
+        sell("S3", "c", date(2024, 5, 20), 30, 2400),
+    ]
+    book = LotBook.from_rows(lots, sells)
+
+    result = detect_wash_sales(book, book.relieve("fifo"), tax_year=2024)
+
+    assert result["loss_dispositions_checked"] == 3
+    assert [w["sell_id"] for w in result["wash_sales"]] == ["S1"]
+    assert result["wash_sales"][0]["replacement_quantity"] == pytest.approx(40)
+    assert result["total_disallowed"] == pytest.approx(2000 * 0.4)
+
+
+def test_harvest_candidates_and_prospective_wash_risk():
+    asof = date(2025, 6, 30)
+    lots = [
+        lot("L1", "a", date(2023, 1, 5), 10, 1500),    # long-term loss
+        lot("L2", "a", date(2025, 6, 20), 5, 500),     # recent purchase, short-term gain
+        lot("L3", "b", date(2025, 2, 1), 20, 2000),    # short-term loss
+        lot("L4", "c", date(2024, 1, 2), 10, 500),     # gain
+    ]
+    book = LotBook.from_rows(lots, [])
+    valuation = value_open_lots(book, {"a": 120.0, "b": 90.0, "c": 80.0}, {}, asof)
+
+    candidates = harvest_candidates(book, valuation, min_loss=100)
+
+    assert [c["security_id"] for c in candidates] == ["a", "b"]
+    assert candidates[0]["long_term_loss"] == pytest.approx(300)
+    assert candidates[0]["lot_ids"] == ["L1"]
+    assert candidates[1]["short_term_loss"] == pytest.approx(200)
+
+    risks = wash_sale_risks(book, candidates, asof)
+    assert risks["a"]["at_risk"] and risks["a"]["recent_purchase_quantity"] == pytest.approx(5)
+    assert risks["a"]["disallowed_fraction"] == pytest.approx(0.5)
+    assert not risks["b"]["at_risk"]
@@ -0,0 +1,136 @@
+"""
+Unit Tests for Batch Trade Execution
+
+Purpose: Cover in-memory lot relief and TradeExecutionService.execute_batch
+Created: 2025-11-10
+Priority: P1 (Trade correctness)
+
+Test Coverage:
+- FIFO/LIFO/HIFO lot ordering
+- Partial/complete lot relief and realized P&L
+- Optimizer proposal → TradeOrder mapping
+- Batch statement count and atomic validation
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+from app.services.trade_execution import (
+    InsufficientSharesError,
+    LotSelectionMethod,
+    TradeExecutionService,
+    TradeOrder,
+    TradeType,
+    order_lots,
+    plan_lot_relief,
+)
+
+
+def lots_and_securities(lots):
+    """Answer the batch's reads: FIFO cost basis method, canned lots, a new id per security."""
+    def respond(method, sql, args):
+        if method == "fetchrow":
+            return {"cost_basis_method": "FIFO"}
+        if method == "fetch" and "FROM lots" in sql:
+            return [
+                {k: v for k, v in lot.items() if k != "_seq"}
+                for lot in sorted(lots, key=lambda lot: lot["_seq"])
+            ]
+        if method == "fetch":
+            return [{"id": uuid4(), "symbol": symbol} for symbol in args[0]]
+        return None
+    return respond
+
+
+class TestLotOrdering:
+    def test_fifo_lifo_hifo(self, make_lot):
+        old = make_lot("AAPL", "10", "1000", date(2024, 1, 1), _seq=0)
+        new = make_lot("AAPL", "10", "2000", date(2024, 6, 1), _seq=1)
+        lots = [new, old]
+
+        assert order_lots(lots, LotSelectionMethod.FIFO) == [old, new]
+        assert order_lots(lots, LotSelectionMethod.LIFO) == [new, old]
+        assert order_lots(lots, LotSelectionMethod.HIFO) == [new, old]
+
+    def test_relief_partial_and_close(self, make_lot):
+        first = make_lot("AAPL", "10", "1000", date(2024, 1, 1), _seq=0)
+        second = make_lot("AAPL", "10", "2000", date(2024, 6, 1), _seq=1)
+
+        closed, pnl = plan_lot_relief([first, second], Decimal("15"), Decimal("150"), date(2025, 1, 2))
+
+        assert [c["qty_closed"] for c in closed] == [Decimal("10"), Decimal("5")]
+        # (10 × 150 − 1000) + (5 × 150 − 5 × 200)
+        assert pnl == Decimal("250")
+        assert first["quantity_open"] == 0 and first["closed_date"] == date(2025, 1, 2)
+        assert second["quantity_open"] == Decimal("5") and second["closed_date"] is None
+
+
+class TestTradeOrder:
+    def test_from_proposal(self):
+        order = TradeOrder.from_proposal(
+            {"symbol": "MSFT", "action": "SELL", "quantity": -12, "current_price": 410.5},
+            trade_date=date(2025, 1, 2),
+        )
+        assert order.trade_type == TradeType.SELL
+        assert order.qty == Decimal("12")
+        assert order.price == Decimal("410.5")
+
+    def test_from_proposal_hold(self):
+        assert TradeOrder.from_proposal(
+            {"symbol": "MSFT", "action": "HOLD", "quantity": 0}, trade_date=date(2025, 1, 2)
+        ) is None
+
+
+class TestExecuteBatch:
+    @pytest.mark.asyncio
+    async def test_fixed_statement_count(self, make_lot, mock_db_connection):
+        lots = [make_lot(f"S{i}", "10", "1000", date(2024, 1, 1), _seq=i) for i in range(50)]
+        conn = mock_db_connection
+        conn.respond = lots_and_securities(lots)
+        service = TradeExecutionService(conn)
+        orders = [
+            TradeOrder(f"S{i}", TradeType.SELL, Decimal("4"), Decimal("120"), "USD", date(2025, 1, 2))
+            for i in range(50)
+        ] + [
+            TradeOrder("NEW", TradeType.BUY, Decimal("5"), Decimal("10"), "USD", date(2025, 1, 2))
+        ]
+
+        result = await service.execute_batch(uuid4(), orders, base_currency="USD")
+
+        assert result["trade_count"] == 51
+        assert result["realized_pnl"] == Decimal("50") * (Decimal("480") - Decimal("400"))
+        # cost basis method, securities, lots, transactions, new lots, lot update
+        assert len(conn.statements()) == 6
+        update = [c for c in conn.calls if c[0] == "execute"][0]
+        assert len(update[2][0]) == 50
+
+    @pytest.mark.asyncio
+    async def test_sell_from_same_batch_buy(self, mock_db_connection):
+        conn = mock_db_connection
+        conn.respond = lots_and_securities([])
+        service = TradeExecutionService(conn)
+        orders = [
+            TradeOrder("NEW", TradeType.BUY, Decimal("5"), Decimal("10"), "USD", date(2025, 1, 2)),
+            TradeOrder("NEW", TradeType.SELL, Decimal("5"), Decimal("12"), "USD", date(2025, 1, 3)),
+        ]
+
+        result = await service.execute_batch(uuid4(), orders)
+
+        assert result["realized_pnl"] == Decimal("10")
+        new_lot_rows = [c for c in conn.calls if c[0] == "executemany" and "INSERT INTO lots" in c[1]][0][2]
+        assert new_lot_rows[0][6] == 0  # quantity_open
+        assert new_lot_rows[0][10] == date(2025, 1, 3)  # closed_date
+
+    @pytest.mark.asyncio
+    async def test_insufficient_shares_writes_nothing(self, make_lot, mock_db_connection):
+        conn = mock_db_connection
+        conn.respond = lots_and_securities([make_lot("AAPL", "10", "1000", date(2024, 1, 1), _seq=0)])
+        service = TradeExecutionService(conn)
+        orders = [TradeOrder("AAPL", TradeType.SELL, Decimal("11"), Decimal("100"), "USD", date(2025, 1, 2))]
+
+        with pytest.raises(InsufficientSharesError):
+            await service.execute_batch(uuid4(), orders)
+
+        assert not [c for c in conn.calls if c[0] in ("execute", "executemany")]
@@ -115,6 +115,9 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     
     try:
         from app.core.types import RequestCtx, ExecReq, ExecResp
+        from app.api.conditional import ConditionalGet
+        from app.core.serialization import ORJSONResponse
+        from app.core.profiling import PROFILE_HEADER, get_flame_graph_store, header_requests_profile
         REQUEST_CTX_AVAILABLE = True
         logger.debug("RequestCtx imported successfully")
     except ImportError as e:
@@ -511,7 +514,97 @@ def get_pattern_orchestrator() -> PatternOrchestrator:
         logger.error(f"Failed to resolve pattern orchestrator: {e}", exc_info=True)
         raise
 
-async def execute_pattern_orchestrator(pattern_name: str, inputs: Dict[str, Any], user_id: str = None) -> Dict[str, Any]:
+async def load_data_version():
+    """
+    Latest pricing pack + ledger data version (what pattern contexts and ETags are keyed by).
+
+    The ledger hash stamps the transactions table (count + last write), so a
+    recorded, edited or deleted trade moves it on the next reload.
+    """
+    from app.api.conditional import DataVersion
+    from app.db.portfolio_version import ledger_data_version
+
+    # Get real pricing pack ID from database
+    pricing_pack_id = f"PP_{date.today().isoformat()}"  # Default fallback
+    # Unknown ledger state: a per-load value never matches an earlier ETag or cache key
+    ledger_commit_hash = uuid4().hex[:8]
+
+    try:
+        # Try to get the latest pricing pack from database
+        query = """
+            SELECT id, date 
+            FROM pricing_packs 
+            WHERE date <= CURRENT_DATE 
+            ORDER BY date DESC 
+            LIMIT 1
+        """
+        result = await execute_query_safe(query)
+        if result and len(result) > 0:
+            pricing_pack_id = result[0]["id"]
+            logger.debug(f"Using pricing pack: {pricing_pack_id}")
+    except Exception as e:
+        logger.warning(f"Could not fetch pricing pack, using default: {e}")
+
+    try:
+        ledger_commit_hash = await ledger_data_version(db_pool) or ledger_commit_hash
+    except Exception as e:
+        logger.warning(f"Could not fetch ledger data version, disabling revalidation: {e}")
+
+    return DataVersion(pricing_pack_id, ledger_commit_hash)
+
+
+_data_versions = None
+
+
+def get_data_versions():
+    """Process-wide data version, reloaded every few seconds (shared by pattern contexts and ETags)."""
+    global _data_versions
+    if _data_versions is None:
+        from app.api.conditional import DataVersionProvider
+
+        _data_versions = DataVersionProvider(load_data_version)
+    return _data_versions
+
+
+async def build_pattern_ctx(
+    inputs: Dict[str, Any], user_id: str = None, profile: bool = False
+) -> Optional["RequestCtx"]:
+    """
+    Build the RequestCtx for a pattern run (latest pricing pack + ledger hash).
+
+    profile=True asks the orchestrator for a sampled profile of the run.
+
+    Returns None when RequestCtx could not be imported (server misconfiguration).
+    """
+    version = await get_data_versions().current()
+    pricing_pack_id = version.pricing_pack_id
+    ledger_commit_hash = version.ledger_commit_hash
+
+    # Create request context with required values
+    # Guardrail: RequestCtx is critical - should never be None (fail fast if import failed)
+    if not REQUEST_CTX_AVAILABLE:
+        logger.error("CRITICAL: RequestCtx not available - cannot create request context")
+        return None
+    
+    ctx = RequestCtx(
+        trace_id=str(uuid4()),
+        request_id=str(uuid4()),
+        user_id=user_id or SYSTEM_USER_ID,
+        portfolio_id=inputs.get("portfolio_id"),
+        asof_date=date.today(),
+        pricing_pack_id=pricing_pack_id,
+        ledger_commit_hash=ledger_commit_hash,
+        profile=profile,
+    )
+
+    # Capabilities run within what is left of the request deadline
+    from app.core.pattern_orchestrator import with_request_deadline
+
+    return with_request_deadline(ctx)
+
+async def execute_pattern_orchestrator(
+    pattern_name: str, inputs: Dict[str, Any], user_id: str = None, profile: bool = False
+) -> Dict[str, Any]:
     """Execute a pattern through the orchestrator and return results."""
     try:
         # Don't attempt orchestration if database is not available
@@ -534,45 +627,15 @@ async def execute_pattern_orchestrator(pattern_name: str, inputs: Dict[str, Any]
             if hasattr(orchestrator, 'agent_runtime') and orchestrator.agent_runtime:
                 logger.debug(f"Agent runtime has execute_capability: {hasattr(orchestrator.agent_runtime, 'execute_capability')}")
 
-        # Get real pricing pack ID from database
-        pricing_pack_id = f"PP_{date.today().isoformat()}"  # Default fallback
-        ledger_commit_hash = hashlib.md5(f"{date.today()}".encode()).hexdigest()[:8]
-
-        try:
-            # Try to get the latest pricing pack from database
-            query = """
-                SELECT id, date 
-                FROM pricing_packs 
-                WHERE date <= CURRENT_DATE 
-                ORDER BY date DESC 
-                LIMIT 1
-            """
-            result = await execute_query_safe(query)
-            if result and len(result) > 0:
-                pricing_pack_id = result[0]["id"]
-                logger.debug(f"Using pricing pack: {pricing_pack_id}")
-        except Exception as e:
-            logger.warning(f"Could not fetch pricing pack, using default: {e}")
-
-        # Create request context with required values
-        # Guardrail: RequestCtx is critical - should never be None (fail fast if import failed)
-        if not REQUEST_CTX_AVAILABLE:
-            logger.error("CRITICAL: RequestCtx not available - cannot create request context")
+        ctx = await build_pattern_ctx(inputs, user_id, profile=profile)
+        if ctx is None:
             return {
                 "success": False,
                 "error": "RequestCtx not available - server configuration error",
                 "data": {}
             }
-        
-        ctx = RequestCtx(
-            trace_id=str(uuid4()),
-            request_id=str(uuid4()),
-            user_id=user_id or SYSTEM_USER_ID,
-            portfolio_id=inputs.get("portfolio_id"),
-            asof_date=date.today(),
-            pricing_pack_id=pricing_pack_id,
-            ledger_commit_hash=ledger_commit_hash
-        )
+        pricing_pack_id = ctx.pricing_pack_id
+        ledger_commit_hash = ctx.ledger_commit_hash
 
         # Run pattern
         result = await orchestrator.run_pattern(pattern_name, ctx, inputs)
@@ -591,7 +654,8 @@ async def execute_pattern_orchestrator(pattern_name: str, inputs: Dict[str, Any]
                 "pricing_pack_id": pricing_pack_id,
                 "ledger_commit_hash": ledger_commit_hash
             },
-            "data_provenance": provenance_info  # Include provenance metadata
+            "data_provenance": provenance_info,  # Include provenance metadata
+            "profile": trace_data.get("profile"),
         }
     except Exception as e:
         import traceback
@@ -628,6 +692,14 @@ async def lifespan(app: FastAPI):
         get_pattern_orchestrator()
         logger.info("Pattern orchestration system initialized")
 
+        # Securities reference data (classification for allocation / comparables)
+        try:
+            from app.services.securities_reference import load_securities_reference
+
+            await load_securities_reference()
+        except Exception as e:
+            logger.warning(f"Securities reference not loaded at startup (loads on first use): {e}")
+
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         logger.warning("Database unavailable - some features may not work")
@@ -644,6 +716,9 @@ async def lifespan(app: FastAPI):
     # Clean up database connections
     if db_pool:
         try:
+            from backend.app.db.connection import get_pool_manager
+
+            await get_pool_manager().close(keep=db_pool)
             await db_pool.close()
             logger.info("Database connections closed")
         except Exception as e:
@@ -727,11 +802,14 @@ async def init_db() -> None:
         # CRITICAL FIX: Register pool with backend connection module
         # This solves the "Database pool not initialized" errors in agents
         try:
-            from backend.app.db.connection import register_external_pool
+            from backend.app.db.connection import init_role_pools, register_external_pool
 
             # Register the pool using the new explicit mechanism
             register_external_pool(db_pool)
 
+            # Separate read (replica when configured) and batch pools
+            await init_role_pools(DATABASE_URL)
+
             logger.info(f"✅ Successfully registered database pool with backend connection module")
             logger.info(f"Pool registered: {db_pool}")
         except ImportError as e:
@@ -1573,78 +1651,103 @@ async def execute_diagnostic_query(query: str = None):
             "error": str(e)
         }
 
+async def resolve_pattern_inputs(request: ExecuteRequest) -> Dict[str, Any]:
+    """Normalize pattern inputs and default portfolio_id for portfolio patterns."""
+    # Handle both 'inputs' and 'params' fields for backwards compatibility
+    pattern_inputs = {}
+    if hasattr(request, 'inputs') and request.inputs:
+        pattern_inputs = request.inputs
+    elif hasattr(request, 'params') and request.params:
+        pattern_inputs = request.params
+
+    # Log initial inputs for debugging
+    logger.info(f"Pattern execution request - pattern: {request.pattern}, initial inputs: {pattern_inputs}")
+    
+    # Provide default values for common missing parameters
+    # portfolio_overview pattern needs lookback_days
+    if request.pattern == "portfolio_overview" and "lookback_days" not in pattern_inputs:
+        pattern_inputs["lookback_days"] = LOOKBACK_DAYS_YEAR  # Default to 1 year
+
+    # Validate and ensure portfolio_id is provided and not None
+    if request.pattern in PORTFOLIO_PATTERNS:
+        # Check if portfolio_id is None, empty string, or missing
+        portfolio_id = pattern_inputs.get("portfolio_id")
+        
+        if portfolio_id is None or portfolio_id == "" or portfolio_id == "None":
+            logger.warning(f"Invalid portfolio_id detected: {portfolio_id}")
+            
+            # Try to get a valid portfolio from the database
+            if db_pool:
+                try:
+                    async with db_pool.acquire() as conn:
+                        result = await conn.fetchrow("SELECT id FROM portfolios LIMIT 1")
+                        if result:
+                            pattern_inputs["portfolio_id"] = str(result["id"])
+                            logger.info(f"Using database portfolio_id: {pattern_inputs['portfolio_id']}")
+                        else:
+                            # Use fallback portfolio ID
+                            pattern_inputs["portfolio_id"] = DEFAULT_PORTFOLIO_ID
+                            logger.info(f"Using fallback portfolio_id: {DEFAULT_PORTFOLIO_ID}")
+                except Exception as e:
+                    logger.error(f"Failed to fetch portfolio from database: {e}")
+                    # Use fallback portfolio ID
+                    fallback_id = "DEFAULT_PORTFOLIO_ID"
+                    pattern_inputs["portfolio_id"] = fallback_id
+                    logger.info(f"Using fallback portfolio_id: {fallback_id}")
+            else:
+                # No database available, use fallback
+                fallback_id = "DEFAULT_PORTFOLIO_ID"
+                pattern_inputs["portfolio_id"] = fallback_id
+                logger.info(f"No database, using fallback portfolio_id: {fallback_id}")
+
+    return pattern_inputs
+
 @app.post("/api/patterns/execute", response_model=SuccessResponse)
-async def execute_pattern(request: ExecuteRequest, user: dict = Depends(require_auth)):
+async def execute_pattern(
+    request: ExecuteRequest,
+    http_request: Request,
+    user: dict = Depends(require_auth),
+):
     """
     Execute a pattern through the orchestrator
     AUTH_STATUS: MIGRATED - Sprint 3 (Final)
+
+    X-Profile: 1 adds "profile" (call tree, per-step cpu/db/await seconds) to the response.
     """
     user_id = user["id"]
     
     try:
-
-        # Execute the pattern
-        # Handle both 'inputs' and 'params' fields for backwards compatibility
-        pattern_inputs = {}
-        if hasattr(request, 'inputs') and request.inputs:
-            pattern_inputs = request.inputs
-        elif hasattr(request, 'params') and request.params:
-            pattern_inputs = request.params
-
-        # Log initial inputs for debugging
-        logger.info(f"Pattern execution request - pattern: {request.pattern}, initial inputs: {pattern_inputs}")
-        
-        # Provide default values for common missing parameters
-        # portfolio_overview pattern needs lookback_days
-        if request.pattern == "portfolio_overview" and "lookback_days" not in pattern_inputs:
-            pattern_inputs["lookback_days"] = LOOKBACK_DAYS_YEAR  # Default to 1 year
-
-        # Validate and ensure portfolio_id is provided and not None
-        if request.pattern in PORTFOLIO_PATTERNS:
-            # Check if portfolio_id is None, empty string, or missing
-            portfolio_id = pattern_inputs.get("portfolio_id")
-            
-            if portfolio_id is None or portfolio_id == "" or portfolio_id == "None":
-                logger.warning(f"Invalid portfolio_id detected: {portfolio_id}")
-                
-                # Try to get a valid portfolio from the database
-                if db_pool:
-                    try:
-                        async with db_pool.acquire() as conn:
-                            result = await conn.fetchrow("SELECT id FROM portfolios LIMIT 1")
-                            if result:
-                                pattern_inputs["portfolio_id"] = str(result["id"])
-                                logger.info(f"Using database portfolio_id: {pattern_inputs['portfolio_id']}")
-                            else:
-                                # Use fallback portfolio ID
-                                pattern_inputs["portfolio_id"] = DEFAULT_PORTFOLIO_ID
-                                logger.info(f"Using fallback portfolio_id: {DEFAULT_PORTFOLIO_ID}")
-                    except Exception as e:
-                        logger.error(f"Failed to fetch portfolio from database: {e}")
-                        # Use fallback portfolio ID
-                        fallback_id = "DEFAULT_PORTFOLIO_ID"
-                        pattern_inputs["portfolio_id"] = fallback_id
-                        logger.info(f"Using fallback portfolio_id: {fallback_id}")
-                else:
-                    # No database available, use fallback
-                    fallback_id = "DEFAULT_PORTFOLIO_ID"
-                    pattern_inputs["portfolio_id"] = fallback_id
-                    logger.info(f"No database, using fallback portfolio_id: {fallback_id}")
+        pattern_inputs = await resolve_pattern_inputs(request)
 
         result = await execute_pattern_orchestrator(
             pattern_name=request.pattern,
             inputs=pattern_inputs,
-            user_id=user_id
+            user_id=user_id,
+            profile=header_requests_profile(http_request.headers.get(PROFILE_HEADER)),
         )
 
         if result["success"]:
-            response = SuccessResponse(data=result["data"])
+            # Same envelope as SuccessResponse, built as a plain dict: ORJSONResponse
+            # serializes the data tree natively, so no pydantic walk over it
+            response = {
+                "status": "success",
+                "data": result["data"],
+                "timestamp": datetime.utcnow().isoformat(),
+            }
             # Add data provenance if available
             if "data_provenance" in result:
-                response_dict = response.model_dump()
-                response_dict["data_provenance"] = result["data_provenance"]
-                return response_dict
-            return response
+                response["data_provenance"] = result["data_provenance"]
+            if result.get("profile"):
+                response["profile"] = {
+                    **result["profile"],
+                    "steps": [
+                        {"capability": step["capability"], **step["time_breakdown"]}
+                        for step in result["trace"]["steps"]
+                        if "time_breakdown" in step
+                    ],
+                }
+            # Rendered directly (no response_model re-validation / jsonable_encoder pass)
+            return ORJSONResponse(response)
         else:
             raise HTTPException(
                 status_code=500,
@@ -1657,6 +1760,58 @@ async def execute_pattern(request: ExecuteRequest, user: dict = Depends(require_
             detail=f"Pattern execution failed: {str(e)}"
         )
 
+@app.post("/api/patterns/execute/stream")
+async def execute_pattern_stream(
+    request: ExecuteRequest,
+    http_request: Request,
+    user: dict = Depends(require_auth),
+):
+    """
+    Execute a pattern, streaming each step's output as soon as it completes.
+
+    Accept: text/event-stream (default) or application/x-ndjson.
+    Events: step (per step), complete ({"data", "data_provenance"}), error.
+    AUTH_STATUS: MIGRATED
+    """
+    from fastapi.responses import StreamingResponse
+    from app.api.streaming import STREAM_HEADERS, encode_stream, negotiate_stream_format
+
+    if not db_pool:
+        raise HTTPException(status_code=503, detail="Database not available")
+
+    orchestrator = get_pattern_orchestrator()
+    if request.pattern not in orchestrator.patterns:
+        raise HTTPException(status_code=404, detail=f"Pattern not found: {request.pattern}")
+
+    pattern_inputs = await resolve_pattern_inputs(request)
+    ctx = await build_pattern_ctx(pattern_inputs, user["id"])
+    if ctx is None:
+        raise HTTPException(status_code=500, detail="RequestCtx not available - server configuration error")
+
+    async def events():
+        async for event in orchestrator.stream_pattern(request.pattern, ctx, pattern_inputs):
+            if event["event"] == "complete":
+                trace_data = event.get("trace") or {}
+                event = {
+                    "event": "complete",
+                    "status": "success",
+                    "data": event.get("data", {}),
+                    "data_provenance": trace_data.get("data_provenance", {}),
+                    "metadata": {
+                        "pattern": request.pattern,
+                        "pricing_pack_id": ctx.pricing_pack_id,
+                        "ledger_commit_hash": ctx.ledger_commit_hash,
+                    },
+                }
+            yield event
+
+    media_type = negotiate_stream_format(http_request.headers.get("accept"))
+    return StreamingResponse(
+        encode_stream(events(), media_type),
+        media_type=media_type,
+        headers=STREAM_HEADERS,
+    )
+
 @app.get("/api/patterns/list")
 async def list_patterns(user: dict = Depends(require_auth)):
     """
@@ -1759,6 +1914,29 @@ async def get_pattern_metadata(pattern_id: str, user: dict = Depends(require_aut
             detail=f"Failed to retrieve pattern metadata: {str(e)}"
         )
 
+@app.get("/api/admin/profiles")
+async def get_pattern_profiles(
+    kind: Optional[str] = Query(None, pattern="^(pattern|capability)$"),
+    name: Optional[str] = Query(None, description="Pattern id or capability name"),
+    format: str = Query("json", pattern="^(json|folded)$"),
+    user: dict = Depends(require_role("ADMIN")),
+):
+    """
+    Aggregated flame graphs of profiled pattern runs over the rolling window.
+
+    format=json: per pattern / capability, profiles, sampled seconds and a
+    condensed call tree. format=folded: folded stacks ("a;b;c <ms>") for
+    flamegraph.pl or speedscope.
+    AUTH_STATUS: ADMIN
+    """
+    store = get_flame_graph_store()
+    if format == "folded":
+        return Response(store.folded(kind, name), media_type="text/plain")
+    return SuccessResponse(data={
+        "window_seconds": store.window_seconds,
+        "graphs": store.summary(kind, name),
+    })
+
 @app.get("/api/patterns/health")
 async def patterns_health_check():
     """
@@ -2266,11 +2444,17 @@ async def get_portfolio_metrics(portfolio_id: str):
         )
 
 @app.get("/api/portfolio")
-async def get_portfolio(user: dict = Depends(require_auth)):
+async def get_portfolio(request: Request, user: dict = Depends(require_auth)):
     """
     Get portfolio data using pattern orchestrator
     AUTH_STATUS: MIGRATED - Sprint 2
     """
+    conditional = await ConditionalGet.open(
+        request, get_data_versions(), "/api/portfolio", user.get("id") or user.get("email")
+    )
+    if conditional.not_modified is not None:
+        return conditional.not_modified
+
     try:
 
         # Try to use pattern orchestrator for real data
@@ -2328,7 +2512,7 @@ async def get_portfolio(user: dict = Depends(require_auth)):
                         # Calculate sector allocation
                         sector_allocation = calculate_sector_allocation(formatted_holdings, total_value)
 
-                        return SuccessResponse(data={
+                        return conditional.respond(SuccessResponse(data={
                             "id": portfolio_id,
                             "name": "Main Portfolio",
                             "total_value": round(total_value, 2),
@@ -2341,7 +2525,7 @@ async def get_portfolio(user: dict = Depends(require_auth)):
                             "var_95": perf_metrics.get("var_95", 0),
                             "risk_score": perf_metrics.get("risk_score", 0.5),
                             "last_updated": datetime.utcnow().isoformat()
-                        })
+                        }))
             except Exception as e:
                 logger.warning(f"Pattern orchestrator failed, falling back: {e}")
 
@@ -2387,7 +2571,8 @@ async def get_portfolio(user: dict = Depends(require_auth)):
         risk_metrics = await calculate_portfolio_risk_metrics(holdings, portfolio_id)
         sector_allocation = calculate_sector_allocation(holdings, total_value)
 
-        return SuccessResponse(data={
+        # Fallback data is not tagged: clients refetch once the pattern path recovers
+        return conditional.respond(SuccessResponse(data={
             "id": portfolio_id,
             "name": portfolio_data[0]["portfolio_name"] if portfolio_data else "Main Portfolio",
             "total_value": round(total_value, 2),
@@ -2395,7 +2580,7 @@ async def get_portfolio(user: dict = Depends(require_auth)):
             "sector_allocation": sector_allocation,
             **risk_metrics,
             "last_updated": datetime.utcnow().isoformat()
-        })
+        }), cacheable=False)
 
     except HTTPException:
         raise
@@ -2408,6 +2593,7 @@ async def get_portfolio(user: dict = Depends(require_auth)):
 
 @app.get("/api/holdings")
 async def get_holdings(
+    request: Request,
     page: int = Query(1, ge=1, le=1000),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     user: dict = Depends(require_auth)
@@ -2416,6 +2602,13 @@ async def get_holdings(
     Get holdings data using pattern orchestrator with pagination
     AUTH_STATUS: MIGRATED - Sprint 2
     """
+    conditional = await ConditionalGet.open(
+        request, get_data_versions(), "/api/holdings", user.get("id") or user.get("email"),
+        {"page": page, "page_size": page_size},
+    )
+    if conditional.not_modified is not None:
+        return conditional.not_modified
+
     try:
 
         # Try to use pattern orchestrator for real data
@@ -2502,7 +2695,7 @@ async def get_holdings(
                         end = start + page_size
                         paginated_holdings = holdings[start:end]
 
-                        return {
+                        return conditional.respond({
                             "holdings": paginated_holdings,
                             "pagination": {
                                 "page": page,
@@ -2510,7 +2703,7 @@ async def get_holdings(
                                 "total": len(holdings),
                                 "total_pages": math.ceil(len(holdings) / page_size)
                             }
-                        }
+                        })
             except Exception as e:
                 logger.warning(f"Pattern orchestrator failed for holdings, using fallback: {e}")
 
@@ -2541,7 +2734,8 @@ async def get_holdings(
         end = start + page_size
         paginated_holdings = holdings[start:end]
 
-        return {
+        # Fallback data is not tagged: clients refetch once the pattern path recovers
+        return conditional.respond({
             "holdings": paginated_holdings,
             "pagination": {
                 "page": page,
@@ -2549,7 +2743,7 @@ async def get_holdings(
                 "total": len(holdings),
                 "total_pages": math.ceil(len(holdings) / page_size)
             }
-        }
+        }, cacheable=False)
 
     except HTTPException:
         raise
@@ -4448,11 +4642,17 @@ async def get_value_at_risk(user: dict = Depends(require_auth)):
 # ============================================================================
 
 @app.get("/api/macro/cycles", response_model=SuccessResponse)
-async def get_macro_cycles(user: dict = Depends(require_auth)):
+async def get_macro_cycles(request: Request, user: dict = Depends(require_auth)):
     """
     Get detailed macro cycle information
     AUTH_STATUS: MIGRATED - Sprint 3
     """
+    conditional = await ConditionalGet.open(
+        request, get_data_versions(), "/api/macro/cycles", user.get("id") or user.get("email")
+    )
+    if conditional.not_modified is not None:
+        return conditional.not_modified
+
     try:
 
         # Try pattern orchestrator for cycle data
@@ -4473,7 +4673,7 @@ async def get_macro_cycles(user: dict = Depends(require_auth)):
                 if result and result.outputs:
                     cycles_data = result.outputs
                     if cycles_data:
-                        return SuccessResponse(data=cycles_data)
+                        return conditional.respond(SuccessResponse(data=cycles_data))
             except Exception as e:
                 logger.warning(f"Pattern execution failed for macro cycles: {e}")
 
@@ -4530,7 +4730,7 @@ async def get_macro_cycles(user: dict = Depends(require_auth)):
             "last_updated": datetime.utcnow().isoformat()
         }
 
-        return SuccessResponse(data=cycles_data)
+        return conditional.respond(SuccessResponse(data=cycles_data), cacheable=False)
 
     except HTTPException:
         raise
@@ -5081,6 +5281,7 @@ async def get_optimizer_analysis(
 
 @app.get("/api/ratings/overview", response_model=SuccessResponse)
 async def get_ratings_overview(
+    request: Request,
     portfolio_id: Optional[str] = Query(None),
     user: dict = Depends(require_auth)
 ):
@@ -5088,6 +5289,13 @@ async def get_ratings_overview(
     Get overall portfolio ratings
     AUTH_STATUS: MIGRATED - Sprint 2
     """
+    conditional = await ConditionalGet.open(
+        request, get_data_versions(), "/api/ratings/overview", user.get("id") or user.get("email"),
+        {"portfolio_id": portfolio_id},
+    )
+    if conditional.not_modified is not None:
+        return conditional.not_modified
+
     try:
 
         # Mock ratings overview
@@ -5118,7 +5326,7 @@ async def get_ratings_overview(
             "last_updated": datetime.utcnow().isoformat()
         }
 
-        return SuccessResponse(data=overview)
+        return conditional.respond(SuccessResponse(data=overview), cacheable=False)
 
     except HTTPException:
         raise
@@ -267,7 +267,63 @@
                 return apiClient.handleApiCallError(`Pattern execution '${patternName}'`, error);
             }
         },
-        
+
+        // Execute pattern with per-step streaming (NDJSON); onStep is called as each step completes.
+        // Resolves with the same shape as executePattern once the pattern finishes.
+        executePatternStream: async (patternName, inputs = {}, onStep = null, options = {}) => {
+            const token = TokenManager.getToken();
+            const response = await fetch(`${API_BASE}/api/patterns/execute/stream`, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/x-ndjson',
+                    ...(token ? { 'Authorization': `Bearer ${token}` } : {})
+                },
+                body: JSON.stringify({
+                    pattern: patternName,
+                    inputs: inputs,
+                    require_fresh: options.requireFresh
+                }),
+                signal: options.signal
+            });
+
+            if (!response.ok || !response.body) {
+                // Streaming unavailable - fall back to the regular endpoint
+                return apiClient.executePattern(patternName, inputs, options);
+            }
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let result = null;
+
+            const handleLine = (line) => {
+                if (!line.trim()) return;
+                const event = JSON.parse(line);
+                if (event.event === 'step') {
+                    if (onStep) onStep(event);
+                } else if (event.event === 'complete') {
+                    result = event;
+                } else if (event.event === 'error') {
+                    const error = new Error(event.error || `Pattern execution '${patternName}' failed`);
+                    error.type = 'PATTERN_ERROR';
+                    throw error;
+                }
+            };
+
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                lines.forEach(handleLine);
+            }
+            handleLine(buffer);
+
+            return result;
+        },
+
         // Get portfolio data with enhanced error handling
         getPortfolio: async () => {
             try {
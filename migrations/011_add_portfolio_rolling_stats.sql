@@ -0,0 +1,45 @@
+-- Migration: Incrementally maintained rolling performance statistics
+-- Purpose: Replace on-demand window scans (the dropped continuous aggregates
+--          portfolio_metrics_30d_rolling / _60d_rolling / _90d_sharpe / _1y_beta)
+--          with per-day rows maintained in O(1) per new daily value
+-- Maintained by: app/services/rolling_stats.py (DailyValuationJob, metrics job)
+-- Rebuild: python -m jobs.rebuild_rolling_stats [--portfolio-id <uuid>]
+--
+-- Created: 2025-11-10
+-- Priority: P1
+
+-- ============================================================================
+-- Per-day rolling metrics (single-row lookups)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS portfolio_rolling_stats (
+    portfolio_id UUID NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    window_days INTEGER NOT NULL,        -- 30, 60, 90, 252 trading days
+    asof_date DATE NOT NULL,
+    n_obs INTEGER NOT NULL,              -- returns in window (< window_days early on)
+    mean_return DOUBLE PRECISION,        -- mean daily return
+    volatility DOUBLE PRECISION,         -- annualised sample stdev
+    sharpe DOUBLE PRECISION,             -- (mean * 252 - rf) / volatility
+    beta DOUBLE PRECISION,               -- vs benchmark, days with benchmark only
+    alpha DOUBLE PRECISION,              -- annualised
+    drawdown DOUBLE PRECISION,           -- NAV / rolling peak - 1
+    peak_value DOUBLE PRECISION,
+    nav DOUBLE PRECISION,
+    PRIMARY KEY (portfolio_id, window_days, asof_date)
+);
+
+-- ============================================================================
+-- Sliding-window state (latest date per portfolio and window)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS portfolio_rolling_state (
+    portfolio_id UUID NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    window_days INTEGER NOT NULL,
+    asof_date DATE NOT NULL,
+    state JSONB NOT NULL,                -- returns/benchmark ring + peak deque
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (portfolio_id, window_days)
+);
+
+COMMENT ON TABLE portfolio_rolling_stats IS 'Rolling vol/Sharpe/beta/drawdown per portfolio, window and day (incremental)';
+COMMENT ON TABLE portfolio_rolling_state IS 'Sliding-window running sums state backing portfolio_rolling_stats';
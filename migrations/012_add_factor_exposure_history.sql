@@ -0,0 +1,22 @@
+-- Migration: Per-pack rolling factor exposure history
+-- Purpose: Persist risk.get_factor_exposure_history results so each
+--          (portfolio, pricing pack, window) regression is computed once
+-- Maintained by: app/services/rolling_factors.py (FactorExposureHistoryStore)
+--
+-- Created: 2025-11-10
+-- Priority: P1
+
+CREATE TABLE IF NOT EXISTS factor_exposure_history (
+    portfolio_id UUID NOT NULL REFERENCES portfolios(id) ON DELETE CASCADE,
+    pricing_pack_id TEXT NOT NULL REFERENCES pricing_packs(id) ON DELETE CASCADE,
+    window_days INTEGER NOT NULL,        -- regression lookback (calendar days)
+    asof_date DATE NOT NULL,             -- pack date (window end)
+    exposure JSONB NOT NULL,             -- alpha, beta{}, r_squared, residual_vol, factor_attribution{}, ...
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (portfolio_id, pricing_pack_id, window_days)
+);
+
+CREATE INDEX IF NOT EXISTS idx_factor_exposure_history_portfolio_date
+    ON factor_exposure_history (portfolio_id, window_days, asof_date DESC);
+
+COMMENT ON TABLE factor_exposure_history IS 'Rolling factor regression results per portfolio, pricing pack and window';
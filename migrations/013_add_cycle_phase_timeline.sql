@@ -0,0 +1,23 @@
+-- Migration: Cached daily cycle phase timeline
+-- Purpose: Phase label and composite score for every indicator date, so
+--          regime-history charts and cycle overlays read full histories
+--          without re-running the detectors
+-- Maintained by: app/services/cycle_timeline.py (refresh_phase_timeline)
+--
+-- Created: 2025-11-10
+-- Priority: P2
+
+CREATE TABLE IF NOT EXISTS cycle_phase_timeline (
+    cycle_type TEXT NOT NULL CHECK (cycle_type IN ('STDC', 'LTDC', 'EMPIRE', 'CIVIL')),
+    date DATE NOT NULL,
+    phase_number SMALLINT NOT NULL,
+    phase TEXT NOT NULL,
+    composite_score DOUBLE PRECISION NOT NULL,
+    computed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (cycle_type, date)
+);
+
+CREATE INDEX IF NOT EXISTS idx_cycle_phase_timeline_date
+    ON cycle_phase_timeline (date DESC);
+
+COMMENT ON TABLE cycle_phase_timeline IS 'Vectorized historical cycle phase classification (one row per cycle and indicator date)';
@@ -0,0 +1,19 @@
+-- Migration: Security classification columns
+-- Purpose: Sector / industry per security so allocation, comparables and
+--          concentration read classification from the in-memory securities
+--          reference table instead of per-position lookups
+-- Maintained by: app/services/securities_reference.py (refresh_classifications)
+--
+-- Created: 2025-11-10
+-- Priority: P1
+
+ALTER TABLE securities ADD COLUMN IF NOT EXISTS sector TEXT;
+ALTER TABLE securities ADD COLUMN IF NOT EXISTS industry TEXT;
+ALTER TABLE securities ADD COLUMN IF NOT EXISTS classification_updated_at TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_securities_sector
+    ON securities (sector) WHERE active = TRUE;
+
+COMMENT ON COLUMN securities.sector IS 'Sector classification (FMP profile sector)';
+COMMENT ON COLUMN securities.industry IS 'Industry classification (FMP profile industry)';
+COMMENT ON COLUMN securities.classification_updated_at IS 'Last bulk classification refresh from FMP profiles';
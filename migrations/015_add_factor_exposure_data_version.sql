@@ -0,0 +1,12 @@
+-- Migration: Portfolio data version on factor exposure history
+-- Purpose: Stored factor regressions are only reused while the portfolio's
+--          transactions and daily values are unchanged since they were computed
+--          (backdated trades and revaluations restate past returns)
+-- Maintained by: app/services/rolling_factors.py (FactorExposureHistoryStore)
+--
+-- Created: 2025-11-10
+-- Priority: P1
+
+ALTER TABLE factor_exposure_history ADD COLUMN IF NOT EXISTS data_version TEXT;
+
+COMMENT ON COLUMN factor_exposure_history.data_version IS 'portfolio_data_version stamp the exposure was computed from (app/db/portfolio_version.py)';